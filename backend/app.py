@@ -1,12 +1,174 @@
-from datetime import datetime
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from functools import wraps
 
 import mysql.connector
-from db import get_db_connection, init_db, is_db_initialized
-from flask import Flask, Response, jsonify, request
+from archive import TABLES as ARCHIVE_TABLES
+from archive import candidates as archive_candidates
+from archive import roll_up
+from batch import Batch, BatchError, parse_operations
+from cache import DEFAULT_TTL_SECONDS, ResponseCache, create_cache_backend
+from cascade import PLANS as CASCADE_PLANS
+from cascade import CascadeBlocked, CascadeError
+from cascade import delete as cascade_delete
+from cascade import impact as cascade_impact
+from cascade import parse_ids as parse_cascade_ids
+from changelog import DEFAULT_LIMIT as CHANGES_DEFAULT_LIMIT
+from changelog import MAX_LIMIT as CHANGES_MAX_LIMIT
+from changelog import read as read_changes
+from changelog import record as record_changes
+from changefeed import ChangeFeed, TooManySubscribers, format_event
+from db import (
+    abandon_connection,
+    get_db_connection,
+    get_replica_hosts,
+    init_db,
+    is_db_initialized,
+)
+from facets import FACETS, facet_values
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
+from hazards import ISO_FORMAT as HAZARD_ISO_FORMAT
+from hazards import WARNING as HAZARD_WARNING
+from hazards import active_hazards
+from hazards import rebuild as rebuild_hazards
+from hazards import refresh as refresh_hazards
+from hierarchy import (
+    MAX_DEPTH,
+    ancestors,
+    closure_insert,
+    closure_move,
+    rebuild_closure,
+    subtree,
+    supervisor_error,
+)
+from listing import LIST_SPECS, ListingError, parse_page
+from occupancy import BUCKET as OCCUPANCY_BUCKET
+from occupancy import (
+    OccupancyConflict,
+    activity_interval,
+    apply_activity,
+    apply_participant,
+    apply_task,
+    bucket_floor,
+    check_booking,
+    check_capacity,
+    load_activity,
+    lock_location,
+    occupancy,
+    parse_capacity,
+)
+from occupancy import rebuild as rebuild_occupancy
+from purge import ENTITIES as PURGE_ENTITIES
+from purge import PurgeWorker, is_deleted, soft_delete, tombstones
+from query_profile import PROFILE_MODES, profile_select
+from quotas import (
+    QuotaExceeded,
+    remove_quota,
+    reserve_slot,
+    set_quota,
+)
+from quotas import sync_counts as sync_quota_counts
+from recurrence import OccurrenceIndex
+from reports import (
+    DEFAULT_TREND_BUCKET,
+    MAINTENANCE_TOTAL_SQL,
+    REPORT_QUERIES,
+    ReportError,
+)
+from reports import maintenance_trend
+from reports import parse_filters as parse_report_filters
+from reports import report_query
+from scheduling import (
+    SCOPES,
+    ScheduleError,
+    find_conflicts,
+    load_bookings,
+    location_conflicts,
+    parse_duration,
+    parse_time,
+    task_interval,
+)
+from search import DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT
+from search import KINDS as SEARCH_KINDS
+from search import MAX_LIMIT as SEARCH_MAX_LIMIT
+from search import search
+from serialization import (
+    compress_response,
+    install_json_provider,
+    to_columnar,
+    wants_columnar,
+)
 
 app = Flask(__name__)
-CORS(app)
+
+# Origins allowed to make credentialed requests. Credentials carry the
+# read-your-writes cookie, so they are never allowed from any origin.
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173"
+    ).split(",")
+    if origin.strip()
+]
+CORS(
+    app,
+    origins=CORS_ORIGINS,
+    expose_headers=["X-Result-Truncated", "X-Row-Limit"],
+    supports_credentials=True,
+)
+install_json_provider(app)
+
+# Responses smaller than this many bytes are sent uncompressed.
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+# After a write, a client reads from the primary for this many seconds
+# instead of a possibly lagging replica.
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+LAST_WRITE_COOKIE = "cmms_last_write"
+
+# Shared response cache for list and report endpoints (see cache.py).
+# Responses read from a replica are not cached while their tables are within
+# the read-your-writes window of a write (see ``cacheable_read``).
+response_cache = ResponseCache(
+    create_cache_backend(),
+    ttl=int(os.getenv("CACHE_TTL", DEFAULT_TTL_SECONDS)),
+    lag_window=READ_YOUR_WRITES_SECONDS,
+)
+
+# Broadcast of committed writes to /api/changes/stream clients (see
+# changefeed.py). Each client may fall this many events behind before it is
+# sent a reset.
+change_feed = ChangeFeed(
+    queue_size=int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "1000")),
+    history_size=int(os.getenv("CHANGE_FEED_HISTORY_SIZE", "1000")),
+    max_subscribers=int(os.getenv("CHANGE_FEED_MAX_CLIENTS", "100")),
+)
+CHANGE_FEED_KEEPALIVE_SECONDS = int(os.getenv("CHANGE_FEED_KEEPALIVE_SECONDS", "15"))
+
+
+# Maintain and read the PersonClosure table for hierarchy lookups instead of
+# walking supervisor_id with recursive CTEs (see hierarchy.py).
+PERSON_CLOSURE = os.getenv("PERSON_CLOSURE", "false").lower() in ("1", "true", "yes")
+
+ALL_TABLES = (
+    "Person",
+    "Profile",
+    "School",
+    "ExternalCompany",
+    "Location",
+    "Activity",
+    "Maintenance",
+    "BuildingSupervision",
+    "Participation",
+    "Affiliation",
+    "RoleQuota",
+    "MaintenanceArchive",
+    "MaintenanceRollup",
+)
 
 
 def ensure_db_initialized_on_startup():
@@ -33,6 +195,31 @@ def ensure_db_initialized_on_startup():
     init_db()
 
 
+def refresh_derived_tables_on_startup():
+    """Bring tables the API maintains in line with the data they summarize.
+
+    Rows written outside the API (seeding, the Dev Console, manual SQL) do
+    not update the RoleQuota counters, PersonClosure, ChemicalHazard or
+    LocationOccupancy, so they are recomputed once per start.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return
+    cursor = conn.cursor()
+    try:
+        sync_quota_counts(cursor)
+        if PERSON_CLOSURE:
+            rebuild_closure(cursor)
+        rebuild_hazards(cursor)
+        rebuild_occupancy(cursor)
+        conn.commit()
+    except mysql.connector.Error as exc:
+        app.logger.warning(f"Could not refresh derived tables: {exc}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
 def parse_json(required_fields=None):
     """Safely parse JSON body and validate required fields.
 
@@ -60,24 +247,419 @@ def parse_json(required_fields=None):
     return data, None
 
 
-def get_connection_or_response():
-    """Get a DB connection or a standardized error response."""
-    conn = get_db_connection()
+def rows_response(rows):
+    """Return a list of rows as JSON.
+
+    Clients may pass ``?shape=columnar`` to receive
+    ``{"columns": [...], "rows": [[...], ...]}`` instead of one object per row.
+    """
+    if wants_columnar(request.args):
+        return jsonify(to_columnar(rows)), 200
+    return jsonify(rows), 200
+
+
+def build_list_query(spec_name, where=(), params=(), reserved=()):
+    """Build ``(sql, params)`` for ``LIST_SPECS[spec_name]`` from the request.
+
+    Honours ``?fields=``, filters, ``?sort=`` and ``?limit=``/``?offset=``
+    (see listing.py) so only the requested rows and columns are read.
+    ``reserved`` names query parameters the view handles itself. Raises
+    ``ListingError`` for anything outside the entity's whitelist.
+    """
+    spec = LIST_SPECS[spec_name]
+    fields = spec.parse_fields(request.args.get("fields"))
+    filters, filter_params = spec.parse_filters(request.args, reserved)
+    order_by = spec.parse_sort(request.args.get("sort"))
+    limit, offset = parse_page(request.args)
+    return spec.build(
+        fields,
+        list(where) + filters,
+        list(params) + filter_params,
+        order_by=order_by,
+        limit=limit,
+        offset=offset,
+    )
+
+
+def fetch_list(cursor, spec_name, where=(), params=(), reserved=()):
+    """Run the list query for ``spec_name`` and return all rows."""
+    sql, params = build_list_query(spec_name, where, params, reserved)
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def recently_wrote():
+    """Return True if this client wrote within ``READ_YOUR_WRITES_SECONDS``.
+
+    Writes made earlier in the same request count too, as does the
+    timestamp cookie set on the response of a client's last write.
+    """
+    if "last_write" in g:
+        return True
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - last_write < READ_YOUR_WRITES_SECONDS
+
+
+def get_connection_or_response(read_only=None):
+    """Get a DB connection or a standardized error response.
+
+    ``read_only`` defaults to True for GET requests. Read-only connections go
+    to a replica when one is configured (``DB_REPLICA_HOSTS``), except for a
+    client that has just written, which keeps reading from the primary so it
+    sees its own changes despite replication lag.
+    """
+    if "batch" in g:
+        return g.batch.connection, None
+    if read_only is None:
+        read_only = request.method in ("GET", "HEAD")
+    if read_only and not recently_wrote():
+        conn = get_db_connection(read_only=True)
+        if get_replica_hosts():
+            g.replica_read = True
+    else:
+        conn = get_db_connection()
     if not conn:
         return None, (jsonify({"error": "Database connection failed"}), 500)
     return conn, None
 
 
+def cacheable_read(tables):
+    """Return True if a response read from ``tables`` may be cached.
+
+    Not while the client is pinned to the primary after its own write, and
+    not when the request read from a replica while one of ``tables`` is
+    still within ``READ_YOUR_WRITES_SECONDS`` of a write, as the replica may
+    not have caught up and its stale rows would be cached under the table's
+    new generation.
+    """
+    if recently_wrote():
+        return False
+    return not (g.get("replica_read") and response_cache.recently_invalidated(tables))
+
+
+def cached_get(namespace, tables):
+    """Cache successful GET responses of a view in ``response_cache``.
+
+    ``tables`` lists every table the response reads from; the entry is
+    skipped as soon as any of them is written (see ``invalidate_tables``).
+    A client that has just written bypasses the cache so it reads its own
+    changes. Other methods on the same view pass straight through.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET" or recently_wrote():
+                return view(*args, **kwargs)
+
+            params = (
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+            )
+            key = response_cache.make_key(namespace, tables, params)
+            body = response_cache.get(key)
+            if body is not None:
+                response = Response(body, mimetype="application/json")
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                if cacheable_read(tables):
+                    response_cache.set(key, response.get_data())
+                response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def change_entries(tables, changes):
+    """Return ``changes`` plus a key-less ``invalidate`` entry for every table
+    in ``tables`` that has no row-level change."""
+    described = {table for table, _, _ in changes}
+    return list(changes) + [
+        (table, "invalidate", None)
+        for table in dict.fromkeys(tables)
+        if table not in described
+    ]
+
+
+def invalidate_tables(*tables, changes=()):
+    """Invalidate cached responses that read from ``tables`` after a commit
+    and announce the write on the change feed.
+
+    ``changes`` lists ``(table, op, key)`` for the rows the write inserted,
+    updated or deleted; each is published as one event carrying the table's
+    new cache generation as its version. Tables written without such an
+    entry (cascades, counters, bulk writes) get a key-less ``invalidate``
+    event telling clients to refetch them.
+
+    Also marks the request as a write so the client is pinned to the primary
+    for the read-your-writes window (see ``set_last_write_cookie``).
+
+    Inside ``/api/batch`` this is deferred until the batch has committed.
+    """
+    if "batch" in g:
+        g.batch.after_commit.append((tables, changes))
+        return
+    entries = change_entries(tables, changes)
+    tables = tuple(dict.fromkeys(table for table, _, _ in entries))
+    versions = response_cache.invalidate(*tables)
+    if OCCURRENCE_TABLES.intersection(tables):
+        reset_occurrence_index()
+    change_feed.publish(
+        [
+            {"table": table, "op": op, "key": key, "version": versions[table]}
+            for table, op, key in entries
+        ]
+    )
+    g.last_write = time.time()
+
+
+def commit_changes(conn, cursor, *tables, changes=()):
+    """Append the write to the ChangeLog, commit, then ``invalidate_tables``.
+
+    The log entries are part of the same transaction as the write itself
+    (see changelog.py), so they are committed or rolled back together.
+    """
+    record_changes(cursor, change_entries(tables, changes))
+    conn.commit()
+    invalidate_tables(*tables, changes=changes)
+
+
+# Larger imports and bulk deletes are logged and announced as one key-less
+# entry per table instead of one entry per row.
+MAX_ROW_EVENTS = 100
+
+
+def commit_cascade(conn, cursor, entity, ids, result, *tables):
+    """``commit_changes`` for a ``cascade.delete`` of ``ids``; ``tables``
+    are other tables the transaction wrote.
+
+    Dependents are logged as key-less ``invalidate`` entries; the deleted
+    rows get one ``delete`` entry each unless some ids did not exist or
+    there are more than ``MAX_ROW_EVENTS``.
+    """
+    plan = CASCADE_PLANS[entity]
+    if result["deleted"] == len(ids) and len(ids) <= MAX_ROW_EVENTS:
+        changes = [(plan.table, "delete", key) for key in ids]
+        if plan.table in plan.tables:
+            # Rows of the same table changed by the cascade (subordinates)
+            changes.append((plan.table, "invalidate", None))
+    else:
+        changes = [(plan.table, "invalidate", None)]
+    commit_changes(conn, cursor, *plan.tables, *tables, changes=changes)
+
+
+@app.before_request
+def postpone_purge():
+    """Keep the purge and archive workers off the database while requests
+    come in.
+
+    Also starts them on the first request, so they run in every server
+    process (gunicorn and other WSGI workers never execute ``__main__``).
+    """
+    purge_worker.start()
+    archive_worker.start()
+    purge_worker.touch()
+    archive_worker.touch()
+
+
+@app.after_request
+def set_last_write_cookie(response):
+    """Remember the time of a client's last write for replica routing."""
+    if "last_write" in g:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{g.last_write:.3f}",
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@app.after_request
+def compress(response):
+    """Gzip/Brotli-encode large responses when the client accepts it."""
+    return compress_response(
+        response, request.headers.get("Accept-Encoding"), COMPRESS_MIN_SIZE
+    )
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+# --- Change Feed ---
+@app.route("/api/changes/stream", methods=["GET"])
+def stream_changes():
+    """Server-Sent Events stream of committed writes.
+
+    Each message is ``{"id", "table", "op", "key", "version"}`` where ``op``
+    is ``insert``, ``update``, ``delete`` or ``invalidate`` (key is null:
+    refetch the table). A ``reset`` event means events were dropped because
+    the client fell too far behind; refetch everything shown. Reconnecting
+    clients send ``Last-Event-ID`` (or ``?last_event_id=``) to resume.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get(
+        "last_event_id"
+    )
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+
+    try:
+        subscriber = change_feed.subscribe(last_event_id)
+    except TooManySubscribers as e:
+        return jsonify({"error": str(e)}), 503
+
+    def generate():
+        try:
+            yield f"retry: {CHANGE_FEED_KEEPALIVE_SECONDS * 1000}\n\n"
+            while True:
+                events = subscriber.wait(CHANGE_FEED_KEEPALIVE_SECONDS)
+                if not events:
+                    # Comment line: keeps proxies from timing out the stream
+                    # and lets the server notice a disconnected client.
+                    yield ": keepalive\n\n"
+                for event in events:
+                    yield format_event(event, app.json.dumps)
+        finally:
+            change_feed.unsubscribe(subscriber)
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+# Dev Console limits for read queries (see execute_query).
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "1000"))
+QUERY_STREAM_MAX_ROWS = int(os.getenv("QUERY_STREAM_MAX_ROWS", "100000"))
+QUERY_MAX_EXECUTION_MS = int(os.getenv("QUERY_MAX_EXECUTION_MS", "10000"))
+QUERY_STREAM_BATCH_SIZE = 500
+
+
+# Single-table writes the Dev Console can attribute to one table. Anything
+# else (multi-table UPDATE/DELETE, DDL, procedures) returns no target.
+WRITE_TARGET = re.compile(
+    r"^\s*(?:"
+    r"(?:INSERT|REPLACE)(?:\s+IGNORE)?\s+(?:INTO\s+)?`?(?P<insert>\w+)`?"
+    r"|UPDATE(?:\s+IGNORE)?\s+`?(?P<update>\w+)`?(?:\s+(?:AS\s+)?\w+)?\s+SET\b"
+    r"|DELETE(?:\s+IGNORE)?\s+FROM\s+`?(?P<delete>\w+)`?"
+    r"(?:\s+(?:AS\s+)?(?!WHERE\b|ORDER\b|LIMIT\b|USING\b)\w+)?"
+    r"(?=\s+(?:WHERE|ORDER|LIMIT)\b|\s*;?\s*$)"
+    r"|TRUNCATE(?:\s+TABLE)?\s+`?(?P<truncate>\w+)`?\s*;?\s*$"
+    r")",
+    re.IGNORECASE,
+)
+
+
+def write_target(query):
+    """Return the table a raw write changes, upper-cased, or None if unknown."""
+    match = WRITE_TARGET.match(query)
+    if not match:
+        return None
+    return next(name for name in match.groups() if name).upper()
+
+
+def bounded_option(value, upper, name):
+    """Parse an optional positive integer request option, capped at ``upper``."""
+    if value is None:
+        return upper
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return min(value, upper)
+
+
+def limit_read_session(cursor, max_rows, timeout_ms):
+    """Cap the rows and run time of SELECTs on this connection's session.
+
+    ``sql_select_limit`` makes MySQL stop after ``max_rows + 1`` rows (the
+    extra row tells us the result was truncated) and ``max_execution_time``
+    makes the server abort a SELECT that runs longer than ``timeout_ms``.
+    Neither applies to a query with its own ``LIMIT`` or to SHOW, so callers
+    also stop reading after ``max_rows + 1`` rows and drop the connection
+    with ``abandon_connection`` instead of draining the rest.
+    """
+    cursor.execute("SET SESSION sql_select_limit = %s", (max_rows + 1,))
+    cursor.execute("SET SESSION max_execution_time = %s", (timeout_ms,))
+
+
+def stream_query(conn, query, max_rows, timeout_ms):
+    """Stream a read query's rows as newline-delimited JSON.
+
+    The first line is ``{"columns": [...]}``, then one JSON array per row as
+    it arrives from an unbuffered cursor, and finally
+    ``{"row_count": n, "truncated": bool}`` (or ``{"error": ...}`` if the
+    query fails part-way through).
+    """
+    cursor = conn.cursor()
+    try:
+        limit_read_session(cursor, max_rows, timeout_ms)
+        cursor.execute(query)
+    except mysql.connector.Error as e:
+        cursor.close()
+        conn.close()
+        return jsonify({"error": str(e), "code": e.errno}), 400
+
+    columns = [column[0] for column in cursor.description or []]
+
+    def generate():
+        row_count = 0
+        truncated = False
+        finished = False
+        try:
+            yield app.json.dumps({"columns": columns}) + "\n"
+            while not truncated:
+                rows = cursor.fetchmany(QUERY_STREAM_BATCH_SIZE)
+                if not rows:
+                    finished = True
+                    break
+                for row in rows:
+                    if row_count == max_rows:
+                        truncated = True
+                        break
+                    row_count += 1
+                    yield app.json.dumps(list(row)) + "\n"
+            yield app.json.dumps(
+                {"row_count": row_count, "truncated": truncated}
+            ) + "\n"
+        except mysql.connector.Error as e:
+            yield app.json.dumps({"error": str(e), "code": e.errno}) + "\n"
+        finally:
+            if finished:
+                cursor.close()
+                conn.close()
+            else:
+                # Truncated, failed or client gone: don't read the rest
+                abandon_connection(conn)
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
 @app.route("/api/query", methods=["POST"])
 def execute_query():
-    """Execute a read-only SQL query.
-
-    For security, this endpoint only allows SELECT statements.
+    """Execute a SQL query from the Dev Console.
+
+    Read queries (SELECT/SHOW) are limited to ``max_rows`` rows (default and
+    upper bound ``QUERY_MAX_ROWS``) and ``timeout_ms`` of server execution
+    time (``QUERY_MAX_EXECUTION_MS``). Truncation is reported in the
+    ``X-Result-Truncated`` header. With ``"stream": true`` rows are sent as
+    newline-delimited JSON while they are read (see ``stream_query``), with
+    a higher row cap of ``QUERY_STREAM_MAX_ROWS``.
+
+    With ``"profile": "explain"`` or ``"profile": "analyze"`` a SELECT is
+    returned as ``{"rows": [...], "profile": {...}}`` with its plan, timings
+    and status counter deltas (see ``query_profile.profile_select``).
     """
     data, error_response = parse_json(required_fields=["query"])
     if error_response:
@@ -87,31 +669,95 @@ def execute_query():
     if not query or not query.strip():
         return jsonify({"error": "Query cannot be empty"}), 400
 
+    is_read = query.strip().upper().startswith(("SELECT", "SHOW"))
+    stream = bool(data.get("stream"))
+    profile_mode = data.get("profile")
+    if profile_mode:
+        if profile_mode not in PROFILE_MODES:
+            return (
+                jsonify(
+                    {"error": f"profile must be one of {', '.join(PROFILE_MODES)}"}
+                ),
+                400,
+            )
+        if stream or not query.strip().upper().startswith("SELECT"):
+            return (
+                jsonify({"error": "profile is only supported for SELECT queries"}),
+                400,
+            )
+    try:
+        max_rows = bounded_option(
+            data.get("max_rows"),
+            QUERY_STREAM_MAX_ROWS if stream else QUERY_MAX_ROWS,
+            "max_rows",
+        )
+        timeout_ms = bounded_option(
+            data.get("timeout_ms"), QUERY_MAX_EXECUTION_MS, "timeout_ms"
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     # Dev Mode: Allow all queries (INSERT, UPDATE, DELETE, DROP, etc.)
     # WARNING: This is dangerous in production!
 
-    conn, error_response = get_connection_or_response()
+    conn, error_response = get_connection_or_response(read_only=is_read)
     if error_response:
         return error_response
 
+    if is_read and stream:
+        return stream_query(conn, query, max_rows, timeout_ms)
+
     cursor = conn.cursor(dictionary=True)
+    unread = False
     try:
-        cursor.execute(query)
-
         # If it's a SELECT query, return results
-        if query.strip().upper().startswith(
-            "SELECT"
-        ) or query.strip().upper().startswith("SHOW"):
-            result = cursor.fetchall()
-            return jsonify(result), 200
+        if is_read:
+            if profile_mode:
+                result, profile = profile_select(
+                    cursor,
+                    query,
+                    profile_mode,
+                    lambda c: limit_read_session(c, max_rows, timeout_ms),
+                    max_rows,
+                    lambda: get_db_connection(read_only=is_read),
+                )
+                response = jsonify({"rows": result[:max_rows], "profile": profile})
+            else:
+                limit_read_session(cursor, max_rows, timeout_ms)
+                cursor.execute(query)
+                # Unbuffered: only max_rows + 1 rows are read, whatever the
+                # query's own LIMIT
+                result = cursor.fetchmany(max_rows + 1)
+                response = jsonify(result[:max_rows])
+            unread = len(result) > max_rows
+            response.headers["X-Result-Truncated"] = str(len(result) > max_rows).lower()
+            response.headers["X-Row-Limit"] = str(max_rows)
+            return response, 200
         else:
             # For write operations, commit and return success message
-            conn.commit()
+            cursor.execute(query)
+            rows_affected = cursor.rowcount
+            # Keep API-maintained tables in line with the raw write; rebuild
+            # them all when the changed table cannot be determined
+            target = write_target(query)
+
+            def changes(*tables):
+                return target is None or target in tables
+
+            if changes("PROFILE"):
+                sync_quota_counts(cursor)
+            if PERSON_CLOSURE and changes("PERSON"):
+                rebuild_closure(cursor)
+            if changes("MAINTENANCE", "LOCATION", "EXTERNALCOMPANY"):
+                rebuild_hazards(cursor)
+            if changes("ACTIVITY", "PARTICIPATION", "MAINTENANCE", "PERSON"):
+                rebuild_occupancy(cursor)
+            commit_changes(conn, cursor, *ALL_TABLES)
             return (
                 jsonify(
                     {
                         "message": "Query executed successfully",
-                        "rows_affected": cursor.rowcount,
+                        "rows_affected": rows_affected,
                     }
                 ),
                 200,
@@ -121,12 +767,16 @@ def execute_query():
         conn.rollback()
         return jsonify({"error": str(e), "code": e.errno}), 400
     finally:
-        cursor.close()
-        conn.close()
+        if unread:
+            abandon_connection(conn)
+        else:
+            cursor.close()
+            conn.close()
 
 
 # --- CRUD Endpoints for Person ---
 @app.route("/api/persons", methods=["GET", "POST"])
+@cached_get("persons", ("Person", "Profile"))
 def manage_persons():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -140,28 +790,18 @@ def manage_persons():
 
             if role_filter:
                 # Filter persons by job_role from Profile table
-                cursor.execute(
-                    """
-                    SELECT p.personal_id, p.name, p.gender, p.date_of_birth, p.entry_date, p.supervisor_id,
-                           TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE()) AS age,
-                           pr.job_role
-                    FROM Person p
-                    JOIN Profile pr ON p.personal_id = pr.personal_id
-                    WHERE pr.job_role = %s
-                """,
-                    (role_filter,),
+                persons = fetch_list(
+                    cursor,
+                    "persons-by-role",
+                    params=(role_filter,),
+                    reserved=("role",),
                 )
             else:
-                # Calculate age dynamically from date_of_birth
-                cursor.execute(
-                    """
-                    SELECT personal_id, name, gender, date_of_birth, entry_date, supervisor_id,
-                           TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) AS age
-                    FROM Person
-                """
-                )
-            persons = cursor.fetchall()
-            return jsonify(persons), 200
+                # Age is calculated dynamically from date_of_birth
+                persons = fetch_list(cursor, "persons", reserved=("role",))
+            return rows_response(persons)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -191,7 +831,11 @@ def manage_persons():
             data.get("supervisor_id"),
         )
         cursor.execute(sql, val)
-        conn.commit()
+        if PERSON_CLOSURE:
+            closure_insert(cursor, data["personal_id"], data.get("supervisor_id"))
+        commit_changes(
+            conn, cursor, changes=[("Person", "insert", data["personal_id"])]
+        )
         return jsonify({"message": "Person created"}), 201
     except mysql.connector.Error as e:
         conn.rollback()
@@ -210,15 +854,18 @@ def manage_person_item(id):
 
     if request.method == "DELETE":
         try:
-            # First delete dependencies (Participation, Affiliation, Profile)
-            cursor.execute("DELETE FROM Participation WHERE personal_id = %s", (id,))
-            cursor.execute("DELETE FROM Affiliation WHERE personal_id = %s", (id,))
-            cursor.execute("DELETE FROM Profile WHERE personal_id = %s", (id,))
-            # Then delete Person
-            cursor.execute("DELETE FROM Person WHERE personal_id = %s", (id,))
-            conn.commit()
-            if cursor.rowcount == 0:
+            # Soft delete; releases the person's quota slots and bookings,
+            # dependents go when the row is purged (purge.py)
+            if not soft_delete(cursor, "persons", id):
+                conn.rollback()
                 return jsonify({"error": "Person not found"}), 404
+            commit_changes(
+                conn,
+                cursor,
+                "Activity",
+                "RoleQuota",
+                changes=[("Person", "delete", id)],
+            )
             return jsonify({"message": "Person deleted"}), 200
         except mysql.connector.Error as e:
             conn.rollback()
@@ -246,6 +893,11 @@ def manage_person_item(id):
             fields.append("date_of_birth = %s")
             values.append(data["date_of_birth"])
         if "supervisor_id" in data:
+            error = supervisor_error(
+                cursor, id, data["supervisor_id"], use_closure=PERSON_CLOSURE
+            )
+            if error:
+                return jsonify({"error": error}), 400
             fields.append("supervisor_id = %s")
             values.append(data["supervisor_id"])
 
@@ -253,11 +905,18 @@ def manage_person_item(id):
             return jsonify({"error": "No fields to update"}), 400
 
         values.append(id)
-        sql = f"UPDATE Person SET {', '.join(fields)} WHERE personal_id = %s"
+        sql = (
+            f"UPDATE Person SET {', '.join(fields)} "
+            "WHERE personal_id = %s AND deleted_at IS NULL"
+        )
         cursor.execute(sql, tuple(values))
-        conn.commit()
-        if cursor.rowcount == 0:
+        updated = cursor.rowcount
+        if updated and PERSON_CLOSURE and "supervisor_id" in data:
+            closure_move(cursor, id, data["supervisor_id"])
+        if updated == 0:
+            conn.rollback()
             return jsonify({"error": "Person not found"}), 404
+        commit_changes(conn, cursor, changes=[("Person", "update", id)])
         return jsonify({"message": "Person updated"}), 200
     except mysql.connector.Error as e:
         conn.rollback()
@@ -267,8 +926,66 @@ def manage_person_item(id):
         conn.close()
 
 
+def hierarchy_response(lookup, id):
+    """Run a hierarchy ``lookup`` for person ``id`` and return its rows.
+
+    The depth-0 row for the person themselves is dropped from the output; if
+    it is missing the person does not exist.
+    """
+    try:
+        max_depth = int(request.args.get("max_depth", MAX_DEPTH))
+    except ValueError:
+        return jsonify({"error": "max_depth must be an integer"}), 400
+    if not 1 <= max_depth <= MAX_DEPTH:
+        return jsonify({"error": f"max_depth must be between 1 and {MAX_DEPTH}"}), 400
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        rows = lookup(cursor, id, max_depth, use_closure=PERSON_CLOSURE)
+        if not rows:
+            return jsonify({"error": "Person not found"}), 404
+        return rows_response([row for row in rows if row["depth"] > 0])
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route("/api/persons/<id>/subordinates", methods=["GET"])
+@cached_get("person-subordinates", ("Person",))
+def person_subordinates(id):
+    """Everyone reporting to a person, directly or indirectly.
+
+    Rows carry ``depth`` (1 = direct report) and are ordered by depth.
+    ``max_depth`` limits how many levels are returned.
+    """
+    return hierarchy_response(subtree, id)
+
+
+@app.route("/api/persons/<id>/ancestors", methods=["GET"])
+@cached_get("person-ancestors", ("Person",))
+def person_ancestors(id):
+    """A person's reporting chain, from their supervisor up to the root."""
+    return hierarchy_response(ancestors, id)
+
+
 # --- Profile Endpoints ---
+# Profiles are only added to live persons: a soft-deleted person gave back
+# their quota slots (see purge.py).
+PROFILE_INSERT_SQL = (
+    "INSERT INTO Profile (personal_id, job_role, status) "
+    "SELECT personal_id, %s, %s FROM Person "
+    "WHERE personal_id = %s AND deleted_at IS NULL"
+)
+
+
 @app.route("/api/profiles", methods=["GET", "POST"])
+@cached_get("profiles", ("Profile", "Person"))
 def manage_profiles():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -277,15 +994,10 @@ def manage_profiles():
 
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute(
-                """
-                SELECT p.*, pr.job_role, pr.status
-                FROM Profile pr
-                JOIN Person p ON pr.personal_id = p.personal_id
-                """
-            )
-            profiles = cursor.fetchall()
-            return jsonify(profiles), 200
+            profiles = fetch_list(cursor, "profiles")
+            return rows_response(profiles)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -303,26 +1015,91 @@ def manage_profiles():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        # Enforce Limits
+        # Enforce Limits (see quotas.py)
         job_role = data["job_role"]
-        if job_role in ["Mid-level Manager", "Base-level Worker"]:
-            limit = 10 if job_role == "Mid-level Manager" else 50
-            cursor.execute(
-                "SELECT COUNT(*) as count FROM Profile WHERE job_role = %s AND status = 'Current'",
-                (job_role,),
-            )
-            count = cursor.fetchone()["count"]
-            if count >= limit:
-                return (
-                    jsonify({"error": f"Limit reached for {job_role} (Max: {limit})"}),
-                    400,
-                )
+        status = data.get("status", "Current")
+        reserve_slot(cursor, job_role, status)
 
-        sql = "INSERT INTO Profile (personal_id, job_role, status) VALUES (%s, %s, %s)"
-        val = (data["personal_id"], job_role, data.get("status", "Current"))
-        cursor.execute(sql, val)
-        conn.commit()
+        cursor.execute(PROFILE_INSERT_SQL, (job_role, status, data["personal_id"]))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return jsonify({"error": "Person not found"}), 400
+        commit_changes(
+            conn,
+            cursor,
+            "RoleQuota",
+            changes=[("Profile", "insert", data["personal_id"])],
+        )
         return jsonify({"message": "Profile created"}), 201
+    except QuotaExceeded as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 400
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# --- Role Quota Endpoints ---
+@app.route("/api/role-quotas", methods=["GET"])
+@cached_get("role-quotas", ("RoleQuota",))
+def list_role_quotas():
+    """List the per-role limits on current profiles and their usage."""
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "SELECT job_role, max_current, current_count FROM RoleQuota "
+            "ORDER BY job_role"
+        )
+        return jsonify(cursor.fetchall()), 200
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route("/api/role-quotas/<job_role>", methods=["PUT", "DELETE"])
+def manage_role_quota(job_role):
+    """Set (PUT ``{"max_current": n}``, null for unlimited) or remove a quota."""
+    if request.method == "PUT":
+        data, error_response = parse_json(required_fields=["max_current"])
+        if error_response:
+            return error_response
+        max_current = data["max_current"]
+        if max_current is not None and (
+            isinstance(max_current, bool)
+            or not isinstance(max_current, int)
+            or max_current < 0
+        ):
+            return (
+                jsonify({"error": "max_current must be a non-negative integer"}),
+                400,
+            )
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        if request.method == "DELETE":
+            remove_quota(cursor, job_role)
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return jsonify({"error": "Quota not found"}), 404
+            commit_changes(conn, cursor, changes=[("RoleQuota", "delete", job_role)])
+            return jsonify({"message": "Quota removed"}), 200
+
+        set_quota(cursor, job_role, max_current)
+        commit_changes(conn, cursor, changes=[("RoleQuota", "update", job_role)])
+        return jsonify({"message": "Quota updated"}), 200
     except mysql.connector.Error as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 400
@@ -333,6 +1110,7 @@ def manage_profiles():
 
 # --- School/Department Endpoints ---
 @app.route("/api/schools", methods=["GET", "POST"])
+@cached_get("schools", ("School",))
 def manage_schools():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -341,16 +1119,10 @@ def manage_schools():
 
         cursor = conn.cursor(dictionary=True)
         try:
-            # Return with school_name alias for frontend compatibility
-            cursor.execute(
-                """
-                SELECT department, dept_name AS school_name, faculty, hq_building
-                FROM School
-                WHERE faculty IS NOT NULL
-            """
-            )
-            schools = cursor.fetchall()
-            return jsonify(schools), 200
+            schools = fetch_list(cursor, "schools")
+            return rows_response(schools)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -376,7 +1148,7 @@ def manage_schools():
             data.get("hq_building"),
         )
         cursor.execute(sql, val)
-        conn.commit()
+        commit_changes(conn, cursor, changes=[("School", "insert", data["department"])])
         return jsonify({"message": "Department created"}), 201
     except mysql.connector.Error as e:
         conn.rollback()
@@ -395,17 +1167,12 @@ def manage_school_item(id):
 
     if request.method == "DELETE":
         try:
-            # Delete related affiliations first
-            cursor.execute("DELETE FROM Affiliation WHERE department = %s", (id,))
-            # Set department to NULL for related locations
-            cursor.execute(
-                "UPDATE Location SET department = NULL WHERE department = %s", (id,)
-            )
-            # Delete the department
-            cursor.execute("DELETE FROM School WHERE department = %s", (id,))
-            conn.commit()
-            if cursor.rowcount == 0:
+            # Affiliations are deleted, locations keep a NULL department
+            result = cascade_delete(cursor, "schools", [id])
+            if result["deleted"] == 0:
+                conn.rollback()
                 return jsonify({"error": "Department not found"}), 404
+            commit_cascade(conn, cursor, "schools", [id], result)
             return jsonify({"message": "Department deleted"}), 200
         except mysql.connector.Error as e:
             conn.rollback()
@@ -438,9 +1205,10 @@ def manage_school_item(id):
         values.append(id)
         sql = f"UPDATE School SET {', '.join(fields)} WHERE department = %s"
         cursor.execute(sql, tuple(values))
-        conn.commit()
         if cursor.rowcount == 0:
+            conn.rollback()
             return jsonify({"error": "Department not found"}), 404
+        commit_changes(conn, cursor, changes=[("School", "update", id)])
         return jsonify({"message": "Department updated"}), 200
     except mysql.connector.Error as e:
         conn.rollback()
@@ -452,6 +1220,7 @@ def manage_school_item(id):
 
 # --- Location Endpoints ---
 @app.route("/api/locations", methods=["GET", "POST"])
+@cached_get("locations", ("Location", "School"))
 def manage_locations():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -460,15 +1229,10 @@ def manage_locations():
 
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute(
-                """
-                SELECT l.*, s.dept_name, s.faculty
-                FROM Location l
-                LEFT JOIN School s ON l.department = s.department
-                """
-            )
-            locations = cursor.fetchall()
-            return jsonify(locations), 200
+            locations = fetch_list(cursor, "locations")
+            return rows_response(locations)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -479,6 +1243,10 @@ def manage_locations():
     data, error_response = parse_json()
     if error_response:
         return error_response
+    try:
+        capacity = parse_capacity(data.get("capacity"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn, error_response = get_connection_or_response()
     if error_response:
@@ -487,8 +1255,8 @@ def manage_locations():
     cursor = conn.cursor(dictionary=True)
     try:
         sql = (
-            "INSERT INTO Location (room, floor, building, type, campus, department) "
-            "VALUES (%s, %s, %s, %s, %s, %s)"
+            "INSERT INTO Location (room, floor, building, type, campus, department, capacity) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)"
         )
         val = (
             data.get("room"),
@@ -497,9 +1265,10 @@ def manage_locations():
             data.get("type"),
             data.get("campus"),
             data.get("department"),
+            capacity,
         )
         cursor.execute(sql, val)
-        conn.commit()
+        commit_changes(conn, cursor, changes=[("Location", "insert", cursor.lastrowid)])
         return jsonify({"message": "Location created"}), 201
     except mysql.connector.Error as e:
         conn.rollback()
@@ -518,26 +1287,16 @@ def manage_location_item(id):
 
     if request.method == "DELETE":
         try:
-            # Check for dependencies (Maintenance)
-            cursor.execute(
-                "SELECT COUNT(*) as count FROM Maintenance WHERE location_id = %s",
-                (id,),
-            )
-            if cursor.fetchone()["count"] > 0:
-                return (
-                    jsonify(
-                        {
-                            "error": "Cannot delete location with associated maintenance tasks"
-                        }
-                    ),
-                    400,
-                )
-
-            cursor.execute("DELETE FROM Location WHERE location_id = %s", (id,))
-            conn.commit()
-            if cursor.rowcount == 0:
+            # Maintenance tasks block the delete, activities lose the location
+            result = cascade_delete(cursor, "locations", [id])
+            if result["deleted"] == 0:
+                conn.rollback()
                 return jsonify({"error": "Location not found"}), 404
+            commit_cascade(conn, cursor, "locations", [id], result)
             return jsonify({"message": "Location deleted"}), 200
+        except CascadeBlocked as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             conn.rollback()
             return jsonify({"error": str(e)}), 400
@@ -551,9 +1310,19 @@ def manage_location_item(id):
         return error_response
 
     try:
+        if "capacity" in data:
+            data["capacity"] = parse_capacity(data["capacity"])
         fields = []
         values = []
-        for key in ["room", "floor", "building", "type", "campus", "department"]:
+        for key in [
+            "room",
+            "floor",
+            "building",
+            "type",
+            "campus",
+            "department",
+            "capacity",
+        ]:
             if key in data:
                 fields.append(f"{key} = %s")
                 values.append(data[key])
@@ -564,10 +1333,15 @@ def manage_location_item(id):
         values.append(id)
         sql = f"UPDATE Location SET {', '.join(fields)} WHERE location_id = %s"
         cursor.execute(sql, tuple(values))
-        conn.commit()
-        if cursor.rowcount == 0:
+        updated = cursor.rowcount
+        refresh_hazards(cursor, "location_id", id)
+        if updated == 0:
+            conn.rollback()
             return jsonify({"error": "Location not found"}), 404
+        commit_changes(conn, cursor, changes=[("Location", "update", id)])
         return jsonify({"message": "Location updated"}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except mysql.connector.Error as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 400
@@ -576,62 +1350,149 @@ def manage_location_item(id):
         conn.close()
 
 
-# --- Activity Endpoints ---
-@app.route("/api/activities", methods=["GET", "POST"])
-def manage_activities():
-    if request.method == "GET":
-        conn, error_response = get_connection_or_response()
-        if error_response:
-            return error_response
+# --- Location Occupancy ---
+OCCUPANCY_MAX_DAYS = 31
 
-        cursor = conn.cursor(dictionary=True)
-        try:
-            cursor.execute(
-                """
-                SELECT
-                    a.activity_id,
-                    a.type,
-                    a.time,
-                    p.name AS organiser_name,
-                    l.building,
-                    l.room,
-                    l.floor
-                FROM Activity a
-                JOIN Person p ON a.organiser_id = p.personal_id
-                LEFT JOIN Location l ON a.location_id = l.location_id
-                ORDER BY a.activity_id
-                """
-            )
-            activities = cursor.fetchall()
-            return jsonify(activities), 200
-        except mysql.connector.Error as e:
-            return jsonify({"error": str(e)}), 400
-        finally:
-            cursor.close()
-            conn.close()
 
-    # POST
-    data, error_response = parse_json(required_fields=["activity_id", "organiser_id"])
+@app.route("/api/locations/<int:id>/occupancy", methods=["GET"])
+@cached_get(
+    "location-occupancy", ("Location", "Activity", "Participation", "Maintenance")
+)
+def location_occupancy(id):
+    """Bookings of a location per time bucket.
+
+    Query parameters:
+    - start_time, end_time: the window (default: the next 24 hours, at most
+      OCCUPANCY_MAX_DAYS days)
+
+    ``available`` is false if an activity or chemical cleaning occupies any
+    bucket of the window. Only non-empty buckets are listed.
+    """
+    try:
+        start = parse_time(request.args.get("start_time"), "start_time")
+        start = start or bucket_floor(datetime.now())
+        end = parse_time(request.args.get("end_time"), "end_time")
+        end = end or start + timedelta(days=1)
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+    if end <= start:
+        return jsonify({"error": "end_time must be after start_time"}), 400
+    if end - start > timedelta(days=OCCUPANCY_MAX_DAYS):
+        return (
+            jsonify({"error": f"Window may span at most {OCCUPANCY_MAX_DAYS} days"}),
+            400,
+        )
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT capacity FROM Location WHERE location_id = %s", (id,))
+        location = cursor.fetchone()
+        if not location:
+            return jsonify({"error": "Location not found"}), 404
+        buckets = occupancy(cursor, id, start, end)
+        return (
+            jsonify(
+                {
+                    "location_id": id,
+                    "capacity": location["capacity"],
+                    "bucket_minutes": int(OCCUPANCY_BUCKET.total_seconds() // 60),
+                    "available": not any(
+                        b["activity_count"] or b["chemical_count"] for b in buckets
+                    ),
+                    "buckets": buckets,
+                }
+            ),
+            200,
+        )
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def occupancy_conflict_response(error):
+    """Return a 409 response listing the buckets that block a booking."""
+    return jsonify({"error": str(error), "conflicts": error.buckets}), 409
+
+
+# --- Activity Endpoints ---
+@app.route("/api/activities", methods=["GET", "POST"])
+@cached_get("activities", ("Activity", "Person", "Location"))
+def manage_activities():
+    if request.method == "GET":
+        conn, error_response = get_connection_or_response()
+        if error_response:
+            return error_response
+
+        cursor = conn.cursor(dictionary=True)
+        try:
+            activities = fetch_list(cursor, "activities")
+            return rows_response(activities)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
+        except mysql.connector.Error as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+            conn.close()
+
+    # POST
+    data, error_response = parse_json(required_fields=["activity_id", "organiser_id"])
     if error_response:
         return error_response
 
+    try:
+        activity = {
+            "location_id": data.get("location_id") or None,
+            "time": parse_time(data.get("time"), "time"),
+            "duration_minutes": parse_duration(data.get("duration_minutes")),
+        }
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn, error_response = get_connection_or_response()
     if error_response:
         return error_response
 
     cursor = conn.cursor(dictionary=True)
     try:
-        sql = "INSERT INTO Activity (activity_id, type, time, organiser_id, location_id) VALUES (%s, %s, %s, %s, %s)"
+        interval = activity_interval(activity)
+        if interval:
+            lock_location(cursor, activity["location_id"])
+            if not data.get("allow_overlap"):
+                check_booking(cursor, activity["location_id"], *interval)
+
+        # Only for a live organiser (see purge.py)
+        sql = (
+            "INSERT INTO Activity (activity_id, type, time, organiser_id, "
+            "location_id, duration_minutes) "
+            "SELECT %s, %s, %s, personal_id, %s, %s FROM Person "
+            "WHERE personal_id = %s AND deleted_at IS NULL"
+        )
         val = (
             data["activity_id"],
             data.get("type"),
-            data.get("time"),
+            activity["time"],
+            activity["location_id"],
+            activity["duration_minutes"],
             data["organiser_id"],
-            data.get("location_id"),
         )
         cursor.execute(sql, val)
-        conn.commit()
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return jsonify({"error": "Organiser not found"}), 400
+        apply_activity(cursor, activity)
+        commit_changes(
+            conn, cursor, changes=[("Activity", "insert", data["activity_id"])]
+        )
         return jsonify({"message": "Activity created"}), 201
+    except OccupancyConflict as e:
+        conn.rollback()
+        return occupancy_conflict_response(e)
     except mysql.connector.Error as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 400
@@ -640,6 +1501,9 @@ def manage_activities():
         conn.close()
 
 
+BOOKING_FIELDS = {"location_id", "time", "duration_minutes"}
+
+
 @app.route("/api/activities/<id>", methods=["PUT", "DELETE"])
 def manage_activity_item(id):
     conn, error_response = get_connection_or_response()
@@ -649,11 +1513,12 @@ def manage_activity_item(id):
 
     if request.method == "DELETE":
         try:
-            cursor.execute("DELETE FROM Participation WHERE activity_id = %s", (id,))
-            cursor.execute("DELETE FROM Activity WHERE activity_id = %s", (id,))
-            conn.commit()
-            if cursor.rowcount == 0:
+            # Soft delete; frees the booking, participations go when the row
+            # is purged
+            if not soft_delete(cursor, "activities", id):
+                conn.rollback()
                 return jsonify({"error": "Activity not found"}), 404
+            commit_changes(conn, cursor, changes=[("Activity", "delete", id)])
             return jsonify({"message": "Activity deleted"}), 200
         except mysql.connector.Error as e:
             conn.rollback()
@@ -667,10 +1532,18 @@ def manage_activity_item(id):
     if error_response:
         return error_response
 
+    try:
+        if "time" in data:
+            data["time"] = parse_time(data["time"], "time")
+        if "duration_minutes" in data:
+            data["duration_minutes"] = parse_duration(data["duration_minutes"])
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         fields = []
         values = []
-        for key in ["type", "time", "organiser_id"]:
+        for key in ["type", "time", "organiser_id", "location_id", "duration_minutes"]:
             if key in data:
                 fields.append(f"{key} = %s")
                 values.append(data[key])
@@ -678,13 +1551,42 @@ def manage_activity_item(id):
         if not fields:
             return jsonify({"error": "No fields to update"}), 400
 
+        if "organiser_id" in data and is_deleted(
+            cursor, "persons", data["organiser_id"]
+        ):
+            return jsonify({"error": "Organiser not found"}), 400
+
+        current = None
+        if BOOKING_FIELDS.intersection(data):
+            # Move the activity's occupancy to where and when it will be
+            current = load_activity(cursor, id)
+        if current:
+            activity = {**current, **{k: data[k] for k in BOOKING_FIELDS if k in data}}
+            apply_activity(cursor, current, -1)
+            interval = activity_interval(activity)
+            if interval:
+                capacity = lock_location(cursor, activity["location_id"])
+                if not data.get("allow_overlap"):
+                    check_booking(cursor, activity["location_id"], *interval)
+                check_capacity(cursor, activity, capacity, activity["participants"])
+
         values.append(id)
-        sql = f"UPDATE Activity SET {', '.join(fields)} WHERE activity_id = %s"
+        sql = (
+            f"UPDATE Activity SET {', '.join(fields)} "
+            "WHERE activity_id = %s AND deleted_at IS NULL"
+        )
         cursor.execute(sql, tuple(values))
-        conn.commit()
-        if cursor.rowcount == 0:
+        updated = cursor.rowcount
+        if current:
+            apply_activity(cursor, activity)
+        if updated == 0:
+            conn.rollback()
             return jsonify({"error": "Activity not found"}), 404
+        commit_changes(conn, cursor, changes=[("Activity", "update", id)])
         return jsonify({"message": "Activity updated"}), 200
+    except OccupancyConflict as e:
+        conn.rollback()
+        return occupancy_conflict_response(e)
     except mysql.connector.Error as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 400
@@ -695,6 +1597,7 @@ def manage_activity_item(id):
 
 # --- Maintenance Endpoints ---
 @app.route("/api/maintenance", methods=["GET", "POST"])
+@cached_get("maintenance", ("Maintenance", "Location"))
 def manage_maintenance():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -703,15 +1606,10 @@ def manage_maintenance():
 
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute(
-                """
-                SELECT m.*, l.building, l.room, l.campus
-                FROM Maintenance m
-                JOIN Location l ON m.location_id = l.location_id
-                """
-            )
-            maintenance = cursor.fetchall()
-            return jsonify(maintenance), 200
+            maintenance = fetch_list(cursor, "maintenance")
+            return rows_response(maintenance)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -723,23 +1621,61 @@ def manage_maintenance():
     if error_response:
         return error_response
 
+    try:
+        scheduled_time = parse_time(data.get("scheduled_time"), "scheduled_time")
+        end_time = parse_time(data.get("end_time"), "end_time")
+        if scheduled_time:
+            task_interval(scheduled_time, end_time)
+        elif end_time:
+            raise ScheduleError("end_time requires scheduled_time")
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn, error_response = get_connection_or_response()
     if error_response:
         return error_response
 
     cursor = conn.cursor(dictionary=True)
     try:
+        if scheduled_time:
+            conflict_response = schedule_conflict_response(
+                cursor,
+                data["location_id"],
+                scheduled_time,
+                end_time,
+                data.get("active_chemical", False),
+                allow_overlap=data.get("allow_overlap"),
+            )
+            if conflict_response:
+                conn.rollback()
+                return conflict_response
+
         cursor.execute(
-            "INSERT INTO Maintenance (type, frequency, location_id, active_chemical, contracted_company_id) VALUES (%s, %s, %s, %s, %s)",
+            "INSERT INTO Maintenance (type, frequency, location_id, active_chemical, contracted_company_id, scheduled_time, end_time) VALUES (%s, %s, %s, %s, %s, %s, %s)",
             (
                 data["type"],
                 data.get("frequency"),
                 data["location_id"],
                 data.get("active_chemical", False),
                 data.get("contracted_company_id"),
+                scheduled_time,
+                end_time,
             ),
         )
-        conn.commit()
+        maintenance_id = cursor.lastrowid
+        refresh_hazards(cursor, "maintenance_id", maintenance_id)
+        apply_task(
+            cursor,
+            {
+                "location_id": data["location_id"],
+                "scheduled_time": scheduled_time,
+                "end_time": end_time,
+                "active_chemical": data.get("active_chemical", False),
+            },
+        )
+        commit_changes(
+            conn, cursor, changes=[("Maintenance", "insert", maintenance_id)]
+        )
         return jsonify({"message": "Maintenance task created"}), 201
     except mysql.connector.Error as e:
         conn.rollback()
@@ -749,6 +1685,79 @@ def manage_maintenance():
         conn.close()
 
 
+SCHEDULE_FIELDS = {"location_id", "scheduled_time", "end_time", "active_chemical"}
+
+
+def schedule_conflict_response(
+    cursor,
+    location_id,
+    scheduled_time,
+    end_time,
+    chemical,
+    exclude_id=None,
+    allow_overlap=False,
+):
+    """Lock the location and return a 409 response if the task would overlap
+    another booking.
+
+    Clients can pass ``"allow_overlap": true`` to schedule it anyway; the
+    location is still locked so the occupancy update is serialized.
+    """
+    lock_location(cursor, location_id)
+    if allow_overlap:
+        return None
+    start, end = task_interval(scheduled_time, end_time)
+    conflicts = location_conflicts(
+        cursor, location_id, start, end, chemical, exclude_id=exclude_id
+    )
+    if not conflicts:
+        return None
+    return (
+        jsonify(
+            {
+                "error": "Maintenance task overlaps existing bookings",
+                "conflicts": conflicts,
+            }
+        ),
+        409,
+    )
+
+
+@app.route("/api/maintenance/conflicts", methods=["GET"])
+@cached_get("maintenance-conflicts", ("Maintenance", "Activity", "Location"))
+def maintenance_conflicts():
+    """Report overlapping bookings per location or building.
+
+    Query parameters:
+    - scope: ``location`` (default) or ``building``
+    - building: only check this building
+    - start_time / end_time: only report conflicts overlapping this window
+    """
+    scope = request.args.get("scope", "location")
+    if scope not in SCOPES:
+        return jsonify({"error": f"scope must be one of {', '.join(SCOPES)}"}), 400
+    try:
+        start = parse_time(request.args.get("start_time"), "start_time")
+        end = parse_time(request.args.get("end_time"), "end_time")
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        bookings = load_bookings(cursor, request.args.get("building"), start, end)
+        conflicts = find_conflicts(bookings, scope)
+        return jsonify({"scope": scope, "count": len(conflicts), "data": conflicts})
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
 @app.route("/api/maintenance/<id>", methods=["PUT", "DELETE"])
 def manage_maintenance_item(id):
     conn, error_response = get_connection_or_response()
@@ -758,10 +1767,11 @@ def manage_maintenance_item(id):
 
     if request.method == "DELETE":
         try:
-            cursor.execute("DELETE FROM Maintenance WHERE maintenance_id = %s", (id,))
-            conn.commit()
-            if cursor.rowcount == 0:
+            result = cascade_delete(cursor, "maintenance", [id])
+            if result["deleted"] == 0:
+                conn.rollback()
                 return jsonify({"error": "Maintenance task not found"}), 404
+            commit_cascade(conn, cursor, "maintenance", [id], result)
             return jsonify({"message": "Maintenance task deleted"}), 200
         except mysql.connector.Error as e:
             conn.rollback()
@@ -775,6 +1785,13 @@ def manage_maintenance_item(id):
     if error_response:
         return error_response
 
+    try:
+        for key in ("scheduled_time", "end_time"):
+            if key in data:
+                data[key] = parse_time(data[key], key)
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         fields = []
         values = []
@@ -784,6 +1801,8 @@ def manage_maintenance_item(id):
             "location_id",
             "active_chemical",
             "contracted_company_id",
+            "scheduled_time",
+            "end_time",
         ]:
             if key in data:
                 fields.append(f"{key} = %s")
@@ -792,12 +1811,48 @@ def manage_maintenance_item(id):
         if not fields:
             return jsonify({"error": "No fields to update"}), 400
 
+        current = None
+        if SCHEDULE_FIELDS.intersection(data):
+            # Check the task as it will be after the update
+            cursor.execute(
+                "SELECT location_id, scheduled_time, end_time, active_chemical "
+                "FROM Maintenance WHERE maintenance_id = %s FOR UPDATE",
+                (id,),
+            )
+            current = cursor.fetchone()
+            if current:
+                task = {**current, **{k: data[k] for k in SCHEDULE_FIELDS if k in data}}
+                if task.get("scheduled_time"):
+                    try:
+                        task_interval(task["scheduled_time"], task["end_time"])
+                    except ScheduleError as e:
+                        conn.rollback()
+                        return jsonify({"error": str(e)}), 400
+                    conflict_response = schedule_conflict_response(
+                        cursor,
+                        task["location_id"],
+                        task["scheduled_time"],
+                        task["end_time"],
+                        task["active_chemical"],
+                        exclude_id=id,
+                        allow_overlap=data.get("allow_overlap"),
+                    )
+                    if conflict_response:
+                        conn.rollback()
+                        return conflict_response
+
         values.append(id)
         sql = f"UPDATE Maintenance SET {', '.join(fields)} WHERE maintenance_id = %s"
         cursor.execute(sql, tuple(values))
-        conn.commit()
-        if cursor.rowcount == 0:
+        updated = cursor.rowcount
+        refresh_hazards(cursor, "maintenance_id", id)
+        if current:
+            apply_task(cursor, current, -1)
+            apply_task(cursor, task)
+        if updated == 0:
+            conn.rollback()
             return jsonify({"error": "Maintenance task not found"}), 404
+        commit_changes(conn, cursor, changes=[("Maintenance", "update", id)])
         return jsonify({"message": "Maintenance task updated"}), 200
     except mysql.connector.Error as e:
         conn.rollback()
@@ -813,6 +1868,7 @@ def manage_maintenance_item(id):
 
 
 @app.route("/api/participations", methods=["GET", "POST"])
+@cached_get("participations", ("Participation", "Person", "Activity", "Location"))
 def manage_participations():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -821,20 +1877,10 @@ def manage_participations():
 
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute(
-                """
-                SELECT p.personal_id, per.name AS person_name,
-                       a.activity_id, a.type AS activity_type,
-                       a.time AS activity_time,
-                       l.building, l.room
-                FROM Participation p
-                JOIN Person per ON p.personal_id = per.personal_id
-                JOIN Activity a ON p.activity_id = a.activity_id
-                LEFT JOIN Location l ON a.location_id = l.location_id
-                """
-            )
-            participations = cursor.fetchall()
-            return jsonify(participations), 200
+            participations = fetch_list(cursor, "participations")
+            return rows_response(participations)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -852,11 +1898,40 @@ def manage_participations():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        sql = "INSERT INTO Participation (personal_id, activity_id) VALUES (%s, %s)"
+        activity = load_activity(cursor, data["activity_id"])
+        if activity and activity_interval(activity):
+            capacity = lock_location(cursor, activity["location_id"])
+            check_capacity(cursor, activity, capacity)
+
+        # Only a live person can join a live activity (see purge.py)
+        sql = (
+            "INSERT INTO Participation (personal_id, activity_id) "
+            "SELECT p.personal_id, a.activity_id FROM Person p, Activity a "
+            "WHERE p.personal_id = %s AND a.activity_id = %s "
+            "AND p.deleted_at IS NULL AND a.deleted_at IS NULL"
+        )
         val = (data["personal_id"], data["activity_id"])
         cursor.execute(sql, val)
-        conn.commit()
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return jsonify({"error": "Person or activity not found"}), 400
+        if activity:
+            apply_participant(cursor, activity)
+        commit_changes(
+            conn,
+            cursor,
+            changes=[
+                (
+                    "Participation",
+                    "insert",
+                    {"personal_id": val[0], "activity_id": val[1]},
+                )
+            ],
+        )
         return jsonify({"message": "Participation added"}), 201
+    except OccupancyConflict as e:
+        conn.rollback()
+        return occupancy_conflict_response(e)
     except mysql.connector.Error as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 400
@@ -867,6 +1942,7 @@ def manage_participations():
 
 # Affiliation (Person-Department)
 @app.route("/api/affiliations", methods=["GET", "POST"])
+@cached_get("affiliations", ("Affiliation", "Person", "School"))
 def manage_affiliations():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -875,17 +1951,10 @@ def manage_affiliations():
 
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute(
-                """
-                SELECT a.personal_id, p.name AS person_name,
-                       a.department, s.dept_name AS school_name
-                FROM Affiliation a
-                JOIN Person p ON a.personal_id = p.personal_id
-                JOIN School s ON a.department = s.department
-                """
-            )
-            affiliations = cursor.fetchall()
-            return jsonify(affiliations), 200
+            affiliations = fetch_list(cursor, "affiliations")
+            return rows_response(affiliations)
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         except mysql.connector.Error as e:
             return jsonify({"error": str(e)}), 400
         finally:
@@ -906,7 +1975,13 @@ def manage_affiliations():
         sql = "INSERT INTO Affiliation (personal_id, department) VALUES (%s, %s)"
         val = (data["personal_id"], data["department"])
         cursor.execute(sql, val)
-        conn.commit()
+        commit_changes(
+            conn,
+            cursor,
+            changes=[
+                ("Affiliation", "insert", {"personal_id": val[0], "department": val[1]})
+            ],
+        )
         return jsonify({"message": "Affiliation added"}), 201
     except mysql.connector.Error as e:
         conn.rollback()
@@ -921,6 +1996,7 @@ def manage_affiliations():
 
 # Report 1: Maintenance by Location and Type
 @app.route("/api/reports/maintenance-summary", methods=["GET"])
+@cached_get("maintenance-summary", ("Maintenance", "Location", "MaintenanceRollup"))
 def maintenance_report():
     conn, error_response = get_connection_or_response()
     if error_response:
@@ -928,16 +2004,12 @@ def maintenance_report():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        query = """
-            SELECT m.type, l.building, l.campus, COUNT(*) AS count
-            FROM Maintenance m
-            JOIN Location l ON m.location_id = l.location_id
-            GROUP BY m.type, l.building, l.campus
-            ORDER BY count DESC
-            """
-        cursor.execute(query)
+        filters = parse_report_filters(request.args)
+        cursor.execute(*report_query("maintenance-summary", filters))
         report = cursor.fetchall()
         return jsonify(report), 200
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 400
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -947,6 +2019,7 @@ def maintenance_report():
 
 # Report 2: People by Job Role and Status
 @app.route("/api/reports/people-summary", methods=["GET"])
+@cached_get("people-summary", ("Profile", "Person"))
 def people_report():
     conn, error_response = get_connection_or_response()
     if error_response:
@@ -954,12 +2027,7 @@ def people_report():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        query = """
-            SELECT pr.job_role, pr.status, COUNT(*) AS count
-            FROM Profile pr
-            GROUP BY pr.job_role, pr.status
-            ORDER BY pr.job_role, count DESC
-            """
+        query = REPORT_QUERIES["people-summary"]
         cursor.execute(query)
         report = cursor.fetchall()
         return jsonify(report), 200
@@ -972,6 +2040,7 @@ def people_report():
 
 # Report 3: Activities by Type and Organiser
 @app.route("/api/reports/activities-summary", methods=["GET"])
+@cached_get("activities-summary", ("Activity", "Person", "Location"))
 def activities_report():
     conn, error_response = get_connection_or_response()
     if error_response:
@@ -979,16 +2048,12 @@ def activities_report():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        query = """
-            SELECT a.type, p.name AS organiser_name, COUNT(*) AS activity_count
-            FROM Activity a
-            JOIN Person p ON a.organiser_id = p.personal_id
-            GROUP BY a.type, p.name
-            ORDER BY activity_count DESC
-            """
-        cursor.execute(query)
+        filters = parse_report_filters(request.args)
+        cursor.execute(*report_query("activities-summary", filters))
         report = cursor.fetchall()
         return jsonify(report), 200
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 400
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -998,6 +2063,7 @@ def activities_report():
 
 # Report 4: Department Statistics
 @app.route("/api/reports/school-stats", methods=["GET"])
+@cached_get("school-stats", ("School", "Affiliation", "Location", "Person"))
 def school_stats():
     conn, error_response = get_connection_or_response()
     if error_response:
@@ -1005,15 +2071,7 @@ def school_stats():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        query = """
-            SELECT s.department, s.dept_name AS school_name, s.faculty,
-                   COUNT(DISTINCT a.personal_id) AS affiliated_people,
-                   COUNT(DISTINCT l.location_id) AS locations_count
-            FROM School s
-            LEFT JOIN Affiliation a ON s.department = a.department
-            LEFT JOIN Location l ON s.department = l.department
-            GROUP BY s.department, s.dept_name, s.faculty
-            """
+        query = REPORT_QUERIES["school-stats"]
         cursor.execute(query)
         report = cursor.fetchall()
         return jsonify(report), 200
@@ -1026,6 +2084,7 @@ def school_stats():
 
 # Report 5: Maintenance Frequency Analysis
 @app.route("/api/reports/maintenance-frequency", methods=["GET"])
+@cached_get("maintenance-frequency", ("Maintenance", "Location", "MaintenanceRollup"))
 def maintenance_frequency():
     conn, error_response = get_connection_or_response()
     if error_response:
@@ -1033,15 +2092,40 @@ def maintenance_frequency():
 
     cursor = conn.cursor(dictionary=True)
     try:
-        query = """
-            SELECT frequency, type, COUNT(*) AS task_count
-            FROM Maintenance
-            GROUP BY frequency, type
-            ORDER BY frequency, task_count DESC
-            """
-        cursor.execute(query)
+        filters = parse_report_filters(request.args)
+        cursor.execute(*report_query("maintenance-frequency", filters))
         report = cursor.fetchall()
         return jsonify(report), 200
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 400
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# Report 6: Maintenance Volume over Time
+@app.route("/api/reports/maintenance-trend", methods=["GET"])
+@cached_get("maintenance-trend", ("Maintenance", "Location", "MaintenanceRollup"))
+def maintenance_trend_report():
+    """Maintenance tasks per ``bucket`` (day, week or month), optionally
+    ``split`` by type, building or campus, with empty buckets as 0."""
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        trend = maintenance_trend(
+            cursor,
+            request.args.get("bucket", DEFAULT_TREND_BUCKET),
+            request.args.get("split") or None,
+            parse_report_filters(request.args),
+        )
+        return jsonify(trend), 200
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 400
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -1054,6 +2138,7 @@ def maintenance_frequency():
 
 # ExternalCompany Endpoints
 @app.route("/api/external-companies", methods=["GET", "POST"])
+@cached_get("external-companies", ("ExternalCompany",))
 def manage_external_companies():
     if request.method == "GET":
         conn, error_response = get_connection_or_response()
@@ -1061,8 +2146,9 @@ def manage_external_companies():
             return error_response
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT * FROM ExternalCompany")
-            return jsonify(cursor.fetchall()), 200
+            return rows_response(fetch_list(cursor, "external-companies"))
+        except ListingError as e:
+            return jsonify({"error": str(e)}), 400
         finally:
             cursor.close()
             conn.close()
@@ -1079,7 +2165,9 @@ def manage_external_companies():
             "INSERT INTO ExternalCompany (name, contact_info) VALUES (%s, %s)",
             (data["name"], data.get("contact_info")),
         )
-        conn.commit()
+        commit_changes(
+            conn, cursor, changes=[("ExternalCompany", "insert", cursor.lastrowid)]
+        )
         return jsonify({"message": "External Company created"}), 201
     except mysql.connector.Error as e:
         conn.rollback()
@@ -1090,6 +2178,14 @@ def manage_external_companies():
 
 
 # --- Bulk Import Endpoint ---
+IMPORT_TABLES = {
+    "persons": ("Person",),
+    "profiles": ("Profile", "RoleQuota"),
+    "locations": ("Location",),
+    "activities": ("Activity",),
+}
+
+
 @app.route("/api/import", methods=["POST"])
 def bulk_import():
     data, error_response = parse_json(required_fields=["entity", "items"])
@@ -1107,6 +2203,7 @@ def bulk_import():
         return error_response
     cursor = conn.cursor(dictionary=True)
 
+    keys = []
     try:
         if entity == "persons":
             sql = "INSERT INTO Person (personal_id, name, gender, date_of_birth, supervisor_id) VALUES (%s, %s, %s, %s, %s)"
@@ -1119,6 +2216,26 @@ def bulk_import():
                     item.get("supervisor_id"),
                 )
                 cursor.execute(sql, val)
+                keys.append(item.get("personal_id"))
+                if PERSON_CLOSURE:
+                    closure_insert(
+                        cursor, item.get("personal_id"), item.get("supervisor_id")
+                    )
+        elif entity == "profiles":
+            # Quotas are reserved row by row, so a batch that would exceed a
+            # role's limit fails and is rolled back as a whole.
+            for item in items:
+                status = item.get("status") or "Current"
+                reserve_slot(cursor, item.get("job_role"), status)
+                val = (item.get("job_role"), status, item.get("personal_id"))
+                cursor.execute(PROFILE_INSERT_SQL, val)
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return (
+                        jsonify({"error": f"Person {item.get('personal_id')} not found"}),
+                        400,
+                    )
+                keys.append(item.get("personal_id"))
         elif entity == "locations":
             sql = "INSERT INTO Location (room, floor, building, type, campus, department) VALUES (%s, %s, %s, %s, %s, %s)"
             for item in items:
@@ -1131,6 +2248,7 @@ def bulk_import():
                     item.get("department"),
                 )
                 cursor.execute(sql, val)
+                keys.append(cursor.lastrowid)
         elif entity == "activities":
             sql = "INSERT INTO Activity (activity_id, type, time, organiser_id) VALUES (%s, %s, %s, %s)"
             for item in items:
@@ -1141,21 +2259,413 @@ def bulk_import():
                     item.get("organiser_id"),
                 )
                 cursor.execute(sql, val)
+                keys.append(item.get("activity_id"))
         else:
             return jsonify({"error": "Unsupported entity for bulk import"}), 400
 
-        conn.commit()
+        table = IMPORT_TABLES[entity][0]
+        changes = []
+        if len(keys) <= MAX_ROW_EVENTS:
+            changes = [(table, "insert", key) for key in keys]
+        commit_changes(conn, cursor, *IMPORT_TABLES[entity], changes=changes)
         return jsonify({"message": f"Successfully imported {len(items)} items"}), 201
+    except QuotaExceeded as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 400
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# --- Bulk Delete Endpoint ---
+@app.route("/api/bulk-delete", methods=["POST"])
+def bulk_delete():
+    """Delete many rows of one entity and everything that depends on them.
+
+    Body: ``{"entity": "persons", "ids": [...], "dry_run": false}``. All
+    dependents are resolved with set-based statements in one transaction
+    (see cascade.py). With ``dry_run`` nothing is changed and the number of
+    rows each step would touch is returned instead.
+    """
+    data, error_response = parse_json(required_fields=["entity", "ids"])
+    if error_response:
+        return error_response
+    try:
+        entity = data["entity"]
+        if entity not in CASCADE_PLANS:
+            raise CascadeError(f"entity must be one of {', '.join(CASCADE_PLANS)}")
+        ids = parse_cascade_ids(data["ids"])
+    except CascadeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        if data.get("dry_run"):
+            return jsonify(cascade_impact(cursor, entity, ids)), 200
+        result = cascade_delete(cursor, entity, ids, person_closure=PERSON_CLOSURE)
+        if result["deleted"] == 0:
+            conn.rollback()
+            return jsonify({"error": "No matching rows"}), 404
+        commit_cascade(conn, cursor, entity, ids, result)
+        return jsonify({"entity": entity, **result}), 200
+    except CascadeBlocked as e:
+        conn.rollback()
+        return jsonify({"error": str(e), "blockers": e.blockers}), 400
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# --- Purge of soft-deleted rows ---
+# Rows per purge transaction, and how long a row stays soft-deleted at least.
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "100"))
+PURGE_GRACE_SECONDS = int(os.getenv("PURGE_GRACE_SECONDS", "0"))
+
+
+def purge_tombstones():
+    """Remove one batch of soft-deleted rows with their dependents.
+
+    Returns the number of rows purged (0 when nothing is left).
+    """
+    conn = get_db_connection()
+    if not conn:
+        return 0
+    cursor = conn.cursor(dictionary=True)
+    try:
+        with app.app_context():
+            for entity in PURGE_ENTITIES:
+                ids = tombstones(cursor, entity, PURGE_BATCH_SIZE, PURGE_GRACE_SECONDS)
+                if not ids:
+                    continue
+                result = cascade_delete(
+                    cursor, entity, ids, person_closure=PERSON_CLOSURE
+                )
+                commit_cascade(conn, cursor, entity, ids, result)
+                return len(ids)
+        conn.rollback()
+        return 0
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# Purge while no request arrived for PURGE_IDLE_SECONDS, checking every
+# PURGE_INTERVAL_SECONDS (0 disables the worker; see purge.py).
+purge_worker = PurgeWorker(
+    purge_tombstones,
+    interval=int(os.getenv("PURGE_INTERVAL_SECONDS", "60")),
+    idle_seconds=int(os.getenv("PURGE_IDLE_SECONDS", "10")),
+    pause=float(os.getenv("PURGE_PAUSE_SECONDS", "1")),
+    max_defer_seconds=int(os.getenv("PURGE_MAX_DEFER_SECONDS", "3600")),
+)
+
+
+# --- Archive of completed maintenance ---
+# Tasks that ended more than MAINTENANCE_RETENTION_DAYS ago are moved to
+# MaintenanceArchive with daily rollups (see archive.py); 0 keeps everything.
+MAINTENANCE_RETENTION_DAYS = int(os.getenv("MAINTENANCE_RETENTION_DAYS", "0"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+
+def archive_maintenance():
+    """Archive one batch of completed maintenance; return the tasks moved."""
+    conn = get_db_connection()
+    if not conn:
+        return 0
+    cursor = conn.cursor(dictionary=True)
+    try:
+        with app.app_context():
+            cutoff = datetime.now() - timedelta(days=MAINTENANCE_RETENTION_DAYS)
+            ids = archive_candidates(cursor, cutoff, ARCHIVE_BATCH_SIZE)
+            if not ids:
+                conn.rollback()
+                return 0
+            roll_up(cursor, ids)
+            result = cascade_delete(cursor, "maintenance", ids)
+            commit_cascade(conn, cursor, "maintenance", ids, result, *ARCHIVE_TABLES)
+            return len(ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# Archiving runs on the same idle-time schedule as the purge.
+archive_worker = PurgeWorker(
+    archive_maintenance,
+    interval=(
+        int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+        if MAINTENANCE_RETENTION_DAYS > 0
+        else 0
+    ),
+    idle_seconds=int(os.getenv("PURGE_IDLE_SECONDS", "10")),
+    pause=float(os.getenv("PURGE_PAUSE_SECONDS", "1")),
+    max_defer_seconds=int(os.getenv("PURGE_MAX_DEFER_SECONDS", "3600")),
+    name="archive-worker",
+    done_message="Archived {count} completed maintenance tasks",
+)
+
+
+# --- Batch Endpoint ---
+# Views that cannot run inside a batch: Dev Console SQL may commit
+# implicitly, and the PDF report is not a write.
+BATCH_EXCLUDED_ENDPOINTS = ("execute_query", "batch_write", "generate_pdf_report")
+
+
+def run_batch_operation(batch, method, path, body):
+    """Dispatch one batch operation to its view; return ``(status, body)``."""
+    with app.test_request_context(path, method=method, json=body):
+        rule = request.url_rule
+        if rule is not None and rule.endpoint in BATCH_EXCLUDED_ENDPOINTS:
+            return 400, {"error": f"{path} cannot be used in a batch"}
+        batch.connection.begin_operation()
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:  # Propagated when the app runs in debug/testing
+            return 500, {"error": str(e)}
+        return response.status_code, response.get_json(silent=True)
+
+
+@app.route("/api/batch", methods=["POST"])
+def batch_write():
+    """Run an ordered list of writes in one transaction.
+
+    Body: ``{"operations": [{"method", "path", "body"}, ...]}`` where each
+    operation is a POST, PUT or DELETE against a regular endpoint, e.g.
+    ``{"method": "POST", "path": "/api/persons", "body": {...}}``.
+
+    Operations share one connection and are committed together (see
+    batch.py). On success returns ``{"results": [{"status", "body"}, ...]}``.
+    If an operation fails, nothing is committed and the response has that
+    operation's status with ``{"error", "failed": index, "results"}``.
+    """
+    data, error_response = parse_json(required_fields=["operations"])
+    if error_response:
+        return error_response
+    try:
+        operations = parse_operations(data)
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn, error_response = get_connection_or_response(read_only=False)
+    if error_response:
+        return error_response
+    batch = g.batch = Batch(conn)
+    results = []
+    try:
+        for index, (method, path, body) in enumerate(operations):
+            status, result = run_batch_operation(batch, method, path, body)
+            results.append({"status": status, "body": result})
+            if status >= 400:
+                conn.rollback()
+                return (
+                    jsonify(
+                        {
+                            "error": f"Operation {index} failed; nothing was committed",
+                            "failed": index,
+                            "results": results,
+                        }
+                    ),
+                    status,
+                )
+        conn.commit()
     except mysql.connector.Error as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 400
+    finally:
+        g.pop("batch")
+        conn.close()
+
+    for tables, changes in batch.after_commit:
+        invalidate_tables(*tables, changes=changes)
+    return jsonify({"results": results}), 200
+
+
+# --- Change Log Endpoint ---
+@app.route("/api/changes", methods=["GET"])
+def list_changes():
+    """Page through the ChangeLog for incremental sync.
+
+    Query parameters:
+    - since: last ``seq`` the consumer has processed (default 0)
+    - limit: page size (default 500, max 5000)
+
+    Returns ``{"changes": [...], "next": seq, "has_more": bool}``; pass
+    ``next`` as ``since`` to fetch the following page. Entries with op
+    ``invalidate`` have no key: resync that whole table.
+    """
+    try:
+        since = int(request.args.get("since", 0))
+        limit = int(request.args.get("limit", CHANGES_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({"error": "since and limit must be integers"}), 400
+    if since < 0 or not 1 <= limit <= CHANGES_MAX_LIMIT:
+        return (
+            jsonify(
+                {
+                    "error": "since must be non-negative and limit between "
+                    f"1 and {CHANGES_MAX_LIMIT}"
+                }
+            ),
+            400,
+        )
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+    cursor = conn.cursor(dictionary=True)
+    try:
+        changes, has_more = read_changes(cursor, since, limit)
+        return (
+            jsonify(
+                {
+                    "changes": changes,
+                    "next": changes[-1]["seq"] if changes else since,
+                    "has_more": has_more,
+                }
+            ),
+            200,
+        )
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# --- Facets Endpoint ---
+@app.route("/api/facets", methods=["GET"])
+def get_facets():
+    """Distinct values with counts for filter dropdowns.
+
+    Query parameters:
+    - fields: comma-separated facet names (default: all of FACETS)
+
+    Returns ``{field: [{value, count}, ...]}``. Each facet is cached on its
+    own, keyed by the generation of its source table, and only the facets
+    missing from the cache are queried.
+    """
+    names = [n.strip() for n in request.args.get("fields", "").split(",")]
+    names = [n for n in names if n] or list(FACETS)
+    unknown = sorted(set(names) - set(FACETS))
+    if unknown:
+        return jsonify({"error": f"Unknown facets: {', '.join(unknown)}"}), 400
+
+    result, keys = {}, {}
+    use_cache = not recently_wrote()
+    for name in names:
+        keys[name] = response_cache.make_key("facet", FACETS[name].tables, name)
+        cached = response_cache.get(keys[name]) if use_cache else None
+        if cached is not None:
+            result[name] = json.loads(cached)
+    missing = [name for name in names if name not in result]
+
+    if missing:
+        conn, error_response = get_connection_or_response()
+        if error_response:
+            return error_response
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for name in missing:
+                result[name] = facet_values(cursor, name)
+                if cacheable_read(FACETS[name].tables):
+                    response_cache.set(keys[name], json.dumps(result[name]).encode())
+        except mysql.connector.Error as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+            conn.close()
+
+    return jsonify({name: result[name] for name in names}), 200
+
+
+# --- Search Endpoint ---
+@app.route("/api/search", methods=["GET"])
+@cached_get("search", ("Person", "Location", "ExternalCompany"))
+def unified_search():
+    """Prefix search over persons, locations and external companies.
+
+    Query parameters:
+    - q: search text; every word must start a word of a result
+    - types: comma-separated subset of person, location, company (default all)
+    - limit: number of results (default 10, at most SEARCH_MAX_LIMIT)
+
+    Returns ``[{kind, id, label, detail, score}]``, best match first.
+    """
+    text = request.args.get("q", "")
+    kinds = [k for k in request.args.get("types", "").split(",") if k.strip()]
+    kinds = [k.strip() for k in kinds] or list(SEARCH_KINDS)
+    unknown = sorted(set(kinds) - set(SEARCH_KINDS))
+    if unknown:
+        return jsonify({"error": f"Unknown search types: {', '.join(unknown)}"}), 400
+    limit = request.args.get("limit", SEARCH_DEFAULT_LIMIT, type=int)
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, SEARCH_MAX_LIMIT)
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+    cursor = conn.cursor(dictionary=True)
+    try:
+        return jsonify(search(cursor, text, kinds, limit)), 200
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
 
 
 # --- Safety Search Endpoint ---
+SAFETY_SEARCH_SQL = """
+    SELECT m.maintenance_id, m.type, m.frequency, m.active_chemical,
+           {times},
+           l.building, l.room, l.floor, l.campus,
+           ec.name as company_name
+    FROM Maintenance m
+    JOIN Location l ON m.location_id = l.location_id
+    LEFT JOIN ExternalCompany ec ON m.contracted_company_id = ec.company_id
+    WHERE m.type = 'Cleaning'
+"""
+# Raw datetimes for recurrence expansion, or rows ready to serialize.
+SAFETY_RAW_TIMES = "m.scheduled_time, m.end_time"
+SAFETY_FORMATTED_TIMES = (
+    "DATE_FORMAT(m.scheduled_time, %s) AS scheduled_time, "
+    "DATE_FORMAT(m.end_time, %s) AS end_time, "
+    "IF(m.active_chemical, %s, NULL) AS warning"
+)
+
+SAFETY_EXPAND_DEFAULT_DAYS = 30
+SAFETY_EXPAND_MAX_DAYS = 366
+# Occurrences are indexed from today up to this many days ahead and reused
+# until one of OCCURRENCE_TABLES is written.
+OCCURRENCE_HORIZON_DAYS = int(os.getenv("OCCURRENCE_HORIZON_DAYS", "90"))
+OCCURRENCE_TABLES = {"Maintenance", "Location", "ExternalCompany"}
+_occurrence_index = {"version": None, "index": None}
+
+
+def reset_occurrence_index():
+    """Drop the shared occurrence index so the next search rebuilds it."""
+    _occurrence_index.update(version=None, index=None)
+
+
 @app.route("/api/search/safety", methods=["GET"])
+@cached_get("safety-search", ("Maintenance", "Location", "ExternalCompany"))
 def safety_search():
     """Find scheduled cleaning activities with optional time period filtering.
 
@@ -1163,28 +2673,29 @@ def safety_search():
     - building: Filter by building name
     - start_time: Filter by scheduled_time >= start_time (format: YYYY-MM-DD or YYYY-MM-DDTHH:MM)
     - end_time: Filter by scheduled_time <= end_time (format: YYYY-MM-DD or YYYY-MM-DDTHH:MM)
+    - expand: if true, search the calendar of recurring occurrences derived
+      from each task's frequency instead of only its first scheduled_time.
+      The window defaults to the next SAFETY_EXPAND_DEFAULT_DAYS days.
+
+    Every cleaning task is listed, including those without chemicals or a
+    schedule, so this reads Maintenance rather than ChemicalHazard. Chemical
+    tasks carry a ``warning``; ``/api/search/hazards`` lists only those.
     """
     building = request.args.get("building")
     start_time = request.args.get("start_time")
     end_time = request.args.get("end_time")
 
+    if request.args.get("expand", "").lower() in ("1", "true", "yes"):
+        return expanded_safety_search(building, start_time, end_time)
+
     conn, error_response = get_connection_or_response()
     if error_response:
         return error_response
     cursor = conn.cursor(dictionary=True)
 
     try:
-        query = """
-            SELECT m.maintenance_id, m.type, m.frequency, m.active_chemical,
-                   m.scheduled_time, m.end_time,
-                   l.building, l.room, l.floor, l.campus,
-                   ec.name as company_name
-            FROM Maintenance m
-            JOIN Location l ON m.location_id = l.location_id
-            LEFT JOIN ExternalCompany ec ON m.contracted_company_id = ec.company_id
-            WHERE m.type = 'Cleaning'
-        """
-        params = []
+        query = SAFETY_SEARCH_SQL.format(times=SAFETY_FORMATTED_TIMES)
+        params = [HAZARD_ISO_FORMAT, HAZARD_ISO_FORMAT, HAZARD_WARNING]
 
         if building:
             query += " AND l.building = %s"
@@ -1203,26 +2714,144 @@ def safety_search():
 
         cursor.execute(query, tuple(params))
         results = cursor.fetchall()
+        for row in results:
+            # Only chemical tasks have the key, as before the query set it
+            if row.get("warning") is None:
+                row.pop("warning", None)
+        return jsonify(results), 200
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
-        # Add warning flag for hazardous chemicals
-        for r in results:
-            if r.get("active_chemical"):
-                r["warning"] = "⚠️ WARNING: Hazardous chemicals used!"
-            # Format dates for frontend display
-            if r.get("scheduled_time"):
-                r["scheduled_time"] = (
-                    r["scheduled_time"].isoformat()
-                    if hasattr(r["scheduled_time"], "isoformat")
-                    else str(r["scheduled_time"])
-                )
-            if r.get("end_time"):
-                r["end_time"] = (
-                    r["end_time"].isoformat()
-                    if hasattr(r["end_time"], "isoformat")
-                    else str(r["end_time"])
+
+@app.route("/api/search/hazards", methods=["GET"])
+@cached_get("hazards", ("Maintenance", "Location", "ExternalCompany"))
+def hazard_search():
+    """List chemical cleanings active during a time window.
+
+    Query parameters:
+    - building: Filter by building name
+    - start_time, end_time: the window ``[start_time, end_time)``; a hazard
+      matches if its scheduled interval overlaps it. Either may be omitted.
+
+    Reads the precomputed ChemicalHazard table (see hazards.py).
+    """
+    try:
+        start = parse_time(request.args.get("start_time"), "start_time")
+        end = parse_time(request.args.get("end_time"), "end_time")
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+    if start and end and end <= start:
+        return jsonify({"error": "end_time must be after start_time"}), 400
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+    cursor = conn.cursor(dictionary=True)
+    try:
+        hazards = active_hazards(cursor, request.args.get("building"), start, end)
+        return jsonify(hazards), 200
+    except mysql.connector.Error as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def format_safety_results(results):
+    """Add the chemical warning and ISO-format the times of expanded rows."""
+    for r in results:
+        if r.get("active_chemical"):
+            r["warning"] = HAZARD_WARNING
+        # Format dates for frontend display
+        for key in ("scheduled_time", "end_time", "series_start"):
+            if r.get(key):
+                r[key] = (
+                    r[key].isoformat() if hasattr(r[key], "isoformat") else str(r[key])
                 )
+    return results
 
-        return jsonify(results), 200
+
+def cleaning_occurrence_index(cursor, start, end):
+    """Return an OccurrenceIndex of cleaning tasks covering ``[start, end)``.
+
+    The shared index spans today to ``OCCURRENCE_HORIZON_DAYS`` ahead and is
+    rebuilt after writes to its tables: by ``invalidate_tables`` in this
+    process and, with a shared cache backend, when the table generations
+    change. Windows outside the horizon get a one-off index of their own.
+    """
+    version = response_cache.make_key(
+        "cleaning-occurrences", sorted(OCCURRENCE_TABLES), ()
+    )
+    index = _occurrence_index["index"]
+    if (
+        index is not None
+        and version is not None
+        and _occurrence_index["version"] == version
+        and index.covers(start, end)
+    ):
+        return index
+
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    horizon_start = min(start, today)
+    horizon_end = max(end, today + timedelta(days=OCCURRENCE_HORIZON_DAYS))
+    if horizon_end - horizon_start > timedelta(days=SAFETY_EXPAND_MAX_DAYS):
+        horizon_start, horizon_end = start, end
+
+    # Earlier tasks can recur into the window; only one-off tasks and tasks
+    # first scheduled after the horizon can be skipped.
+    cursor.execute(
+        SAFETY_SEARCH_SQL.format(times=SAFETY_RAW_TIMES)
+        + " AND m.scheduled_time < %s ORDER BY m.scheduled_time ASC",
+        (horizon_end,),
+    )
+    index = OccurrenceIndex(cursor.fetchall(), horizon_start, horizon_end)
+    if horizon_start <= today and horizon_end >= today + timedelta(
+        days=OCCURRENCE_HORIZON_DAYS
+    ):
+        _occurrence_index.update(version=version, index=index)
+    return index
+
+
+def expanded_safety_search(building, start_time, end_time):
+    """Safety search over recurring occurrences in ``[start_time, end_time)``."""
+    try:
+        start = parse_time(start_time, "start_time") or datetime.now()
+        end = parse_time(end_time, "end_time") or start + timedelta(
+            days=SAFETY_EXPAND_DEFAULT_DAYS
+        )
+    except ScheduleError as e:
+        return jsonify({"error": str(e)}), 400
+    if end <= start:
+        return jsonify({"error": "end_time must be after start_time"}), 400
+    if end - start > timedelta(days=SAFETY_EXPAND_MAX_DAYS):
+        return (
+            jsonify(
+                {"error": f"Window may span at most {SAFETY_EXPAND_MAX_DAYS} days"}
+            ),
+            400,
+        )
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        index = cleaning_occurrence_index(cursor, start, end)
+        results = [
+            {
+                **task,
+                "scheduled_time": occurrence_start,
+                "end_time": occurrence_end,
+                "series_start": task["scheduled_time"],
+            }
+            for occurrence_start, occurrence_end, task in index.between(start, end)
+            if not building or task["building"] == building
+        ]
+        return jsonify(format_safety_results(results)), 200
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -1232,6 +2861,9 @@ def safety_search():
 
 # --- Manager Building Report Endpoint ---
 @app.route("/api/reports/manager-buildings", methods=["GET"])
+@cached_get(
+    "manager-buildings", ("BuildingSupervision", "Person", "Location", "Maintenance")
+)
 def get_manager_building_report():
     """Get report showing managers with their supervised buildings and related maintenance activities."""
     conn, error_response = get_connection_or_response()
@@ -1241,23 +2873,8 @@ def get_manager_building_report():
     cursor = conn.cursor(dictionary=True)
     try:
         # Get all supervision assignments with manager details and maintenance counts
-        cursor.execute(
-            """
-            SELECT
-                bs.personal_id,
-                p.name as manager_name,
-                bs.building,
-                bs.assigned_date,
-                COUNT(DISTINCT m.maintenance_id) as maintenance_count,
-                SUM(CASE WHEN m.active_chemical = 1 THEN 1 ELSE 0 END) as chemical_maintenance_count
-            FROM BuildingSupervision bs
-            JOIN Person p ON bs.personal_id = p.personal_id
-            LEFT JOIN Location l ON l.building = bs.building
-            LEFT JOIN Maintenance m ON m.location_id = l.location_id
-            GROUP BY bs.supervision_id, bs.personal_id, p.name, bs.building, bs.assigned_date
-            ORDER BY p.name, bs.building
-        """
-        )
+        filters = parse_report_filters(request.args)
+        cursor.execute(*report_query("manager-buildings", filters))
         supervisions = cursor.fetchall()
 
         # Group by manager for a hierarchical report
@@ -1295,6 +2912,8 @@ def get_manager_building_report():
             ),
             200,
         )
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 400
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 400
     finally:
@@ -1306,6 +2925,7 @@ def get_manager_building_report():
 
 
 @app.route("/api/reports/comprehensive-data", methods=["GET"])
+@cached_get("comprehensive-data", ALL_TABLES)
 def get_comprehensive_report_data():
     """Get all data needed for comprehensive PDF report generation."""
     conn, error_response = get_connection_or_response()
@@ -1317,16 +2937,16 @@ def get_comprehensive_report_data():
         report_data = {}
 
         # Summary counts
-        cursor.execute("SELECT COUNT(*) as count FROM Person")
+        cursor.execute("SELECT COUNT(*) as count FROM Person WHERE deleted_at IS NULL")
         total_persons = cursor.fetchone()["count"]
 
         cursor.execute("SELECT COUNT(*) as count FROM School WHERE faculty IS NOT NULL")
         total_schools = cursor.fetchone()["count"]
 
-        cursor.execute("SELECT COUNT(*) as count FROM Activity")
+        cursor.execute("SELECT COUNT(*) as count FROM Activity WHERE deleted_at IS NULL")
         total_activities = cursor.fetchone()["count"]
 
-        cursor.execute("SELECT COUNT(*) as count FROM Maintenance")
+        cursor.execute(MAINTENANCE_TOTAL_SQL)
         total_maintenance = cursor.fetchone()["count"]
 
         cursor.execute("SELECT COUNT(*) as count FROM Location")
@@ -1341,66 +2961,29 @@ def get_comprehensive_report_data():
             "generated_at": datetime.now().isoformat(),
         }
 
-        # Maintenance summary
-        cursor.execute(
-            """
-            SELECT m.type, l.building, l.campus, COUNT(*) AS count
-            FROM Maintenance m
-            JOIN Location l ON m.location_id = l.location_id
-            GROUP BY m.type, l.building, l.campus
-            ORDER BY count DESC
-        """
-        )
+        # Maintenance summary (including archived tasks)
+        cursor.execute(*report_query("maintenance-summary"))
         report_data["maintenance_summary"] = cursor.fetchall()
 
         # People summary
-        cursor.execute(
-            """
-            SELECT pr.job_role, pr.status, COUNT(*) AS count
-            FROM Profile pr
-            GROUP BY pr.job_role, pr.status
-            ORDER BY pr.job_role, count DESC
-        """
-        )
+        cursor.execute(REPORT_QUERIES["people-summary"])
         report_data["people_summary"] = cursor.fetchall()
 
         # Activities summary
-        cursor.execute(
-            """
-            SELECT a.type, p.name AS organiser_name, COUNT(*) AS activity_count
-            FROM Activity a
-            JOIN Person p ON a.organiser_id = p.personal_id
-            GROUP BY a.type, p.name
-            ORDER BY activity_count DESC
-        """
-        )
+        cursor.execute(*report_query("activities-summary"))
         report_data["activities_summary"] = cursor.fetchall()
 
         # School stats
-        cursor.execute(
-            """
-            SELECT s.department, s.dept_name AS school_name, s.faculty,
-                   COUNT(DISTINCT a.personal_id) AS affiliated_people,
-                   COUNT(DISTINCT l.location_id) AS locations_count
-            FROM School s
-            LEFT JOIN Affiliation a ON s.department = a.department
-            LEFT JOIN Location l ON s.department = l.department
-            GROUP BY s.department, s.dept_name, s.faculty
-        """
-        )
+        cursor.execute(REPORT_QUERIES["school-stats"])
         report_data["school_stats"] = cursor.fetchall()
 
-        # Maintenance frequency
-        cursor.execute(
-            """
-            SELECT frequency, type, COUNT(*) AS task_count
-            FROM Maintenance
-            GROUP BY frequency, type
-            ORDER BY frequency, task_count DESC
-        """
-        )
+        # Maintenance frequency (including archived tasks)
+        cursor.execute(*report_query("maintenance-frequency"))
         report_data["maintenance_frequency"] = cursor.fetchall()
 
+        # Weekly maintenance by type over the last 90 days
+        report_data["maintenance_trend"] = maintenance_trend(cursor, "week", "type")
+
         # Safety data (cleaning tasks with chemicals)
         cursor.execute(
             """
@@ -1412,6 +2995,10 @@ def get_comprehensive_report_data():
         )
         report_data["safety_data"] = cursor.fetchall()
 
+        if wants_columnar(request.args):
+            for section, rows in report_data.items():
+                if isinstance(rows, list):
+                    report_data[section] = to_columnar(rows)
         return jsonify(report_data), 200
 
     except mysql.connector.Error as e:
@@ -1453,7 +3040,7 @@ def generate_pdf_report():
     )
 
     # Fetch comprehensive data
-    conn, error_response = get_connection_or_response()
+    conn, error_response = get_connection_or_response(read_only=True)
     if error_response:
         return error_response
 
@@ -1462,16 +3049,16 @@ def generate_pdf_report():
         report_data = {}
 
         # Summary counts
-        cursor.execute("SELECT COUNT(*) as count FROM Person")
+        cursor.execute("SELECT COUNT(*) as count FROM Person WHERE deleted_at IS NULL")
         total_persons = cursor.fetchone()["count"]
 
         cursor.execute("SELECT COUNT(*) as count FROM School WHERE faculty IS NOT NULL")
         total_schools = cursor.fetchone()["count"]
 
-        cursor.execute("SELECT COUNT(*) as count FROM Activity")
+        cursor.execute("SELECT COUNT(*) as count FROM Activity WHERE deleted_at IS NULL")
         total_activities = cursor.fetchone()["count"]
 
-        cursor.execute("SELECT COUNT(*) as count FROM Maintenance")
+        cursor.execute(MAINTENANCE_TOTAL_SQL)
         total_maintenance = cursor.fetchone()["count"]
 
         report_data["summary"] = {
@@ -1481,64 +3068,29 @@ def generate_pdf_report():
             "total_maintenance": total_maintenance,
         }
 
-        # Maintenance summary
-        cursor.execute(
-            """
-            SELECT m.type, l.building, l.campus, COUNT(*) AS count
-            FROM Maintenance m
-            JOIN Location l ON m.location_id = l.location_id
-            GROUP BY m.type, l.building, l.campus
-            ORDER BY count DESC
-        """
-        )
+        # Maintenance summary (including archived tasks)
+        cursor.execute(*report_query("maintenance-summary"))
         report_data["maintenance_summary"] = cursor.fetchall()
 
         # People summary
-        cursor.execute(
-            """
-            SELECT pr.job_role, pr.status, COUNT(*) AS count
-            FROM Profile pr
-            GROUP BY pr.job_role, pr.status
-        """
-        )
+        cursor.execute(REPORT_QUERIES["people-summary"])
         report_data["people_summary"] = cursor.fetchall()
 
         # Activities summary
-        cursor.execute(
-            """
-            SELECT a.type, p.name AS organiser_name, COUNT(*) AS activity_count
-            FROM Activity a
-            JOIN Person p ON a.organiser_id = p.personal_id
-            GROUP BY a.type, p.name
-            ORDER BY activity_count DESC
-        """
-        )
+        cursor.execute(*report_query("activities-summary"))
         report_data["activities_summary"] = cursor.fetchall()
 
         # School stats
-        cursor.execute(
-            """
-            SELECT s.department, s.dept_name AS school_name, s.faculty,
-                   COUNT(DISTINCT a.personal_id) AS affiliated_people,
-                   COUNT(DISTINCT l.location_id) AS locations_count
-            FROM School s
-            LEFT JOIN Affiliation a ON s.department = a.department
-            LEFT JOIN Location l ON s.department = l.department
-            GROUP BY s.department, s.dept_name, s.faculty
-        """
-        )
+        cursor.execute(REPORT_QUERIES["school-stats"])
         report_data["school_stats"] = cursor.fetchall()
 
-        # Maintenance frequency
-        cursor.execute(
-            """
-            SELECT frequency, type, COUNT(*) AS task_count
-            FROM Maintenance
-            GROUP BY frequency, type
-        """
-        )
+        # Maintenance frequency (including archived tasks)
+        cursor.execute(*report_query("maintenance-frequency"))
         report_data["maintenance_frequency"] = cursor.fetchall()
 
+        # Weekly maintenance by type over the last 90 days
+        report_data["maintenance_trend"] = maintenance_trend(cursor, "week", "type")
+
         # Safety data
         cursor.execute(
             """
@@ -1573,12 +3125,131 @@ def generate_pdf_report():
         conn.close()
 
 
+# --- Bulk Export Endpoints ---
+
+# Query parameters consumed by the export endpoints rather than the list filters.
+EXPORT_PARAMS = ("format", "batch_size", "role")
+MAX_EXPORT_BATCH_SIZE = 50000
+
+
+def export_query(name, sql, params=()):
+    """Stream the result of ``sql`` as Arrow IPC or Parquet.
+
+    Rows are read from an unbuffered cursor in ``?batch_size=`` chunks and
+    encoded batch by batch (see export_service.py), so memory use is bounded
+    by the batch size rather than by the size of the table.
+    """
+    try:
+        from export_service import DEFAULT_BATCH_SIZE, EXPORT_FORMATS, stream_cursor
+    except ImportError:
+        return (
+            jsonify(
+                {
+                    "error": "Export not available. Please install required packages: "
+                    "pip install pyarrow"
+                }
+            ),
+            500,
+        )
+
+    fmt = request.args.get("format", "arrow").lower()
+    if fmt not in EXPORT_FORMATS:
+        return (
+            jsonify(
+                {
+                    "error": f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}"
+                }
+            ),
+            400,
+        )
+    try:
+        batch_size = int(request.args.get("batch_size", DEFAULT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"error": "batch_size must be an integer"}), 400
+    batch_size = max(1, min(batch_size, MAX_EXPORT_BATCH_SIZE))
+
+    conn, error_response = get_connection_or_response()
+    if error_response:
+        return error_response
+
+    # Tuple, unbuffered cursor: rows stay on the server until fetched.
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+    except mysql.connector.Error as e:
+        cursor.close()
+        conn.close()
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        finished = False
+        try:
+            yield from stream_cursor(cursor, fmt, batch_size)
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+                conn.close()
+            else:
+                # Failed or client gone: closing the cursor would raise on the
+                # unread rows and skip conn.close()
+                abandon_connection(conn)
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"{name}_{datetime.now().strftime('%Y-%m-%d')}.{extension}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.route("/api/export/<entity>", methods=["GET"])
+def export_entity(entity):
+    """Export a list endpoint's rows (e.g. maintenance, activities, participations).
+
+    Accepts the same ``fields``, filter and ``sort`` parameters as the list
+    endpoint, plus ``format`` (``arrow`` or ``parquet``) and ``batch_size``.
+    """
+    if entity not in LIST_SPECS or entity == "persons-by-role":
+        return jsonify({"error": f"Unknown export entity: {entity}"}), 404
+
+    role_filter = request.args.get("role") if entity == "persons" else None
+    try:
+        if role_filter:
+            sql, params = build_list_query(
+                "persons-by-role", params=(role_filter,), reserved=EXPORT_PARAMS
+            )
+        else:
+            sql, params = build_list_query(entity, reserved=EXPORT_PARAMS)
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_query(entity, sql, params)
+
+
+@app.route("/api/export/reports/<report>", methods=["GET"])
+def export_report(report):
+    """Export one of the summary report queries.
+
+    Accepts the report's filters (see reports.py) besides ``format`` and
+    ``batch_size``.
+    """
+    if report not in REPORT_QUERIES:
+        return jsonify({"error": f"Unknown report: {report}"}), 404
+    try:
+        sql, params = report_query(report, parse_report_filters(request.args))
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_query(report, sql, params)
+
+
 # =====================
 # Building Supervision Endpoints
 # =====================
 
 
 @app.route("/api/building-supervision", methods=["GET"])
+@cached_get("building-supervision", ("BuildingSupervision", "Person"))
 def get_building_supervisions():
     """Get all building supervision assignments."""
     conn, err = get_connection_or_response()
@@ -1586,17 +3257,10 @@ def get_building_supervisions():
         return err
     try:
         cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT bs.supervision_id, bs.personal_id, bs.building, bs.assigned_date,
-                   p.name as manager_name
-            FROM BuildingSupervision bs
-            JOIN Person p ON bs.personal_id = p.personal_id
-            ORDER BY bs.building, p.name
-        """
-        )
-        supervisions = cursor.fetchall()
+        supervisions = fetch_list(cursor, "building-supervision")
         return jsonify({"data": supervisions})
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 500
     finally:
@@ -1624,7 +3288,9 @@ def create_building_supervision():
         """,
             (data["personal_id"], data["building"]),
         )
-        conn.commit()
+        commit_changes(
+            conn, cursor, changes=[("BuildingSupervision", "insert", cursor.lastrowid)]
+        )
         return (
             jsonify(
                 {"message": "Supervision assignment created", "id": cursor.lastrowid}
@@ -1660,7 +3326,9 @@ def delete_building_supervision(supervision_id):
         )
         if cursor.rowcount == 0:
             return jsonify({"error": "Supervision assignment not found"}), 404
-        conn.commit()
+        commit_changes(
+            conn, cursor, changes=[("BuildingSupervision", "delete", supervision_id)]
+        )
         return jsonify({"message": "Supervision assignment deleted"})
     except mysql.connector.Error as e:
         return jsonify({"error": str(e)}), 500
@@ -1670,6 +3338,7 @@ def delete_building_supervision(supervision_id):
 
 
 @app.route("/api/building-supervision/by-manager/<personal_id>", methods=["GET"])
+@cached_get("building-supervision-by-manager", ("BuildingSupervision",))
 def get_supervisions_by_manager(personal_id):
     """Get all buildings supervised by a specific manager."""
     conn, err = get_connection_or_response()
@@ -1696,6 +3365,7 @@ def get_supervisions_by_manager(personal_id):
 
 
 @app.route("/api/building-supervision/by-building/<building>", methods=["GET"])
+@cached_get("building-supervision-by-building", ("BuildingSupervision", "Person"))
 def get_supervisions_by_building(building):
     """Get all managers supervising a specific building."""
     conn, err = get_connection_or_response()
@@ -1709,7 +3379,7 @@ def get_supervisions_by_building(building):
                    p.name as manager_name
             FROM BuildingSupervision bs
             JOIN Person p ON bs.personal_id = p.personal_id
-            WHERE bs.building = %s
+            WHERE bs.building = %s AND p.deleted_at IS NULL
             ORDER BY p.name
         """,
             (building,),
@@ -1727,4 +3397,7 @@ if __name__ == "__main__":
     # Optionally initialize the DB on first run. This will only call the
     # destructive init_db() if the core tables are missing.
     ensure_db_initialized_on_startup()
+    refresh_derived_tables_on_startup()
+    purge_worker.start()
+    archive_worker.start()
     app.run(debug=True, host="0.0.0.0", port=5050)
@@ -0,0 +1,71 @@
+"""Move completed maintenance out of the hot table, keeping daily rollups.
+
+Tasks whose ``end_time`` lies more than the retention window in the past
+are moved to ``MaintenanceArchive``, a compressed table that also keeps the
+building, campus and department the task's location had at the time.
+Before they leave Maintenance they are counted into ``MaintenanceRollup``:
+one row per day (of ``scheduled_time``), building, campus, department, type
+and frequency. The maintenance-summary and maintenance-frequency reports
+add these counts to those of the hot table, so a report over years of
+history reads a few rollup rows per day instead of every archived task;
+the report filters (see reports.py) apply to the rollup dimensions.
+
+The rollup dimensions form its primary key and cannot be NULL; a missing
+value is stored as ``''`` and read back as NULL with ``NULLIF``. Tasks
+without an ``end_time`` are never archived.
+
+Each batch runs in one transaction: rollup, copy, then the usual cascade
+delete (hazards, occupancy buckets; see cascade.py). The batches are run by
+an idle-time worker in the API process (see ``PurgeWorker``).
+"""
+
+ROLLUP_SQL = """
+    INSERT INTO MaintenanceRollup
+        (day, building, campus, department, type, frequency, task_count)
+    SELECT DATE(COALESCE(m.scheduled_time, m.end_time)),
+           COALESCE(l.building, ''), COALESCE(l.campus, ''),
+           COALESCE(l.department, ''), COALESCE(m.type, ''),
+           COALESCE(m.frequency, ''), COUNT(*)
+    FROM Maintenance m
+    LEFT JOIN Location l ON m.location_id = l.location_id
+    WHERE m.maintenance_id IN ({ids})
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ON DUPLICATE KEY UPDATE task_count = task_count + VALUES(task_count)
+"""
+
+COPY_SQL = """
+    INSERT INTO MaintenanceArchive
+        (maintenance_id, type, frequency, location_id, building, campus,
+         department, active_chemical, contracted_company_id, scheduled_time,
+         end_time)
+    SELECT m.maintenance_id, m.type, m.frequency, m.location_id, l.building,
+           l.campus, l.department, m.active_chemical, m.contracted_company_id,
+           m.scheduled_time, m.end_time
+    FROM Maintenance m
+    LEFT JOIN Location l ON m.location_id = l.location_id
+    WHERE m.maintenance_id IN ({ids})
+"""
+
+# Tables written by a batch besides those of the maintenance cascade.
+TABLES = ("MaintenanceArchive", "MaintenanceRollup")
+
+
+def candidates(cursor, cutoff, limit):
+    """Lock and return up to ``limit`` ids of tasks that ended before
+    ``cutoff``, oldest first (a range on ``idx_maintenance_end_time``)."""
+    cursor.execute(
+        "SELECT maintenance_id AS id FROM Maintenance WHERE end_time < %s "
+        "ORDER BY end_time LIMIT %s FOR UPDATE",
+        (cutoff, limit),
+    )
+    return [row["id"] for row in cursor.fetchall()]
+
+
+def roll_up(cursor, ids):
+    """Count the tasks ``ids`` into the rollups and copy them to the archive.
+
+    Must run before the tasks are deleted.
+    """
+    marks = ", ".join(["%s"] * len(ids))
+    cursor.execute(ROLLUP_SQL.format(ids=marks), tuple(ids))
+    cursor.execute(COPY_SQL.format(ids=marks), tuple(ids))
@@ -0,0 +1,93 @@
+"""Run several write requests on one connection and in one transaction.
+
+``/api/batch`` replays each operation through the normal view functions.
+While a batch is active, ``get_connection_or_response`` hands every view
+the same ``BatchConnection``: views run their statements as usual, but
+their ``commit`` and ``close`` calls are deferred to the batch, which
+commits once after the last operation succeeded or rolls everything back
+as soon as one fails. Each operation starts at a savepoint, so a view that
+rolls back (a dry run, a rejected write) only undoes its own statements.
+Work a view does after its commit (cache invalidation, change feed
+events) is queued on the ``Batch`` and run only once the transaction has
+committed.
+"""
+
+MAX_OPERATIONS = 100
+
+SAVEPOINT = "batch_operation"
+
+METHODS = ("POST", "PUT", "DELETE")
+
+
+class BatchError(Exception):
+    """Raised for a malformed batch request."""
+
+
+class BatchConnection:
+    """A connection whose ``commit``/``close`` are left to the batch and
+    whose ``rollback`` only undoes the current operation."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def _execute(self, sql):
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    def begin_operation(self):
+        # Redeclaring a savepoint with the same name moves it.
+        self._execute(f"SAVEPOINT {SAVEPOINT}")
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class Batch:
+    """State of the batch being executed by the current request."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.connection = BatchConnection(conn)
+        self.after_commit = []
+
+
+def parse_operations(data):
+    """Validate ``{"operations": [{method, path, body?}, ...]}``.
+
+    Returns the list of ``(method, path, body)``; raises ``BatchError``.
+    """
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        raise BatchError("operations must be a non-empty list")
+    if len(operations) > MAX_OPERATIONS:
+        raise BatchError(f"A batch may contain at most {MAX_OPERATIONS} operations")
+
+    parsed = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise BatchError(f"Operation {index} must be an object")
+        method = str(operation.get("method", "")).upper()
+        path = operation.get("path")
+        if method not in METHODS:
+            raise BatchError(
+                f"Operation {index}: method must be one of {', '.join(METHODS)}"
+            )
+        if not isinstance(path, str) or not path.startswith("/api/"):
+            raise BatchError(f"Operation {index}: path must start with /api/")
+        parsed.append((method, path, operation.get("body")))
+    return parsed
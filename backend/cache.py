@@ -0,0 +1,362 @@
+"""Pluggable cache backends for list and report responses.
+
+The backend is selected with the ``CACHE_BACKEND`` environment variable:
+
+- ``memory`` (default): a per-process dictionary. Fine for a single worker.
+- ``sqlite``: a SQLite file (``CACHE_SQLITE_PATH``) shared by every worker
+  process on the same host. Needs no network, so it also works in tests.
+- ``redis``: a Redis server (``CACHE_REDIS_URL``) shared across hosts.
+  Requires the optional ``redis`` package.
+- ``none``: disables caching entirely.
+
+Invalidation works through per-table *generations*. Every cached entry key
+embeds the current generation of each table the response reads from, and a
+write bumps the generation of the tables it touched. Because the generation
+counters live in the backend, a write handled by one worker invalidates the
+entries of every other worker that shares the backend.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60
+
+
+class CacheBackend(ABC):
+    """Minimal key/value interface every backend implements.
+
+    Values are ``bytes``. ``incr`` maintains integer counters that never
+    expire (used for table generations).
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Return the value stored under ``key``, or None."""
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove ``key`` if present."""
+
+    @abstractmethod
+    def get_counters(self, keys):
+        """Return a list with the current value of each counter (0 if unset)."""
+
+    @abstractmethod
+    def incr(self, key):
+        """Increment the counter ``key`` and return its new value."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every entry and counter."""
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def get_counters(self, keys):
+        return [0 for _ in keys]
+
+    def incr(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+
+class InProcessCache(CacheBackend):
+    """Thread-safe dictionary cache local to one worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._counters = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def get_counters(self, keys):
+        with self._lock:
+            return [self._counters.get(k, 0) for k in keys]
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._counters.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """Cache stored in a SQLite file shared by all local worker processes.
+
+    Each thread keeps its own connection (SQLite connections cannot be shared
+    across threads). WAL mode lets readers proceed while a writer commits.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entry ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_counter ("
+            "key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = (
+            self._connection()
+            .execute("SELECT value, expires_at FROM cache_entry WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None or row[1] < time.time():
+            return None
+        return bytes(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, sqlite3.Binary(value), time.time() + ttl),
+        )
+        # Opportunistically drop expired rows so the file does not grow forever.
+        conn.execute("DELETE FROM cache_entry WHERE expires_at < ?", (time.time(),))
+        conn.commit()
+
+    def delete(self, key):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entry WHERE key = ?", (key,))
+        conn.commit()
+
+    def get_counters(self, keys):
+        if not keys:
+            return []
+        placeholders = ", ".join("?" for _ in keys)
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT key, value FROM cache_counter WHERE key IN ({placeholders})",
+                tuple(keys),
+            )
+            .fetchall()
+        )
+        found = dict(rows)
+        return [found.get(k, 0) for k in keys]
+
+    def incr(self, key):
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO cache_counter (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (key,),
+        )
+        conn.commit()
+        return self.get_counters([key])[0]
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entry")
+        conn.execute("DELETE FROM cache_counter")
+        conn.commit()
+
+
+class RedisCache(CacheBackend):
+    """Cache stored on a Redis server (or anything speaking its protocol)."""
+
+    def __init__(self, url, prefix="cmms:"):
+        import redis  # Optional dependency, only needed for this backend
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def _k(self, key):
+        return self._prefix + key
+
+    def get(self, key):
+        return self._client.get(self._k(key))
+
+    def set(self, key, value, ttl):
+        self._client.set(self._k(key), value, ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self._client.delete(self._k(key))
+
+    def get_counters(self, keys):
+        if not keys:
+            return []
+        values = self._client.mget([self._k(k) for k in keys])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def incr(self, key):
+        return self._client.incr(self._k(key))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+
+def create_cache_backend(name=None):
+    """Build the backend named by ``name`` or the ``CACHE_BACKEND`` env var."""
+    name = (name or os.getenv("CACHE_BACKEND", "memory")).lower()
+    if name == "none":
+        return NullCache()
+    if name == "sqlite":
+        path = os.getenv(
+            "CACHE_SQLITE_PATH",
+            os.path.join(tempfile.gettempdir(), "cmms_cache.sqlite3"),
+        )
+        return SQLiteCache(path)
+    if name == "redis":
+        return RedisCache(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    if name != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND '{name}', using in-process cache.")
+    return InProcessCache()
+
+
+class ResponseCache:
+    """Caches serialized responses keyed by request and table generations.
+
+    Backend failures are logged and treated as cache misses so a broken cache
+    never takes the API down with it.
+
+    With a ``lag_window`` (seconds), ``invalidate`` also leaves a marker on
+    each table for that long so ``recently_invalidated`` can tell whether a
+    replica may not have caught up with the write yet.
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL_SECONDS, lag_window=0):
+        self.backend = backend
+        self.ttl = ttl
+        self.lag_window = lag_window
+
+    @staticmethod
+    def _generation_key(table):
+        return f"gen:{table}"
+
+    @staticmethod
+    def _written_key(table):
+        return f"written:{table}"
+
+    def make_key(self, namespace, tables, params):
+        """Build the entry key for ``namespace`` at the current generations."""
+        try:
+            generations = self.backend.get_counters(
+                [self._generation_key(t) for t in tables]
+            )
+        except Exception as exc:
+            logger.warning(f"Cache generation lookup failed: {exc}")
+            return None
+        raw = repr((namespace, tuple(generations), params)).encode("utf-8")
+        return f"resp:{namespace}:{hashlib.sha1(raw).hexdigest()}"
+
+    def get(self, key):
+        if key is None:
+            return None
+        try:
+            return self.backend.get(key)
+        except Exception as exc:
+            logger.warning(f"Cache read failed: {exc}")
+            return None
+
+    def set(self, key, value):
+        if key is None:
+            return
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as exc:
+            logger.warning(f"Cache write failed: {exc}")
+
+    def invalidate(self, *tables):
+        """Bump the generation of each table so dependent entries are skipped.
+
+        Returns ``{table: new generation}``, with None for tables whose
+        counter could not be bumped.
+        """
+        generations = {}
+        for table in tables:
+            try:
+                generations[table] = self.backend.incr(self._generation_key(table))
+            except Exception as exc:
+                logger.warning(f"Cache invalidation failed for {table}: {exc}")
+                generations[table] = None
+            if self.lag_window > 0:
+                try:
+                    self.backend.set(self._written_key(table), b"1", self.lag_window)
+                except Exception as exc:
+                    logger.warning(f"Cache write marker failed for {table}: {exc}")
+        return generations
+
+    def recently_invalidated(self, tables):
+        """Return True if any of ``tables`` was invalidated within ``lag_window``.
+
+        Errs on the side of True when the backend cannot be read.
+        """
+        if self.lag_window <= 0:
+            return False
+        try:
+            return any(
+                self.backend.get(self._written_key(table)) is not None
+                for table in tables
+            )
+        except Exception as exc:
+            logger.warning(f"Cache write marker lookup failed: {exc}")
+            return True
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except Exception as exc:
+            logger.warning(f"Cache clear failed: {exc}")
@@ -0,0 +1,281 @@
+"""Delete rows together with everything that references them, set-based.
+
+Each deletable entity has a ``Plan``: the statements that resolve the rows
+referencing the ones being deleted, in dependency order. Every statement
+handles the whole id set at once (``WHERE ... IN (...)``), so deleting a
+thousand rows takes as many round trips as deleting one. A dependent is
+deleted with its parent (``delete``), has its reference cleared
+(``detach``) or prevents the delete (``restrict``).
+
+Derived tables the API maintains itself (RoleQuota counters,
+LocationOccupancy, the PersonClosure paths of surviving subordinates) are
+adjusted by the plan's ``prepare`` hook before any row is removed. Rows the
+schema removes with ``ON DELETE CASCADE`` are left to MySQL.
+
+``impact`` runs the same predicates as ``SELECT COUNT(*)`` for a dry run.
+"""
+
+from hierarchy import closure_move
+from occupancy import release_activities, release_people, release_tasks
+from quotas import release_slots
+
+MAX_IDS = 1000
+
+ACTIONS = ("delete", "detach", "restrict")
+
+
+class CascadeError(Exception):
+    """Raised for an unknown entity or an invalid id list."""
+
+
+class CascadeBlocked(Exception):
+    """Raised when ``restrict`` dependents exist; ``blockers`` lists them."""
+
+    def __init__(self, message, blockers):
+        super().__init__(message)
+        self.blockers = blockers
+
+
+class Step:
+    """One set-based statement on the rows of ``table`` matching ``where``.
+
+    ``where`` contains ``{ids}`` wherever the placeholders for the ids being
+    deleted go. ``column`` is the reference cleared by ``detach``.
+    """
+
+    def __init__(self, table, action, where, column=None, message=None):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}")
+        self.table = table
+        self.action = action
+        self.where = where
+        self.column = column
+        self.message = message
+
+    def params(self, ids):
+        return tuple(ids) * self.where.count("{ids}")
+
+    def sql(self, ids):
+        where = self.where.format(ids=", ".join(["%s"] * len(ids)))
+        if self.action == "delete":
+            return f"DELETE FROM {self.table} WHERE {where}"
+        if self.action == "detach":
+            return f"UPDATE {self.table} SET {self.column} = NULL WHERE {where}"
+        return self.count_sql(ids)
+
+    def count_sql(self, ids):
+        where = self.where.format(ids=", ".join(["%s"] * len(ids)))
+        return f"SELECT COUNT(*) AS count FROM {self.table} WHERE {where}"
+
+
+class Plan:
+    """How to delete rows of ``table`` identified by ``key``.
+
+    ``self_reference`` names a column of ``table`` pointing at ``table``
+    itself; it is cleared on the doomed rows so they can go in one
+    statement. ``prepare(cursor, ids, **options)`` runs after the restrict
+    checks and before the first change; ``derived`` lists the cached tables
+    it writes.
+    """
+
+    def __init__(
+        self, table, key, steps, self_reference=None, prepare=None, derived=()
+    ):
+        self.table = table
+        self.key = key
+        self.steps = steps
+        self.self_reference = self_reference
+        self.prepare = prepare
+        self.derived = derived
+
+    @property
+    def tables(self):
+        """Other tables changed by the cascade, in the order they are written."""
+        return tuple(
+            dict.fromkeys(
+                [s.table for s in self.steps if s.action != "restrict"]
+                + list(self.derived)
+            )
+        )
+
+
+def _prepare_persons(cursor, ids, person_closure=False):
+    release_people(cursor, ids)
+    release_slots(cursor, ids)
+    if person_closure:
+        # Subordinates outside the set become roots: drop the paths from
+        # their former ancestors while those still exist.
+        marks = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            "SELECT personal_id FROM Person "
+            f"WHERE supervisor_id IN ({marks}) AND personal_id NOT IN ({marks})",
+            tuple(ids) * 2,
+        )
+        for row in cursor.fetchall():
+            closure_move(cursor, row["personal_id"], None)
+
+
+def _prepare_activities(cursor, ids, **options):
+    release_activities(cursor, ids)
+
+
+def _prepare_maintenance(cursor, ids, **options):
+    release_tasks(cursor, ids)
+
+
+PLANS = {
+    "persons": Plan(
+        "Person",
+        "personal_id",
+        [
+            Step(
+                "Participation",
+                "delete",
+                "personal_id IN ({ids}) OR activity_id IN "
+                "(SELECT activity_id FROM Activity WHERE organiser_id IN ({ids}))",
+            ),
+            Step("Activity", "delete", "organiser_id IN ({ids})"),
+            Step("Affiliation", "delete", "personal_id IN ({ids})"),
+            Step("Profile", "delete", "personal_id IN ({ids})"),
+            Step("BuildingSupervision", "delete", "personal_id IN ({ids})"),
+            Step(
+                "Person",
+                "detach",
+                "supervisor_id IN ({ids}) AND personal_id NOT IN ({ids})",
+                column="supervisor_id",
+            ),
+        ],
+        self_reference="supervisor_id",
+        prepare=_prepare_persons,
+        derived=("RoleQuota",),
+    ),
+    "schools": Plan(
+        "School",
+        "department",
+        [
+            Step("Affiliation", "delete", "department IN ({ids})"),
+            Step("Location", "detach", "department IN ({ids})", column="department"),
+        ],
+    ),
+    "locations": Plan(
+        "Location",
+        "location_id",
+        [
+            Step(
+                "Maintenance",
+                "restrict",
+                "location_id IN ({ids})",
+                message="Cannot delete location with associated maintenance tasks",
+            ),
+            Step("Activity", "detach", "location_id IN ({ids})", column="location_id"),
+        ],
+    ),
+    "activities": Plan(
+        "Activity",
+        "activity_id",
+        [Step("Participation", "delete", "activity_id IN ({ids})")],
+        prepare=_prepare_activities,
+    ),
+    "maintenance": Plan(
+        "Maintenance",
+        "maintenance_id",
+        # ON DELETE CASCADE in schema.sql, but partitioning.py drops it
+        [Step("ChemicalHazard", "delete", "maintenance_id IN ({ids})")],
+        prepare=_prepare_maintenance,
+    ),
+}
+
+
+def parse_ids(ids):
+    """Validate a list of ids and return it without duplicates."""
+    if not isinstance(ids, list) or not ids:
+        raise CascadeError("ids must be a non-empty list")
+    if len(ids) > MAX_IDS:
+        raise CascadeError(f"At most {MAX_IDS} ids can be deleted at once")
+    if not all(isinstance(i, (str, int)) and not isinstance(i, bool) for i in ids):
+        raise CascadeError("ids must be strings or integers")
+    return list(dict.fromkeys(ids))
+
+
+def get_plan(entity):
+    try:
+        return PLANS[entity]
+    except KeyError:
+        raise CascadeError(f"entity must be one of {', '.join(PLANS)}") from None
+
+
+def impact(cursor, entity, ids):
+    """Count what deleting ``ids`` would touch, without changing anything.
+
+    Returns ``{"entity", "matched", "dependents": [{table, action, rows}],
+    "blocked"}``.
+    """
+    plan = get_plan(entity)
+    marks = ", ".join(["%s"] * len(ids))
+    cursor.execute(
+        f"SELECT COUNT(*) AS count FROM {plan.table} WHERE {plan.key} IN ({marks})",
+        tuple(ids),
+    )
+    matched = cursor.fetchone()["count"]
+    dependents = []
+    for step in plan.steps:
+        cursor.execute(step.count_sql(ids), step.params(ids))
+        dependents.append(
+            {
+                "table": step.table,
+                "action": step.action,
+                "rows": cursor.fetchone()["count"],
+            }
+        )
+    return {
+        "entity": entity,
+        "matched": matched,
+        "dependents": dependents,
+        "blocked": any(d["action"] == "restrict" and d["rows"] for d in dependents),
+    }
+
+
+def delete(cursor, entity, ids, **options):
+    """Delete ``ids`` of ``entity`` and resolve their dependents.
+
+    Runs inside the caller's transaction and does not commit. Raises
+    ``CascadeBlocked`` before changing anything if a ``restrict``
+    dependent exists. Returns ``{"deleted": n, "dependents": [...]}`` with
+    the rows each step changed.
+    """
+    plan = get_plan(entity)
+    blockers = []
+    for step in plan.steps:
+        if step.action == "restrict":
+            cursor.execute(step.count_sql(ids), step.params(ids))
+            rows = cursor.fetchone()["count"]
+            if rows:
+                blockers.append(
+                    {"table": step.table, "rows": rows, "message": step.message}
+                )
+    if blockers:
+        raise CascadeBlocked(blockers[0]["message"], blockers)
+
+    if plan.prepare:
+        plan.prepare(cursor, ids, **options)
+
+    dependents = []
+    for step in plan.steps:
+        if step.action == "restrict":
+            continue
+        cursor.execute(step.sql(ids), step.params(ids))
+        dependents.append(
+            {"table": step.table, "action": step.action, "rows": cursor.rowcount}
+        )
+
+    marks = ", ".join(["%s"] * len(ids))
+    if plan.self_reference:
+        cursor.execute(
+            f"UPDATE {plan.table} SET {plan.self_reference} = NULL "
+            f"WHERE {plan.key} IN ({marks})",
+            tuple(ids),
+        )
+    cursor.execute(
+        f"DELETE FROM {plan.table} WHERE {plan.key} IN ({marks})", tuple(ids)
+    )
+    return {"deleted": cursor.rowcount, "dependents": dependents}
@@ -0,0 +1,135 @@
+"""In-process broadcast of committed writes for Server-Sent Events clients.
+
+Write handlers publish compact change events (table, op, key, version) after
+their commit. Every connected client owns a bounded queue; publishing never
+blocks the writer. A client that falls ``queue_size`` events behind is
+marked as lagging: its queued events are dropped and the next thing it
+receives is a ``reset`` event, after which it should refetch the tables it
+shows and continue applying events from there.
+
+The last ``history_size`` events are kept so a reconnecting client that
+sends ``Last-Event-ID`` receives what it missed, or a ``reset`` when that
+event has already been evicted.
+
+Events only reach clients connected to the same process that handled the
+write. Running several worker processes therefore needs a shared transport
+(for example Redis pub/sub) in front of ``ChangeFeed.publish``.
+"""
+
+import itertools
+import threading
+from collections import deque
+
+RESET = {"op": "reset"}
+
+
+class TooManySubscribers(Exception):
+    """Raised when ``max_subscribers`` clients are already connected."""
+
+
+class Subscriber:
+    """Bounded queue of events for one connected client."""
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self._events = deque()
+        self._ready = threading.Condition()
+        self.lagging = False
+
+    def push(self, events):
+        with self._ready:
+            if self.lagging:
+                return
+            if len(self._events) + len(events) > self.queue_size:
+                self._events.clear()
+                self.lagging = True
+            else:
+                self._events.extend(events)
+            self._ready.notify()
+
+    def reset(self):
+        """Drop anything queued and make the next ``wait`` return a reset."""
+        with self._ready:
+            self._events.clear()
+            self.lagging = True
+            self._ready.notify()
+
+    def wait(self, timeout):
+        """Return the queued events, waiting up to ``timeout`` seconds.
+
+        Returns ``[RESET]`` once after the queue overflowed and ``[]`` on
+        timeout.
+        """
+        with self._ready:
+            if not self._events and not self.lagging:
+                self._ready.wait(timeout)
+            if self.lagging:
+                self.lagging = False
+                return [RESET]
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+
+class ChangeFeed:
+    """Fan-out of change events to every current ``Subscriber``."""
+
+    def __init__(self, queue_size=1000, history_size=1000, max_subscribers=100):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+
+    def publish(self, changes):
+        """Assign ids to ``changes`` (dicts) and queue them for every client."""
+        if not changes:
+            return []
+        with self._lock:
+            events = [{"id": next(self._ids), **change} for change in changes]
+            self._history.extend(events)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(events)
+        return events
+
+    def subscribe(self, last_event_id=None):
+        """Register a client, replaying events after ``last_event_id``."""
+        subscriber = Subscriber(self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers("Too many change feed clients")
+            if last_event_id is not None:
+                oldest = self._history[0]["id"] if self._history else 1
+                newest = self._history[-1]["id"] if self._history else 0
+                # An id from before the history window, or from before a
+                # restart of this process, cannot be resumed.
+                if not oldest - 1 <= last_event_id <= newest:
+                    subscriber.reset()
+                else:
+                    subscriber.push(
+                        [e for e in self._history if e["id"] > last_event_id]
+                    )
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def format_event(event, dumps):
+    """Render ``event`` as one SSE message; ``dumps`` serializes the data."""
+    lines = []
+    if "id" in event:
+        lines.append(f"id: {event['id']}")
+    if event is RESET:
+        lines.append("event: reset")
+    lines.append(f"data: {dumps(event)}")
+    return "\n".join(lines) + "\n\n"
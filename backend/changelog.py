@@ -0,0 +1,68 @@
+"""Append-only log of the rows each API write inserted, updated or deleted.
+
+Every write appends its ``(table, op, key)`` entries to ``ChangeLog`` in
+the same transaction as the change itself, so a logged change is committed
+exactly when the data is. Consumers page through the log by ``seq`` (see
+``read``) and only ever need the last sequence number they processed.
+
+A consumer that has read up to ``seq`` must never later see a smaller
+number commit, or it would skip that change. ``seq`` is an AUTO_INCREMENT
+value, allocated when the row is inserted, not when it commits, so
+``record`` first locks the single ``ChangeLogHead`` row. The lock is held
+until commit, which makes appends commit in sequence order. Writes are
+therefore serialized for the moment between logging and commit; the log is
+written last in each transaction to keep that window short.
+
+``invalidate`` entries have no key and mean "anything in this table may
+have changed" (raw SQL from the Dev Console, cascades, bulk imports).
+"""
+
+import json
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+LOCK_SQL = "UPDATE ChangeLogHead SET last_write = CURRENT_TIMESTAMP(6) WHERE id = 1"
+
+INSERT_SQL = "INSERT INTO ChangeLog (table_name, op, row_key) VALUES (%s, %s, %s)"
+
+READ_SQL = """
+    SELECT seq, table_name, op, row_key, changed_at
+    FROM ChangeLog
+    WHERE seq > %s
+    ORDER BY seq
+    LIMIT %s
+"""
+
+
+def record(cursor, entries):
+    """Append ``(table, op, key)`` entries within the current transaction."""
+    if not entries:
+        return
+    cursor.execute(LOCK_SQL)
+    cursor.executemany(
+        INSERT_SQL,
+        [
+            (table, op, None if key is None else json.dumps(key, default=str))
+            for table, op, key in entries
+        ],
+    )
+
+
+def read(cursor, since, limit=DEFAULT_LIMIT):
+    """Return up to ``limit`` entries after ``since`` and whether more follow.
+
+    Entries are ``{seq, table, op, key, changed_at}``.
+    """
+    cursor.execute(READ_SQL, (since, limit + 1))
+    rows = cursor.fetchall()
+    return [
+        {
+            "seq": row["seq"],
+            "table": row["table_name"],
+            "op": row["op"],
+            "key": None if row["row_key"] is None else json.loads(row["row_key"]),
+            "changed_at": row["changed_at"],
+        }
+        for row in rows[:limit]
+    ], len(rows) > limit
@@ -1,3 +1,4 @@
+import itertools
 import os
 from pathlib import Path
 
@@ -23,7 +24,59 @@ else:
     )
 
 
-def get_db_connection():
+def get_replica_hosts():
+    """Parse ``DB_REPLICA_HOSTS`` (``host[:port],...``) into ``(host, port)`` pairs."""
+    hosts = []
+    for entry in os.getenv("DB_REPLICA_HOSTS", "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        hosts.append((host, int(port) if port else 3306))
+    return hosts
+
+
+_replica_counter = itertools.count()
+
+
+def get_replica_connection():
+    """Connect to one of the configured read replicas, or return None.
+
+    Replicas are tried round-robin starting at the next host in the list, so
+    read load is spread across them and a replica that is down is skipped.
+    They use the primary's credentials unless ``DB_REPLICA_USER`` and
+    ``DB_REPLICA_PASSWORD`` are set.
+    """
+    hosts = get_replica_hosts()
+    if not hosts:
+        return None
+
+    start = next(_replica_counter)
+    for offset in range(len(hosts)):
+        host, port = hosts[(start + offset) % len(hosts)]
+        try:
+            return mysql.connector.connect(
+                host=host,
+                port=port,
+                user=os.getenv("DB_REPLICA_USER", os.getenv("DB_USER", "root")),
+                password=os.getenv("DB_REPLICA_PASSWORD", os.getenv("DB_PASSWORD", "")),
+                database=os.getenv("DB_NAME", "cmms_db"),
+            )
+        except Error as e:
+            print(f"Error connecting to MySQL replica {host}:{port}: {e}")
+    return None
+
+
+def get_db_connection(read_only=False):
+    """Open a connection to the primary, or to a replica if ``read_only``.
+
+    Read-only connections fall back to the primary when no replica is
+    configured or none of them is reachable.
+    """
+    if read_only:
+        connection = get_replica_connection()
+        if connection:
+            return connection
     try:
         connection = mysql.connector.connect(
             host=os.getenv("DB_HOST", "localhost"),
@@ -37,6 +90,21 @@ def get_db_connection():
         return None
 
 
+def abandon_connection(connection):
+    """Close ``connection`` without reading the rest of an unbuffered result.
+
+    Closing the cursor first would read or reject the unread rows
+    (``InternalError: Unread result found``) and leave the connection open.
+    The connection is closed instead, which fails to send ``QUIT`` over the
+    pending result, ignores that and drops the socket; the server then
+    aborts the statement.
+    """
+    try:
+        connection.close()
+    except Error:
+        pass
+
+
 def is_db_initialized() -> bool:
     """Check whether the core application tables already exist.
 
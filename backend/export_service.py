@@ -0,0 +1,183 @@
+"""
+Bulk export of query results as Apache Arrow IPC streams or Parquet files.
+
+Rows are pulled from an unbuffered (server-side streaming) MySQL cursor in
+batches of ``batch_size`` and each batch is encoded and yielded before the
+next one is fetched, so neither the server nor the client has to hold the
+whole extract in memory. The Arrow schema is derived from the cursor
+description, so column types are stable across batches even when the first
+batch contains only NULLs. DECIMAL columns are kept exact as Arrow decimals
+rather than being rounded through float64.
+
+Requires ``pyarrow``; callers should import this module lazily and report a
+helpful error if it is missing.
+"""
+
+from decimal import Context, Decimal
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from mysql.connector import FieldType
+
+DEFAULT_BATCH_SIZE = 5000
+
+# mysql-connector leaves precision and scale out of cursor.description, so
+# DECIMAL columns fall back to the widest decimal128 with room for the extra
+# fraction digits MySQL adds to AVG() and division results.
+DEFAULT_DECIMAL_PRECISION = 38
+DEFAULT_DECIMAL_SCALE = 10
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+_INTEGER_TYPES = {
+    FieldType.TINY,
+    FieldType.SHORT,
+    FieldType.INT24,
+    FieldType.LONG,
+    FieldType.LONGLONG,
+    FieldType.YEAR,
+}
+_FLOAT_TYPES = {
+    FieldType.FLOAT,
+    FieldType.DOUBLE,
+}
+_DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+_BINARY_TYPES = {
+    FieldType.BLOB,
+    FieldType.TINY_BLOB,
+    FieldType.MEDIUM_BLOB,
+    FieldType.LONG_BLOB,
+    FieldType.GEOMETRY,
+    FieldType.BIT,
+}
+
+
+def decimal_type(precision=None, scale=None):
+    """Return the Arrow decimal type for a DECIMAL(precision, scale) column."""
+    if precision is None:
+        precision = DEFAULT_DECIMAL_PRECISION
+    if scale is None:
+        scale = min(DEFAULT_DECIMAL_SCALE, precision)
+    if precision > 38:
+        return pa.decimal256(precision, scale)
+    return pa.decimal128(precision, scale)
+
+
+def arrow_type(type_code, precision=None, scale=None):
+    """Map a MySQL column type code to an Arrow data type."""
+    if type_code in _INTEGER_TYPES:
+        return pa.int64()
+    if type_code in _FLOAT_TYPES:
+        return pa.float64()
+    if type_code in _DECIMAL_TYPES:
+        return decimal_type(precision, scale)
+    if type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+        return pa.timestamp("us")
+    if type_code in (FieldType.DATE, FieldType.NEWDATE):
+        return pa.date32()
+    if type_code == FieldType.TIME:
+        return pa.duration("us")
+    if type_code in _BINARY_TYPES:
+        return pa.binary()
+    return pa.string()
+
+
+def schema_from_description(description):
+    """Build an Arrow schema from a DB-API ``cursor.description``."""
+    return pa.schema(
+        [pa.field(col[0], arrow_type(col[1], col[4], col[5])) for col in description]
+    )
+
+
+def _decimal_values(values, data_type):
+    # Quantize to the column scale so pyarrow does not reject values with
+    # more fraction digits than the fallback scale allows.
+    quantum = Decimal(1).scaleb(-data_type.scale)
+    context = Context(prec=data_type.precision + data_type.scale)
+    return [
+        None if v is None else Decimal(str(v)).quantize(quantum, context=context)
+        for v in values
+    ]
+
+
+def _record_batch(rows, schema):
+    columns = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_floating(field.type):
+            values = [float(v) if v is not None else None for v in values]
+        elif pa.types.is_decimal(field.type):
+            values = _decimal_values(values, field.type)
+        elif pa.types.is_string(field.type):
+            values = [
+                v if v is None or isinstance(v, str) else str(v) for v in values
+            ]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_cursor(cursor, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield ``fmt``-encoded chunks for the rows of an executed ``cursor``.
+
+    ``cursor`` must be a tuple (non-dictionary) cursor whose query has
+    already been executed.
+    """
+    schema = schema_from_description(cursor.description)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    else:
+        writer = ipc.new_stream(sink, schema)
+
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = _record_batch(rows, schema)
+            if fmt == "parquet":
+                # One row group per batch keeps the writer's buffer bounded.
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
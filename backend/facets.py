@@ -0,0 +1,62 @@
+"""Distinct values with counts for filter dropdowns.
+
+Each facet is one ``GROUP BY`` over a single column; for indexed columns
+(building, campus, activity and maintenance type, job role) MySQL answers
+it from the index alone; facets that skip soft-deleted rows (see purge.py)
+also read ``deleted_at``. The API caches every facet separately under the
+generations of the tables it reads (see ``ResponseCache``), so a write to
+Profile only recomputes the role facets and not the building list.
+"""
+
+ACTIVITY_LIVE = "deleted_at IS NULL"
+PERSON_LIVE = (
+    "personal_id IN (SELECT personal_id FROM Person WHERE deleted_at IS NULL)"
+)
+
+
+class Facet:
+    """Distinct non-NULL values of ``table.column``.
+
+    ``where`` restricts the rows counted; ``joins`` names the other tables
+    it reads.
+    """
+
+    def __init__(self, table, column, where=None, joins=()):
+        self.table = table
+        self.column = column
+        self.where = where
+        self.joins = joins
+
+    @property
+    def tables(self):
+        return (self.table, *self.joins)
+
+    @property
+    def sql(self):
+        where = f" AND {self.where}" if self.where else ""
+        return (
+            f"SELECT {self.column} AS value, COUNT(*) AS count FROM {self.table} "
+            f"WHERE {self.column} IS NOT NULL AND {self.column} <> ''{where} "
+            f"GROUP BY {self.column} ORDER BY {self.column}"
+        )
+
+
+FACETS = {
+    "building": Facet("Location", "building"),
+    "campus": Facet("Location", "campus"),
+    "location_type": Facet("Location", "type"),
+    "activity_type": Facet("Activity", "type", ACTIVITY_LIVE),
+    "maintenance_type": Facet("Maintenance", "type"),
+    "frequency": Facet("Maintenance", "frequency"),
+    "job_role": Facet("Profile", "job_role", PERSON_LIVE, ("Person",)),
+    "profile_status": Facet("Profile", "status", PERSON_LIVE, ("Person",)),
+    "faculty": Facet("School", "faculty"),
+}
+
+
+def facet_values(cursor, name):
+    """Return ``[{"value", "count"}]`` for facet ``name``, sorted by value."""
+    cursor.execute(FACETS[name].sql)
+    return [
+        {"value": row["value"], "count": int(row["count"])} for row in cursor.fetchall()
+    ]
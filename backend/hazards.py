@@ -0,0 +1,125 @@
+"""Denormalized index of chemical-cleaning hazards.
+
+``ChemicalHazard`` holds one row per cleaning task with ``active_chemical``
+set and a ``scheduled_time``, copied together with the location and
+contractor details the safety search shows. ``end_time`` is always filled
+in (tasks without one last ``DEFAULT_TASK_DURATION``), so "which hazards are
+active in building X during ``[start, end)``" is answered from
+``idx_hazard_building_time`` instead of a three-way join per request.
+
+An overlap test has two open-ended bounds (``scheduled_time < end`` and
+``end_time > start``), and an index range can only use the first. Rows are
+therefore flagged ``long_running`` when written if they last longer than
+``LONG_RUNNING``. Short hazards that can overlap the window started within
+``LONG_RUNNING`` of ``start``, which bounds their ``scheduled_time`` on both
+sides; long ones are rare and read by a second range on the flag.
+
+The API refreshes the rows of a task or location in the same transaction as
+the write that changes them; ``rebuild`` recomputes the whole table after
+writes made outside the API. The warning text and ISO formatting of the
+times are produced by the query, so rows are returned as read.
+"""
+
+from datetime import timedelta
+
+from scheduling import DEFAULT_TASK_DURATION
+
+WARNING = "⚠️ WARNING: Hazardous chemicals used!"
+
+# DATE_FORMAT pattern matching datetime.isoformat() for whole seconds.
+ISO_FORMAT = "%Y-%m-%dT%H:%i:%S"
+
+# Longest hazard read through the bounded range (see the module docstring).
+LONG_RUNNING = timedelta(hours=24)
+
+# Columns a refresh can be scoped by (both exist in ChemicalHazard and as
+# m.<column> in the source query).
+REFRESH_SCOPES = ("maintenance_id", "location_id")
+
+_END_TIME = (
+    "COALESCE(m.end_time, m.scheduled_time "
+    f"+ INTERVAL {int(DEFAULT_TASK_DURATION.total_seconds())} SECOND)"
+)
+
+SOURCE_SQL = f"""
+    INSERT INTO ChemicalHazard (
+        maintenance_id, location_id, building, room, floor, campus,
+        type, frequency, company_name, scheduled_time, end_time, long_running
+    )
+    SELECT m.maintenance_id, m.location_id, l.building, l.room, l.floor,
+           l.campus, m.type, m.frequency, ec.name, m.scheduled_time,
+           {_END_TIME},
+           {_END_TIME} > m.scheduled_time
+               + INTERVAL {int(LONG_RUNNING.total_seconds())} SECOND
+    FROM Maintenance m
+    JOIN Location l ON m.location_id = l.location_id
+    LEFT JOIN ExternalCompany ec ON m.contracted_company_id = ec.company_id
+    WHERE m.type = 'Cleaning' AND m.active_chemical
+      AND m.scheduled_time IS NOT NULL
+"""
+
+ACTIVE_SQL = """
+    SELECT h.maintenance_id, h.type, h.frequency, TRUE AS active_chemical,
+           h.building, h.room, h.floor, h.campus, h.company_name,
+           DATE_FORMAT(h.scheduled_time, %s) AS scheduled_time,
+           DATE_FORMAT(h.end_time, %s) AS end_time,
+           %s AS warning
+    FROM ChemicalHazard h
+"""
+
+
+def refresh(cursor, scope, value):
+    """Recompute the hazard rows of one task or location.
+
+    ``scope`` is ``"maintenance_id"`` or ``"location_id"``.
+    """
+    if scope not in REFRESH_SCOPES:
+        raise ValueError(f"Unknown hazard scope: {scope}")
+    cursor.execute(f"DELETE FROM ChemicalHazard WHERE {scope} = %s", (value,))
+    cursor.execute(SOURCE_SQL + f" AND m.{scope} = %s", (value,))
+
+
+def rebuild(cursor):
+    """Recompute ``ChemicalHazard`` from Maintenance, Location and companies."""
+    cursor.execute("DELETE FROM ChemicalHazard")
+    cursor.execute(SOURCE_SQL)
+
+
+def active_hazards(cursor, building=None, start=None, end=None):
+    """Return the hazards overlapping ``[start, end)``, earliest first.
+
+    Either bound may be omitted. Rows are ready to serialize: times are ISO
+    strings and each row carries the ``warning`` text.
+    """
+    select = [ISO_FORMAT, ISO_FORMAT, WARNING]
+    where, params = [], []
+    if building:
+        where.append("h.building = %s")
+        params.append(building)
+    if not (start or end):
+        sql = ACTIVE_SQL
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY h.scheduled_time, h.maintenance_id"
+        cursor.execute(sql, tuple(select + params))
+        return cursor.fetchall()
+
+    branches, all_params = [], []
+    for long_running in ("FALSE", "TRUE"):
+        branch = where + [f"h.long_running = {long_running}"]
+        all_params += select + params
+        if start and long_running == "FALSE":
+            branch.append("h.scheduled_time >= %s")
+            all_params.append(start - LONG_RUNNING)
+        if end:
+            branch.append("h.scheduled_time < %s")
+            all_params.append(end)
+        if start:
+            branch.append("h.end_time > %s")
+            all_params.append(start)
+        branches.append(f"{ACTIVE_SQL} WHERE {' AND '.join(branch)}")
+
+    # The union returns ISO strings, which sort chronologically.
+    sql = " UNION ALL ".join(branches) + " ORDER BY scheduled_time, maintenance_id"
+    cursor.execute(sql, tuple(all_params))
+    return cursor.fetchall()
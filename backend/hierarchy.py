@@ -0,0 +1,172 @@
+"""Reporting-chain queries over ``Person.supervisor_id``.
+
+The org tree can be read in two ways:
+
+- ``WITH RECURSIVE`` common table expressions walk ``supervisor_id`` one
+  level per iteration. Always correct, needs no extra storage, and is the
+  default.
+- The ``PersonClosure`` table stores one row per (ancestor, descendant)
+  pair, including each person's depth-0 row for themselves. A subtree is a
+  range read on the primary key and the ancestors of a person a range read
+  on ``idx_closure_descendant``, plus, per row, a read of its own ancestors
+  on that index to skip paths through soft-deleted persons. The table is maintained on Person
+  writes when ``PERSON_CLOSURE=true`` and can be rebuilt from
+  ``supervisor_id`` at any time with ``rebuild_closure``.
+
+Every query returns ``personal_id``, ``name``, ``supervisor_id`` and
+``depth`` (distance from the requested person) and includes the requested
+person as the depth-0 row, so callers can tell an unknown id from a person
+with no subordinates.
+
+Soft-deleted persons (see purge.py) end a chain: they are not returned and
+neither is anyone reached only through them, as if their subordinates had
+already been detached by the purge.
+"""
+
+# Bounds recursion if supervisor_id ever contains a cycle (e.g. edited via
+# the Dev Console); MySQL would otherwise stop at cte_max_recursion_depth.
+MAX_DEPTH = 64
+
+SUBTREE_CTE_SQL = """
+    WITH RECURSIVE subtree (personal_id, name, supervisor_id, depth) AS (
+        SELECT personal_id, name, supervisor_id, 0
+        FROM Person WHERE personal_id = %s AND deleted_at IS NULL
+        UNION ALL
+        SELECT p.personal_id, p.name, p.supervisor_id, s.depth + 1
+        FROM Person p
+        JOIN subtree s ON p.supervisor_id = s.personal_id
+        WHERE s.depth < %s AND p.deleted_at IS NULL
+    )
+    SELECT personal_id, name, supervisor_id, depth
+    FROM subtree
+    ORDER BY depth, personal_id
+"""
+
+ANCESTORS_CTE_SQL = """
+    WITH RECURSIVE chain (personal_id, name, supervisor_id, depth) AS (
+        SELECT personal_id, name, supervisor_id, 0
+        FROM Person WHERE personal_id = %s AND deleted_at IS NULL
+        UNION ALL
+        SELECT p.personal_id, p.name, p.supervisor_id, c.depth + 1
+        FROM Person p
+        JOIN chain c ON p.personal_id = c.supervisor_id
+        WHERE c.depth < %s AND p.deleted_at IS NULL
+    )
+    SELECT personal_id, name, supervisor_id, depth
+    FROM chain
+    ORDER BY depth
+"""
+
+# A closure row is only returned if no person on its path, ends included,
+# is soft-deleted: those are the descendant's ancestors up to c.depth.
+CLOSURE_PATH_LIVE = """
+    NOT EXISTS (
+        SELECT 1 FROM PersonClosure x
+        JOIN Person d ON d.personal_id = x.ancestor_id
+        WHERE x.descendant_id = c.descendant_id AND x.depth <= c.depth
+          AND d.deleted_at IS NOT NULL
+    )
+"""
+
+SUBTREE_CLOSURE_SQL = f"""
+    SELECT p.personal_id, p.name, p.supervisor_id, c.depth
+    FROM PersonClosure c
+    JOIN Person p ON p.personal_id = c.descendant_id
+    WHERE c.ancestor_id = %s AND c.depth <= %s AND {CLOSURE_PATH_LIVE}
+    ORDER BY c.depth, p.personal_id
+"""
+
+ANCESTORS_CLOSURE_SQL = f"""
+    SELECT p.personal_id, p.name, p.supervisor_id, c.depth
+    FROM PersonClosure c
+    JOIN Person p ON p.personal_id = c.ancestor_id
+    WHERE c.descendant_id = %s AND c.depth <= %s AND {CLOSURE_PATH_LIVE}
+    ORDER BY c.depth
+"""
+
+REBUILD_CLOSURE_SQL = f"""
+    INSERT INTO PersonClosure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE paths (ancestor_id, descendant_id, depth) AS (
+        SELECT personal_id, personal_id, 0 FROM Person
+        UNION ALL
+        SELECT paths.ancestor_id, p.personal_id, paths.depth + 1
+        FROM paths
+        JOIN Person p ON p.supervisor_id = paths.descendant_id
+        WHERE paths.depth < {MAX_DEPTH}
+    )
+    SELECT ancestor_id, descendant_id, depth FROM paths
+"""
+
+
+def subtree(cursor, personal_id, max_depth=MAX_DEPTH, use_closure=False):
+    """Return ``personal_id`` and everyone reporting to them, nearest first."""
+    sql = SUBTREE_CLOSURE_SQL if use_closure else SUBTREE_CTE_SQL
+    cursor.execute(sql, (personal_id, max_depth))
+    return cursor.fetchall()
+
+
+def ancestors(cursor, personal_id, max_depth=MAX_DEPTH, use_closure=False):
+    """Return ``personal_id`` followed by their supervisors up to the root."""
+    sql = ANCESTORS_CLOSURE_SQL if use_closure else ANCESTORS_CTE_SQL
+    cursor.execute(sql, (personal_id, max_depth))
+    return cursor.fetchall()
+
+
+def supervisor_error(cursor, personal_id, supervisor_id, use_closure=False):
+    """Return why ``supervisor_id`` cannot supervise ``personal_id``, or None.
+
+    The supervisor must be a live person and must not report to
+    ``personal_id``, which would put ``personal_id`` above itself.
+    """
+    if supervisor_id is None:
+        return None
+    if supervisor_id == personal_id:
+        return "Supervisor would create a reporting cycle"
+    rows = ancestors(cursor, supervisor_id, use_closure=use_closure)
+    if not rows:
+        return "Supervisor not found"
+    if any(row["personal_id"] == personal_id for row in rows):
+        return "Supervisor would create a reporting cycle"
+    return None
+
+
+def closure_insert(cursor, personal_id, supervisor_id):
+    """Add the closure rows for a newly inserted (leaf) person."""
+    cursor.execute(
+        "INSERT INTO PersonClosure (ancestor_id, descendant_id, depth) "
+        "SELECT ancestor_id, %s, depth + 1 FROM PersonClosure "
+        "WHERE descendant_id = %s "
+        "UNION ALL SELECT %s, %s, 0",
+        (personal_id, supervisor_id, personal_id, personal_id),
+    )
+
+
+def closure_move(cursor, personal_id, supervisor_id):
+    """Re-parent the subtree rooted at ``personal_id`` under ``supervisor_id``.
+
+    Removes the paths from the old ancestors into the subtree, then connects
+    every new ancestor (if any) to every node of the subtree. Paths inside
+    the subtree are untouched.
+    """
+    cursor.execute(
+        "DELETE a FROM PersonClosure a "
+        "JOIN PersonClosure d ON a.descendant_id = d.descendant_id "
+        "LEFT JOIN PersonClosure x "
+        "ON x.ancestor_id = d.ancestor_id AND x.descendant_id = a.ancestor_id "
+        "WHERE d.ancestor_id = %s AND x.ancestor_id IS NULL",
+        (personal_id,),
+    )
+    if supervisor_id is not None:
+        cursor.execute(
+            "INSERT INTO PersonClosure (ancestor_id, descendant_id, depth) "
+            "SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1 "
+            "FROM PersonClosure sup JOIN PersonClosure sub "
+            "WHERE sup.descendant_id = %s AND sub.ancestor_id = %s",
+            (supervisor_id, personal_id),
+        )
+
+
+def rebuild_closure(cursor):
+    """Recompute ``PersonClosure`` from ``Person.supervisor_id``."""
+    cursor.execute("DELETE FROM PersonClosure")
+    cursor.execute(REBUILD_CLOSURE_SQL)
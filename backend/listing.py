@@ -0,0 +1,482 @@
+"""Declarative SELECT builder for the list endpoints.
+
+Each list endpoint is described by a ``ListSpec``: the base table, the joins it
+may need, a whitelist mapping every public field name to its SQL expression,
+the filters it accepts and the columns it can be sorted by. The query string
+grammar is:
+
+- ``?fields=a,b`` selects only the named fields.
+- ``?name=value`` is an equality filter; ``?name__in=a,b`` matches any value.
+- ``?name__gte=...`` / ``__gt`` / ``__lte`` / ``__lt`` are range filters,
+  available on date/time and numeric filters.
+- ``?sort=a,-b`` orders by ``a`` ascending then ``b`` descending.
+- ``?limit=n&offset=m`` pages through the result.
+
+Everything is validated against the spec and turned into parameterized SQL;
+no client-supplied text is ever interpolated into the statement.
+
+Persons and activities are soft-deleted (``deleted_at`` is set until the
+purge worker removes the row, see purge.py); every spec reading them keeps
+only live rows through ``where``.
+
+Only joins that can never add or remove rows (inner joins along a NOT NULL
+foreign key, or left joins onto a primary key) may be marked ``optional``;
+everything else must stay in the query regardless of the requested fields.
+"""
+
+import re
+from datetime import datetime
+
+# Query parameters consumed by the listing machinery itself.
+RESERVED_PARAMS = {"fields", "sort", "limit", "offset", "shape"}
+
+MAX_LIMIT = 10000
+MAX_IN_VALUES = 100
+
+# Filter kinds and the operators each one accepts.
+EXACT, RANGE, BOOL = "exact", "range", "bool"
+KIND_OPERATORS = {
+    EXACT: {"eq", "in"},
+    RANGE: {"eq", "in", "gt", "gte", "lt", "lte"},
+    BOOL: {"eq"},
+}
+SQL_OPERATORS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+TRUE_VALUES = {"1", "true", "yes"}
+FALSE_VALUES = {"0", "false", "no"}
+
+
+class ListingError(ValueError):
+    """Raised when a list request names unknown fields, filters or sorts."""
+
+
+class Join:
+    """A join clause introducing ``alias``, optionally depending on others."""
+
+    def __init__(self, sql, alias, optional=True, depends=()):
+        self.sql = sql
+        self.alias = alias
+        self.optional = optional
+        self.depends = tuple(depends)
+
+
+class ListSpec:
+    """Describes the SELECT behind one list endpoint."""
+
+    def __init__(
+        self,
+        name,
+        base,
+        fields,
+        joins=(),
+        where=None,
+        order_by=None,
+        filters=None,
+        sortable=(),
+    ):
+        self.name = name
+        self.base = base
+        self.fields = fields  # public name -> SQL expression, in output order
+        self.joins = tuple(joins)
+        self.where = where
+        self.order_by = order_by
+        self.filters = filters or {}  # public name -> (SQL expression, kind)
+        self.sortable = tuple(sortable)
+
+    def parse_fields(self, raw):
+        """Return the requested field names, or all fields if ``raw`` is empty."""
+        if not raw:
+            return list(self.fields)
+        requested = [f.strip() for f in raw.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in self.fields]
+        if unknown:
+            raise ListingError(
+                f"Unknown field(s) for {self.name}: {', '.join(unknown)}. "
+                f"Allowed: {', '.join(self.fields)}"
+            )
+        # Keep the first occurrence of each field, in the order requested.
+        return list(dict.fromkeys(requested))
+
+    def _convert(self, name, kind, value):
+        if kind == BOOL:
+            lowered = value.lower()
+            if lowered in TRUE_VALUES:
+                return True
+            if lowered in FALSE_VALUES:
+                return False
+            raise ListingError(f"Filter {name} expects true or false")
+        if kind == RANGE and not value.lstrip("-").isdigit():
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                raise ListingError(
+                    f"Filter {name} expects a number or an ISO date/time"
+                ) from None
+        return value
+
+    def parse_filters(self, args, reserved=()):
+        """Turn filter query parameters into ``(predicates, params)``.
+
+        ``args`` is a request's ``MultiDict`` of query parameters; names in
+        ``RESERVED_PARAMS`` or ``reserved`` are ignored.
+        """
+        predicates, params = [], []
+        for key, value in args.items(multi=True):
+            if key in RESERVED_PARAMS or key in reserved:
+                continue
+            name, _, op = key.partition("__")
+            op = op or "eq"
+            if name not in self.filters:
+                raise ListingError(
+                    f"Unknown filter for {self.name}: {name}. "
+                    f"Allowed: {', '.join(self.filters) or 'none'}"
+                )
+            expr, kind = self.filters[name]
+            if op not in KIND_OPERATORS[kind]:
+                raise ListingError(f"Operator {op} is not supported for {name}")
+
+            if op == "in":
+                values = [v.strip() for v in value.split(",") if v.strip()]
+                if not values or len(values) > MAX_IN_VALUES:
+                    raise ListingError(
+                        f"Filter {key} needs between 1 and {MAX_IN_VALUES} values"
+                    )
+                predicates.append(f"{expr} IN ({', '.join(['%s'] * len(values))})")
+                params.extend(self._convert(name, kind, v) for v in values)
+            else:
+                predicates.append(f"{expr} {SQL_OPERATORS[op]} %s")
+                params.append(self._convert(name, kind, value))
+        return predicates, params
+
+    def parse_sort(self, raw):
+        """Turn ``?sort=a,-b`` into an ORDER BY clause, or None if empty."""
+        if not raw:
+            return None
+        clauses = []
+        for item in raw.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            direction = "DESC" if item.startswith("-") else "ASC"
+            name = item.lstrip("+-")
+            if name not in self.sortable:
+                raise ListingError(
+                    f"Cannot sort {self.name} by {name}. "
+                    f"Allowed: {', '.join(self.sortable) or 'none'}"
+                )
+            expr = self.fields.get(name) or self.filters[name][0]
+            clauses.append(f"{expr} {direction}")
+        return ", ".join(clauses) or None
+
+    def _needed_joins(self, expressions):
+        text = " ".join(expressions)
+        needed = set()
+        for join in self.joins:
+            if not join.optional or re.search(rf"\b{join.alias}\.", text):
+                needed.add(join.alias)
+        # Pull in joins that the selected joins themselves reference.
+        changed = True
+        while changed:
+            changed = False
+            for join in self.joins:
+                if join.alias in needed:
+                    for dep in join.depends:
+                        if dep not in needed:
+                            needed.add(dep)
+                            changed = True
+        return [j for j in self.joins if j.alias in needed]
+
+    def build(
+        self, fields, where=(), params=(), order_by=None, limit=None, offset=None
+    ):
+        """Build ``(sql, params)`` selecting ``fields``.
+
+        ``where`` is a list of extra SQL predicates (with ``%s`` placeholders
+        matched by ``params``).
+        """
+        params = list(params)
+        select = [f"{self.fields[f]} AS {f}" for f in fields]
+        predicates = ([self.where] if self.where else []) + list(where)
+        order_by = order_by or self.order_by
+        joins = self._needed_joins(select + predicates + [order_by or ""])
+
+        sql = f"SELECT {', '.join(select)} FROM {self.base}"
+        for join in joins:
+            sql += f" {join.sql}"
+        if predicates:
+            sql += " WHERE " + " AND ".join(predicates)
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params.extend([limit, offset or 0])
+        return sql, tuple(params)
+
+
+def parse_page(args):
+    """Return ``(limit, offset)`` from the query string (``None`` = no limit)."""
+    limit, offset = args.get("limit"), args.get("offset")
+    if limit is None and offset is None:
+        return None, None
+    try:
+        limit = int(limit) if limit is not None else MAX_LIMIT
+        offset = int(offset) if offset is not None else 0
+    except ValueError:
+        raise ListingError("limit and offset must be integers") from None
+    if limit < 0 or offset < 0:
+        raise ListingError("limit and offset must not be negative")
+    return min(limit, MAX_LIMIT), offset
+
+
+PERSON_FIELDS = {
+    "personal_id": "p.personal_id",
+    "name": "p.name",
+    "gender": "p.gender",
+    "date_of_birth": "p.date_of_birth",
+    "entry_date": "p.entry_date",
+    "supervisor_id": "p.supervisor_id",
+}
+
+PERSON_AGE = "TIMESTAMPDIFF(YEAR, p.date_of_birth, CURDATE())"
+
+PERSON_FILTERS = {
+    "personal_id": ("p.personal_id", EXACT),
+    "name": ("p.name", EXACT),
+    "gender": ("p.gender", EXACT),
+    "date_of_birth": ("p.date_of_birth", RANGE),
+    "entry_date": ("p.entry_date", RANGE),
+    "supervisor_id": ("p.supervisor_id", EXACT),
+}
+
+PERSON_SORTABLE = ("personal_id", "name", "date_of_birth", "entry_date")
+
+PERSON_LIVE = "p.deleted_at IS NULL"
+
+LIST_SPECS = {
+    spec.name: spec
+    for spec in [
+        ListSpec(
+            "persons",
+            "Person p",
+            {**PERSON_FIELDS, "age": PERSON_AGE},
+            where=PERSON_LIVE,
+            filters=PERSON_FILTERS,
+            sortable=PERSON_SORTABLE,
+        ),
+        ListSpec(
+            "persons-by-role",
+            "Person p",
+            {**PERSON_FIELDS, "age": PERSON_AGE, "job_role": "pr.job_role"},
+            joins=[
+                Join(
+                    "JOIN Profile pr ON p.personal_id = pr.personal_id",
+                    "pr",
+                    optional=False,
+                )
+            ],
+            where=f"pr.job_role = %s AND {PERSON_LIVE}",
+            filters={**PERSON_FILTERS, "status": ("pr.status", EXACT)},
+            sortable=PERSON_SORTABLE,
+        ),
+        ListSpec(
+            "profiles",
+            "Profile pr",
+            {**PERSON_FIELDS, "job_role": "pr.job_role", "status": "pr.status"},
+            joins=[Join("JOIN Person p ON pr.personal_id = p.personal_id", "p")],
+            where=PERSON_LIVE,
+            filters={
+                "personal_id": ("pr.personal_id", EXACT),
+                "job_role": ("pr.job_role", EXACT),
+                "status": ("pr.status", EXACT),
+            },
+            sortable=("personal_id", "name", "job_role"),
+        ),
+        ListSpec(
+            "schools",
+            "School s",
+            {
+                "department": "s.department",
+                "school_name": "s.dept_name",
+                "faculty": "s.faculty",
+                "hq_building": "s.hq_building",
+            },
+            where="s.faculty IS NOT NULL",
+            filters={
+                "department": ("s.department", EXACT),
+                "faculty": ("s.faculty", EXACT),
+                "hq_building": ("s.hq_building", EXACT),
+            },
+            sortable=("department", "school_name"),
+        ),
+        ListSpec(
+            "locations",
+            "Location l",
+            {
+                "location_id": "l.location_id",
+                "room": "l.room",
+                "floor": "l.floor",
+                "building": "l.building",
+                "type": "l.type",
+                "campus": "l.campus",
+                "department": "l.department",
+                "capacity": "l.capacity",
+                "dept_name": "s.dept_name",
+                "faculty": "s.faculty",
+            },
+            joins=[Join("LEFT JOIN School s ON l.department = s.department", "s")],
+            filters={
+                "location_id": ("l.location_id", EXACT),
+                "building": ("l.building", EXACT),
+                "floor": ("l.floor", EXACT),
+                "type": ("l.type", EXACT),
+                "campus": ("l.campus", EXACT),
+                "department": ("l.department", EXACT),
+            },
+            sortable=("location_id", "building", "department"),
+        ),
+        ListSpec(
+            "activities",
+            "Activity a",
+            {
+                "activity_id": "a.activity_id",
+                "type": "a.type",
+                "time": "a.time",
+                "duration_minutes": "a.duration_minutes",
+                "organiser_name": "p.name",
+                "building": "l.building",
+                "room": "l.room",
+                "floor": "l.floor",
+            },
+            joins=[
+                Join("JOIN Person p ON a.organiser_id = p.personal_id", "p"),
+                Join("LEFT JOIN Location l ON a.location_id = l.location_id", "l"),
+            ],
+            where=f"a.deleted_at IS NULL AND {PERSON_LIVE}",
+            order_by="a.activity_id",
+            filters={
+                "activity_id": ("a.activity_id", EXACT),
+                "type": ("a.type", EXACT),
+                "time": ("a.time", RANGE),
+                "organiser_id": ("a.organiser_id", EXACT),
+                "location_id": ("a.location_id", EXACT),
+                "building": ("l.building", EXACT),
+            },
+            sortable=("activity_id", "type", "time"),
+        ),
+        ListSpec(
+            "maintenance",
+            "Maintenance m",
+            {
+                "maintenance_id": "m.maintenance_id",
+                "type": "m.type",
+                "frequency": "m.frequency",
+                "location_id": "m.location_id",
+                "active_chemical": "m.active_chemical",
+                "contracted_company_id": "m.contracted_company_id",
+                "scheduled_time": "m.scheduled_time",
+                "end_time": "m.end_time",
+                "building": "l.building",
+                "room": "l.room",
+                "campus": "l.campus",
+            },
+            joins=[Join("JOIN Location l ON m.location_id = l.location_id", "l")],
+            filters={
+                "maintenance_id": ("m.maintenance_id", EXACT),
+                "type": ("m.type", EXACT),
+                "frequency": ("m.frequency", EXACT),
+                "location_id": ("m.location_id", EXACT),
+                "active_chemical": ("m.active_chemical", BOOL),
+                "contracted_company_id": ("m.contracted_company_id", EXACT),
+                "scheduled_time": ("m.scheduled_time", RANGE),
+                "end_time": ("m.end_time", RANGE),
+                "building": ("l.building", EXACT),
+                "campus": ("l.campus", EXACT),
+            },
+            sortable=("maintenance_id", "type", "location_id", "scheduled_time"),
+        ),
+        ListSpec(
+            "participations",
+            "Participation pa",
+            {
+                "personal_id": "pa.personal_id",
+                "person_name": "per.name",
+                "activity_id": "pa.activity_id",
+                "activity_type": "a.type",
+                "activity_time": "a.time",
+                "building": "l.building",
+                "room": "l.room",
+            },
+            joins=[
+                Join("JOIN Person per ON pa.personal_id = per.personal_id", "per"),
+                Join("JOIN Activity a ON pa.activity_id = a.activity_id", "a"),
+                Join(
+                    "LEFT JOIN Location l ON a.location_id = l.location_id",
+                    "l",
+                    depends=["a"],
+                ),
+            ],
+            where="per.deleted_at IS NULL AND a.deleted_at IS NULL",
+            filters={
+                "personal_id": ("pa.personal_id", EXACT),
+                "activity_id": ("pa.activity_id", EXACT),
+                "activity_type": ("a.type", EXACT),
+                "activity_time": ("a.time", RANGE),
+                "building": ("l.building", EXACT),
+            },
+            sortable=("personal_id", "activity_id", "activity_time"),
+        ),
+        ListSpec(
+            "affiliations",
+            "Affiliation af",
+            {
+                "personal_id": "af.personal_id",
+                "person_name": "p.name",
+                "department": "af.department",
+                "school_name": "s.dept_name",
+            },
+            joins=[
+                Join("JOIN Person p ON af.personal_id = p.personal_id", "p"),
+                Join("JOIN School s ON af.department = s.department", "s"),
+            ],
+            where=PERSON_LIVE,
+            filters={
+                "personal_id": ("af.personal_id", EXACT),
+                "department": ("af.department", EXACT),
+            },
+            sortable=("personal_id", "department"),
+        ),
+        ListSpec(
+            "external-companies",
+            "ExternalCompany ec",
+            {
+                "company_id": "ec.company_id",
+                "name": "ec.name",
+                "contact_info": "ec.contact_info",
+            },
+            filters={
+                "company_id": ("ec.company_id", EXACT),
+                "name": ("ec.name", EXACT),
+            },
+            sortable=("company_id", "name"),
+        ),
+        ListSpec(
+            "building-supervision",
+            "BuildingSupervision bs",
+            {
+                "supervision_id": "bs.supervision_id",
+                "personal_id": "bs.personal_id",
+                "building": "bs.building",
+                "assigned_date": "bs.assigned_date",
+                "manager_name": "p.name",
+            },
+            joins=[Join("JOIN Person p ON bs.personal_id = p.personal_id", "p")],
+            where=PERSON_LIVE,
+            order_by="bs.building, p.name",
+            filters={
+                "personal_id": ("bs.personal_id", EXACT),
+                "building": ("bs.building", EXACT),
+                "assigned_date": ("bs.assigned_date", RANGE),
+            },
+            sortable=("supervision_id", "building", "assigned_date"),
+        ),
+    ]
+}
@@ -0,0 +1,388 @@
+"""Per-location occupancy in fixed time buckets.
+
+``LocationOccupancy`` has one row per (location, ``BUCKET``-long slot) that
+something overlaps, with the number of activities, their participants, the
+maintenance tasks and, of those, the chemical cleanings in that slot. A
+booking or participation check reads the few rows covering the activity
+(at most ``MAX_ACTIVITY_DURATION / BUCKET + 1``) by primary key instead of
+joining Activity, Participation and Maintenance.
+
+The counters are maintained incrementally: every API write that adds,
+moves or removes an activity, participation or maintenance task applies a
++1/-1 delta to the buckets it covers, in the same transaction. ``rebuild``
+recomputes the table after writes made outside the API.
+
+Checks work at bucket granularity: a booking occupies every bucket it
+overlaps, so two activities in the same bucket conflict even if their exact
+times do not overlap.
+
+Maintenance tasks have no upper bound on their duration, and a task running
+for months would need thousands of bucket rows. Tasks longer than
+``LONG_TASK_DURATION`` (``Maintenance.long_running``) are therefore not
+counted here. ``occupancy`` reads the few that overlap the requested window
+from ``idx_maintenance_location_long`` and adds them to its buckets.
+"""
+
+from datetime import datetime, timedelta
+
+from scheduling import (
+    ACTIVITY_DURATION,
+    DEFAULT_TASK_DURATION,
+    LONG_TASK_DURATION,
+    MAX_ACTIVITY_DURATION,
+)
+
+BUCKET = timedelta(minutes=30)
+# Buckets are aligned to this instant (a Monday midnight).
+_EPOCH = datetime(2000, 1, 3)
+
+COUNTERS = (
+    "activity_count",
+    "participant_count",
+    "maintenance_count",
+    "chemical_count",
+)
+
+# Soft-deleted activities and participants are not counted (see purge.py).
+ACTIVITY_SQL = """
+    SELECT a.activity_id, a.location_id, a.time, a.duration_minutes,
+           (SELECT COUNT(*) FROM Participation pa
+            JOIN Person p ON p.personal_id = pa.personal_id
+            WHERE pa.activity_id = a.activity_id AND p.deleted_at IS NULL
+           ) AS participants
+    FROM Activity a
+"""
+ACTIVITY_LIVE = "a.deleted_at IS NULL"
+ACTIVITY_COLUMNS = (
+    "activity_id",
+    "location_id",
+    "time",
+    "duration_minutes",
+    "participants",
+)
+
+MAINTENANCE_SQL = """
+    SELECT location_id, scheduled_time, end_time, active_chemical
+    FROM Maintenance
+    WHERE scheduled_time IS NOT NULL AND NOT long_running
+"""
+
+LONG_TASKS_SQL = f"""
+    SELECT scheduled_time,
+           COALESCE(end_time, scheduled_time
+                    + INTERVAL {int(DEFAULT_TASK_DURATION.total_seconds())} SECOND)
+               AS end_time,
+           active_chemical
+    FROM Maintenance
+    WHERE location_id = %s AND long_running = TRUE AND scheduled_time < %s
+      AND COALESCE(end_time, scheduled_time
+                   + INTERVAL {int(DEFAULT_TASK_DURATION.total_seconds())} SECOND) > %s
+"""
+MAINTENANCE_COLUMNS = ("location_id", "scheduled_time", "end_time", "active_chemical")
+
+
+class OccupancyConflict(Exception):
+    """Raised when a booking would overlap a busy or full location."""
+
+    def __init__(self, message, buckets):
+        super().__init__(message)
+        self.buckets = buckets
+
+
+def parse_capacity(value):
+    """Parse a location's ``capacity``: a non-negative whole number, or None
+    (unlimited) when empty. Raises ValueError otherwise."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+        return value
+    raise ValueError("capacity must be a non-negative whole number")
+
+
+def bucket_floor(moment):
+    """Return the start of the bucket containing ``moment``."""
+    return moment - (moment - _EPOCH) % BUCKET
+
+
+def buckets(start, end):
+    """Return the starts of the buckets overlapping ``[start, end)``."""
+    current = bucket_floor(start)
+    starts = []
+    while current < end:
+        starts.append(current)
+        current += BUCKET
+    return starts
+
+
+def activity_interval(activity):
+    """Return the ``[start, end)`` of an activity row, or None if unplaced."""
+    if not activity.get("location_id") or not activity.get("time"):
+        return None
+    minutes = activity.get("duration_minutes")
+    duration = timedelta(minutes=minutes) if minutes else ACTIVITY_DURATION
+    return activity["time"], activity["time"] + duration
+
+
+def maintenance_interval(task):
+    """Return the ``[start, end)`` a maintenance row is counted over, or None
+    if it is unscheduled or long-running (not counted per bucket)."""
+    if not task.get("location_id") or not task.get("scheduled_time"):
+        return None
+    start = task["scheduled_time"]
+    end = task.get("end_time") or start + DEFAULT_TASK_DURATION
+    if end - start > LONG_TASK_DURATION:
+        return None
+    return start, end
+
+
+def apply(cursor, location_id, start, end, **deltas):
+    """Add ``deltas`` (counter name to amount) to the buckets of an interval."""
+    columns = [c for c in COUNTERS if deltas.get(c)]
+    if not columns:
+        return
+    rows = [
+        (location_id, bucket, *(deltas[c] for c in columns))
+        for bucket in buckets(start, end)
+    ]
+    cursor.executemany(
+        f"INSERT INTO LocationOccupancy (location_id, bucket_start, "
+        f"{', '.join(columns)}) VALUES (%s, %s{', %s' * len(columns)}) "
+        "ON DUPLICATE KEY UPDATE "
+        + ", ".join(f"{c} = {c} + VALUES({c})" for c in columns),
+        rows,
+    )
+    if any(deltas[c] < 0 for c in columns):
+        cursor.execute(
+            "DELETE FROM LocationOccupancy "
+            "WHERE location_id = %s AND bucket_start >= %s AND bucket_start < %s "
+            + "".join(f" AND {c} = 0" for c in COUNTERS),
+            (location_id, bucket_floor(start), end),
+        )
+
+
+def apply_activity(cursor, activity, sign=1):
+    """Count (``sign=1``) or uncount (``-1``) an activity and its participants."""
+    interval = activity_interval(activity)
+    if interval:
+        apply(
+            cursor,
+            activity["location_id"],
+            *interval,
+            activity_count=sign,
+            participant_count=sign * (activity.get("participants") or 0),
+        )
+
+
+def apply_participant(cursor, activity, sign=1):
+    """Count or uncount one participant of ``activity``."""
+    interval = activity_interval(activity)
+    if interval:
+        apply(cursor, activity["location_id"], *interval, participant_count=sign)
+
+
+def apply_task(cursor, task, sign=1):
+    """Count or uncount a maintenance task."""
+    interval = maintenance_interval(task)
+    if interval:
+        apply(
+            cursor,
+            task["location_id"],
+            *interval,
+            maintenance_count=sign,
+            chemical_count=sign if task.get("active_chemical") else 0,
+        )
+
+
+def release_people(cursor, personal_ids):
+    """Uncount persons that are about to be deleted.
+
+    Activities they organise are deleted with them and are uncounted as a
+    whole; in every other activity their own places are given back. Must
+    run before any of the rows are deleted; soft-deleted persons and
+    activities were uncounted already and are skipped.
+    """
+    marks = ", ".join(["%s"] * len(personal_ids))
+    cursor.execute(
+        ACTIVITY_SQL
+        + f" WHERE a.organiser_id IN ({marks}) AND {ACTIVITY_LIVE} FOR UPDATE",
+        tuple(personal_ids),
+    )
+    for activity in cursor.fetchall():
+        apply_activity(cursor, activity, -1)
+    cursor.execute(
+        "SELECT a.activity_id, a.location_id, a.time, a.duration_minutes, "
+        "COUNT(*) AS participants FROM Activity a "
+        "JOIN Participation own ON own.activity_id = a.activity_id "
+        "JOIN Person p ON p.personal_id = own.personal_id "
+        f"WHERE own.personal_id IN ({marks}) AND a.organiser_id NOT IN ({marks}) "
+        f"AND p.deleted_at IS NULL AND {ACTIVITY_LIVE} "
+        "GROUP BY a.activity_id",
+        tuple(personal_ids) * 2,
+    )
+    for activity in cursor.fetchall():
+        interval = activity_interval(activity)
+        if interval:
+            apply(
+                cursor,
+                activity["location_id"],
+                *interval,
+                participant_count=-activity["participants"],
+            )
+
+
+def release_activities(cursor, activity_ids):
+    """Uncount activities (and their participants) about to be deleted.
+
+    Soft-deleted activities were uncounted already and are skipped.
+    """
+    marks = ", ".join(["%s"] * len(activity_ids))
+    cursor.execute(
+        ACTIVITY_SQL
+        + f" WHERE a.activity_id IN ({marks}) AND {ACTIVITY_LIVE} FOR UPDATE",
+        tuple(activity_ids),
+    )
+    for activity in cursor.fetchall():
+        apply_activity(cursor, activity, -1)
+
+
+def release_tasks(cursor, maintenance_ids):
+    """Uncount maintenance tasks about to be deleted."""
+    marks = ", ".join(["%s"] * len(maintenance_ids))
+    cursor.execute(
+        "SELECT location_id, scheduled_time, end_time, active_chemical "
+        f"FROM Maintenance WHERE maintenance_id IN ({marks}) FOR UPDATE",
+        tuple(maintenance_ids),
+    )
+    for task in cursor.fetchall():
+        apply_task(cursor, task, -1)
+
+
+def load_activity(cursor, activity_id):
+    """Lock and return a live activity with its participant count, or None."""
+    cursor.execute(
+        ACTIVITY_SQL + f" WHERE a.activity_id = %s AND {ACTIVITY_LIVE} FOR UPDATE",
+        (activity_id,),
+    )
+    return cursor.fetchone()
+
+
+def lock_location(cursor, location_id):
+    """Serialize bookings of a location; return its capacity (None if unset)."""
+    cursor.execute(
+        "SELECT capacity FROM Location WHERE location_id = %s FOR UPDATE",
+        (location_id,),
+    )
+    row = cursor.fetchone()
+    return row["capacity"] if row else None
+
+
+def occupancy(cursor, location_id, start, end):
+    """Return the non-empty buckets of a location overlapping ``[start, end)``.
+
+    Long-running tasks are added to the buckets of the window they overlap.
+    """
+    cursor.execute(
+        "SELECT bucket_start, activity_count, participant_count, "
+        "maintenance_count, chemical_count FROM LocationOccupancy "
+        "WHERE location_id = %s AND bucket_start >= %s AND bucket_start < %s "
+        "ORDER BY bucket_start",
+        (location_id, bucket_floor(start), end),
+    )
+    rows = {row["bucket_start"]: row for row in cursor.fetchall()}
+    cursor.execute(LONG_TASKS_SQL, (location_id, end, start))
+    for task in cursor.fetchall():
+        overlap = max(task["scheduled_time"], start), min(task["end_time"], end)
+        for bucket in buckets(*overlap):
+            row = rows.setdefault(
+                bucket, {"bucket_start": bucket, **dict.fromkeys(COUNTERS, 0)}
+            )
+            row["maintenance_count"] += 1
+            if task["active_chemical"]:
+                row["chemical_count"] += 1
+    return [rows[bucket] for bucket in sorted(rows)]
+
+
+def check_booking(cursor, location_id, start, end):
+    """Raise OccupancyConflict if another activity or a chemical cleaning
+    occupies any bucket of ``[start, end)`` at ``location_id``.
+
+    The caller must already hold the location lock (``lock_location``) and,
+    when moving an activity, have uncounted its old interval.
+    """
+    busy = [
+        row
+        for row in occupancy(cursor, location_id, start, end)
+        if row["activity_count"] or row["chemical_count"]
+    ]
+    if busy:
+        raise OccupancyConflict("Location is already booked for this time", busy)
+
+
+def check_capacity(cursor, activity, capacity, extra=1):
+    """Raise OccupancyConflict if ``extra`` more participants of ``activity``
+    would exceed the location's ``capacity`` in any of its buckets."""
+    interval = activity_interval(activity)
+    if capacity is None or not interval:
+        return
+    full = [
+        row
+        for row in occupancy(cursor, activity["location_id"], *interval)
+        if row["participant_count"] + extra > capacity
+    ]
+    if full:
+        raise OccupancyConflict(f"Location is full (Capacity: {capacity})", full)
+
+
+def rebuild(cursor):
+    """Recompute ``LocationOccupancy`` from activities and maintenance."""
+    totals = {}
+
+    def add(location_id, interval, **deltas):
+        for bucket in buckets(*interval):
+            counts = totals.setdefault(
+                (location_id, bucket), dict.fromkeys(COUNTERS, 0)
+            )
+            for name, amount in deltas.items():
+                counts[name] += amount
+
+    cursor.execute(ACTIVITY_SQL + f" WHERE {ACTIVITY_LIVE}")
+    for activity in map(_as_dict(ACTIVITY_COLUMNS), cursor.fetchall()):
+        interval = activity_interval(activity)
+        if interval:
+            add(
+                activity["location_id"],
+                interval,
+                activity_count=1,
+                participant_count=activity["participants"],
+            )
+    cursor.execute(MAINTENANCE_SQL)
+    for task in map(_as_dict(MAINTENANCE_COLUMNS), cursor.fetchall()):
+        interval = maintenance_interval(task)
+        if interval:
+            add(
+                task["location_id"],
+                interval,
+                maintenance_count=1,
+                chemical_count=1 if task["active_chemical"] else 0,
+            )
+
+    cursor.execute("DELETE FROM LocationOccupancy")
+    if totals:
+        cursor.executemany(
+            f"INSERT INTO LocationOccupancy (location_id, bucket_start, "
+            f"{', '.join(COUNTERS)}) VALUES (%s, %s{', %s' * len(COUNTERS)})",
+            [
+                (location_id, bucket, *(counts[c] for c in COUNTERS))
+                for (location_id, bucket), counts in sorted(totals.items())
+            ],
+        )
+
+
+def _as_dict(columns):
+    # rebuild also runs on plain (tuple) cursors at startup and in seeding.
+    def convert(row):
+        return row if isinstance(row, dict) else dict(zip(columns, row))
+
+    return convert
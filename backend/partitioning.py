@@ -0,0 +1,322 @@
+"""Optional monthly partitioning of the Maintenance and Activity history.
+
+Usage (from ``backend/``)::
+
+    python partitioning.py status  [TABLE]
+    python partitioning.py enable  TABLE [--ahead MONTHS]
+    python partitioning.py extend  [TABLE] [--ahead MONTHS]
+    python partitioning.py archive TABLE --before YYYY-MM
+
+``enable`` converts a table to ``PARTITION BY RANGE COLUMNS`` on its time
+column with one partition per month (``p202401`` holds January 2024) and a
+catch-all ``pmax``. A query with a range on the bare column, such as
+``m.scheduled_time >= %s AND m.scheduled_time < %s``, then only reads the
+partitions of its window; wrapping the column in a function (``DATE(...)``,
+``YEAR(...)``) reads all of them. ``extend`` splits months off ``pmax`` so
+new rows keep landing in monthly partitions; run it from cron, e.g. monthly.
+
+``archive`` moves every month before ``--before`` out of the table with
+``ALTER TABLE ... EXCHANGE PARTITION``, which swaps the partition with an
+empty table instead of copying rows: the month ends up in
+``MaintenanceArchive_p202301`` (or ``ActivityArchive_...``), and the empty
+partition is dropped. Participation rows of archived activities are moved
+to ``ParticipationArchive_...`` alongside; ChemicalHazard rows of archived
+tasks are deleted (they are derived, see hazards.py). Archive tables can be
+dumped to a file with ``mysqldump`` and dropped.
+
+MySQL limits that shape the layout:
+
+- Partitioned InnoDB tables can neither have foreign keys nor be referenced
+  by one. ``enable`` drops the constraints of the table and those pointing
+  at it. The API resolves these references itself (cascade.py), but rows
+  written with raw SQL are no longer checked.
+- Every unique key must contain the partitioning column, so the primary key
+  becomes ``(id, time)`` and the time column ``NOT NULL``: tasks and
+  activities must be scheduled. ``maintenance_id`` stays unique through
+  AUTO_INCREMENT; ``activity_id`` is chosen by clients and is no longer
+  guaranteed unique by the database.
+- DDL commits implicitly, so ``archive`` is not atomic. Run it while no
+  writes are expected; rerunning it finishes an interrupted month.
+
+Undoing the layout means ``ALTER TABLE ... REMOVE PARTITIONING`` and
+re-adding the primary and foreign keys from schema.sql.
+"""
+
+import argparse
+from datetime import date
+
+import mysql.connector
+from db import get_db_connection
+
+MAX_PARTITION = "pmax"
+
+DEFAULT_AHEAD_MONTHS = 3
+
+
+class PartitionError(Exception):
+    """Raised when a table cannot be (re)partitioned as requested."""
+
+
+class Layout:
+    """How one table is partitioned and what to do with its dependents.
+
+    ``children`` are ``(table, column, action)`` with ``action`` ``move``
+    (to an archive table) or ``delete``.
+    """
+
+    def __init__(self, table, key, time_column, time_definition, children=()):
+        self.table = table
+        self.key = key
+        self.time_column = time_column
+        self.time_definition = time_definition
+        self.children = tuple(children)
+
+
+LAYOUTS = {
+    "Maintenance": Layout(
+        "Maintenance",
+        "maintenance_id",
+        "scheduled_time",
+        "DATETIME NOT NULL",
+        children=[("ChemicalHazard", "maintenance_id", "delete")],
+    ),
+    "Activity": Layout(
+        "Activity",
+        "activity_id",
+        "time",
+        "DATETIME NOT NULL",
+        children=[("Participation", "activity_id", "move")],
+    ),
+}
+
+
+def partition_name(month):
+    return f"p{month.year}{month.month:02d}"
+
+
+def next_month(month):
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def months(first, last):
+    """Return the first days of the months from ``first`` to ``last``."""
+    current = date(first.year, first.month, 1)
+    result = []
+    while current <= last:
+        result.append(current)
+        current = next_month(current)
+    return result
+
+
+def add_months(month, count):
+    for _ in range(count):
+        month = next_month(month)
+    return month
+
+
+def partition_definitions(month_starts):
+    """``PARTITION pYYYYMM VALUES LESS THAN ('<next month>')`` clauses."""
+    return [
+        f"PARTITION {partition_name(m)} VALUES LESS THAN ('{next_month(m)}')"
+        for m in month_starts
+    ] + [f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)"]
+
+
+def partitions(cursor, table):
+    """Return ``[{name, rows}]`` of ``table`` in order; empty if unpartitioned."""
+    cursor.execute(
+        "SELECT PARTITION_NAME AS name, TABLE_ROWS AS `rows` "
+        "FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+        "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION",
+        (table,),
+    )
+    return cursor.fetchall()
+
+
+def partition_month(name):
+    """Return the month a ``pYYYYMM`` partition holds, or None for ``pmax``."""
+    if name == MAX_PARTITION:
+        return None
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+
+def foreign_keys(cursor, table):
+    """Return ``(table, constraint)`` of the foreign keys on or into ``table``."""
+    cursor.execute(
+        "SELECT DISTINCT TABLE_NAME AS table_name, CONSTRAINT_NAME AS name "
+        "FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL "
+        "AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)",
+        (table, table),
+    )
+    return [(row["table_name"], row["name"]) for row in cursor.fetchall()]
+
+
+def enable(cursor, table, ahead=DEFAULT_AHEAD_MONTHS, today=None):
+    """Partition ``table`` by month, from its oldest row to ``ahead`` months
+    from now. Returns the partition names."""
+    layout = LAYOUTS[table]
+    if partitions(cursor, table):
+        raise PartitionError(f"{table} is already partitioned")
+    cursor.execute(
+        f"SELECT COUNT(*) AS unscheduled FROM {table} "
+        f"WHERE {layout.time_column} IS NULL"
+    )
+    unscheduled = cursor.fetchone()["unscheduled"]
+    if unscheduled:
+        raise PartitionError(
+            f"{unscheduled} {table} rows have no {layout.time_column}; "
+            "set or delete them first"
+        )
+    cursor.execute(f"SELECT MIN({layout.time_column}) AS first FROM {table}")
+    today = today or date.today()
+    first = cursor.fetchone()["first"] or today
+    month_starts = months(first, add_months(today, ahead))
+
+    for owner, constraint in foreign_keys(cursor, table):
+        cursor.execute(f"ALTER TABLE {owner} DROP FOREIGN KEY {constraint}")
+    cursor.execute(
+        f"ALTER TABLE {table} "
+        f"MODIFY {layout.time_column} {layout.time_definition}, "
+        f"DROP PRIMARY KEY, ADD PRIMARY KEY ({layout.key}, {layout.time_column})"
+    )
+    cursor.execute(
+        f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS ({layout.time_column}) "
+        f"({', '.join(partition_definitions(month_starts))})"
+    )
+    return [partition_name(m) for m in month_starts] + [MAX_PARTITION]
+
+
+def extend(cursor, table, ahead=DEFAULT_AHEAD_MONTHS, today=None):
+    """Split the months up to ``ahead`` months from now off ``pmax``.
+
+    Returns the partitions added.
+    """
+    existing = [partition_month(p["name"]) for p in partitions(cursor, table)]
+    if not existing:
+        raise PartitionError(f"{table} is not partitioned")
+    monthly = [m for m in existing if m]
+    today = today or date.today()
+    start = next_month(monthly[-1]) if monthly else date(today.year, today.month, 1)
+    month_starts = months(start, add_months(today, ahead))
+    if not month_starts:
+        return []
+    cursor.execute(
+        f"ALTER TABLE {table} REORGANIZE PARTITION {MAX_PARTITION} INTO "
+        f"({', '.join(partition_definitions(month_starts))})"
+    )
+    return [partition_name(m) for m in month_starts]
+
+
+def archive_table(table, partition):
+    return f"{table}Archive_{partition}"
+
+
+def archive(cursor, table, before):
+    """Move every month before ``before`` (a date) into archive tables.
+
+    Returns the archived partition names.
+    """
+    layout = LAYOUTS[table]
+    names = [
+        p["name"]
+        for p in partitions(cursor, table)
+        if p["name"] != MAX_PARTITION and partition_month(p["name"]) < before
+    ]
+    for name in names:
+        target = archive_table(table, name)
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {target} LIKE {table}")
+        if partitions(cursor, target):
+            cursor.execute(f"ALTER TABLE {target} REMOVE PARTITIONING")
+        cursor.execute(f"SELECT 1 FROM {target} LIMIT 1")
+        if cursor.fetchall():
+            # Left over from an interrupted run: exchanging would swap the
+            # archived rows back, so copy what the partition holds instead.
+            cursor.execute(
+                f"INSERT IGNORE INTO {target} SELECT * FROM {table} PARTITION ({name})"
+            )
+        else:
+            cursor.execute(
+                f"ALTER TABLE {table} EXCHANGE PARTITION {name} WITH TABLE {target}"
+            )
+        for child, column, action in layout.children:
+            join = f"JOIN {target} a ON c.{column} = a.{layout.key}"
+            if action == "move":
+                child_target = archive_table(child, name)
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {child_target} LIKE {child}"
+                )
+                cursor.execute(
+                    f"INSERT IGNORE INTO {child_target} SELECT c.* FROM {child} c {join}"
+                )
+            cursor.execute(f"DELETE c FROM {child} c {join}")
+        # Implicitly commits the moves above.
+        cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
+    return names
+
+
+def status(cursor, table):
+    parts = partitions(cursor, table)
+    if not parts:
+        print(f"{table}: not partitioned")
+        return
+    print(f"{table}: {len(parts)} partitions")
+    for part in parts:
+        print(f"  {part['name']:<10} ~{part['rows']} rows")
+
+
+def parse_month(value):
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected YYYY-MM") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["status", "enable", "extend", "archive"])
+    parser.add_argument("table", nargs="?", choices=list(LAYOUTS))
+    parser.add_argument("--ahead", type=int, default=DEFAULT_AHEAD_MONTHS)
+    parser.add_argument("--before", type=parse_month)
+    args = parser.parse_args(argv)
+    if args.command in ("enable", "archive") and not args.table:
+        parser.error(f"{args.command} needs a table")
+    if args.command == "archive" and not args.before:
+        parser.error("archive needs --before YYYY-MM")
+
+    conn = get_db_connection()
+    if conn is None:
+        print("Failed to connect to database.")
+        return 1
+    cursor = conn.cursor(dictionary=True)
+    try:
+        for table in [args.table] if args.table else list(LAYOUTS):
+            if args.command == "status":
+                status(cursor, table)
+            elif args.command == "enable":
+                added = enable(cursor, table, args.ahead)
+                print(f"{table}: partitioned into {len(added)} partitions")
+            elif args.command == "extend":
+                if not partitions(cursor, table):
+                    continue
+                added = extend(cursor, table, args.ahead)
+                print(f"{table}: added {', '.join(added) or 'nothing'}")
+            else:
+                archived = archive(cursor, table, args.before)
+                print(f"{table}: archived {', '.join(archived) or 'nothing'}")
+        conn.commit()
+        return 0
+    except (PartitionError, mysql.connector.Error) as err:
+        print(f"Error: {err}")
+        return 1
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -42,6 +42,21 @@ POLYU_DARK_RED = colors.HexColor("#8C1526")
 POLYU_GRAY = colors.HexColor("#5D5D5D")
 POLYU_LIGHT_GRAY = colors.HexColor("#E8E8E8")
 
+# PolyU color palette for chart series
+CHART_COLORS = [
+    "#A6192E",
+    "#B08E55",
+    "#8C1526",
+    "#5D5D5D",
+    "#A0A0A0",
+    "#D4D4D4",
+    "#E8D4A0",
+    "#6B3A3A",
+]
+
+# Series drawn in a trend chart; the rest are summed into "Other".
+MAX_TREND_SERIES = 5
+
 
 class ReportGenerator:
     """Generates comprehensive PDF reports for PolyU CMMS."""
@@ -289,23 +304,11 @@ class ReportGenerator:
         labels = [str(item.get(label_key, ""))[:15] for item in data]
         values = [item.get(value_key, 0) for item in data]
 
-        # PolyU color palette
-        chart_colors = [
-            "#A6192E",
-            "#B08E55",
-            "#8C1526",
-            "#5D5D5D",
-            "#A0A0A0",
-            "#D4D4D4",
-            "#E8D4A0",
-            "#6B3A3A",
-        ]
-
         wedges, texts, autotexts = ax.pie(
             values,
             labels=labels,
             autopct="%1.1f%%",
-            colors=chart_colors[: len(values)],
+            colors=CHART_COLORS[: len(values)],
             startangle=90,
             pctdistance=0.75,
         )
@@ -332,6 +335,64 @@ class ReportGenerator:
 
         return Image(img_buffer, width=5 * inch, height=3.5 * inch)
 
+    def _create_trend_chart(self, trend, title, xlabel, ylabel):
+        """Generate a line chart of a maintenance trend (see reports.py),
+        one line per series plus "Other" for the smaller ones.
+
+        Returns an Image flowable or None if matplotlib unavailable.
+        """
+        if not MATPLOTLIB_AVAILABLE or not trend or not trend.get("buckets"):
+            return None
+
+        fig, ax = plt.subplots(figsize=(7, 3.5))
+
+        labels = trend["buckets"]
+        series = trend.get("series") or [{"name": "Total", "counts": trend["total"]}]
+        lines = [
+            (str(s["name"] or "Unspecified")[:20], s["counts"])
+            for s in series[:MAX_TREND_SERIES]
+        ]
+        if len(series) > MAX_TREND_SERIES:
+            other = [
+                sum(c) for c in zip(*(s["counts"] for s in series[MAX_TREND_SERIES:]))
+            ]
+            lines.append(("Other", other))
+
+        positions = range(len(labels))
+        for (name, counts), color in zip(lines, CHART_COLORS):
+            ax.plot(positions, counts, label=name, color=color, linewidth=1.5)
+
+        ax.set_xlabel(xlabel, fontsize=10, color="#5D5D5D")
+        ax.set_ylabel(ylabel, fontsize=10, color="#5D5D5D")
+        ax.set_title(title, fontsize=12, fontweight="bold", color="#A6192E")
+
+        # Label at most ~12 buckets
+        step = max(1, len(labels) // 12)
+        ax.set_xticks(list(positions)[::step])
+        ax.set_xticklabels(labels[::step], rotation=45, ha="right", fontsize=8)
+        if len(lines) > 1:
+            ax.legend(fontsize=8, frameon=False)
+
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+        ax.tick_params(colors="#5D5D5D")
+
+        plt.tight_layout()
+
+        img_buffer = io.BytesIO()
+        plt.savefig(
+            img_buffer,
+            format="png",
+            dpi=150,
+            bbox_inches="tight",
+            facecolor="white",
+            edgecolor="none",
+        )
+        plt.close(fig)
+        img_buffer.seek(0)
+
+        return Image(img_buffer, width=6.5 * inch, height=3 * inch)
+
     def _create_footer(self, canvas, doc):
         """Add footer to each page."""
         canvas.saveState()
@@ -479,6 +540,18 @@ class ReportGenerator:
                 self._create_data_table(headers, rows, "Maintenance Summary Table")
             )
 
+        # Trend chart
+        trend = report_data.get("maintenance_trend") or {}
+        chart = self._create_trend_chart(
+            trend,
+            f"Maintenance Tasks per {trend.get('bucket', 'week').title()}",
+            "Period",
+            "Task Count",
+        )
+        if chart:
+            elements.append(chart)
+            elements.append(Spacer(1, 20))
+
         return elements
 
     def _build_personnel_section(self, report_data):
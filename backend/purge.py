@@ -0,0 +1,192 @@
+"""Soft-deleted persons and activities, and the worker that removes them.
+
+``DELETE /api/persons/<id>`` and ``DELETE /api/activities/<id>`` only set
+``deleted_at`` on the row (and on the activities a person organises), so
+they never lock Participation, Affiliation or Profile rows that other
+writes are using. Every read path skips rows with ``deleted_at`` set. The
+quota slots and occupancy a row holds are released in the same
+transaction, so a deleted activity frees its room and a deleted person
+their profile slots at once. The rows and their dependents are physically
+removed later by ``PurgeWorker``, a small batch per transaction, through
+the same plans as a hard delete (see cascade.py); the release functions
+skip rows that are already deleted, so nothing is released twice.
+
+The worker purges while the process is idle: no API request for
+``idle_seconds``. So that a busy server still purges eventually, a run of
+at least one batch is forced once ``max_defer_seconds`` passed since the
+last run.
+"""
+
+import logging
+import threading
+import time
+
+from occupancy import release_activities, release_people
+from quotas import release_slots
+
+logger = logging.getLogger(__name__)
+
+# Purge order: a purged person takes the activities they organise along.
+ENTITIES = {
+    "persons": ("Person", "personal_id"),
+    "activities": ("Activity", "activity_id"),
+}
+
+SOFT_DELETE_SQL = (
+    "UPDATE {table} SET deleted_at = CURRENT_TIMESTAMP "
+    "WHERE {key} = %s AND deleted_at IS NULL"
+)
+
+
+# What a live row holds that other writes are checked against.
+RELEASE = {
+    "persons": (release_people, release_slots),
+    "activities": (release_activities,),
+}
+
+
+def soft_delete(cursor, entity, id):
+    """Mark one row deleted; return False if it does not exist (any more).
+
+    Locks the row, releases its quota slots and occupancy, and marks the
+    activities a person organises deleted with them, all in the caller's
+    transaction.
+    """
+    table, key = ENTITIES[entity]
+    cursor.execute(
+        f"SELECT {key} FROM {table} WHERE {key} = %s AND deleted_at IS NULL "
+        "FOR UPDATE",
+        (id,),
+    )
+    if cursor.fetchone() is None:
+        return False
+    for release in RELEASE[entity]:
+        release(cursor, [id])
+    if entity == "persons":
+        cursor.execute(
+            SOFT_DELETE_SQL.format(table="Activity", key="organiser_id"), (id,)
+        )
+    cursor.execute(SOFT_DELETE_SQL.format(table=table, key=key), (id,))
+    return True
+
+
+def is_deleted(cursor, entity, id):
+    """Return True if ``id`` exists but is soft-deleted.
+
+    Writes that reference a person or activity check this first. The shared
+    lock waits for a concurrent soft delete, so no new profile or
+    participation can be counted for a row whose slots were just released.
+    """
+    table, key = ENTITIES[entity]
+    cursor.execute(
+        f"SELECT deleted_at FROM {table} WHERE {key} = %s LOCK IN SHARE MODE",
+        (id,),
+    )
+    row = cursor.fetchone()
+    return bool(row) and row["deleted_at"] is not None
+
+
+def tombstones(cursor, entity, limit, grace_seconds=0):
+    """Lock and return up to ``limit`` ids deleted at least ``grace_seconds``
+    ago, oldest first.
+
+    The range on ``deleted_at`` is read from its index, which live rows
+    (NULL) do not reach.
+    """
+    table, key = ENTITIES[entity]
+    cursor.execute(
+        f"SELECT {key} AS id FROM {table} "
+        "WHERE deleted_at <= CURRENT_TIMESTAMP - INTERVAL %s SECOND "
+        "ORDER BY deleted_at LIMIT %s FOR UPDATE",
+        (grace_seconds, limit),
+    )
+    return [row["id"] for row in cursor.fetchall()]
+
+
+class PurgeWorker:
+    """Background thread calling ``purge_batch()`` while the server is idle.
+
+    ``purge_batch`` removes one batch in its own transaction and returns
+    the number of rows it purged (0 when nothing is left). Other idle-time
+    jobs (e.g. the maintenance archive) reuse the worker with their own
+    thread ``name`` and ``done_message``, formatted with ``count``.
+    """
+
+    def __init__(
+        self,
+        purge_batch,
+        interval,
+        idle_seconds,
+        pause=1.0,
+        max_defer_seconds=3600,
+        name="purge-worker",
+        done_message="Purged {count} soft-deleted rows",
+    ):
+        self._purge_batch = purge_batch
+        self.name = name
+        self.done_message = done_message
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.pause = pause
+        self.max_defer_seconds = max_defer_seconds
+        self.last_request = 0.0
+        self.last_run = time.monotonic()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def touch(self):
+        """Record API activity; postpones purging for ``idle_seconds``."""
+        self.last_request = time.monotonic()
+
+    def idle(self):
+        return time.monotonic() - self.last_request >= self.idle_seconds
+
+    def due(self):
+        return self.idle() or time.monotonic() - self.last_run >= self.max_defer_seconds
+
+    def run_once(self):
+        """Purge batches until none is left or a request arrives.
+
+        Always runs at least one batch; returns the number of rows purged.
+        """
+        total = 0
+        while not self._stop.is_set():
+            purged = self._purge_batch()
+            total += purged
+            if not purged or not self.idle():
+                break
+            self._stop.wait(self.pause)
+        self.last_run = time.monotonic()
+        return total
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if not self.due():
+                continue
+            try:
+                purged = self.run_once()
+            except Exception as exc:  # Keep the worker alive on DB errors
+                logger.warning(f"{self.name} failed: {exc}")
+                continue
+            if purged:
+                logger.info(self.done_message.format(count=purged))
+
+    def start(self):
+        """Start the thread unless disabled or already running; safe to call
+        on every request."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._loop, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
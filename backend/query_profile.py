@@ -0,0 +1,170 @@
+"""Query profiling for the Dev Console.
+
+``profile_select`` runs a SELECT the same way ``/api/query`` does and also
+collects what an operator needs to tune it against the real schema:
+
+- the optimizer plan, either ``EXPLAIN FORMAT=JSON`` (``mode="explain"``,
+  the estimated plan) or ``EXPLAIN ANALYZE`` (``mode="analyze"``, MySQL
+  8.0.18+, which executes the query again and reports actual row counts and
+  timings per iterator);
+- client-side elapsed time and, when ``performance_schema`` is available,
+  the server-side execution time, rows examined and scan/sort/temp-table
+  flags of the statement from ``events_statements_history``;
+- the deltas of the session ``Handler_%``, ``Select_%``, ``Sort_%`` and
+  ``Created_tmp_%`` status counters around the query.
+
+The counters are session-scoped, so they are not disturbed by other
+clients, but they do include the small constant overhead of the profiling
+statements themselves. Missing ``performance_schema`` (or the privilege to
+read it) is tolerated: the statement fields are then ``None``.
+
+Like ``/api/query``, at most ``max_rows + 1`` rows are read. A truncated
+result leaves rows unread on the connection, which then cannot run another
+statement without draining them, so the statement metrics and counter
+deltas are ``None`` and the plan is taken on a second connection.
+"""
+
+import json
+import logging
+import time
+
+import mysql.connector
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("explain", "analyze")
+
+STATUS_QUERY = (
+    "SHOW SESSION STATUS WHERE Variable_name LIKE 'Handler\\_%' "
+    "OR Variable_name LIKE 'Select\\_%' OR Variable_name LIKE 'Sort\\_%' "
+    "OR Variable_name LIKE 'Created\\_tmp\\_%'"
+)
+
+# The profiled statement is the last one this thread completed, because the
+# history lookup itself is still in events_statements_current while it runs.
+LAST_STATEMENT_QUERY = (
+    "SELECT TIMER_WAIT, LOCK_TIME, ROWS_EXAMINED, ROWS_SENT, SELECT_SCAN, "
+    "SELECT_FULL_JOIN, SORT_ROWS, CREATED_TMP_TABLES, CREATED_TMP_DISK_TABLES, "
+    "NO_INDEX_USED, NO_GOOD_INDEX_USED "
+    "FROM performance_schema.events_statements_history "
+    "WHERE THREAD_ID = PS_CURRENT_THREAD_ID() "
+    "ORDER BY EVENT_ID DESC LIMIT 1"
+)
+
+PICOSECONDS_PER_MS = 1_000_000_000
+
+
+def session_status(cursor):
+    """Return the profiled session status counters as ``{name: int}``."""
+    cursor.execute(STATUS_QUERY)
+    counters = {}
+    for row in cursor.fetchall():
+        try:
+            counters[row["Variable_name"]] = int(row["Value"])
+        except (TypeError, ValueError):
+            continue
+    return counters
+
+
+def status_deltas(before, after):
+    """Return the non-zero counter changes between two snapshots."""
+    deltas = {}
+    for name, value in after.items():
+        delta = value - before.get(name, 0)
+        if delta:
+            deltas[name] = delta
+    return dict(sorted(deltas.items()))
+
+
+def last_statement(cursor):
+    """Return performance_schema metrics for the previous statement, or None."""
+    try:
+        cursor.execute(LAST_STATEMENT_QUERY)
+        row = cursor.fetchone()
+    except mysql.connector.Error as exc:
+        logger.info(f"Statement metrics unavailable: {exc}")
+        return None
+    if not row:
+        return None
+
+    metrics = {key.lower(): int(value or 0) for key, value in row.items()}
+    timer_wait = metrics.pop("timer_wait")
+    lock_time = metrics.pop("lock_time")
+    metrics["server_ms"] = round(timer_wait / PICOSECONDS_PER_MS, 3)
+    metrics["lock_ms"] = round(lock_time / PICOSECONDS_PER_MS, 3)
+    return metrics
+
+
+def explain(cursor, query, mode):
+    """Return the plan for ``query``: parsed JSON or the ANALYZE tree text."""
+    if mode == "analyze":
+        cursor.execute(f"EXPLAIN ANALYZE {query}")
+    else:
+        cursor.execute(f"EXPLAIN FORMAT=JSON {query}")
+    row = cursor.fetchone()
+    plan = next(iter(row.values())) if row else None
+    if mode == "explain" and isinstance(plan, str):
+        return json.loads(plan)
+    return plan
+
+
+def profile_select(cursor, query, mode, limit_session, max_rows, reconnect):
+    """Execute a SELECT and return ``(rows, profile)``.
+
+    ``cursor`` must be an unbuffered dictionary cursor. ``limit_session(cursor)``
+    applies the Dev Console row and time limits; it is called before the
+    profiled query and again before the plan is taken, because the status
+    snapshot in between has to run without the row cap.
+
+    At most ``max_rows + 1`` rows are returned. If there are more, rows are
+    left unread and the caller must discard the connection; the plan is then
+    taken on ``reconnect()`` (a new connection, or None), which is closed.
+    """
+    before = session_status(cursor)
+    limit_session(cursor)
+    started = time.perf_counter()
+    cursor.execute(query)
+    rows = cursor.fetchmany(max_rows + 1)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    if len(rows) > max_rows:
+        profile = {
+            "mode": mode,
+            "plan": _fresh_plan(reconnect, query, mode, limit_session),
+            "elapsed_ms": elapsed_ms,
+            "statement": None,
+            "status": None,
+        }
+        return rows, profile
+    statement = last_statement(cursor)
+
+    cursor.execute("SET SESSION sql_select_limit = DEFAULT")
+    status = status_deltas(before, session_status(cursor))
+
+    # Taken last so EXPLAIN ANALYZE's own execution stays out of the deltas.
+    limit_session(cursor)
+    plan = explain(cursor, query, mode)
+
+    profile = {
+        "mode": mode,
+        "plan": plan,
+        "elapsed_ms": elapsed_ms,
+        "statement": statement,
+        "status": status,
+    }
+    return rows, profile
+
+
+def _fresh_plan(reconnect, query, mode, limit_session):
+    conn = reconnect()
+    if conn is None:
+        return None
+    cursor = conn.cursor(dictionary=True)
+    try:
+        limit_session(cursor)
+        return explain(cursor, query, mode)
+    except mysql.connector.Error as exc:
+        logger.info(f"Plan unavailable: {exc}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,102 @@
+"""Per-role limits on the number of current profiles.
+
+``RoleQuota`` holds one row per limited job role with its ``max_current``
+limit (NULL means unlimited but still counted) and ``current_count``, the
+number of Profile rows with that role and status ``Current`` whose person
+is not soft-deleted. Roles without a row are not limited.
+
+A slot is reserved with a single conditional ``UPDATE`` that only increments
+the counter while it is below the limit. The UPDATE takes a row lock on the
+role's quota row, so concurrent creates for the same role are serialized and
+cannot overshoot the limit, and no ``COUNT(*)`` over Profile is needed. The
+reservation is part of the caller's transaction and is undone by its
+rollback.
+"""
+
+CURRENT_STATUS = "Current"
+PERSON_LIVE = "per.deleted_at IS NULL"
+
+
+class QuotaExceeded(Exception):
+    """Raised when a role has no free slots left."""
+
+    def __init__(self, job_role, limit):
+        super().__init__(f"Limit reached for {job_role} (Max: {limit})")
+        self.job_role = job_role
+        self.limit = limit
+
+
+def reserve_slot(cursor, job_role, status=CURRENT_STATUS):
+    """Count a new ``job_role`` profile, raising QuotaExceeded if it is full."""
+    if status != CURRENT_STATUS:
+        return
+    cursor.execute(
+        "UPDATE RoleQuota SET current_count = current_count + 1 "
+        "WHERE job_role = %s "
+        "AND (max_current IS NULL OR current_count < max_current)",
+        (job_role,),
+    )
+    if cursor.rowcount:
+        return
+    # Nothing updated: either the role is unlimited or its quota is full.
+    cursor.execute("SELECT max_current FROM RoleQuota WHERE job_role = %s", (job_role,))
+    row = cursor.fetchone()
+    if row is not None:
+        raise QuotaExceeded(job_role, _value(row, "max_current"))
+
+
+def release_slots(cursor, personal_ids):
+    """Give back the slots held by the current profiles of ``personal_ids``.
+
+    Must run before the Profile rows are deleted. Soft-deleted persons gave
+    their slots back already and are skipped.
+    """
+    marks = ", ".join(["%s"] * len(personal_ids))
+    cursor.execute(
+        "UPDATE RoleQuota q JOIN ("
+        "SELECT pr.job_role, COUNT(*) AS released FROM Profile pr "
+        "JOIN Person per ON per.personal_id = pr.personal_id "
+        f"WHERE pr.personal_id IN ({marks}) AND pr.status = %s "
+        f"AND {PERSON_LIVE} GROUP BY pr.job_role"
+        ") p ON p.job_role = q.job_role "
+        "SET q.current_count = q.current_count - p.released",
+        (*personal_ids, CURRENT_STATUS),
+    )
+
+
+def set_quota(cursor, job_role, max_current):
+    """Create or change the limit for ``job_role``.
+
+    A new quota row starts from a count of the role's current profiles; an
+    existing row keeps its maintained counter and only changes the limit.
+    Lowering a limit below the current count blocks new profiles until
+    enough are removed.
+    """
+    cursor.execute(
+        "INSERT INTO RoleQuota (job_role, max_current, current_count) "
+        "SELECT %s, %s, COUNT(*) FROM Profile pr "
+        "JOIN Person per ON per.personal_id = pr.personal_id "
+        f"WHERE pr.job_role = %s AND pr.status = %s AND {PERSON_LIVE} "
+        "ON DUPLICATE KEY UPDATE max_current = VALUES(max_current)",
+        (job_role, max_current, job_role, CURRENT_STATUS),
+    )
+
+
+def remove_quota(cursor, job_role):
+    """Stop limiting and counting ``job_role``."""
+    cursor.execute("DELETE FROM RoleQuota WHERE job_role = %s", (job_role,))
+
+
+def sync_counts(cursor):
+    """Recount every quota from Profile (after writes made outside the API)."""
+    cursor.execute(
+        "UPDATE RoleQuota q SET current_count = ("
+        "SELECT COUNT(*) FROM Profile pr "
+        "JOIN Person per ON per.personal_id = pr.personal_id "
+        f"WHERE pr.job_role = q.job_role AND pr.status = %s AND {PERSON_LIVE})",
+        (CURRENT_STATUS,),
+    )
+
+
+def _value(row, key):
+    return row[key] if isinstance(row, dict) else row[0]
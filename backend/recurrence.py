@@ -0,0 +1,179 @@
+"""Expansion of recurring maintenance into concrete occurrences.
+
+``Maintenance.frequency`` is free text. ``parse_frequency`` turns the values
+the UI offers ("Daily", "Weekly", "Monthly", "Yearly", "One-off") and common
+variants ("Every 2 weeks", "Fortnightly", "Quarterly", ...) into a ``Rule``;
+anything it does not recognise is treated as a one-off task.
+
+A task's ``scheduled_time``/``end_time`` is its first occurrence.
+``occurrences`` lazily yields the later ones that overlap a window, jumping
+straight to the first relevant occurrence instead of stepping from the
+anchor. ``OccurrenceIndex`` materializes the occurrences of many tasks over a
+horizon, sorted by start time, so any sub-range is answered with two
+binary searches.
+"""
+
+import bisect
+import calendar
+import re
+from datetime import timedelta
+
+# Used for tasks without an end_time (matches scheduling.DEFAULT_TASK_DURATION).
+DEFAULT_DURATION = timedelta(hours=1)
+
+_UNITS = {
+    "day": "day",
+    "daily": "day",
+    "week": "week",
+    "weekly": "week",
+    "month": "month",
+    "monthly": "month",
+    "year": "year",
+    "yearly": "year",
+    "annual": "year",
+    "annually": "year",
+}
+
+_ALIASES = {
+    "biweekly": ("week", 2),
+    "fortnightly": ("week", 2),
+    "bimonthly": ("month", 2),
+    "quarterly": ("month", 3),
+    "semiannually": ("month", 6),
+    "semi-annually": ("month", 6),
+    "biannually": ("month", 6),
+}
+
+_EVERY_PATTERN = re.compile(r"^every\s+(\d+)?\s*(day|week|month|year)s?$")
+
+
+class Rule:
+    """Repeat every ``interval`` ``unit``s (day, week, month or year)."""
+
+    def __init__(self, unit, interval=1):
+        if interval < 1:
+            raise ValueError("interval must be positive")
+        self.unit = unit
+        self.interval = interval
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and (self.unit, self.interval) == (
+            other.unit,
+            other.interval,
+        )
+
+    def __repr__(self):
+        return f"Rule({self.unit!r}, {self.interval})"
+
+    def nth(self, anchor, n):
+        """Return the start of occurrence ``n`` (0 is ``anchor`` itself).
+
+        Months and years are counted from the anchor, so a task on the 31st
+        falls on the last day of shorter months without drifting.
+        """
+        if self.unit == "day":
+            return anchor + timedelta(days=n * self.interval)
+        if self.unit == "week":
+            return anchor + timedelta(weeks=n * self.interval)
+        months = n * self.interval * (12 if self.unit == "year" else 1)
+        month_index = anchor.month - 1 + months
+        year = anchor.year + month_index // 12
+        month = month_index % 12 + 1
+        day = min(anchor.day, calendar.monthrange(year, month)[1])
+        return anchor.replace(year=year, month=month, day=day)
+
+    def index_before(self, anchor, moment):
+        """Return an occurrence number whose start is not after ``moment``."""
+        if moment <= anchor:
+            return 0
+        if self.unit in ("day", "week"):
+            step = timedelta(days=self.interval * (7 if self.unit == "week" else 1))
+            return (moment - anchor) // step
+        months = (moment.year - anchor.year) * 12 + moment.month - anchor.month
+        step = self.interval * (12 if self.unit == "year" else 1)
+        return max(months // step - 1, 0)
+
+
+def parse_frequency(text):
+    """Return the ``Rule`` for a frequency string, or None for one-off tasks."""
+    if not text:
+        return None
+    value = " ".join(str(text).strip().lower().split())
+    if value in _UNITS:
+        return Rule(_UNITS[value])
+    if value in _ALIASES:
+        return Rule(*_ALIASES[value])
+    match = _EVERY_PATTERN.match(value)
+    if match:
+        return Rule(match.group(2), int(match.group(1) or 1))
+    return None
+
+
+def occurrences(start, end, rule, window_start, window_end):
+    """Yield ``(start, end)`` of each occurrence overlapping the window.
+
+    ``start``/``end`` are the first occurrence; ``end`` may be None. The
+    window is half-open, ``[window_start, window_end)``.
+    """
+    duration = (end - start) if end and end > start else DEFAULT_DURATION
+    if rule is None:
+        if start < window_end and start + duration > window_start:
+            yield start, start + duration
+        return
+
+    n = rule.index_before(start, window_start - duration)
+    while True:
+        occurrence = rule.nth(start, n)
+        if occurrence >= window_end:
+            return
+        if occurrence + duration > window_start:
+            yield occurrence, occurrence + duration
+        n += 1
+
+
+class OccurrenceIndex:
+    """Occurrences of many tasks over ``[window_start, window_end)``.
+
+    ``tasks`` are dicts with ``scheduled_time``, ``end_time`` and
+    ``frequency``; tasks without a ``scheduled_time`` are skipped.
+    """
+
+    def __init__(self, tasks, window_start, window_end):
+        self.window_start = window_start
+        self.window_end = window_end
+        entries = []
+        for task in tasks:
+            if not task.get("scheduled_time"):
+                continue
+            rule = parse_frequency(task.get("frequency"))
+            for occurrence in occurrences(
+                task["scheduled_time"],
+                task.get("end_time"),
+                rule,
+                window_start,
+                window_end,
+            ):
+                entries.append((occurrence[0], occurrence[1], task))
+        entries.sort(key=lambda entry: entry[0])
+        self._starts = [entry[0] for entry in entries]
+        self._entries = entries
+        self._longest = max(
+            (entry[1] - entry[0] for entry in entries), default=timedelta(0)
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def covers(self, start, end):
+        """Return True if ``[start, end)`` lies inside the indexed window."""
+        return self.window_start <= start and end <= self.window_end
+
+    def between(self, start, end):
+        """Return ``(start, end, task)`` for occurrences overlapping the range.
+
+        Only occurrences starting after ``start`` minus the longest duration
+        can overlap, which bounds the binary-searched slice.
+        """
+        low = bisect.bisect_right(self._starts, start - self._longest)
+        high = bisect.bisect_left(self._starts, end)
+        return [entry for entry in self._entries[low:high] if entry[1] > start]
@@ -0,0 +1,378 @@
+"""Summary report queries and their filters.
+
+The maintenance, activity and manager reports accept::
+
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD&building=...&campus=...&department=...
+
+``from`` and ``to`` are inclusive days. Every filter is applied to the bare
+column (``m.scheduled_time >= %s AND m.scheduled_time < %s``,
+``l.building = %s``) so that MySQL can read a range of
+``idx_maintenance_scheduled`` / ``idx_activity_time`` or look locations up
+through ``idx_location_building``, and prune the months of a partitioned
+table (see partitioning.py), instead of evaluating an expression per row.
+A "last 30 days" dashboard therefore reads 30 days of rows.
+
+A query is a template with one placeholder per branch (``FROM ... WHERE``
+part) that can be filtered; ``REPORT_SCOPES`` names, for each placeholder,
+the columns the filters apply to in that branch. Branches without a
+Location join match building, campus and department with a subquery on
+the branch's location id, which MySQL resolves through the Location
+indexes and then ``idx_maintenance_location_time`` (location, time).
+
+``maintenance_trend`` counts tasks per day, week or month with one GROUP BY
+on the bucket's first day, over the same filters, and fills the buckets
+without tasks with 0.
+"""
+
+from datetime import date, timedelta
+
+FILTERS = ("from", "to", "building", "campus", "department")
+LOCATION_FILTERS = ("building", "campus", "department")
+
+# Trend buckets as the first day of the bucket a time falls into (weeks
+# start on Monday). They are only grouped on; rows are still selected by a
+# range on the bare column.
+TREND_BUCKETS = {
+    "day": "DATE({column})",
+    "week": "DATE_SUB(DATE({column}), INTERVAL WEEKDAY({column}) DAY)",
+    "month": "DATE_SUB(DATE({column}), INTERVAL DAYOFMONTH({column}) - 1 DAY)",
+}
+# Series a trend can be split into: (hot table column, rollup column).
+TREND_SPLITS = {
+    "type": ("m.type", "r.type"),
+    "building": ("l.building", "r.building"),
+    "campus": ("l.campus", "r.campus"),
+}
+DEFAULT_TREND_BUCKET = "week"
+DEFAULT_TREND_DAYS = 90
+MAX_TREND_BUCKETS = 400
+
+
+class ReportError(ValueError):
+    """Raised when report filters are invalid or not supported by a report."""
+
+
+class Scope:
+    """The columns one branch of a report query filters on.
+
+    ``time`` takes ``from``/``to``; ``building``, ``campus`` and
+    ``department`` are columns of the branch. Location filters without a
+    column are matched through ``location_id`` if given. Filters the scope
+    has no column for are left to the other scopes of the query.
+    """
+
+    def __init__(
+        self, time=None, building=None, campus=None, department=None, location_id=None
+    ):
+        self.time = time
+        self.columns = {
+            "building": building,
+            "campus": campus,
+            "department": department,
+        }
+        self.location_id = location_id
+
+    def conditions(self, filters):
+        """Return ``(predicates, params)`` for ``filters`` (see ``parse_filters``)."""
+        predicates, params = [], []
+        if self.time and "from" in filters:
+            predicates.append(f"{self.time} >= %s")
+            params.append(filters["from"])
+        if self.time and "to" in filters:
+            predicates.append(f"{self.time} < %s")
+            params.append(filters["to"])
+        lookups = []
+        for name in LOCATION_FILTERS:
+            if name not in filters:
+                continue
+            if self.columns[name]:
+                predicates.append(f"{self.columns[name]} = %s")
+                params.append(filters[name])
+            elif self.location_id:
+                lookups.append(name)
+        if lookups:
+            predicates.append(
+                f"{self.location_id} IN (SELECT location_id FROM Location WHERE "
+                + " AND ".join(f"{name} = %s" for name in lookups)
+                + ")"
+            )
+            params.extend(filters[name] for name in lookups)
+        return predicates, params
+
+
+# Hot and archived tasks, for report totals next to the summaries below.
+MAINTENANCE_TOTAL_SQL = """
+    SELECT (SELECT COUNT(*) FROM Maintenance)
+           + (SELECT CAST(COALESCE(SUM(task_count), 0) AS SIGNED)
+              FROM MaintenanceRollup) AS count
+"""
+
+# Report queries, shared by the report endpoints and the bulk export.
+# The maintenance reports add archived tasks from MaintenanceRollup (see
+# archive.py) to the counts from the hot table.
+REPORT_QUERIES = {
+    "maintenance-summary": """
+        SELECT type, building, campus, CAST(SUM(count) AS SIGNED) AS count
+        FROM (
+            SELECT m.type, l.building, l.campus, COUNT(*) AS count
+            FROM Maintenance m
+            JOIN Location l ON m.location_id = l.location_id
+            {maintenance}
+            GROUP BY m.type, l.building, l.campus
+            UNION ALL
+            SELECT NULLIF(r.type, ''), NULLIF(r.building, ''),
+                   NULLIF(r.campus, ''), SUM(r.task_count)
+            FROM MaintenanceRollup r
+            {rollup}
+            GROUP BY r.type, r.building, r.campus
+        ) t
+        GROUP BY type, building, campus
+        ORDER BY count DESC
+        """,
+    "people-summary": """
+        SELECT pr.job_role, pr.status, COUNT(*) AS count
+        FROM Profile pr
+        JOIN Person p ON pr.personal_id = p.personal_id
+        WHERE p.deleted_at IS NULL
+        GROUP BY pr.job_role, pr.status
+        ORDER BY pr.job_role, count DESC
+        """,
+    "activities-summary": """
+        SELECT a.type, p.name AS organiser_name, COUNT(*) AS activity_count
+        FROM Activity a
+        JOIN Person p ON a.organiser_id = p.personal_id
+        WHERE a.deleted_at IS NULL AND p.deleted_at IS NULL {activity}
+        GROUP BY a.type, p.name
+        ORDER BY activity_count DESC
+        """,
+    "school-stats": """
+        SELECT s.department, s.dept_name AS school_name, s.faculty,
+               COUNT(DISTINCT a.personal_id) AS affiliated_people,
+               COUNT(DISTINCT l.location_id) AS locations_count
+        FROM School s
+        LEFT JOIN Affiliation a ON s.department = a.department
+            AND a.personal_id IN (
+                SELECT personal_id FROM Person WHERE deleted_at IS NULL
+            )
+        LEFT JOIN Location l ON s.department = l.department
+        GROUP BY s.department, s.dept_name, s.faculty
+        """,
+    "maintenance-frequency": """
+        SELECT frequency, type, CAST(SUM(task_count) AS SIGNED) AS task_count
+        FROM (
+            SELECT m.frequency, m.type, COUNT(*) AS task_count
+            FROM Maintenance m
+            {maintenance}
+            GROUP BY m.frequency, m.type
+            UNION ALL
+            SELECT NULLIF(r.frequency, ''), NULLIF(r.type, ''), SUM(r.task_count)
+            FROM MaintenanceRollup r
+            {rollup}
+            GROUP BY r.frequency, r.type
+        ) t
+        GROUP BY frequency, type
+        ORDER BY frequency, task_count DESC
+        """,
+    "manager-buildings": """
+        SELECT
+            bs.personal_id,
+            p.name as manager_name,
+            bs.building,
+            bs.assigned_date,
+            COUNT(DISTINCT m.maintenance_id) as maintenance_count,
+            SUM(CASE WHEN m.active_chemical = 1 THEN 1 ELSE 0 END) as chemical_maintenance_count
+        FROM BuildingSupervision bs
+        JOIN Person p ON bs.personal_id = p.personal_id
+        LEFT JOIN Location l ON l.building = bs.building
+        LEFT JOIN Maintenance m ON m.location_id = l.location_id {maintenance}
+        WHERE p.deleted_at IS NULL {supervision}
+        GROUP BY bs.supervision_id, bs.personal_id, p.name, bs.building, bs.assigned_date
+        ORDER BY p.name, bs.building
+        """,
+}
+
+# Filterable branches of each report, in the order their placeholders
+# appear in the query. A placeholder is replaced by ``WHERE ...``, or by
+# ``AND ...`` if it is listed in ``JOIN_SCOPES`` (it extends an ON clause or
+# the WHERE that skips soft-deleted rows).
+REPORT_SCOPES = {
+    "maintenance-summary": {
+        "maintenance": Scope(
+            "m.scheduled_time", "l.building", "l.campus", "l.department"
+        ),
+        "rollup": Scope("r.day", "r.building", "r.campus", "r.department"),
+    },
+    "activities-summary": {
+        "activity": Scope("a.time", location_id="a.location_id"),
+    },
+    "maintenance-frequency": {
+        "maintenance": Scope("m.scheduled_time", location_id="m.location_id"),
+        "rollup": Scope("r.day", "r.building", "r.campus", "r.department"),
+    },
+    "manager-buildings": {
+        # Time only narrows what is counted, so managers stay listed.
+        "maintenance": Scope("m.scheduled_time"),
+        "supervision": Scope(
+            building="bs.building", campus="l.campus", department="l.department"
+        ),
+    },
+}
+
+JOIN_SCOPES = {
+    ("activities-summary", "activity"),
+    ("manager-buildings", "maintenance"),
+    ("manager-buildings", "supervision"),
+}
+
+# Maintenance per bucket and series, archived tasks included through the
+# rollups. Uses the filter scopes of maintenance-summary.
+TREND_QUERY = """
+    SELECT bucket, series, CAST(SUM(count) AS SIGNED) AS count
+    FROM (
+        SELECT {maintenance_bucket} AS bucket, {maintenance_series} AS series,
+               COUNT(*) AS count
+        FROM Maintenance m
+        JOIN Location l ON m.location_id = l.location_id
+        {maintenance}
+        GROUP BY 1, 2
+        UNION ALL
+        SELECT {rollup_bucket}, NULLIF({rollup_series}, ''), SUM(r.task_count)
+        FROM MaintenanceRollup r
+        {rollup}
+        GROUP BY 1, 2
+    ) t
+    GROUP BY bucket, series
+    ORDER BY bucket, series
+"""
+
+
+def parse_day(name, value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ReportError(f"Filter {name} expects a date (YYYY-MM-DD)") from None
+
+
+def parse_filters(args):
+    """Return the report filters in ``args`` as ``{name: value}``.
+
+    ``to`` is returned as the exclusive upper bound (the day after). Other
+    query parameters are ignored.
+    """
+    filters = {}
+    for name in FILTERS:
+        value = args.get(name)
+        if value is None or value == "":
+            continue
+        if name in ("from", "to"):
+            value = parse_day(name, value)
+            if name == "to":
+                value += timedelta(days=1)
+        filters[name] = value
+    return filters
+
+
+def scope_clauses(report, filters):
+    """Return the placeholder values of ``report``'s scopes and their params."""
+    parts, params = {}, []
+    for name, scope in REPORT_SCOPES.get(report, {}).items():
+        predicates, values = scope.conditions(filters)
+        joiner = "AND" if (report, name) in JOIN_SCOPES else "WHERE"
+        parts[name] = f"{joiner} {' AND '.join(predicates)}" if predicates else ""
+        params.extend(values)
+    return parts, tuple(params)
+
+
+def report_query(report, filters=None):
+    """Return ``(sql, params)`` of ``report`` restricted to ``filters``."""
+    if filters and report not in REPORT_SCOPES:
+        raise ReportError(f"Report {report} does not accept filters")
+    parts, params = scope_clauses(report, filters or {})
+    return REPORT_QUERIES[report].format(**parts), params
+
+
+def bucket_start(bucket, day):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(bucket, day):
+    if bucket == "week":
+        return day + timedelta(days=7)
+    if bucket == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def bucket_starts(bucket, start, end):
+    """Return the first days of the buckets overlapping ``[start, end)``."""
+    current, result = bucket_start(bucket, start), []
+    while current < end:
+        if len(result) == MAX_TREND_BUCKETS:
+            raise ReportError(
+                f"A trend covers at most {MAX_TREND_BUCKETS} buckets; "
+                "narrow from/to or use a larger bucket"
+            )
+        result.append(current)
+        current = next_bucket(bucket, current)
+    return result
+
+
+def trend_query(bucket, split, filters):
+    """Return ``(sql, params)`` counting maintenance per bucket and series."""
+    if bucket not in TREND_BUCKETS:
+        raise ReportError(f"bucket must be one of: {', '.join(TREND_BUCKETS)}")
+    if split is not None and split not in TREND_SPLITS:
+        raise ReportError(f"split must be one of: {', '.join(TREND_SPLITS)}")
+    hot_series, rollup_series = TREND_SPLITS[split] if split else ("NULL", "''")
+    parts, params = scope_clauses("maintenance-summary", filters)
+    sql = TREND_QUERY.format(
+        maintenance_bucket=TREND_BUCKETS[bucket].format(column="m.scheduled_time"),
+        maintenance_series=hot_series,
+        rollup_bucket=TREND_BUCKETS[bucket].format(column="r.day"),
+        rollup_series=rollup_series,
+        **parts,
+    )
+    return sql, params
+
+
+def maintenance_trend(cursor, bucket, split=None, filters=None, today=None):
+    """Count maintenance tasks per ``bucket`` (day, week or month), split by
+    ``split`` (type, building or campus) if given.
+
+    Without ``from``/``to`` the trend covers the last ``DEFAULT_TREND_DAYS``
+    days. Buckets without tasks are filled with 0, so every series has one
+    count per bucket. Series are ordered by their total, largest first.
+    """
+    filters = dict(filters or {})
+    filters.setdefault("to", (today or date.today()) + timedelta(days=1))
+    filters.setdefault("from", filters["to"] - timedelta(days=DEFAULT_TREND_DAYS))
+    sql, params = trend_query(bucket, split, filters)
+    buckets = bucket_starts(bucket, filters["from"], filters["to"])
+    cursor.execute(sql, params)
+
+    index = {day: i for i, day in enumerate(buckets)}
+    total = [0] * len(buckets)
+    series = {}
+    for row in cursor.fetchall():
+        i = index[date.fromisoformat(str(row["bucket"])[:10])]
+        counts = series.setdefault(row["series"], [0] * len(buckets))
+        counts[i] += row["count"]
+        total[i] += row["count"]
+    if not split:
+        series = {}
+    return {
+        "bucket": bucket,
+        "split": split,
+        "from": filters["from"].isoformat(),
+        "to": (filters["to"] - timedelta(days=1)).isoformat(),
+        "buckets": [day.isoformat() for day in buckets],
+        "series": [
+            {"name": name, "counts": counts}
+            for name, counts in sorted(series.items(), key=lambda s: -sum(s[1]))
+        ],
+        "total": total,
+    }
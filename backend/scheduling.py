@@ -0,0 +1,282 @@
+"""Detection of overlapping maintenance schedules.
+
+Two kinds of booking occupy a location for a time interval ``[start, end)``:
+
+- maintenance tasks (``scheduled_time`` to ``end_time``), and
+- activities (``time`` plus ``duration_minutes``).
+
+Two maintenance tasks conflict when they overlap in the same location (or
+building, for the building-wide report). A task conflicts with an activity
+only if it uses active chemicals.
+
+``find_conflicts`` is the batch report: bookings are grouped, sorted by
+start time and swept once while a min-heap of end times holds the bookings
+still in progress, so the cost is O(n log n + conflicts) instead of the
+O(n^2) of a pairwise self-join.
+
+``location_conflicts`` is the write-time check. Stored tasks may overlap
+each other (``allow_overlap``, seed data, Dev Console writes), so the check
+cannot stop at the latest earlier task. Tasks have no upper bound on their
+duration either, so ``Maintenance.long_running`` (a stored generated
+column) flags those lasting over ``LONG_TASK_DURATION``. The others can only
+overlap if they start within ``LONG_TASK_DURATION`` of the new task, a
+range bounded on both sides on ``idx_maintenance_location_long``; the few
+long ones are a second range on the same index. Activities last at most
+``MAX_ACTIVITY_DURATION``, so the ones that can overlap are a single range
+on ``idx_activity_location_time``.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+
+# Default and upper bound of Activity.duration_minutes.
+ACTIVITY_DURATION = timedelta(hours=1)
+MAX_ACTIVITY_DURATION = timedelta(hours=24)
+
+# Used for maintenance tasks scheduled without an end_time.
+DEFAULT_TASK_DURATION = timedelta(hours=1)
+
+# Tasks lasting longer are flagged by Maintenance.long_running; the
+# generated column in schema.sql uses the same bound.
+LONG_TASK_DURATION = timedelta(hours=24)
+
+SCOPES = ("location", "building")
+
+BOOKINGS_SQL = """
+    SELECT 'maintenance' AS kind, CAST(m.maintenance_id AS CHAR) AS id,
+           m.type, m.location_id, l.building, l.room,
+           m.scheduled_time AS start, m.end_time AS end,
+           m.active_chemical AS chemical
+    FROM Maintenance m
+    JOIN Location l ON m.location_id = l.location_id
+    WHERE m.scheduled_time IS NOT NULL {maintenance_where}
+    UNION ALL
+    SELECT 'activity', a.activity_id, a.type, a.location_id, l.building, l.room,
+           a.time, a.time + INTERVAL a.duration_minutes MINUTE, FALSE
+    FROM Activity a
+    JOIN Location l ON a.location_id = l.location_id
+    WHERE a.time IS NOT NULL AND a.deleted_at IS NULL {activity_where}
+"""
+
+
+class ScheduleError(ValueError):
+    """Raised for an invalid schedule (e.g. an end before the start)."""
+
+
+def parse_time(value, name):
+    """Parse an ISO date/datetime request value; empty values become None.
+
+    Stored times are naive local times, so a value with a UTC offset is
+    converted to local time and made naive. A trailing ``Z`` is dropped, as
+    before, rather than read as UTC.
+    """
+    if value in (None, ""):
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace("Z", ""))
+        except ValueError:
+            raise ScheduleError(f"{name} must be an ISO date or datetime") from None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def parse_duration(value):
+    """Parse an activity's ``duration_minutes``; empty values get the default."""
+    if value in (None, ""):
+        return int(ACTIVITY_DURATION.total_seconds() // 60)
+    try:
+        minutes = int(value)
+    except (TypeError, ValueError):
+        raise ScheduleError("duration_minutes must be a whole number") from None
+    limit = int(MAX_ACTIVITY_DURATION.total_seconds() // 60)
+    if not 0 < minutes <= limit:
+        raise ScheduleError(f"duration_minutes must be between 1 and {limit}")
+    return minutes
+
+
+def task_interval(start, end):
+    """Return the ``[start, end)`` a task occupies, validating the order."""
+    end = end or start + DEFAULT_TASK_DURATION
+    if end <= start:
+        raise ScheduleError("end_time must be after scheduled_time")
+    return start, end
+
+
+def load_bookings(cursor, building=None, start=None, end=None):
+    """Fetch the bookings to check, optionally limited to a building/window.
+
+    The window keeps every booking that may overlap ``[start, end)``, so
+    conflicts that straddle its edges are still reported.
+    """
+    maintenance_where, activity_where, params = [], [], []
+    if building:
+        maintenance_where.append("l.building = %s")
+        params.append(building)
+    if end:
+        maintenance_where.append("m.scheduled_time < %s")
+        params.append(end)
+    if start:
+        # Tasks without an end_time last DEFAULT_TASK_DURATION.
+        maintenance_where.append(
+            "COALESCE(m.end_time, m.scheduled_time + INTERVAL %s SECOND) > %s"
+        )
+        params.extend([int(DEFAULT_TASK_DURATION.total_seconds()), start])
+    if building:
+        activity_where.append("l.building = %s")
+        params.append(building)
+    if end:
+        activity_where.append("a.time < %s")
+        params.append(end)
+    if start:
+        activity_where.append("a.time > %s")
+        activity_where.append("a.time + INTERVAL a.duration_minutes MINUTE > %s")
+        params.extend([start - MAX_ACTIVITY_DURATION, start])
+
+    sql = BOOKINGS_SQL.format(
+        maintenance_where="".join(f" AND {p}" for p in maintenance_where),
+        activity_where="".join(f" AND {p}" for p in activity_where),
+    )
+    cursor.execute(sql, tuple(params))
+    return [_with_interval(row) for row in cursor.fetchall()]
+
+
+def _with_interval(row):
+    row = dict(row)
+    if row["kind"] == "activity":
+        row["end"] = row["end"] or row["start"] + ACTIVITY_DURATION
+    else:
+        row["end"] = row["end"] or row["start"] + DEFAULT_TASK_DURATION
+    row["chemical"] = bool(row["chemical"])
+    return row
+
+
+def is_conflict(a, b):
+    """Return True if two overlapping bookings may not share a place."""
+    if a["kind"] == "maintenance" and b["kind"] == "maintenance":
+        return True
+    if a["kind"] == "activity" and b["kind"] == "activity":
+        return False
+    task = a if a["kind"] == "maintenance" else b
+    return task["chemical"]
+
+
+def find_conflicts(bookings, scope="location"):
+    """Return the conflicting pairs among ``bookings`` in each ``scope``.
+
+    Each conflict is ``{scope: key, "overlap_start", "overlap_end", "first",
+    "second"}`` with ``first`` starting no later than ``second``.
+    """
+    key_name = "location_id" if scope == "location" else "building"
+    groups = {}
+    for booking in bookings:
+        groups.setdefault(booking[key_name], []).append(booking)
+
+    conflicts = []
+    for key, group in groups.items():
+        group.sort(key=lambda b: (b["start"], b["end"]))
+        active = []  # min-heap of (end, sequence, booking)
+        for sequence, booking in enumerate(group):
+            while active and active[0][0] <= booking["start"]:
+                heapq.heappop(active)
+            for end, _, other in active:
+                if is_conflict(other, booking):
+                    conflicts.append(
+                        {
+                            key_name: key,
+                            "overlap_start": booking["start"],
+                            "overlap_end": min(end, booking["end"]),
+                            "first": _summary(other),
+                            "second": _summary(booking),
+                        }
+                    )
+            heapq.heappush(active, (booking["end"], sequence, booking))
+
+    conflicts.sort(key=lambda c: (c["overlap_start"], str(c[key_name])))
+    return conflicts
+
+
+def _summary(booking):
+    return {
+        "kind": booking["kind"],
+        "id": booking["id"],
+        "type": booking["type"],
+        "location_id": booking["location_id"],
+        "building": booking["building"],
+        "room": booking["room"],
+        "start": booking["start"],
+        "end": booking["end"],
+        "active_chemical": booking["chemical"],
+    }
+
+
+def location_conflicts(cursor, location_id, start, end, chemical, exclude_id=None):
+    """Return the bookings that a task at ``location_id`` would conflict with.
+
+    The caller must hold the location lock (``occupancy.lock_location``) so
+    that concurrent checks for the same location run one after another.
+    """
+    task_end = "COALESCE(end_time, scheduled_time + INTERVAL %s SECOND)"
+    default_seconds = int(DEFAULT_TASK_DURATION.total_seconds())
+    exclude = exclude_id if exclude_id is not None else -1
+    cursor.execute(
+        f"SELECT maintenance_id, type, scheduled_time, {task_end} AS end_time "
+        "FROM Maintenance "
+        "WHERE location_id = %s AND long_running = FALSE "
+        f"AND scheduled_time >= %s AND scheduled_time < %s AND {task_end} > %s "
+        "AND maintenance_id <> %s "
+        "UNION ALL "
+        f"SELECT maintenance_id, type, scheduled_time, {task_end} AS end_time "
+        "FROM Maintenance "
+        "WHERE location_id = %s AND long_running = TRUE "
+        f"AND scheduled_time < %s AND {task_end} > %s "
+        "AND maintenance_id <> %s "
+        "ORDER BY scheduled_time, maintenance_id",
+        (
+            default_seconds,
+            location_id,
+            start - LONG_TASK_DURATION,
+            end,
+            default_seconds,
+            start,
+            exclude,
+            default_seconds,
+            location_id,
+            end,
+            default_seconds,
+            start,
+            exclude,
+        ),
+    )
+    conflicts = [
+        {
+            "kind": "maintenance",
+            "id": str(row["maintenance_id"]),
+            "type": row["type"],
+            "start": row["scheduled_time"],
+            "end": row["end_time"],
+        }
+        for row in cursor.fetchall()
+    ]
+
+    if chemical:
+        cursor.execute(
+            "SELECT activity_id, type, time, "
+            "time + INTERVAL duration_minutes MINUTE AS end_time FROM Activity "
+            "WHERE location_id = %s AND time > %s AND time < %s "
+            "AND time + INTERVAL duration_minutes MINUTE > %s "
+            "AND deleted_at IS NULL ORDER BY time",
+            (location_id, start - MAX_ACTIVITY_DURATION, end, start),
+        )
+        for row in cursor.fetchall():
+            conflicts.append(
+                {
+                    "kind": "activity",
+                    "id": row["activity_id"],
+                    "type": row["type"],
+                    "start": row["time"],
+                    "end": row["end_time"],
+                }
+            )
+    return conflicts
@@ -2,6 +2,22 @@
 SET
     FOREIGN_KEY_CHECKS = 0;
 
+DROP TABLE IF EXISTS ChangeLog;
+
+DROP TABLE IF EXISTS MaintenanceArchive;
+
+DROP TABLE IF EXISTS MaintenanceRollup;
+
+DROP TABLE IF EXISTS ChangeLogHead;
+
+DROP TABLE IF EXISTS PersonClosure;
+
+DROP TABLE IF EXISTS RoleQuota;
+
+DROP TABLE IF EXISTS ChemicalHazard;
+
+DROP TABLE IF EXISTS LocationOccupancy;
+
 DROP TABLE IF EXISTS BuildingSupervision;
 
 DROP TABLE IF EXISTS Maintenance;
@@ -33,7 +49,14 @@ CREATE TABLE
         date_of_birth DATE,
         entry_date DATE DEFAULT (CURRENT_DATE),
         supervisor_id VARCHAR(20),
-        FOREIGN KEY (supervisor_id) REFERENCES Person (personal_id)
+        -- Set by DELETE; the row is removed later by the purge worker
+        -- (see purge.py). List endpoints only show rows where it is NULL.
+        deleted_at DATETIME,
+        FOREIGN KEY (supervisor_id) REFERENCES Person (personal_id),
+        -- Backing /api/search (see search.py)
+        INDEX idx_person_name (name),
+        FULLTEXT INDEX ft_person_name (name),
+        INDEX idx_person_deleted (deleted_at)
     );
 
 CREATE TABLE
@@ -43,7 +66,8 @@ CREATE TABLE
         job_role VARCHAR(50), -- Academic, Maintenance, Student
         status VARCHAR(20), -- Current, Former
         FOREIGN KEY (personal_id) REFERENCES Person (personal_id),
-        UNIQUE (personal_id) -- One-to-one relationship
+        UNIQUE (personal_id), -- One-to-one relationship
+        INDEX idx_profile_role_status (job_role, status)
     );
 
 CREATE TABLE
@@ -59,7 +83,9 @@ CREATE TABLE
     ExternalCompany (
         company_id INT AUTO_INCREMENT PRIMARY KEY,
         name VARCHAR(100) NOT NULL,
-        contact_info VARCHAR(255)
+        contact_info VARCHAR(255),
+        INDEX idx_company_name (name),
+        FULLTEXT INDEX ft_company_name (name)
     );
 
 CREATE TABLE
@@ -71,7 +97,12 @@ CREATE TABLE
         type VARCHAR(20), -- Room, Square, Gate, Level
         campus VARCHAR(50),
         department VARCHAR(20),
-        FOREIGN KEY (department) REFERENCES School (department)
+        capacity INT, -- Maximum concurrent participants; NULL means unlimited
+        FOREIGN KEY (department) REFERENCES School (department),
+        INDEX idx_location_building (building),
+        INDEX idx_location_campus (campus),
+        INDEX idx_location_room (room),
+        FULLTEXT INDEX ft_location (building, room, campus)
     );
 
 CREATE TABLE
@@ -79,10 +110,16 @@ CREATE TABLE
         activity_id VARCHAR(20) PRIMARY KEY,
         type VARCHAR(50), -- Lecture, Event
         time DATETIME,
+        duration_minutes INT NOT NULL DEFAULT 60,
         organiser_id VARCHAR(20) NOT NULL,
         location_id INT, -- [NEW] Link to Location
+        deleted_at DATETIME, -- Soft delete, see Person.deleted_at
         FOREIGN KEY (organiser_id) REFERENCES Person (personal_id),
-        FOREIGN KEY (location_id) REFERENCES Location (location_id)
+        FOREIGN KEY (location_id) REFERENCES Location (location_id),
+        INDEX idx_activity_time (time),
+        INDEX idx_activity_type (type),
+        INDEX idx_activity_location_time (location_id, time),
+        INDEX idx_activity_deleted (deleted_at)
     );
 
 CREATE TABLE
@@ -95,8 +132,20 @@ CREATE TABLE
         contracted_company_id INT, -- [MODIFIED] FK to ExternalCompany
         scheduled_time DATETIME, -- [NEW] Scheduled start time for time-based filtering
         end_time DATETIME, -- [NEW] Scheduled end time
+        -- Lasts over scheduling.LONG_TASK_DURATION, so overlap checks can
+        -- bound scheduled_time from below for every other task
+        long_running BOOLEAN AS (
+            COALESCE(end_time, scheduled_time + INTERVAL 1 HOUR)
+            > scheduled_time + INTERVAL 24 HOUR
+        ) STORED,
         FOREIGN KEY (location_id) REFERENCES Location (location_id),
-        FOREIGN KEY (contracted_company_id) REFERENCES ExternalCompany (company_id)
+        FOREIGN KEY (contracted_company_id) REFERENCES ExternalCompany (company_id),
+        -- Indexes backing list filters/sorts and time-window queries
+        INDEX idx_maintenance_location_time (location_id, scheduled_time),
+        INDEX idx_maintenance_location_long (location_id, long_running, scheduled_time),
+        INDEX idx_maintenance_scheduled (scheduled_time),
+        INDEX idx_maintenance_end_time (end_time),
+        INDEX idx_maintenance_type (type)
     );
 
 -- Many-to-Many: Mid-level Manager supervises Building
@@ -130,4 +179,131 @@ CREATE TABLE
         FOREIGN KEY (department) REFERENCES School (department)
     );
 
+-- Closure of Person.supervisor_id: one row per (ancestor, descendant) pair,
+-- including depth-0 self rows. Maintained by the API when PERSON_CLOSURE is
+-- enabled (see hierarchy.py).
+CREATE TABLE
+    PersonClosure (
+        ancestor_id VARCHAR(20) NOT NULL,
+        descendant_id VARCHAR(20) NOT NULL,
+        depth INT NOT NULL,
+        PRIMARY KEY (ancestor_id, descendant_id),
+        INDEX idx_closure_descendant (descendant_id, depth),
+        FOREIGN KEY (ancestor_id) REFERENCES Person (personal_id) ON DELETE CASCADE,
+        FOREIGN KEY (descendant_id) REFERENCES Person (personal_id) ON DELETE CASCADE
+    );
+
+-- Limits on current profiles per job role. current_count is maintained by
+-- the API with a conditional UPDATE (see quotas.py); roles without a row are
+-- unlimited.
+CREATE TABLE
+    RoleQuota (
+        job_role VARCHAR(50) PRIMARY KEY,
+        max_current INT,
+        current_count INT NOT NULL DEFAULT 0
+    );
+
+INSERT INTO
+    RoleQuota (job_role, max_current)
+VALUES
+    ('Mid-level Manager', 10),
+    ('Base-level Worker', 50);
+
+-- Chemical cleaning tasks with their location and contractor copied in, so
+-- the hazards of a building over a time window are index range reads.
+-- end_time is never NULL here; long_running marks rows lasting over a day.
+-- Maintained by the API (see hazards.py).
+CREATE TABLE
+    ChemicalHazard (
+        maintenance_id INT PRIMARY KEY,
+        location_id INT NOT NULL,
+        building VARCHAR(50),
+        room VARCHAR(20),
+        floor VARCHAR(10),
+        campus VARCHAR(50),
+        type VARCHAR(50),
+        frequency VARCHAR(50),
+        company_name VARCHAR(100),
+        scheduled_time DATETIME NOT NULL,
+        end_time DATETIME NOT NULL,
+        long_running BOOLEAN NOT NULL,
+        INDEX idx_hazard_building_time (building, long_running, scheduled_time, end_time),
+        INDEX idx_hazard_time (long_running, scheduled_time, end_time),
+        INDEX idx_hazard_location (location_id),
+        FOREIGN KEY (maintenance_id) REFERENCES Maintenance (maintenance_id) ON DELETE CASCADE
+    );
+
+-- Activities, participants and maintenance per location and 30-minute
+-- bucket, so booking checks read a few rows by primary key. Maintained by the
+-- API (see occupancy.py).
+CREATE TABLE
+    LocationOccupancy (
+        location_id INT NOT NULL,
+        bucket_start DATETIME NOT NULL,
+        activity_count INT NOT NULL DEFAULT 0,
+        participant_count INT NOT NULL DEFAULT 0,
+        maintenance_count INT NOT NULL DEFAULT 0,
+        chemical_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (location_id, bucket_start),
+        FOREIGN KEY (location_id) REFERENCES Location (location_id) ON DELETE CASCADE
+    );
+
+-- Completed maintenance moved out of Maintenance by the archive job, with
+-- the building, campus and department of its location at the time (see
+-- archive.py).
+CREATE TABLE
+    MaintenanceArchive (
+        maintenance_id INT PRIMARY KEY,
+        type VARCHAR(50),
+        frequency VARCHAR(50),
+        location_id INT NOT NULL,
+        building VARCHAR(50),
+        campus VARCHAR(50),
+        department VARCHAR(20),
+        active_chemical BOOLEAN,
+        contracted_company_id INT,
+        scheduled_time DATETIME,
+        end_time DATETIME,
+        archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_archive_scheduled (scheduled_time)
+    ) ROW_FORMAT = COMPRESSED;
+
+-- Archived maintenance counted per day, building, campus, department, type
+-- and frequency, read by the maintenance reports. Missing values are stored
+-- as '' since they are part of the key.
+CREATE TABLE
+    MaintenanceRollup (
+        day DATE NOT NULL,
+        building VARCHAR(50) NOT NULL DEFAULT '',
+        campus VARCHAR(50) NOT NULL DEFAULT '',
+        department VARCHAR(20) NOT NULL DEFAULT '',
+        type VARCHAR(50) NOT NULL DEFAULT '',
+        frequency VARCHAR(50) NOT NULL DEFAULT '',
+        task_count INT NOT NULL,
+        PRIMARY KEY (day, building, campus, department, type, frequency)
+    );
+
+-- Append-only record of API writes for incremental consumers
+-- (/api/changes). Written in the same transaction as the change; appends
+-- lock the ChangeLogHead row so seq values commit in order (see changelog.py).
+CREATE TABLE
+    ChangeLog (
+        seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+        table_name VARCHAR(64) NOT NULL,
+        op ENUM('insert', 'update', 'delete', 'invalidate') NOT NULL,
+        row_key JSON,
+        changed_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+    );
+
+CREATE TABLE
+    ChangeLogHead (
+        id TINYINT PRIMARY KEY,
+        last_write DATETIME(6)
+    );
+
+INSERT INTO
+    ChangeLogHead (id)
+VALUES
+    (1);
+
 -- Note: hq_building is now a simple VARCHAR, no FK needed
@@ -0,0 +1,147 @@
+"""Prefix search across persons, locations and external companies.
+
+Each searchable table has a ``FULLTEXT`` index maintained by InnoDB on
+every write. A query such as ``"john smi"`` becomes the boolean-mode
+expression ``+john* +smi*``: every word must start a word of the row, and
+rows are ranked by relevance. Each kind contributes at most ``limit``
+rows through its own index, and the union is cut to the overall top
+``limit``. Relevance is computed per index, so scores of different kinds
+are only roughly comparable.
+
+InnoDB does not index words shorter than ``innodb_ft_min_token_size``
+(3 by default) or stopwords, so those cannot be found via ``MATCH``. When
+a query contains such a word, or the full-text query finds nothing, the
+search falls back to ``LIKE 'word%'`` prefix matches on the B-tree
+indexed columns instead, ranking rows whose label starts with the first
+word ahead of the rest.
+"""
+
+import re
+
+KINDS = ("person", "location", "company")
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Matches innodb_ft_min_token_size (default 3).
+MIN_TOKEN_LENGTH = 3
+
+# Characters with a meaning in boolean-mode queries or LIKE patterns.
+_WORD_PATTERN = re.compile(r"[^\s+\-<>()~*\"@%_\\]+")
+
+
+class Source:
+    """How one kind of result is searched and labelled."""
+
+    def __init__(
+        self,
+        kind,
+        table,
+        id_sql,
+        label_sql,
+        detail_sql,
+        ft_columns,
+        prefix_columns,
+        where=None,
+    ):
+        self.kind = kind
+        self.table = table
+        self.id_sql = id_sql
+        self.label_sql = label_sql
+        self.detail_sql = detail_sql
+        self.ft_columns = ft_columns
+        self.prefix_columns = prefix_columns
+        self.where = where  # extra predicate, e.g. to skip soft-deleted rows
+
+    def select(self, score_sql, where_sql):
+        if self.where:
+            where_sql = f"({where_sql}) AND {self.where}"
+        return (
+            f"(SELECT '{self.kind}' AS kind, {self.id_sql} AS id, "
+            f"{self.label_sql} AS label, {self.detail_sql} AS detail, "
+            f"{score_sql} AS score FROM {self.table} WHERE {where_sql} "
+            "ORDER BY score DESC, label LIMIT %s)"
+        )
+
+
+SOURCES = {
+    "person": Source(
+        "person",
+        "Person",
+        id_sql="personal_id",
+        label_sql="name",
+        detail_sql="personal_id",
+        ft_columns="name",
+        prefix_columns=("name", "personal_id"),
+        where="deleted_at IS NULL",
+    ),
+    "location": Source(
+        "location",
+        "Location",
+        id_sql="CAST(location_id AS CHAR)",
+        label_sql="CONCAT_WS(' ', building, room)",
+        detail_sql="campus",
+        ft_columns="building, room, campus",
+        prefix_columns=("building", "room", "campus"),
+    ),
+    "company": Source(
+        "company",
+        "ExternalCompany",
+        id_sql="CAST(company_id AS CHAR)",
+        label_sql="name",
+        detail_sql="contact_info",
+        ft_columns="name",
+        prefix_columns=("name",),
+    ),
+}
+
+
+def words(text):
+    """Split a query into search words, dropping operator characters."""
+    return _WORD_PATTERN.findall(text or "")[:8]
+
+
+def search(cursor, text, kinds=KINDS, limit=DEFAULT_LIMIT):
+    """Return up to ``limit`` ``{kind, id, label, detail, score}`` matches."""
+    terms = words(text)
+    if not terms:
+        return []
+    sources = [SOURCES[kind] for kind in kinds]
+
+    rows = []
+    if all(len(term) >= MIN_TOKEN_LENGTH for term in terms):
+        rows = _fulltext(cursor, sources, terms, limit)
+    if not rows:
+        rows = _prefix(cursor, sources, terms, limit)
+    return rows
+
+
+def _fulltext(cursor, sources, terms, limit):
+    expression = " ".join(f"+{term}*" for term in terms)
+    parts, params = [], []
+    for source in sources:
+        match = f"MATCH({source.ft_columns}) AGAINST (%s IN BOOLEAN MODE)"
+        parts.append(source.select(match, match))
+        params.extend([expression, expression, limit])
+    return _run(cursor, parts, params, limit)
+
+
+def _prefix(cursor, sources, terms, limit):
+    parts, params = [], []
+    for source in sources:
+        any_column = " OR ".join(f"{c} LIKE %s" for c in source.prefix_columns)
+        where = " AND ".join(f"({any_column})" for _ in terms)
+        parts.append(source.select(f"({source.label_sql} LIKE %s)", where))
+        params.append(f"{terms[0]}%")
+        for term in terms:
+            params.extend([f"{term}%"] * len(source.prefix_columns))
+        params.append(limit)
+    return _run(cursor, parts, params, limit)
+
+
+def _run(cursor, parts, params, limit):
+    cursor.execute(
+        " UNION ALL ".join(parts) + " ORDER BY score DESC, label LIMIT %s",
+        tuple(params) + (limit,),
+    )
+    return cursor.fetchall()
@@ -3,6 +3,10 @@ from datetime import datetime, timedelta
 
 import mysql.connector
 from db import get_db_connection
+from hazards import rebuild as rebuild_hazards
+from occupancy import rebuild as rebuild_occupancy
+from hierarchy import rebuild_closure
+from quotas import sync_counts
 
 
 def seed_data():
@@ -29,6 +33,10 @@ def seed_data():
             "School",
             "Profile",
             "Person",
+            "MaintenanceArchive",
+            "MaintenanceRollup",
+            # ChangeLogHead keeps its single row: changelog.record locks it
+            "ChangeLog",
         ]
         for table in tables:
             cursor.execute(f"TRUNCATE TABLE {table}")
@@ -210,11 +218,14 @@ def seed_data():
             floor = room_no[0]
             l_type = random.choice(loc_types)
             dept = random.choice(dept_abbrs)
+            capacity = random.choice([20, 40, 60, 120])
 
-            locations_data.append((room_no, floor, b_name, l_type, campus, dept))
+            locations_data.append(
+                (room_no, floor, b_name, l_type, campus, dept, capacity)
+            )
 
         cursor.executemany(
-            "INSERT INTO Location (room, floor, building, type, campus, department) VALUES (%s, %s, %s, %s, %s, %s)",
+            "INSERT INTO Location (room, floor, building, type, campus, department, capacity) VALUES (%s, %s, %s, %s, %s, %s, %s)",
             locations_data,
         )
         print(f"Inserted {cursor.rowcount} locations.")
@@ -243,10 +254,13 @@ def seed_data():
             )
             organiser = random.choice(people_data)[0]
             location_id = random.choice(location_ids)
-            activities_data.append((aid, a_type, time, organiser, location_id))
+            duration = random.choice([60, 90, 120])
+            activities_data.append(
+                (aid, a_type, time, organiser, location_id, duration)
+            )
 
         cursor.executemany(
-            "INSERT INTO Activity (activity_id, type, time, organiser_id, location_id) VALUES (%s, %s, %s, %s, %s)",
+            "INSERT INTO Activity (activity_id, type, time, organiser_id, location_id, duration_minutes) VALUES (%s, %s, %s, %s, %s, %s)",
             activities_data,
         )
         print(f"Inserted {cursor.rowcount} activities.")
@@ -360,6 +374,15 @@ def seed_data():
             )
             print(f"Inserted {cursor.rowcount} building supervisions.")
 
+        rebuild_closure(cursor)
+        print(f"Rebuilt supervisor closure ({cursor.rowcount} paths).")
+        sync_counts(cursor)
+        print("Recounted role quotas.")
+        rebuild_hazards(cursor)
+        print(f"Indexed {cursor.rowcount} chemical hazards.")
+        rebuild_occupancy(cursor)
+        print("Rebuilt location occupancy.")
+
         conn.commit()
         print("Data seeding completed successfully!")
 
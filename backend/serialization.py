@@ -0,0 +1,129 @@
+"""Response serialization helpers: fast JSON, columnar shape and compression.
+
+``orjson`` and ``brotli`` are optional. Without ``orjson`` the app keeps
+Flask's default JSON provider; without ``brotli`` only gzip is negotiated.
+Both paths produce the same JSON as Flask's default provider (sorted keys,
+HTTP dates for ``datetime``/``date`` and strings for ``Decimal``), so clients
+cannot tell which encoder served them.
+"""
+
+import decimal
+import gzip
+import uuid
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date, parse_accept_header
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv", "text/plain"}
+
+
+def _default(o):
+    """Serialize the non-native values MySQL hands back, like Flask does."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes with ``orjson`` when no options are given."""
+
+    option = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        if orjson
+        else 0
+    )
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Custom json.dumps options (indent, separators, ...) are not
+            # supported by orjson; honour them with the stdlib encoder.
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self.option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app):
+    """Use ``OrjsonProvider`` for ``app`` if ``orjson`` is installed."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def to_columnar(rows):
+    """Convert a list of row dicts into ``{"columns": [...], "rows": [[...]]}``.
+
+    Column order follows the first row; keys missing from a later row are
+    sent as ``null``.
+    """
+    if not rows:
+        return {"columns": [], "rows": []}
+    columns = list(rows[0].keys())
+    return {
+        "columns": columns,
+        "rows": [[row.get(c) for c in columns] for row in rows],
+    }
+
+
+def wants_columnar(args):
+    """Return True if the request asked for ``?shape=columnar``."""
+    return args.get("shape", "").lower() == "columnar"
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content coding from an Accept-Encoding header."""
+    accepted = parse_accept_header(accept_encoding or "")
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0
+    for coding in candidates:
+        quality = accepted[coding]
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress_response(response, accept_encoding, min_size, gzip_level=6):
+    """Compress ``response`` in place when the client and payload allow it."""
+    if (
+        response.status_code < 200
+        or response.status_code >= 300
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    coding = choose_encoding(accept_encoding)
+    if coding == "br":
+        compressed = brotli.compress(body, quality=5)
+    elif coding == "gzip":
+        compressed = gzip.compress(body, compresslevel=gzip_level)
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = coding
+    return response
@@ -3,12 +3,17 @@ Pytest fixtures for backend testing.
 Provides mock database connections and Flask test client.
 """
 
+import os
 import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
-from app import app
+
+# The purge worker starts on the first request; keep it off the mocks.
+os.environ.setdefault("PURGE_INTERVAL_SECONDS", "0")
+
+from app import app, reset_occurrence_index, response_cache
 
 # Add backend directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -22,6 +27,16 @@ def client():
         yield client
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start every test with an empty response cache."""
+    response_cache.clear()
+    reset_occurrence_index()
+    yield
+    response_cache.clear()
+    reset_occurrence_index()
+
+
 @pytest.fixture
 def mock_db_connection():
     """Create a mock database connection."""
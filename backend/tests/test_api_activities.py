@@ -3,6 +3,7 @@ Unit tests for Activity API endpoints.
 """
 
 import json
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -107,6 +108,13 @@ class TestActivityItemEndpoint:
         """Test DELETE /api/activities/<id> deletes an activity."""
         mock_conn, mock_cursor = mock_get_db_connection
         mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = {
+            "activity_id": "A001",
+            "location_id": None,
+            "time": None,
+            "duration_minutes": 60,
+            "participants": 0,
+        }
 
         response = client.delete("/api/activities/A001")
 
@@ -118,7 +126,139 @@ class TestActivityItemEndpoint:
         """Test DELETE /api/activities/<id> returns 404 when activity not found."""
         mock_conn, mock_cursor = mock_get_db_connection
         mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = None
 
         response = client.delete("/api/activities/INVALID")
 
         assert response.status_code == 404
+
+
+class TestActivityOccupancy:
+    """Tests for booking checks backed by LocationOccupancy."""
+
+    @staticmethod
+    def _bucket(**counts):
+        row = {
+            "bucket_start": datetime(2024, 3, 15, 14),
+            "activity_count": 0,
+            "participant_count": 0,
+            "maintenance_count": 0,
+            "chemical_count": 0,
+        }
+        row.update(counts)
+        return row
+
+    def test_create_rejects_booked_location(
+        self, client, mock_get_db_connection, sample_activity
+    ):
+        """Test POST returns 409 when the location is already booked."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"capacity": None}
+        mock_cursor.fetchall.side_effect = [[self._bucket(activity_count=1)], []]
+
+        response = client.post(
+            "/api/activities",
+            data=json.dumps(sample_activity),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 409
+        data = json.loads(response.data)
+        assert data["conflicts"][0]["activity_count"] == 1
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    def test_create_counts_occupancy(
+        self, client, mock_get_db_connection, sample_activity
+    ):
+        """Test a new activity is added to its buckets in the same commit."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"capacity": None}
+        mock_cursor.fetchall.side_effect = [[self._bucket(maintenance_count=1)], []]
+        sample_activity["duration_minutes"] = 90
+
+        response = client.post(
+            "/api/activities",
+            data=json.dumps(sample_activity),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        sql, rows = mock_cursor.executemany.call_args_list[0][0]
+        assert sql.startswith("INSERT INTO LocationOccupancy")
+        assert [row[1].hour for row in rows] == [14, 14, 15]
+        mock_conn.commit.assert_called_once()
+
+    def test_create_rejects_invalid_duration(
+        self, client, mock_get_db_connection, sample_activity
+    ):
+        """Test durations outside 1 minute to 24 hours are rejected."""
+        sample_activity["duration_minutes"] = 0
+
+        response = client.post(
+            "/api/activities",
+            data=json.dumps(sample_activity),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+
+    def test_participation_rejected_when_full(
+        self, client, mock_get_db_connection, sample_participation
+    ):
+        """Test POST /api/participations returns 409 at the location's capacity."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.side_effect = [
+            {
+                "activity_id": "A001",
+                "location_id": 1,
+                "time": datetime(2024, 3, 15, 14),
+                "duration_minutes": 60,
+                "participants": 20,
+            },
+            {"capacity": 20},
+        ]
+        mock_cursor.fetchall.side_effect = [
+            [self._bucket(activity_count=1, participant_count=20)],
+            [],
+        ]
+
+        response = client.post(
+            "/api/participations",
+            data=json.dumps(sample_participation),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 409
+        assert "Capacity: 20" in json.loads(response.data)["error"]
+        mock_conn.commit.assert_not_called()
+
+    def test_location_occupancy(self, client, mock_get_db_connection):
+        """Test GET /api/locations/<id>/occupancy reports buckets and availability."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"capacity": 40}
+        mock_cursor.fetchall.side_effect = [
+            [self._bucket(activity_count=1, participant_count=12)],
+            [],
+        ]
+
+        response = client.get(
+            "/api/locations/1/occupancy"
+            "?start_time=2024-03-15T08:00&end_time=2024-03-15T20:00"
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["capacity"] == 40
+        assert data["bucket_minutes"] == 30
+        assert data["available"] is False
+        assert data["buckets"][0]["participant_count"] == 12
+
+    def test_location_occupancy_not_found(self, client, mock_get_db_connection):
+        """Test the occupancy of an unknown location is a 404."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = None
+
+        response = client.get("/api/locations/999/occupancy")
+
+        assert response.status_code == 404
@@ -0,0 +1,156 @@
+"""
+Unit tests for the Arrow/Parquet bulk export endpoints.
+"""
+
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc as ipc  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+from mysql.connector import FieldType  # noqa: E402
+
+MAINTENANCE_DESCRIPTION = [
+    ("maintenance_id", FieldType.LONG, None, None, None, None, 0),
+    ("type", FieldType.VAR_STRING, None, None, None, None, 1),
+    ("scheduled_time", FieldType.DATETIME, None, None, None, None, 1),
+    ("cost", FieldType.NEWDECIMAL, None, None, None, None, 1),
+]
+
+
+def _setup_cursor(mock_cursor, batches):
+    mock_cursor.description = MAINTENANCE_DESCRIPTION
+    mock_cursor.fetchmany.side_effect = batches + [[]]
+
+
+class TestExportEntity:
+    """Tests for /api/export/<entity>."""
+
+    def test_arrow_stream_export(self, client, mock_get_db_connection):
+        """Test GET /api/export/maintenance streams typed Arrow batches."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        _setup_cursor(
+            mock_cursor,
+            [
+                [(1, "Cleaning", None, None), (2, "Repair", None, None)],
+                [(3, "Cleaning", datetime(2024, 1, 15, 10, 0), Decimal("12.50"))],
+            ],
+        )
+
+        response = client.get("/api/export/maintenance?batch_size=2")
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/vnd.apache.arrow.stream"
+        reader = ipc.open_stream(response.data)
+        batches = list(reader)
+        assert len(batches) == 2
+        table = pa.Table.from_batches(batches)
+        assert table.num_rows == 3
+        assert table.schema.field("maintenance_id").type == pa.int64()
+        assert table.schema.field("scheduled_time").type == pa.timestamp("us")
+        assert table.schema.field("cost").type == pa.decimal128(38, 10)
+        assert table.column("cost").to_pylist() == [None, None, Decimal("12.50")]
+        mock_cursor.fetchmany.assert_called_with(2)
+        mock_conn.close.assert_called_once()
+
+    def test_parquet_export(self, client, mock_get_db_connection):
+        """Test format=parquet returns a readable Parquet file."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        _setup_cursor(mock_cursor, [[(1, "Cleaning", None, None)]])
+
+        response = client.get("/api/export/maintenance?format=parquet")
+
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.data))
+        assert table.column("type").to_pylist() == ["Cleaning"]
+
+    def test_decimal_precision_from_description(
+        self, client, mock_get_db_connection
+    ):
+        """Test DECIMAL columns keep the described precision and scale."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.description = [
+            ("cost", FieldType.NEWDECIMAL, None, None, 12, 2, 1),
+        ]
+        mock_cursor.fetchmany.side_effect = [[(Decimal("1234567890.12"),)], []]
+
+        response = client.get("/api/export/maintenance?format=parquet")
+
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.data))
+        assert table.schema.field("cost").type == pa.decimal128(12, 2)
+        assert table.column("cost").to_pylist() == [Decimal("1234567890.12")]
+
+    def test_export_uses_list_filters(self, client, mock_get_db_connection):
+        """Test list filters and fields are applied to the export query."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        _setup_cursor(mock_cursor, [])
+
+        response = client.get(
+            "/api/export/maintenance?fields=maintenance_id,type&type=Cleaning"
+        )
+        response.get_data()
+
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "WHERE m.type = %s" in sql
+        assert params == ("Cleaning",)
+
+    def test_disconnect_closes_connection(self, client, mock_get_db_connection):
+        """Test a client that stops reading still gets its connection closed."""
+        from mysql.connector import InternalError
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        _setup_cursor(
+            mock_cursor,
+            [[(1, "Cleaning", None, None)], [(2, "Repair", None, None)]],
+        )
+        mock_cursor.close.side_effect = InternalError("Unread result found")
+
+        response = client.get("/api/export/maintenance?batch_size=1")
+        next(response.response)
+        response.close()
+
+        mock_conn.close.assert_called_once()
+        mock_cursor.close.assert_not_called()
+
+    def test_unknown_entity(self, client, mock_get_db_connection):
+        """Test exporting an unknown entity returns 404."""
+        response = client.get("/api/export/secrets")
+
+        assert response.status_code == 404
+
+    def test_unknown_format(self, client, mock_get_db_connection):
+        """Test an unsupported format returns 400."""
+        response = client.get("/api/export/maintenance?format=xlsx")
+
+        assert response.status_code == 400
+        assert "format" in json.loads(response.data)["error"]
+
+
+class TestExportReport:
+    """Tests for /api/export/reports/<report>."""
+
+    def test_report_export(self, client, mock_get_db_connection):
+        """Test a summary report can be exported."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.description = [
+            ("frequency", FieldType.VAR_STRING, None, None, None, None, 1),
+            ("task_count", FieldType.LONGLONG, None, None, None, None, 0),
+        ]
+        mock_cursor.fetchmany.side_effect = [[("Daily", 4)], []]
+
+        response = client.get("/api/export/reports/maintenance-frequency")
+
+        assert response.status_code == 200
+        table = ipc.open_stream(response.data).read_all()
+        assert table.to_pylist() == [{"frequency": "Daily", "task_count": 4}]
+
+    def test_unknown_report(self, client, mock_get_db_connection):
+        """Test exporting an unknown report returns 404."""
+        response = client.get("/api/export/reports/unknown")
+
+        assert response.status_code == 404
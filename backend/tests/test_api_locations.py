@@ -63,6 +63,40 @@ class TestLocationsEndpoint:
 
         assert response.status_code == 201
 
+    def test_create_location_zero_capacity(self, client, mock_get_db_connection):
+        """Test capacity 0 is stored as 0, not as unlimited (NULL)."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        response = client.post(
+            "/api/locations",
+            data=json.dumps({"building": "Block B", "capacity": 0}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        sql, params = mock_cursor.execute.call_args_list[0][0]
+        assert params[-1] == 0
+
+    @pytest.mark.parametrize("capacity", [-1, 2.5, "ten", True])
+    def test_create_location_invalid_capacity(
+        self, client, mock_get_db_connection, capacity
+    ):
+        """Test a capacity that is not a non-negative whole number is a 400."""
+        response = client.post(
+            "/api/locations",
+            data=json.dumps({"building": "Block B", "capacity": capacity}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert "capacity" in json.loads(response.data)["error"]
+
+    def test_occupancy_rejects_non_numeric_id(self, client, mock_get_db_connection):
+        """Test a non-numeric location id is not found instead of a 500."""
+        response = client.get("/api/locations/abc/occupancy")
+
+        assert response.status_code == 404
+
 
 class TestLocationItemEndpoint:
     """Tests for /api/locations/<id> endpoint."""
@@ -82,6 +116,19 @@ class TestLocationItemEndpoint:
         data = json.loads(response.data)
         assert data["message"] == "Location updated"
 
+    def test_update_location_invalid_capacity(self, client, mock_get_db_connection):
+        """Test PUT validates capacity before writing."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        response = client.put(
+            "/api/locations/1",
+            data=json.dumps({"capacity": -5}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        mock_cursor.execute.assert_not_called()
+
     def test_update_location_not_found(self, client, mock_get_db_connection):
         """Test PUT /api/locations/<id> returns 404 when location not found."""
         mock_conn, mock_cursor = mock_get_db_connection
@@ -71,6 +71,12 @@ class TestMaintenanceItemEndpoint:
         """Test PUT /api/maintenance/<id> updates a maintenance task."""
         mock_conn, mock_cursor = mock_get_db_connection
         mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = {
+            "location_id": 1,
+            "scheduled_time": None,
+            "end_time": None,
+            "active_chemical": False,
+        }
 
         response = client.put(
             "/api/maintenance/1",
@@ -109,6 +115,12 @@ class TestMaintenanceItemEndpoint:
         """Test DELETE /api/maintenance/<id> deletes a maintenance task."""
         mock_conn, mock_cursor = mock_get_db_connection
         mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = {
+            "location_id": 1,
+            "scheduled_time": None,
+            "end_time": None,
+            "active_chemical": False,
+        }
 
         response = client.delete("/api/maintenance/1")
 
@@ -120,7 +132,232 @@ class TestMaintenanceItemEndpoint:
         """Test DELETE /api/maintenance/<id> returns 404 when task not found."""
         mock_conn, mock_cursor = mock_get_db_connection
         mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = None
 
         response = client.delete("/api/maintenance/999")
 
         assert response.status_code == 404
+
+
+class TestMaintenanceScheduleConflicts:
+    """Tests for overlap checks and the conflicts report."""
+
+    def test_create_rejects_overlap(
+        self, client, mock_get_db_connection, sample_maintenance
+    ):
+        """Test POST returns 409 when an earlier task is still running."""
+        from datetime import datetime
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        overlapping = {
+            "maintenance_id": 7,
+            "type": "Repair",
+            "scheduled_time": datetime(2024, 1, 15, 9, 0),
+            "end_time": datetime(2024, 1, 15, 11, 0),
+        }
+        mock_cursor.fetchone.return_value = {"capacity": None}
+        mock_cursor.fetchall.return_value = [overlapping]
+        sample_maintenance.update(
+            scheduled_time="2024-01-15T10:00", end_time="2024-01-15T12:00"
+        )
+
+        response = client.post(
+            "/api/maintenance",
+            data=json.dumps(sample_maintenance),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 409
+        data = json.loads(response.data)
+        assert data["conflicts"][0]["id"] == "7"
+        mock_conn.commit.assert_not_called()
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "FROM Location" in statements[0] and "FOR UPDATE" in statements[0]
+        short, long = statements[1].split(" UNION ALL ")
+        assert "long_running = FALSE AND scheduled_time >= %s" in short
+        assert "scheduled_time < %s" in short and "SECOND) > %s" in short
+        assert "long_running = TRUE AND scheduled_time < %s" in long
+        assert "LIMIT" not in statements[1]
+
+    def test_create_reports_every_overlapping_task(
+        self, client, mock_get_db_connection, sample_maintenance
+    ):
+        """Test the window is bounded below by LONG_TASK_DURATION for short
+        tasks and unbounded for long-running ones."""
+        from datetime import datetime
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        long_task = {
+            "maintenance_id": 1,
+            "type": "Repair",
+            "scheduled_time": datetime(2024, 1, 15, 1, 0),
+            "end_time": datetime(2024, 1, 15, 10, 0),
+        }
+        mock_cursor.fetchone.return_value = {"capacity": None}
+        mock_cursor.fetchall.return_value = [long_task]
+        sample_maintenance.update(
+            scheduled_time="2024-01-15T05:00", end_time="2024-01-15T06:00"
+        )
+
+        response = client.post(
+            "/api/maintenance",
+            data=json.dumps(sample_maintenance),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 409
+        assert [c["id"] for c in json.loads(response.data)["conflicts"]] == ["1"]
+        sql, params = mock_cursor.execute.call_args_list[1][0]
+        assert params == (
+            3600,
+            1,
+            datetime(2024, 1, 14, 5),
+            datetime(2024, 1, 15, 6),
+            3600,
+            datetime(2024, 1, 15, 5),
+            -1,
+            3600,
+            1,
+            datetime(2024, 1, 15, 6),
+            3600,
+            datetime(2024, 1, 15, 5),
+            -1,
+        )
+
+    def test_allow_overlap_still_locks_location(
+        self, client, mock_get_db_connection, sample_maintenance
+    ):
+        """Test allow_overlap skips the check but not the location lock."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"capacity": None}
+        mock_cursor.fetchall.return_value = []
+        sample_maintenance.update(
+            scheduled_time="2024-01-15T10:00",
+            end_time="2024-01-15T12:00",
+            allow_overlap=True,
+        )
+
+        response = client.post(
+            "/api/maintenance",
+            data=json.dumps(sample_maintenance),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "FROM Location" in statements[0] and "FOR UPDATE" in statements[0]
+        assert not any("maintenance_id <> %s" in sql for sql in statements)
+
+    def test_create_without_overlap(
+        self, client, mock_get_db_connection, sample_maintenance
+    ):
+        """Test POST stores the schedule when the previous task has ended."""
+        from datetime import datetime
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.return_value = {"capacity": None}
+        sample_maintenance.update(
+            scheduled_time="2024-01-15T10:00", end_time="2024-01-15T12:00"
+        )
+
+        response = client.post(
+            "/api/maintenance",
+            data=json.dumps(sample_maintenance),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        sql, params = next(
+            c[0]
+            for c in mock_cursor.execute.call_args_list
+            if c[0][0].startswith("INSERT INTO Maintenance")
+        )
+        assert params[-2:] == (datetime(2024, 1, 15, 10), datetime(2024, 1, 15, 12))
+
+    def test_create_rejects_end_before_start(
+        self, client, mock_get_db_connection, sample_maintenance
+    ):
+        """Test an end_time before scheduled_time is rejected."""
+        sample_maintenance.update(
+            scheduled_time="2024-01-15T10:00", end_time="2024-01-15T09:00"
+        )
+
+        response = client.post(
+            "/api/maintenance",
+            data=json.dumps(sample_maintenance),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+
+    def test_update_checks_merged_schedule(self, client, mock_get_db_connection):
+        """Test PUT checks the task as updated, excluding itself."""
+        from datetime import datetime
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.side_effect = [
+            {
+                "location_id": 3,
+                "scheduled_time": datetime(2024, 1, 15, 8, 0),
+                "end_time": datetime(2024, 1, 15, 9, 0),
+                "active_chemical": False,
+            },
+            {"capacity": None},
+        ]
+        mock_cursor.rowcount = 1
+
+        response = client.put(
+            "/api/maintenance/5",
+            data=json.dumps({"end_time": "2024-01-15T10:00"}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        seek = [
+            c[0]
+            for c in mock_cursor.execute.call_args_list
+            if "maintenance_id <> %s" in c[0][0]
+        ][0]
+        assert seek[1][1:7] == (
+            3,
+            datetime(2024, 1, 14, 8),
+            datetime(2024, 1, 15, 10),
+            3600,
+            datetime(2024, 1, 15, 8),
+            "5",
+        )
+
+    def test_conflicts_report(self, client, mock_get_db_connection):
+        """Test GET /api/maintenance/conflicts sweeps the loaded bookings."""
+        from datetime import datetime
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {
+                "kind": "maintenance",
+                "id": str(i),
+                "type": "Cleaning",
+                "location_id": 1,
+                "building": "Block A",
+                "room": "101",
+                "start": datetime(2024, 1, 15, 9 + i),
+                "end": datetime(2024, 1, 15, 11 + i),
+                "chemical": 0,
+            }
+            for i in range(2)
+        ]
+
+        response = client.get("/api/maintenance/conflicts?scope=building")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["count"] == 1
+        assert data["data"][0]["building"] == "Block A"
+
+    def test_conflicts_invalid_scope(self, client, mock_get_db_connection):
+        """Test an unknown scope returns 400."""
+        response = client.get("/api/maintenance/conflicts?scope=campus")
+
+        assert response.status_code == 400
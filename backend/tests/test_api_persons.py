@@ -136,8 +136,134 @@ class TestPersonItemEndpoint:
     def test_delete_person_not_found(self, client, mock_get_db_connection):
         """Test DELETE /api/persons/<id> returns 404 when person not found."""
         mock_conn, mock_cursor = mock_get_db_connection
-        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = None
 
         response = client.delete("/api/persons/INVALID")
 
         assert response.status_code == 404
+
+
+class TestPersonHierarchyEndpoints:
+    """Tests for /api/persons/<id>/subordinates and /ancestors."""
+
+    def test_get_subordinates(self, client, mock_get_db_connection):
+        """Test subordinates are returned without the person themselves."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"personal_id": "P001", "name": "Boss", "supervisor_id": None, "depth": 0},
+            {"personal_id": "P002", "name": "A", "supervisor_id": "P001", "depth": 1},
+            {"personal_id": "P003", "name": "B", "supervisor_id": "P002", "depth": 2},
+        ]
+
+        response = client.get("/api/persons/P001/subordinates")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [row["personal_id"] for row in data] == ["P002", "P003"]
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "WITH RECURSIVE subtree" in sql
+        assert params == ("P001", 64)
+
+    def test_get_ancestors(self, client, mock_get_db_connection):
+        """Test the reporting chain is walked upwards."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"personal_id": "P003", "name": "B", "supervisor_id": "P002", "depth": 0},
+            {"personal_id": "P002", "name": "A", "supervisor_id": "P001", "depth": 1},
+        ]
+
+        response = client.get("/api/persons/P003/ancestors?max_depth=1")
+
+        assert response.status_code == 200
+        assert json.loads(response.data)[0]["personal_id"] == "P002"
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "WITH RECURSIVE chain" in sql
+        assert params == ("P003", 1)
+
+    def test_unknown_person(self, client, mock_get_db_connection):
+        """Test an unknown person returns 404."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get("/api/persons/NOPE/subordinates")
+
+        assert response.status_code == 404
+
+    def test_invalid_max_depth(self, client, mock_get_db_connection):
+        """Test max_depth is validated."""
+        response = client.get("/api/persons/P001/subordinates?max_depth=0")
+
+        assert response.status_code == 400
+
+    def test_closure_table_used_when_enabled(self, client, mock_get_db_connection):
+        """Test PERSON_CLOSURE switches lookups to the closure table."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        with patch("app.PERSON_CLOSURE", True):
+            client.get("/api/persons/P001/subordinates")
+
+        sql = mock_cursor.execute.call_args[0][0]
+        assert "FROM PersonClosure c" in sql
+        assert "WITH RECURSIVE" not in sql
+
+    def test_update_rejects_cycle(self, client, mock_get_db_connection):
+        """Test a supervisor from the person's own subtree is rejected."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"personal_id": "P003", "name": "B", "supervisor_id": "P002", "depth": 0},
+            {"personal_id": "P001", "name": "Boss", "supervisor_id": None, "depth": 2},
+        ]
+
+        response = client.put(
+            "/api/persons/P001",
+            data=json.dumps({"supervisor_id": "P003"}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert "cycle" in json.loads(response.data)["error"]
+        mock_conn.commit.assert_not_called()
+
+    def test_update_moves_closure_subtree(self, client, mock_get_db_connection):
+        """Test changing supervisor_id re-parents the closure rows."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"personal_id": "P005", "name": "Boss", "supervisor_id": None, "depth": 0}
+        ]
+        mock_cursor.rowcount = 1
+
+        with patch("app.PERSON_CLOSURE", True):
+            response = client.put(
+                "/api/persons/P002",
+                data=json.dumps({"supervisor_id": "P005"}),
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        statements = [
+            c[0]
+            for c in mock_cursor.execute.call_args_list
+            if "ChangeLog" not in c[0][0]
+        ]
+        assert statements[-2][0].startswith("DELETE a FROM PersonClosure a")
+        assert statements[-1][0].startswith("INSERT INTO PersonClosure")
+        assert statements[-1][1] == ("P005", "P002")
+
+    def test_create_person_maintains_closure(
+        self, client, mock_get_db_connection, sample_person
+    ):
+        """Test POST /api/persons adds closure rows when enabled."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        with patch("app.PERSON_CLOSURE", True):
+            client.post(
+                "/api/persons",
+                data=json.dumps(sample_person),
+                content_type="application/json",
+            )
+
+        sql, params = mock_cursor.execute.call_args_list[1][0]
+        assert sql.startswith("INSERT INTO PersonClosure")
+        assert params == ("P001", None, "P001", "P001")
+        mock_conn.commit.assert_called_once()
@@ -3,7 +3,7 @@ Unit tests for Profile API endpoints.
 """
 
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import mysql.connector
 import pytest
@@ -65,7 +65,8 @@ class TestProfilesEndpoint:
     def test_create_profile_mid_level_limit(self, client, mock_get_db_connection):
         """Test POST /api/profiles enforces Mid-level Manager limit."""
         mock_conn, mock_cursor = mock_get_db_connection
-        mock_cursor.fetchone.return_value = {"count": 10}  # At limit
+        mock_cursor.rowcount = 0  # Conditional quota UPDATE matched nothing
+        mock_cursor.fetchone.return_value = {"max_current": 10}
 
         response = client.post(
             "/api/profiles",
@@ -75,12 +76,14 @@ class TestProfilesEndpoint:
 
         assert response.status_code == 400
         data = json.loads(response.data)
-        assert "Limit reached" in data["error"]
+        assert data["error"] == "Limit reached for Mid-level Manager (Max: 10)"
+        mock_conn.rollback.assert_called_once()
 
     def test_create_profile_base_level_limit(self, client, mock_get_db_connection):
         """Test POST /api/profiles enforces Base-level Worker limit."""
         mock_conn, mock_cursor = mock_get_db_connection
-        mock_cursor.fetchone.return_value = {"count": 50}  # At limit
+        mock_cursor.rowcount = 0  # Conditional quota UPDATE matched nothing
+        mock_cursor.fetchone.return_value = {"max_current": 50}
 
         response = client.post(
             "/api/profiles",
@@ -94,7 +97,7 @@ class TestProfilesEndpoint:
         """Test POST /api/profiles handles database errors."""
         mock_conn, mock_cursor = mock_get_db_connection
 
-        # For 'Manager' role, INSERT is the first execute call (no count query)
+        # The quota UPDATE is the first execute call
         mock_cursor.execute.side_effect = mysql.connector.Error("Duplicate entry")
 
         response = client.post(
@@ -106,3 +109,96 @@ class TestProfilesEndpoint:
         assert response.status_code == 400
         data = json.loads(response.data)
         assert "Duplicate entry" in data["error"]
+
+    def test_create_profile_unlimited_role(self, client, mock_get_db_connection):
+        """Test roles without a quota row are not limited."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        # No quota row updated, then the profile inserted
+        type(mock_cursor).rowcount = PropertyMock(side_effect=[0, 1])
+        mock_cursor.fetchone.return_value = None
+
+        response = client.post(
+            "/api/profiles",
+            data=json.dumps({"personal_id": "P003", "job_role": "Student"}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert statements[0].startswith("UPDATE RoleQuota SET current_count")
+        assert "COUNT(*)" not in " ".join(statements)
+
+    def test_former_profile_not_counted(self, client, mock_get_db_connection):
+        """Test non-current profiles do not use a quota slot."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        client.post(
+            "/api/profiles",
+            data=json.dumps(
+                {
+                    "personal_id": "P003",
+                    "job_role": "Base-level Worker",
+                    "status": "Former",
+                }
+            ),
+            content_type="application/json",
+        )
+
+        statements = [
+            c[0][0]
+            for c in mock_cursor.execute.call_args_list
+            if "ChangeLog" not in c[0][0]
+        ]
+        assert len(statements) == 1
+        assert statements[0].startswith("INSERT INTO Profile")
+
+
+class TestRoleQuotaEndpoints:
+    """Tests for /api/role-quotas."""
+
+    def test_list_quotas(self, client, mock_get_db_connection):
+        """Test GET /api/role-quotas lists limits and usage."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"job_role": "Mid-level Manager", "max_current": 10, "current_count": 4}
+        ]
+
+        response = client.get("/api/role-quotas")
+
+        assert response.status_code == 200
+        assert json.loads(response.data)[0]["current_count"] == 4
+
+    def test_set_quota(self, client, mock_get_db_connection):
+        """Test PUT /api/role-quotas/<role> upserts the limit."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        response = client.put(
+            "/api/role-quotas/Technician",
+            data=json.dumps({"max_current": 5}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        sql, params = mock_cursor.execute.call_args_list[0][0]
+        assert "ON DUPLICATE KEY UPDATE" in sql
+        assert params[:2] == ("Technician", 5)
+        mock_conn.commit.assert_called_once()
+
+    def test_set_quota_invalid(self, client, mock_get_db_connection):
+        """Test negative or non-integer limits are rejected."""
+        response = client.put(
+            "/api/role-quotas/Technician",
+            data=json.dumps({"max_current": -1}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+
+    def test_delete_quota_not_found(self, client, mock_get_db_connection):
+        """Test DELETE of an unknown quota returns 404."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 0
+
+        response = client.delete("/api/role-quotas/Nobody")
+
+        assert response.status_code == 404
@@ -0,0 +1,320 @@
+"""
+Unit tests for the Dev Console /api/query limits and streaming mode.
+"""
+
+import json
+from unittest.mock import patch
+
+import app as app_module
+
+
+def _post_query(client, body):
+    return client.post(
+        "/api/query", data=json.dumps(body), content_type="application/json"
+    )
+
+
+class TestQueryLimits:
+    """Tests for row caps and execution time limits on read queries."""
+
+    def test_session_limits_applied_before_select(self, client, mock_get_db_connection):
+        """Test sql_select_limit and max_execution_time are set first."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchmany.return_value = []
+
+        _post_query(
+            client, {"query": "SELECT * FROM Person", "max_rows": 5, "timeout_ms": 200}
+        )
+
+        calls = [c[0] for c in mock_cursor.execute.call_args_list]
+        assert calls[0] == ("SET SESSION sql_select_limit = %s", (6,))
+        assert calls[1] == ("SET SESSION max_execution_time = %s", (200,))
+        assert calls[2] == ("SELECT * FROM Person",)
+
+    def test_result_truncated(self, client, mock_get_db_connection):
+        """Test results beyond max_rows are cut and flagged."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchmany.return_value = [{"id": i} for i in range(3)]
+
+        response = _post_query(client, {"query": "SELECT id FROM t", "max_rows": 2})
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == [{"id": 0}, {"id": 1}]
+        assert response.headers["X-Result-Truncated"] == "true"
+        assert response.headers["X-Row-Limit"] == "2"
+
+    def test_truncated_result_is_not_drained(self, client, mock_get_db_connection):
+        """Test only max_rows + 1 rows are read and the rest is abandoned."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchmany.return_value = [{"id": i} for i in range(3)]
+
+        _post_query(
+            client, {"query": "SELECT id FROM t LIMIT 100000000", "max_rows": 2}
+        )
+
+        mock_cursor.fetchmany.assert_called_once_with(3)
+        mock_cursor.fetchall.assert_not_called()
+        mock_cursor.close.assert_not_called()
+        mock_conn.close.assert_called_once()
+
+    def test_result_not_truncated(self, client, mock_get_db_connection):
+        """Test small results are returned whole."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchmany.return_value = [{"id": 1}]
+
+        response = _post_query(client, {"query": "SELECT id FROM t"})
+
+        assert response.headers["X-Result-Truncated"] == "false"
+        assert response.headers["X-Row-Limit"] == str(app_module.QUERY_MAX_ROWS)
+
+    def test_max_rows_capped_by_server_limit(self, client, mock_get_db_connection):
+        """Test clients cannot raise the row cap above QUERY_MAX_ROWS."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchmany.return_value = []
+
+        response = _post_query(
+            client, {"query": "SELECT 1", "max_rows": 10**9, "timeout_ms": 10**9}
+        )
+
+        assert response.headers["X-Row-Limit"] == str(app_module.QUERY_MAX_ROWS)
+        calls = [c[0] for c in mock_cursor.execute.call_args_list]
+        assert calls[1][1] == (app_module.QUERY_MAX_EXECUTION_MS,)
+
+    def test_invalid_max_rows(self, client, mock_get_db_connection):
+        """Test non-positive limits are rejected."""
+        response = _post_query(client, {"query": "SELECT 1", "max_rows": 0})
+
+        assert response.status_code == 400
+
+    def test_write_query_not_limited(self, client, mock_get_db_connection):
+        """Test write statements run without the read session limits."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 1
+
+        _post_query(client, {"query": "DELETE FROM Person WHERE 1=0"})
+
+        calls = [c[0] for c in mock_cursor.execute.call_args_list]
+        assert calls[0] == ("DELETE FROM Person WHERE 1=0",)
+        assert not any("SET SESSION" in call[0] for call in calls)
+
+
+class TestQueryStreaming:
+    """Tests for the newline-delimited JSON streaming mode."""
+
+    def test_stream_rows(self, client, mock_get_db_connection):
+        """Test rows are streamed as NDJSON with a trailing summary."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.description = [("id",), ("name",)]
+        mock_cursor.fetchmany.side_effect = [[(1, "A"), (2, "B")], []]
+
+        response = _post_query(
+            client, {"query": "SELECT id, name FROM t", "stream": True}
+        )
+
+        assert response.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        assert lines[0] == {"columns": ["id", "name"]}
+        assert lines[1:3] == [[1, "A"], [2, "B"]]
+        assert lines[3] == {"row_count": 2, "truncated": False}
+        mock_conn.close.assert_called_once()
+
+    def test_stream_truncated(self, client, mock_get_db_connection):
+        """Test streaming stops at max_rows and reports truncation."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.description = [("id",)]
+        mock_cursor.fetchmany.side_effect = [[(1,), (2,), (3,)], []]
+
+        response = _post_query(
+            client, {"query": "SELECT id FROM t", "stream": True, "max_rows": 2}
+        )
+
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        assert lines[-1] == {"row_count": 2, "truncated": True}
+        assert len(lines) == 4
+        assert mock_cursor.fetchmany.call_count == 1
+        mock_cursor.fetchall.assert_not_called()
+        mock_cursor.close.assert_not_called()
+        mock_conn.close.assert_called_once()
+
+
+class TestQueryProfiling:
+    """Tests for the EXPLAIN / ANALYZE profiling mode."""
+
+    def _setup_profile(self, mock_cursor, plan, statement=None):
+        mock_cursor.fetchall.side_effect = [
+            [
+                {"Variable_name": "Handler_read_key", "Value": "10"},
+                {"Variable_name": "Handler_read_rnd_next", "Value": "100"},
+            ],
+            [
+                {"Variable_name": "Handler_read_key", "Value": "12"},
+                {"Variable_name": "Handler_read_rnd_next", "Value": "100"},
+            ],
+        ]
+        mock_cursor.fetchmany.return_value = [{"id": 1}, {"id": 2}]
+        mock_cursor.fetchone.side_effect = [statement, {"EXPLAIN": plan}]
+
+    def test_explain_profile(self, client, mock_get_db_connection):
+        """Test profile=explain returns rows, a JSON plan and counter deltas."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        self._setup_profile(
+            mock_cursor,
+            '{"query_block": {"select_id": 1}}',
+            {
+                "TIMER_WAIT": 2_500_000_000,
+                "LOCK_TIME": 0,
+                "ROWS_EXAMINED": 42,
+                "ROWS_SENT": 2,
+                "NO_INDEX_USED": 1,
+            },
+        )
+
+        response = _post_query(
+            client, {"query": "SELECT id FROM Person", "profile": "explain"}
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["rows"] == [{"id": 1}, {"id": 2}]
+        profile = data["profile"]
+        assert profile["mode"] == "explain"
+        assert profile["plan"] == {"query_block": {"select_id": 1}}
+        assert profile["status"] == {"Handler_read_key": 2}
+        assert profile["statement"]["rows_examined"] == 42
+        assert profile["statement"]["server_ms"] == 2.5
+        assert profile["statement"]["no_index_used"] == 1
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert executed[-1] == "EXPLAIN FORMAT=JSON SELECT id FROM Person"
+        assert "SELECT id FROM Person" in executed
+
+    def test_analyze_profile(self, client, mock_get_db_connection):
+        """Test profile=analyze runs EXPLAIN ANALYZE after the status snapshot."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        self._setup_profile(mock_cursor, "-> Table scan on Person (actual rows=2)")
+
+        response = _post_query(
+            client, {"query": "SELECT id FROM Person", "profile": "analyze"}
+        )
+
+        profile = json.loads(response.data)["profile"]
+        assert profile["plan"].startswith("-> Table scan")
+        assert profile["statement"] is None
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert executed[-1] == "EXPLAIN ANALYZE SELECT id FROM Person"
+
+    def test_performance_schema_unavailable(self, client, mock_get_db_connection):
+        """Test statement metrics are optional."""
+        import mysql.connector
+
+        mock_conn, mock_cursor = mock_get_db_connection
+        self._setup_profile(mock_cursor, "{}")
+
+        def execute(sql, params=None):
+            if "performance_schema" in sql:
+                raise mysql.connector.Error("access denied")
+
+        mock_cursor.execute.side_effect = execute
+        mock_cursor.fetchone.side_effect = [{"EXPLAIN": "{}"}]
+
+        response = _post_query(
+            client, {"query": "SELECT id FROM Person", "profile": "explain"}
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.data)["profile"]["statement"] is None
+
+    def test_truncated_profile_discards_connection(
+        self, client, mock_get_db_connection
+    ):
+        """Test a profiled SELECT stops reading at the cap like /api/query."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchmany.return_value = [{"id": 1}, {"id": 2}, {"id": 3}]
+        mock_cursor.fetchone.return_value = {"EXPLAIN": "{}"}
+
+        response = _post_query(
+            client,
+            {
+                "query": "SELECT id FROM Person LIMIT 100000000",
+                "profile": "explain",
+                "max_rows": 2,
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["X-Result-Truncated"] == "true"
+        data = json.loads(response.data)
+        assert data["rows"] == [{"id": 1}, {"id": 2}]
+        assert data["profile"]["plan"] == {}
+        assert data["profile"]["status"] is None
+        mock_cursor.fetchmany.assert_called_once_with(3)
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "performance_schema" not in " ".join(executed)
+        # the plan's connection is closed, the profiled one abandoned
+        assert mock_cursor.close.call_count == 1
+        assert mock_conn.close.call_count == 2
+
+    def test_profile_rejected_for_writes(self, client, mock_get_db_connection):
+        """Test profiling is limited to SELECT statements."""
+        response = _post_query(
+            client, {"query": "DELETE FROM Person", "profile": "analyze"}
+        )
+
+        assert response.status_code == 400
+
+    def test_unknown_profile_mode(self, client, mock_get_db_connection):
+        """Test an unknown profile mode returns 400."""
+        response = _post_query(client, {"query": "SELECT 1", "profile": "trace"})
+
+        assert response.status_code == 400
+
+
+class TestWriteTarget:
+    """Tests for attributing Dev Console writes to a table."""
+
+    def test_single_table_writes(self):
+        """Test the changed table is parsed, not searched for in the text."""
+        assert app_module.write_target("INSERT INTO Person VALUES (1)") == "PERSON"
+        assert (
+            app_module.write_target("UPDATE Location SET note = 'Activity room'")
+            == "LOCATION"
+        )
+        assert (
+            app_module.write_target("DELETE FROM `Maintenance` WHERE type = 'x'")
+            == "MAINTENANCE"
+        )
+        assert app_module.write_target("TRUNCATE Participation") == "PARTICIPATION"
+
+    def test_unknown_target(self):
+        """Test multi-table writes and DDL have no single target."""
+        assert app_module.write_target("UPDATE Person p JOIN Profile f SET x=1") is None
+        assert app_module.write_target("DELETE p FROM Person p JOIN Profile") is None
+        assert app_module.write_target("DROP TABLE Activity") is None
+
+    def test_occupancy_rebuilt_only_for_its_sources(
+        self, client, mock_get_db_connection
+    ):
+        """Test a column named like a source table does not trigger a rebuild."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 1
+
+        with patch.object(app_module, "rebuild_occupancy") as rebuild:
+            _post_query(
+                client, {"query": "UPDATE School SET activity_notes = 'Maintenance'"}
+            )
+            rebuild.assert_not_called()
+            _post_query(client, {"query": "DELETE FROM Participation"})
+            rebuild.assert_called_once()
+
+    def test_quota_sync_only_for_profile_writes(self, client, mock_get_db_connection):
+        """Test a column or alias named profile does not resync quotas."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 1
+
+        with patch.object(app_module, "sync_quota_counts") as sync:
+            _post_query(
+                client, {"query": "UPDATE Person SET profile_note = 'x' WHERE 1"}
+            )
+            sync.assert_not_called()
+            _post_query(client, {"query": "UPDATE Profile SET status = 'Retired'"})
+            sync.assert_called_once()
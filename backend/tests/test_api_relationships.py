@@ -38,6 +38,13 @@ class TestParticipationsEndpoint:
     ):
         """Test POST /api/participations creates a new participation."""
         mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {
+            "activity_id": "A001",
+            "location_id": None,
+            "time": None,
+            "duration_minutes": 60,
+            "participants": 0,
+        }
 
         response = client.post(
             "/api/participations",
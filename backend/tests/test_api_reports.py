@@ -3,9 +3,20 @@ Unit tests for Report API endpoints.
 """
 
 import json
+from datetime import date
 from unittest.mock import MagicMock, patch
 
 import pytest
+from reports import (
+    DEFAULT_TREND_DAYS,
+    MAINTENANCE_TOTAL_SQL,
+    ReportError,
+    bucket_starts,
+    maintenance_trend,
+    report_query,
+    trend_query,
+)
+from reports import parse_filters as parse_report_filters
 
 
 class TestMaintenanceSummaryReport:
@@ -106,6 +117,188 @@ class TestMaintenanceFrequencyReport:
         assert data[0]["task_count"] == 20
 
 
+class TestReportFilters:
+    """Tests for the from/to/building/campus/department report filters."""
+
+    def test_filters_are_bare_column_ranges(self):
+        """Test filters compare indexed columns without wrapping them."""
+        filters = parse_report_filters(
+            {"from": "2024-05-01", "to": "2024-05-31", "building": "Block A"}
+        )
+        sql, params = report_query("maintenance-summary", filters)
+
+        assert "m.scheduled_time >= %s AND m.scheduled_time < %s" in sql
+        assert "AND l.building = %s" in sql
+        assert "r.day >= %s AND r.day < %s AND r.building = %s" in sql
+        assert params == (date(2024, 5, 1), date(2024, 6, 1), "Block A") * 2
+
+    def test_location_subquery_without_join(self):
+        """Test branches without a Location join look locations up by id."""
+        sql, params = report_query(
+            "activities-summary", {"campus": "Main", "department": "COMP"}
+        )
+
+        assert (
+            "a.location_id IN (SELECT location_id FROM Location "
+            "WHERE campus = %s AND department = %s)"
+        ) in sql
+        assert params == ("Main", "COMP")
+
+    def test_no_filters_leave_query_unrestricted(self):
+        """Test an unfiltered report has no WHERE and no params."""
+        sql, params = report_query("maintenance-frequency")
+
+        assert "WHERE" not in sql
+        assert params == ()
+
+    def test_invalid_filters(self):
+        """Test bad dates and filters on unfilterable reports are rejected."""
+        with pytest.raises(ReportError):
+            parse_report_filters({"from": "last month"})
+        with pytest.raises(ReportError):
+            report_query("people-summary", {"building": "Block A"})
+
+    def test_endpoint_passes_filters(self, client, mock_get_db_connection):
+        """Test the endpoint runs the filtered query with bound params."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get("/api/reports/activities-summary?from=2024-05-01")
+
+        assert response.status_code == 200
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "p.deleted_at IS NULL AND a.time >= %s" in sql
+        assert params == (date(2024, 5, 1),)
+
+    def test_manager_report_keeps_managers(self, client, mock_get_db_connection):
+        """Test the time window narrows the join, not the supervisions."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get(
+            "/api/reports/manager-buildings?to=2024-05-31&building=Block A"
+        )
+
+        assert response.status_code == 200
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "m.location_id = l.location_id AND m.scheduled_time < %s" in sql
+        assert "WHERE p.deleted_at IS NULL AND bs.building = %s" in sql
+        assert params == (date(2024, 6, 1), "Block A")
+
+    def test_endpoint_rejects_bad_date(self, client, mock_get_db_connection):
+        """Test an unparseable date is a 400."""
+        response = client.get("/api/reports/maintenance-summary?to=31/05/2024")
+
+        assert response.status_code == 400
+
+
+class TestMaintenanceTrendReport:
+    """Tests for /api/reports/maintenance-trend and its bucketing."""
+
+    def test_buckets_are_gap_filled(self):
+        """Test every bucket of the window gets a count, 0 when empty."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            {"bucket": date(2024, 4, 29), "series": "Cleaning", "count": 3},
+            {"bucket": date(2024, 5, 13), "series": "Cleaning", "count": 1},
+            {"bucket": date(2024, 5, 13), "series": "Repair", "count": 2},
+        ]
+        filters = parse_report_filters({"from": "2024-05-01", "to": "2024-05-19"})
+
+        trend = maintenance_trend(cursor, "week", "type", filters)
+
+        assert trend["buckets"] == ["2024-04-29", "2024-05-06", "2024-05-13"]
+        assert trend["series"] == [
+            {"name": "Cleaning", "counts": [3, 0, 1]},
+            {"name": "Repair", "counts": [0, 0, 2]},
+        ]
+        assert trend["total"] == [3, 0, 3]
+        assert trend["to"] == "2024-05-19"
+
+    def test_single_group_by_over_time_range(self):
+        """Test one statement groups on the bucket and filters the bare column."""
+        sql, params = trend_query(
+            "month", "building", {"from": date(2024, 1, 1), "to": date(2024, 7, 1)}
+        )
+
+        assert "DAYOFMONTH(m.scheduled_time)" in sql
+        assert "WHERE m.scheduled_time >= %s AND m.scheduled_time < %s" in sql
+        assert "WHERE r.day >= %s AND r.day < %s" in sql
+        assert "l.building AS series" in sql
+        assert params == (date(2024, 1, 1), date(2024, 7, 1)) * 2
+
+    def test_default_window(self):
+        """Test the trend covers the last DEFAULT_TREND_DAYS without from/to."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+
+        trend = maintenance_trend(cursor, "day", today=date(2024, 5, 31))
+
+        assert len(trend["buckets"]) == DEFAULT_TREND_DAYS
+        assert trend["buckets"][-1] == "2024-05-31"
+        assert trend["series"] == []
+
+    def test_month_buckets_cross_years(self):
+        """Test month buckets start on the 1st and roll over December."""
+        assert bucket_starts("month", date(2023, 11, 15), date(2024, 2, 1)) == [
+            date(2023, 11, 1),
+            date(2023, 12, 1),
+            date(2024, 1, 1),
+        ]
+
+    def test_invalid_parameters(self, client, mock_get_db_connection):
+        """Test unknown buckets/splits and oversized windows are a 400."""
+        assert (
+            client.get("/api/reports/maintenance-trend?bucket=hour").status_code == 400
+        )
+        assert (
+            client.get("/api/reports/maintenance-trend?split=company").status_code
+            == 400
+        )
+        assert (
+            client.get(
+                "/api/reports/maintenance-trend?bucket=day&from=2020-01-01"
+            ).status_code
+            == 400
+        )
+
+    def test_endpoint(self, client, mock_get_db_connection):
+        """Test the endpoint returns the filled series as JSON."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"bucket": "2024-05-01", "series": "Main", "count": 4}
+        ]
+
+        response = client.get(
+            "/api/reports/maintenance-trend?bucket=month&split=campus"
+            "&from=2024-04-01&to=2024-05-31"
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["buckets"] == ["2024-04-01", "2024-05-01"]
+        assert data["series"] == [{"name": "Main", "counts": [0, 4]}]
+
+
+class TestComprehensiveReportData:
+    """Tests for /api/reports/comprehensive-data."""
+
+    def test_total_includes_archived_tasks(self, client, mock_get_db_connection):
+        """Test the maintenance total counts rollups like the summaries do."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"count": 5}
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get("/api/reports/comprehensive-data")
+
+        assert response.status_code == 200
+        assert json.loads(response.data)["summary"]["total_maintenance"] == 5
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert MAINTENANCE_TOTAL_SQL in statements
+        assert "SELECT COUNT(*) as count FROM Maintenance" not in statements
+        assert "FROM MaintenanceRollup" in MAINTENANCE_TOTAL_SQL
+
+
 class TestHealthCheck:
     """Tests for /api/health endpoint."""
 
@@ -124,7 +317,7 @@ class TestQueryEndpoint:
     def test_select_query_success(self, client, mock_get_db_connection):
         """Test POST /api/query with SELECT statement."""
         mock_conn, mock_cursor = mock_get_db_connection
-        mock_cursor.fetchall.return_value = [{"name": "John"}]
+        mock_cursor.fetchmany.return_value = [{"name": "John"}]
 
         response = client.post(
             "/api/query",
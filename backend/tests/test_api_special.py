@@ -1,11 +1,13 @@
 """
-Unit tests for Special API endpoints (Safety Search, Bulk Import).
+Unit tests for Special API endpoints (Search, Safety Search, Bulk Import).
 """
 
 import json
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
+from app import response_cache
 
 
 class TestSafetySearchEndpoint:
@@ -47,6 +49,7 @@ class TestSafetySearchEndpoint:
                 "building": "Block A",
                 "room": "101",
                 "floor": "1",
+                "warning": "⚠️ WARNING: Hazardous chemicals used!",
             }
         ]
 
@@ -55,8 +58,28 @@ class TestSafetySearchEndpoint:
         assert response.status_code == 200
         data = json.loads(response.data)
         assert len(data) == 1
-        assert "warning" in data[0]
         assert "Hazardous" in data[0]["warning"]
+        # The warning and time formatting are computed by the query
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "IF(m.active_chemical, %s, NULL) AS warning" in sql
+        assert "DATE_FORMAT(m.scheduled_time" in sql
+        assert "Hazardous" in params[2]
+        assert params[-1] == "Block A"
+
+    def test_safety_search_omits_warning_without_chemicals(
+        self, client, mock_get_db_connection
+    ):
+        """Test non-chemical rows have no warning key rather than null."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {"maintenance_id": 2, "active_chemical": False, "warning": None}
+        ]
+
+        response = client.get("/api/search/safety")
+
+        assert json.loads(response.data) == [
+            {"maintenance_id": 2, "active_chemical": False}
+        ]
 
     def test_safety_search_no_building_filter(self, client, mock_get_db_connection):
         """Test GET /api/search/safety works without building filter."""
@@ -96,6 +119,300 @@ class TestSafetySearchEndpoint:
         assert len(data) == 1
 
 
+class TestFacetsEndpoint:
+    """Tests for /api/facets."""
+
+    def test_facets_selected_fields(self, client, mock_get_db_connection):
+        """Test GET /api/facets returns value counts per requested field."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.side_effect = [
+            [{"value": "Block A", "count": 3}, {"value": "Block B", "count": 1}],
+            [{"value": "Base-level Worker", "count": 7}],
+        ]
+
+        response = client.get("/api/facets?fields=building,job_role")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["building"] == [
+            {"value": "Block A", "count": 3},
+            {"value": "Block B", "count": 1},
+        ]
+        assert data["job_role"][0]["count"] == 7
+        sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "GROUP BY building" in sql
+
+    def test_facets_cached_per_table(self, client, mock_get_db_connection):
+        """Test a write only recomputes the facets of the written table."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [{"value": "x", "count": 1}]
+
+        client.get("/api/facets?fields=building,job_role")
+        assert mock_cursor.execute.call_count == 2
+
+        client.get("/api/facets?fields=building,job_role")
+        assert mock_cursor.execute.call_count == 2
+
+        response_cache.invalidate("Profile")
+        client.get("/api/facets?fields=building,job_role")
+        assert mock_cursor.execute.call_count == 3
+        assert "job_role" in mock_cursor.execute.call_args[0][0]
+
+    def test_facets_unknown_field(self, client, mock_get_db_connection):
+        """Test unknown facet names are rejected."""
+        response = client.get("/api/facets?fields=building,colour")
+
+        assert response.status_code == 400
+        assert "colour" in json.loads(response.data)["error"]
+
+
+class TestUnifiedSearch:
+    """Tests for /api/search."""
+
+    def test_search_success(self, client, mock_get_db_connection):
+        """Test GET /api/search returns ranked matches."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {
+                "kind": "person",
+                "id": "P001",
+                "label": "John Doe",
+                "detail": "P001",
+                "score": 1.2,
+            }
+        ]
+
+        response = client.get("/api/search?q=john&types=person&limit=5")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data[0]["label"] == "John Doe"
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "FROM Person" in sql and "FROM Location" not in sql
+        assert params[-1] == 5
+
+    def test_search_empty_query(self, client, mock_get_db_connection):
+        """Test an empty query returns no results without touching the DB."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        response = client.get("/api/search?q=")
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == []
+        mock_cursor.execute.assert_not_called()
+
+    def test_search_limit_is_capped(self, client, mock_get_db_connection):
+        """Test limit is capped at the maximum."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        client.get("/api/search?q=room&limit=1000")
+
+        assert mock_cursor.execute.call_args_list[0][0][1][-1] == 50
+
+    def test_search_unknown_type(self, client, mock_get_db_connection):
+        """Test unknown result types are rejected."""
+        response = client.get("/api/search?q=john&types=person,vehicle")
+
+        assert response.status_code == 400
+        assert "vehicle" in json.loads(response.data)["error"]
+
+
+class TestHazardSearch:
+    """Tests for /api/search/hazards."""
+
+    def test_hazards_bounded_range_reads(self, client, mock_get_db_connection):
+        """Test short hazards are read by a range bounded on both sides."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            {
+                "maintenance_id": 3,
+                "type": "Cleaning",
+                "building": "Block A",
+                "scheduled_time": "2024-01-15T10:00:00",
+                "end_time": "2024-01-15T11:00:00",
+                "warning": "⚠️ WARNING: Hazardous chemicals used!",
+            }
+        ]
+
+        response = client.get(
+            "/api/search/hazards?building=Block A"
+            "&start_time=2024-01-15T09:00&end_time=2024-01-15T12:00"
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data[0]["maintenance_id"] == 3
+        assert mock_cursor.execute.call_count == 1
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "FROM ChemicalHazard h" in sql
+        assert "JOIN" not in sql
+        short, long = sql.split(" UNION ALL ")
+        assert (
+            "h.building = %s AND h.long_running = FALSE AND h.scheduled_time >= %s "
+            "AND h.scheduled_time < %s AND h.end_time > %s"
+        ) in short
+        assert (
+            "h.building = %s AND h.long_running = TRUE "
+            "AND h.scheduled_time < %s AND h.end_time > %s"
+        ) in long
+        assert params[3:7] == (
+            "Block A",
+            datetime(2024, 1, 14, 9),
+            datetime(2024, 1, 15, 12),
+            datetime(2024, 1, 15, 9),
+        )
+        assert params[10:] == (
+            "Block A",
+            datetime(2024, 1, 15, 12),
+            datetime(2024, 1, 15, 9),
+        )
+
+    def test_hazards_without_filters(self, client, mock_get_db_connection):
+        """Test all hazards are listed when no filter is given."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get("/api/search/hazards")
+
+        assert response.status_code == 200
+        sql, _ = mock_cursor.execute.call_args[0]
+        assert "WHERE" not in sql
+
+    def test_hazards_rejects_inverted_window(self, client, mock_get_db_connection):
+        """Test an end_time before start_time is rejected."""
+        response = client.get(
+            "/api/search/hazards?start_time=2024-01-15&end_time=2024-01-14"
+        )
+
+        assert response.status_code == 400
+
+    def test_maintenance_write_refreshes_hazards(self, client, mock_get_db_connection):
+        """Test updating a task recomputes its hazard row before committing."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = None
+
+        response = client.put(
+            "/api/maintenance/5",
+            data=json.dumps({"active_chemical": True}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        statements = [
+            c[0]
+            for c in mock_cursor.execute.call_args_list
+            if "ChangeLog" not in c[0][0]
+        ]
+        assert statements[-2] == (
+            "DELETE FROM ChemicalHazard WHERE maintenance_id = %s",
+            ("5",),
+        )
+        assert "INSERT INTO ChemicalHazard" in statements[-1][0]
+        assert statements[-1][1] == ("5",)
+        mock_conn.commit.assert_called_once()
+
+
+class TestExpandedSafetySearch:
+    """Tests for /api/search/safety?expand=true."""
+
+    def _task(self, **overrides):
+
+        task = {
+            "maintenance_id": 1,
+            "type": "Cleaning",
+            "frequency": "Weekly",
+            "active_chemical": True,
+            "scheduled_time": datetime(2024, 1, 1, 9),
+            "end_time": datetime(2024, 1, 1, 11),
+            "building": "Block A",
+            "room": "101",
+            "floor": "1",
+            "campus": "Main",
+            "company_name": None,
+        }
+        task.update(overrides)
+        return task
+
+    def test_recurring_occurrences_in_window(self, client, mock_get_db_connection):
+        """Test a weekly task yields one row per occurrence in the window."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [self._task()]
+
+        response = client.get(
+            "/api/search/safety?expand=true"
+            "&start_time=2024-03-01&end_time=2024-03-15"
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [row["scheduled_time"] for row in data] == [
+            "2024-03-04T09:00:00",
+            "2024-03-11T09:00:00",
+        ]
+        assert data[0]["series_start"] == "2024-01-01T09:00:00"
+        assert "Hazardous" in data[0]["warning"]
+
+    def test_building_filter(self, client, mock_get_db_connection):
+        """Test occurrences are filtered by building."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            self._task(),
+            self._task(maintenance_id=2, building="Block B"),
+        ]
+
+        response = client.get(
+            "/api/search/safety?expand=true&building=Block B"
+            "&start_time=2024-03-01&end_time=2024-03-08"
+        )
+
+        data = json.loads(response.data)
+        assert {row["maintenance_id"] for row in data} == {2}
+
+    def test_index_reused_until_write(self, client, mock_get_db_connection):
+        """Test the occurrence index is built once and dropped on writes."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [
+            self._task(frequency="Daily", scheduled_time=datetime.now())
+        ]
+        day = (datetime.now() + timedelta(days=2)).date().isoformat()
+
+        def index_builds():
+            return sum(
+                "m.type = 'Cleaning'" in c[0][0]
+                for c in mock_cursor.execute.call_args_list
+            )
+
+        client.get(f"/api/search/safety?expand=true&start_time={day}")
+        client.get(f"/api/search/safety?expand=true&start_time={day}T06:00")
+        assert index_builds() == 1
+
+        mock_cursor.fetchone.return_value = None
+        client.delete("/api/maintenance/1")
+        client.get(f"/api/search/safety?expand=true&start_time={day}T07:00")
+        assert index_builds() == 2
+
+    def test_offset_start_time(self, client, mock_get_db_connection):
+        """Test a start_time with a UTC offset is compared as local time."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [self._task()]
+
+        response = client.get(
+            "/api/search/safety?expand=1&start_time=2025-01-01T00:00%2B08:00"
+        )
+
+        assert response.status_code == 200
+
+    def test_window_too_long(self, client, mock_get_db_connection):
+        """Test very long expansion windows are rejected."""
+        response = client.get(
+            "/api/search/safety?expand=true&start_time=2024-01-01&end_time=2026-01-01"
+        )
+
+        assert response.status_code == 400
+
+
 class TestBuildingSupervisionEndpoints:
     """Tests for /api/building-supervision endpoints."""
 
@@ -328,3 +645,25 @@ class TestBulkImportEndpoint:
         )
 
         assert response.status_code == 400
+
+    def test_bulk_import_profiles_enforces_quota(self, client, mock_get_db_connection):
+        """Test importing profiles stops and rolls back at a role's quota."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = {"max_current": 10}
+
+        response = client.post(
+            "/api/import",
+            data=json.dumps(
+                {
+                    "entity": "profiles",
+                    "items": [{"personal_id": "P009", "job_role": "Mid-level Manager"}],
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert "Limit reached" in json.loads(response.data)["error"]
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
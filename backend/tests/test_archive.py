@@ -0,0 +1,77 @@
+"""
+Unit tests for backend/archive.py and the archive batch in the API.
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app import REPORT_QUERIES, archive_maintenance
+from archive import candidates, roll_up
+
+
+def _statements(cursor):
+    return [c[0][0] for c in cursor.execute.call_args_list]
+
+
+class TestArchive:
+    """Tests for the archive statements."""
+
+    def test_candidates_oldest_first(self):
+        """Test tasks are picked by end_time in locked batches."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [{"id": 3}, {"id": 9}]
+
+        assert candidates(cursor, datetime(2023, 1, 1), 500) == [3, 9]
+        sql, params = cursor.execute.call_args[0]
+        assert "WHERE end_time < %s ORDER BY end_time LIMIT %s FOR UPDATE" in sql
+        assert params == (datetime(2023, 1, 1), 500)
+
+    def test_roll_up_before_copy(self):
+        """Test the batch is counted into the rollups, then copied."""
+        cursor = MagicMock()
+
+        roll_up(cursor, [3, 9])
+
+        rollup, copy = _statements(cursor)
+        assert "INSERT INTO MaintenanceRollup" in rollup
+        assert "task_count = task_count + VALUES(task_count)" in rollup
+        assert "INSERT INTO MaintenanceArchive" in copy
+        assert cursor.execute.call_args[0][1] == (3, 9)
+
+    def test_reports_include_rollups(self):
+        """Test both maintenance reports read the rollups."""
+        assert "MaintenanceRollup" in REPORT_QUERIES["maintenance-summary"]
+        assert "MaintenanceRollup" in REPORT_QUERIES["maintenance-frequency"]
+
+
+class TestArchiveBatch:
+    """Tests for the batch run by the archive worker."""
+
+    def test_batch_moves_and_deletes(self, mock_get_db_connection):
+        """Test one batch rolls up, copies and deletes in one transaction."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.side_effect = [[{"id": 3}, {"id": 9}], []]
+        mock_cursor.rowcount = 2
+
+        assert archive_maintenance() == 2
+
+        statements = _statements(mock_cursor)
+        order = [
+            next(i for i, s in enumerate(statements) if marker in s)
+            for marker in (
+                "INSERT INTO MaintenanceRollup",
+                "INSERT INTO MaintenanceArchive",
+                "DELETE FROM Maintenance",
+            )
+        ]
+        assert order == sorted(order)
+        mock_conn.commit.assert_called_once()
+
+    def test_nothing_to_archive(self, mock_get_db_connection):
+        """Test an empty batch writes nothing."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        assert archive_maintenance() == 0
+
+        mock_conn.commit.assert_not_called()
@@ -0,0 +1,144 @@
+"""
+Unit tests for backend/batch.py and the /api/batch endpoint.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from app import change_feed
+from batch import MAX_OPERATIONS, BatchError, parse_operations
+
+
+def _post_batch(client, operations):
+    return client.post(
+        "/api/batch",
+        data=json.dumps({"operations": operations}),
+        content_type="application/json",
+    )
+
+
+class TestParseOperations:
+    """Tests for validating the batch body."""
+
+    def test_valid(self):
+        """Test methods are normalized and bodies passed through."""
+        operations = parse_operations(
+            {"operations": [{"method": "post", "path": "/api/persons", "body": {}}]}
+        )
+
+        assert operations == [("POST", "/api/persons", {})]
+
+    @pytest.mark.parametrize(
+        "operations",
+        [
+            [],
+            [{"method": "GET", "path": "/api/persons"}],
+            [{"method": "POST", "path": "persons"}],
+            [{"method": "DELETE", "path": "/api/persons/P1"}] * (MAX_OPERATIONS + 1),
+        ],
+    )
+    def test_invalid(self, operations):
+        """Test empty, read-only, relative and oversized batches are rejected."""
+        with pytest.raises(BatchError):
+            parse_operations({"operations": operations})
+
+
+class TestBatchEndpoint:
+    """Tests for /api/batch."""
+
+    @pytest.fixture
+    def subscriber(self):
+        subscriber = change_feed.subscribe()
+        yield subscriber
+        change_feed.unsubscribe(subscriber)
+
+    def test_operations_share_one_transaction(
+        self, client, mock_get_db_connection, sample_person, sample_affiliation
+    ):
+        """Test all operations run on one connection with a single commit."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        with patch("app.get_db_connection", return_value=mock_conn) as connect:
+            response = _post_batch(
+                client,
+                [
+                    {"method": "POST", "path": "/api/persons", "body": sample_person},
+                    {
+                        "method": "POST",
+                        "path": "/api/affiliations",
+                        "body": sample_affiliation,
+                    },
+                ],
+            )
+
+        assert response.status_code == 200
+        results = json.loads(response.data)["results"]
+        assert [r["status"] for r in results] == [201, 201]
+        assert results[0]["body"] == {"message": "Person created"}
+        connect.assert_called_once()
+        mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called_once()
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert statements.count("SAVEPOINT batch_operation") == 2
+
+    def test_events_published_after_commit(
+        self, client, mock_get_db_connection, sample_person, subscriber
+    ):
+        """Test change events are only sent once the batch committed."""
+        _post_batch(
+            client, [{"method": "POST", "path": "/api/persons", "body": sample_person}]
+        )
+
+        events = subscriber.wait(0)
+        assert [(e["table"], e["op"]) for e in events] == [("Person", "insert")]
+
+    def test_failure_rolls_back_everything(
+        self, client, mock_get_db_connection, sample_person, subscriber
+    ):
+        """Test a failing operation aborts the batch without committing."""
+        mock_conn, mock_cursor = mock_get_db_connection
+
+        response = _post_batch(
+            client,
+            [
+                {"method": "POST", "path": "/api/persons", "body": sample_person},
+                {"method": "POST", "path": "/api/profiles", "body": {}},
+                {"method": "POST", "path": "/api/persons", "body": sample_person},
+            ],
+        )
+
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data["failed"] == 1
+        assert [r["status"] for r in data["results"]] == [201, 400]
+        mock_conn.commit.assert_not_called()
+        mock_conn.rollback.assert_called_once()
+        assert subscriber.wait(0) == []
+
+    def test_view_rollback_undoes_its_operation(self, client, mock_get_db_connection):
+        """Test a view's own rollback returns to the operation's savepoint."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = None
+
+        response = _post_batch(
+            client, [{"method": "DELETE", "path": "/api/persons/P404"}]
+        )
+
+        assert response.status_code == 404
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "ROLLBACK TO SAVEPOINT batch_operation" in statements
+
+    def test_excluded_and_unknown_paths(self, client, mock_get_db_connection):
+        """Test raw SQL cannot be batched and unknown paths fail the batch."""
+        query = _post_batch(
+            client, [{"method": "POST", "path": "/api/query", "body": {}}]
+        )
+        unknown = _post_batch(client, [{"method": "POST", "path": "/api/nothing"}])
+
+        assert query.status_code == 400
+        assert (
+            "cannot be used in a batch"
+            in json.loads(query.data)["results"][0]["body"]["error"]
+        )
+        assert unknown.status_code == 404
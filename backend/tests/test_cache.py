@@ -0,0 +1,181 @@
+"""
+Unit tests for backend/cache.py and the cached GET endpoints.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from app import LAST_WRITE_COOKIE
+from cache import InProcessCache, NullCache, ResponseCache, SQLiteCache
+
+
+class TestCacheBackends:
+    """Tests for the individual cache backends."""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def backend(self, request, tmp_path):
+        if request.param == "sqlite":
+            return SQLiteCache(tmp_path / "cache.sqlite3")
+        return InProcessCache()
+
+    def test_set_and_get(self, backend):
+        """Test a stored value is returned until it expires."""
+        backend.set("k", b"value", ttl=60)
+        assert backend.get("k") == b"value"
+
+    def test_expired_value_is_a_miss(self, backend):
+        """Test values past their TTL are not returned."""
+        backend.set("k", b"value", ttl=-1)
+        assert backend.get("k") is None
+
+    def test_counters(self, backend):
+        """Test counters start at zero and increment."""
+        assert backend.get_counters(["a", "b"]) == [0, 0]
+        backend.incr("a")
+        backend.incr("a")
+        assert backend.get_counters(["a", "b"]) == [2, 0]
+
+    def test_clear(self, backend):
+        """Test clear removes values and counters."""
+        backend.set("k", b"value", ttl=60)
+        backend.incr("a")
+        backend.clear()
+        assert backend.get("k") is None
+        assert backend.get_counters(["a"]) == [0]
+
+    def test_null_cache_never_hits(self):
+        """Test the null backend stores nothing."""
+        backend = NullCache()
+        backend.set("k", b"value", ttl=60)
+        assert backend.get("k") is None
+
+
+class TestSharedSQLiteCache:
+    """Tests that two workers sharing a SQLite file see the same cache."""
+
+    def test_hits_and_invalidations_are_shared(self, tmp_path):
+        """Test an entry written by one worker is invalidated by another."""
+        path = tmp_path / "shared.sqlite3"
+        worker_a = ResponseCache(SQLiteCache(path))
+        worker_b = ResponseCache(SQLiteCache(path))
+
+        key_a = worker_a.make_key("maintenance", ("Maintenance",), ())
+        worker_a.set(key_a, b"[1]")
+
+        key_b = worker_b.make_key("maintenance", ("Maintenance",), ())
+        assert worker_b.get(key_b) == b"[1]"
+
+        worker_b.invalidate("Maintenance")
+        key_a = worker_a.make_key("maintenance", ("Maintenance",), ())
+        assert worker_a.get(key_a) is None
+
+
+class TestCachedEndpoints:
+    """Tests for response caching on list endpoints."""
+
+    def test_second_get_is_served_from_cache(self, client, mock_get_db_connection):
+        """Test repeated GETs only query the database once."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [{"department": "COMP"}]
+
+        first = client.get("/api/schools")
+        second = client.get("/api/schools")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert json.loads(second.data) == [{"department": "COMP"}]
+        assert mock_cursor.fetchall.call_count == 1
+
+    def test_write_invalidates_cached_list(
+        self, client, mock_get_db_connection, sample_school
+    ):
+        """Test a POST to the same table forces the next GET to the database."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        client.get("/api/schools")
+        client.post(
+            "/api/schools",
+            data=json.dumps(sample_school),
+            content_type="application/json",
+        )
+        client.delete_cookie(LAST_WRITE_COOKIE)
+        response = client.get("/api/schools")
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert mock_cursor.fetchall.call_count == 2
+
+    @pytest.mark.parametrize("report", ["activities-summary", "maintenance-frequency"])
+    def test_location_write_invalidates_filtered_report(
+        self, client, mock_get_db_connection, sample_location, report
+    ):
+        """Test reports filtered by building drop entries on Location writes."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        client.get(f"/api/reports/{report}?building=Block A")
+        client.post(
+            "/api/locations",
+            data=json.dumps(sample_location),
+            content_type="application/json",
+        )
+        client.delete_cookie(LAST_WRITE_COOKIE)
+        response = client.get(f"/api/reports/{report}?building=Block A")
+
+        assert response.headers["X-Cache"] == "MISS"
+
+    def test_writer_bypasses_cache(self, client, mock_get_db_connection, sample_school):
+        """Test a client that just wrote neither reads nor fills the cache."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        client.post(
+            "/api/schools",
+            data=json.dumps(sample_school),
+            content_type="application/json",
+        )
+        client.get("/api/schools")
+        response = client.get("/api/schools")
+
+        assert "X-Cache" not in response.headers
+        assert mock_cursor.fetchall.call_count == 2
+
+    @patch.dict("os.environ", {"DB_REPLICA_HOSTS": "replica1"})
+    def test_replica_read_after_write_is_not_cached(
+        self, client, mock_get_db_connection, sample_school
+    ):
+        """Test replica reads within the lag window of a write are not stored."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        client.post(
+            "/api/schools",
+            data=json.dumps(sample_school),
+            content_type="application/json",
+        )
+        client.delete_cookie(LAST_WRITE_COOKIE)
+        client.get("/api/schools")
+        response = client.get("/api/schools")
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert mock_cursor.fetchall.call_count == 2
+
+    def test_query_string_is_part_of_key(self, client, mock_get_db_connection):
+        """Test different filters are cached separately."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        client.get("/api/persons")
+        response = client.get("/api/persons?role=Mid-level Manager")
+
+        assert response.headers["X-Cache"] == "MISS"
+
+    def test_errors_are_not_cached(self, client):
+        """Test failed responses are not stored."""
+        with patch("app.get_db_connection", return_value=None):
+            client.get("/api/schools")
+            response = client.get("/api/schools")
+
+        assert response.status_code == 500
+        assert "X-Cache" not in response.headers
@@ -0,0 +1,180 @@
+"""
+Unit tests for backend/cascade.py and the /api/bulk-delete endpoint.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from cascade import (
+    MAX_IDS,
+    PLANS,
+    CascadeBlocked,
+    CascadeError,
+    Step,
+    delete,
+    impact,
+    parse_ids,
+)
+
+
+def _statements(cursor):
+    return [c[0][0] for c in cursor.execute.call_args_list]
+
+
+def _post_delete(client, body):
+    return client.post(
+        "/api/bulk-delete", data=json.dumps(body), content_type="application/json"
+    )
+
+
+class TestPlans:
+    """Tests for the generated statements."""
+
+    def test_step_expands_every_id_list(self):
+        """Test each {ids} gets one placeholder per id and its own params."""
+        step = Step("Person", "detach", "a IN ({ids}) AND b NOT IN ({ids})", "a")
+
+        assert step.sql(["P1", "P2"]) == (
+            "UPDATE Person SET a = NULL WHERE a IN (%s, %s) AND b NOT IN (%s, %s)"
+        )
+        assert step.params(["P1", "P2"]) == ("P1", "P2", "P1", "P2")
+
+    def test_person_plan_covers_all_references(self):
+        """Test every table referencing Person is resolved by the plan."""
+        tables = {step.table for step in PLANS["persons"].steps}
+
+        assert {
+            "Participation",
+            "Activity",
+            "Affiliation",
+            "Profile",
+            "BuildingSupervision",
+            "Person",
+        } <= tables
+
+    @pytest.mark.parametrize(
+        "ids", [[], "P1", [True], [{"id": 1}], ["P1"] * (MAX_IDS + 1)]
+    )
+    def test_invalid_ids(self, ids):
+        """Test empty, non-list, non-scalar and oversized id lists are rejected."""
+        with pytest.raises(CascadeError):
+            parse_ids(ids)
+
+    def test_duplicate_ids_collapsed(self):
+        """Test repeated ids are deleted once, order kept."""
+        assert parse_ids(["P2", "P1", "P2"]) == ["P2", "P1"]
+
+
+class TestDelete:
+    """Tests for running a plan."""
+
+    def test_person_statements_in_dependency_order(self):
+        """Test dependents go first and the persons last, one statement each."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        cursor.rowcount = 2
+
+        result = delete(cursor, "persons", ["P1", "P2"])
+
+        writes = [
+            s.split(" WHERE")[0]
+            for s in _statements(cursor)
+            if s.startswith(("DELETE", "UPDATE Person"))
+        ]
+        assert writes == [
+            "DELETE FROM Participation",
+            "DELETE FROM Activity",
+            "DELETE FROM Affiliation",
+            "DELETE FROM Profile",
+            "DELETE FROM BuildingSupervision",
+            "UPDATE Person SET supervisor_id = NULL",
+            "UPDATE Person SET supervisor_id = NULL",
+            "DELETE FROM Person",
+        ]
+        assert result["deleted"] == 2
+        assert len(result["dependents"]) == 6
+
+    def test_restrict_blocks_before_any_change(self):
+        """Test a restricting dependent raises before anything is written."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = {"count": 3}
+
+        with pytest.raises(CascadeBlocked) as info:
+            delete(cursor, "locations", [1, 2])
+
+        assert info.value.blockers[0]["table"] == "Maintenance"
+        assert info.value.blockers[0]["rows"] == 3
+        assert all(s.startswith("SELECT") for s in _statements(cursor))
+
+    def test_impact_counts_without_writing(self):
+        """Test a dry run only counts matched rows and dependents."""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [{"count": 2}, {"count": 1}, {"count": 4}]
+
+        result = impact(cursor, "locations", [1, 2])
+
+        assert result["matched"] == 2
+        assert result["blocked"] is True
+        assert [d["rows"] for d in result["dependents"]] == [1, 4]
+        assert all(s.startswith("SELECT") for s in _statements(cursor))
+
+
+class TestBulkDeleteEndpoint:
+    """Tests for /api/bulk-delete."""
+
+    def test_bulk_delete(self, client, mock_get_db_connection):
+        """Test many rows are deleted in one transaction with one commit."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.rowcount = 2
+
+        response = _post_delete(client, {"entity": "activities", "ids": ["A1", "A2"]})
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["deleted"] == 2
+        assert data["dependents"][0]["table"] == "Participation"
+        mock_conn.commit.assert_called_once()
+
+    def test_dry_run_changes_nothing(self, client, mock_get_db_connection):
+        """Test dry_run returns counts and never commits."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"count": 1}
+
+        response = _post_delete(
+            client, {"entity": "schools", "ids": ["COMP"], "dry_run": True}
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["matched"] == 1
+        assert data["blocked"] is False
+        mock_conn.commit.assert_not_called()
+
+    def test_blocked_delete(self, client, mock_get_db_connection):
+        """Test restricting dependents are reported and rolled back."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = {"count": 5}
+
+        response = _post_delete(client, {"entity": "locations", "ids": [1]})
+
+        assert response.status_code == 400
+        assert json.loads(response.data)["blockers"][0]["table"] == "Maintenance"
+        mock_conn.commit.assert_not_called()
+
+    def test_nothing_matched(self, client, mock_get_db_connection):
+        """Test a delete of unknown ids is a 404."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.rowcount = 0
+
+        response = _post_delete(client, {"entity": "maintenance", "ids": [7]})
+
+        assert response.status_code == 404
+        mock_conn.commit.assert_not_called()
+
+    def test_invalid_request(self, client):
+        """Test unknown entities and bad id lists are rejected."""
+        assert _post_delete(client, {"entity": "users", "ids": [1]}).status_code == 400
+        assert _post_delete(client, {"entity": "persons", "ids": []}).status_code == 400
@@ -0,0 +1,164 @@
+"""
+Unit tests for backend/changefeed.py and the change feed endpoint.
+"""
+
+import json
+
+import pytest
+from app import change_feed
+from changefeed import RESET, ChangeFeed, TooManySubscribers, format_event
+
+
+def _change(key):
+    return {"table": "Person", "op": "insert", "key": key, "version": 1}
+
+
+class TestChangeFeed:
+    """Tests for the broadcast queue."""
+
+    def test_publish_reaches_every_subscriber(self):
+        """Test each client receives the events in order with fresh ids."""
+        feed = ChangeFeed()
+        first, second = feed.subscribe(), feed.subscribe()
+
+        feed.publish([_change("P001"), _change("P002")])
+
+        for subscriber in (first, second):
+            events = subscriber.wait(0)
+            assert [e["key"] for e in events] == ["P001", "P002"]
+            assert [e["id"] for e in events] == [1, 2]
+        assert first.wait(0) == []
+
+    def test_slow_client_is_reset(self):
+        """Test a full queue drops its events and yields one reset."""
+        feed = ChangeFeed(queue_size=2)
+        slow = feed.subscribe()
+
+        feed.publish([_change("P001"), _change("P002")])
+        feed.publish([_change("P003")])
+
+        assert slow.wait(0) == [RESET]
+        feed.publish([_change("P004")])
+        assert [e["key"] for e in slow.wait(0)] == ["P004"]
+
+    def test_resume_from_last_event_id(self):
+        """Test a reconnecting client is sent only what it missed."""
+        feed = ChangeFeed()
+        feed.publish([_change("P001"), _change("P002"), _change("P003")])
+
+        subscriber = feed.subscribe(last_event_id=1)
+
+        assert [e["id"] for e in subscriber.wait(0)] == [2, 3]
+
+    def test_resume_outside_history_resets(self):
+        """Test an evicted or unknown event id cannot be resumed."""
+        feed = ChangeFeed(history_size=2)
+        feed.publish([_change("P001"), _change("P002"), _change("P003")])
+
+        assert feed.subscribe(last_event_id=0).wait(0) == [RESET]
+        assert feed.subscribe(last_event_id=99).wait(0) == [RESET]
+
+    def test_subscriber_limit(self):
+        """Test clients beyond max_subscribers are refused."""
+        feed = ChangeFeed(max_subscribers=1)
+        subscriber = feed.subscribe()
+
+        with pytest.raises(TooManySubscribers):
+            feed.subscribe()
+        feed.unsubscribe(subscriber)
+        feed.subscribe()
+
+    def test_format_event(self):
+        """Test events render as SSE messages with id and data lines."""
+        event = {"id": 7, **_change("P001")}
+
+        assert format_event(event, json.dumps) == (
+            'id: 7\ndata: {"id": 7, "table": "Person", "op": "insert", '
+            '"key": "P001", "version": 1}\n\n'
+        )
+        assert format_event(RESET, json.dumps).startswith("event: reset\n")
+
+
+class TestChangeFeedEndpoint:
+    """Tests for /api/changes/stream and the events writes publish."""
+
+    @pytest.fixture
+    def subscriber(self):
+        subscriber = change_feed.subscribe()
+        yield subscriber
+        change_feed.unsubscribe(subscriber)
+
+    def test_create_publishes_insert(
+        self, client, mock_get_db_connection, sample_person, subscriber
+    ):
+        """Test a created row is announced with its key and table version."""
+        client.post(
+            "/api/persons",
+            data=json.dumps(sample_person),
+            content_type="application/json",
+        )
+
+        (event,) = subscriber.wait(0)
+        assert event["table"] == "Person"
+        assert event["op"] == "insert"
+        assert event["key"] == "P001"
+        assert event["version"] >= 1
+
+    def test_cascaded_tables_are_invalidated(
+        self, client, mock_get_db_connection, subscriber
+    ):
+        """Test tables a delete cascades into get key-less invalidate events."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.return_value = {"count": 0}
+        mock_cursor.rowcount = 1
+
+        client.delete("/api/locations/7")
+
+        events = {e["table"]: e for e in subscriber.wait(0)}
+        assert events["Location"]["op"] == "delete"
+        assert events["Location"]["key"] == "7"
+        assert events["Activity"]["op"] == "invalidate"
+        assert events["Activity"]["key"] is None
+
+    def test_large_import_is_one_event(
+        self, client, mock_get_db_connection, subscriber
+    ):
+        """Test bulk imports above the row limit publish a table event."""
+        items = [{"room": str(n), "building": "Block A"} for n in range(101)]
+
+        client.post(
+            "/api/import",
+            data=json.dumps({"entity": "locations", "items": items}),
+            content_type="application/json",
+        )
+
+        (event,) = subscriber.wait(0)
+        assert event["table"] == "Location"
+        assert event["op"] == "invalidate"
+        assert event["key"] is None
+
+    def test_stream_replays_missed_events(self, client):
+        """Test the stream starts with the events after Last-Event-ID."""
+        (event,) = change_feed.publish([_change("P009")])
+        clients = change_feed.subscriber_count
+
+        response = client.get(
+            "/api/changes/stream", headers={"Last-Event-ID": str(event["id"] - 1)}
+        )
+        chunks = response.iter_encoded()
+        assert next(chunks).startswith(b"retry:")
+        message = next(chunks).decode()
+        response.close()
+
+        assert response.mimetype == "text/event-stream"
+        assert change_feed.subscriber_count == clients
+        id_line, data_line = message.strip().split("\n")
+        assert id_line == f"id: {event['id']}"
+        assert json.loads(data_line[len("data: ") :])["key"] == "P009"
+
+    def test_invalid_last_event_id(self, client):
+        """Test a non-numeric Last-Event-ID is rejected."""
+        response = client.get("/api/changes/stream?last_event_id=abc")
+
+        assert response.status_code == 400
@@ -0,0 +1,144 @@
+"""
+Unit tests for backend/changelog.py and the /api/changes endpoint.
+"""
+
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, call
+
+from changelog import INSERT_SQL, LOCK_SQL, read, record
+
+
+def _row(seq, key='"P001"', op="insert"):
+    return {
+        "seq": seq,
+        "table_name": "Person",
+        "op": op,
+        "row_key": key,
+        "changed_at": datetime(2024, 1, 1, 9),
+    }
+
+
+class TestChangeLog:
+    """Tests for appending to and reading the log."""
+
+    def test_record_locks_then_appends(self):
+        """Test entries are inserted in one batch after taking the head lock."""
+        cursor = MagicMock()
+
+        record(
+            cursor,
+            [
+                (
+                    "Participation",
+                    "insert",
+                    {"personal_id": "P001", "activity_id": "A1"},
+                ),
+                ("Activity", "invalidate", None),
+            ],
+        )
+
+        cursor.execute.assert_called_once_with(LOCK_SQL)
+        cursor.executemany.assert_called_once_with(
+            INSERT_SQL,
+            [
+                (
+                    "Participation",
+                    "insert",
+                    '{"personal_id": "P001", "activity_id": "A1"}',
+                ),
+                ("Activity", "invalidate", None),
+            ],
+        )
+
+    def test_record_nothing(self):
+        """Test an empty write takes no lock."""
+        cursor = MagicMock()
+
+        record(cursor, [])
+
+        cursor.execute.assert_not_called()
+
+    def test_read_pages(self):
+        """Test one extra row is fetched to tell whether more follow."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [_row(4), _row(5, None, "invalidate")]
+
+        changes, has_more = read(cursor, 3, limit=1)
+
+        assert cursor.execute.call_args[0][1] == (3, 2)
+        assert has_more
+        assert changes == [
+            {
+                "seq": 4,
+                "table": "Person",
+                "op": "insert",
+                "key": "P001",
+                "changed_at": datetime(2024, 1, 1, 9),
+            }
+        ]
+
+
+class TestChangesEndpoint:
+    """Tests for /api/changes and logging in write handlers."""
+
+    def test_list_changes(self, client, mock_get_db_connection):
+        """Test GET /api/changes returns entries and the next cursor."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [_row(11), _row(12)]
+
+        response = client.get("/api/changes?since=10&limit=5")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [c["seq"] for c in data["changes"]] == [11, 12]
+        assert data["next"] == 12
+        assert data["has_more"] is False
+
+    def test_empty_page_keeps_cursor(self, client, mock_get_db_connection):
+        """Test a caught-up consumer gets its own cursor back."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        data = json.loads(client.get("/api/changes?since=42").data)
+
+        assert data == {"changes": [], "next": 42, "has_more": False}
+
+    def test_invalid_parameters(self, client):
+        """Test non-numeric or out-of-range parameters are rejected."""
+        assert client.get("/api/changes?since=abc").status_code == 400
+        assert client.get("/api/changes?limit=0").status_code == 400
+        assert client.get("/api/changes?since=-1").status_code == 400
+
+    def test_write_is_logged_before_commit(
+        self, client, mock_get_db_connection, sample_school
+    ):
+        """Test a create appends its log entry in the same transaction."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        events = MagicMock()
+        events.attach_mock(mock_cursor.executemany, "executemany")
+        events.attach_mock(mock_conn.commit, "commit")
+
+        client.post(
+            "/api/schools",
+            data=json.dumps(sample_school),
+            content_type="application/json",
+        )
+
+        assert events.mock_calls == [
+            call.executemany(INSERT_SQL, [("School", "insert", '"COMP"')]),
+            call.commit(),
+        ]
+
+    def test_missing_row_is_not_logged(self, client, mock_get_db_connection):
+        """Test a delete of an unknown row is rolled back without a log entry."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = {"count": 0}
+
+        response = client.delete("/api/locations/99")
+
+        assert response.status_code == 404
+        mock_cursor.executemany.assert_not_called()
+        mock_conn.commit.assert_not_called()
+        mock_conn.rollback.assert_called_once()
@@ -147,3 +147,123 @@ class TestInitDb:
 
         # Should try to create database
         assert mock_connect.called
+
+
+class TestReplicaConnection:
+    """Tests for read-replica connections."""
+
+    @patch.dict("os.environ", {"DB_REPLICA_HOSTS": ""})
+    @patch("db.mysql.connector.connect")
+    def test_read_only_without_replicas_uses_primary(self, mock_connect):
+        """Test read-only connections fall back to DB_HOST."""
+        from db import get_db_connection
+
+        get_db_connection(read_only=True)
+
+        assert mock_connect.call_count == 1
+        assert "port" not in mock_connect.call_args.kwargs
+
+    @patch.dict("os.environ", {"DB_REPLICA_HOSTS": "replica1, replica2:3307"})
+    @patch("db.mysql.connector.connect")
+    def test_replicas_used_round_robin(self, mock_connect):
+        """Test read-only connections rotate over DB_REPLICA_HOSTS."""
+        from db import get_db_connection
+
+        get_db_connection(read_only=True)
+        get_db_connection(read_only=True)
+
+        hosts = {
+            (c.kwargs["host"], c.kwargs["port"]) for c in mock_connect.call_args_list
+        }
+        assert hosts == {("replica1", 3306), ("replica2", 3307)}
+
+    @patch.dict("os.environ", {"DB_REPLICA_HOSTS": "replica1", "DB_HOST": "primary"})
+    @patch("db.mysql.connector.connect")
+    def test_unreachable_replica_falls_back_to_primary(self, mock_connect):
+        """Test a failed replica connection retries on the primary."""
+        from db import get_db_connection
+        from mysql.connector import Error
+
+        primary = MagicMock()
+        mock_connect.side_effect = [Error("replica down"), primary]
+
+        assert get_db_connection(read_only=True) is primary
+        assert mock_connect.call_args.kwargs["host"] == "primary"
+
+    @patch.dict("os.environ", {"DB_REPLICA_HOSTS": "replica1"})
+    @patch("db.mysql.connector.connect")
+    def test_writes_never_use_replicas(self, mock_connect):
+        """Test the default connection always goes to the primary."""
+        from db import get_db_connection
+
+        get_db_connection()
+
+        assert mock_connect.call_args.kwargs["host"] != "replica1"
+
+
+class TestReadReplicaRouting:
+    """Tests for choosing replica or primary connections per request."""
+
+    def test_get_requests_read_from_replica(self, client):
+        """Test list GETs ask for a read-only connection."""
+        with patch("app.get_db_connection") as mock_get_conn:
+            mock_get_conn.return_value.cursor.return_value.fetchall.return_value = []
+            client.get("/api/schools")
+
+        mock_get_conn.assert_called_once_with(read_only=True)
+
+    def test_writes_use_primary_and_set_cookie(self, client, sample_school):
+        """Test a write uses the primary and pins the client to it."""
+        import json
+
+        with patch("app.get_db_connection") as mock_get_conn:
+            mock_get_conn.return_value.cursor.return_value.fetchall.return_value = []
+            response = client.post(
+                "/api/schools",
+                data=json.dumps(sample_school),
+                content_type="application/json",
+            )
+            mock_get_conn.assert_called_once_with()
+            assert "cmms_last_write=" in response.headers["Set-Cookie"]
+
+            mock_get_conn.reset_mock()
+            client.get("/api/schools?limit=1")
+            mock_get_conn.assert_called_once_with()
+
+    def test_stale_write_cookie_reads_from_replica(self, client):
+        """Test reads go back to the replica after the window has passed."""
+        client.set_cookie("cmms_last_write", "1000.0")
+
+        with patch("app.get_db_connection") as mock_get_conn:
+            mock_get_conn.return_value.cursor.return_value.fetchall.return_value = []
+            client.get("/api/schools")
+
+        mock_get_conn.assert_called_once_with(read_only=True)
+
+    def test_select_query_reads_from_replica(self, client):
+        """Test Dev Console SELECTs use a replica and writes the primary."""
+        import json
+
+        with patch("app.get_db_connection") as mock_get_conn:
+            mock_get_conn.return_value.cursor.return_value.fetchmany.return_value = []
+            client.post(
+                "/api/query",
+                data=json.dumps({"query": "SELECT 1"}),
+                content_type="application/json",
+            )
+            mock_get_conn.assert_called_once_with(read_only=True)
+
+    def test_credentials_only_for_configured_origins(self, client):
+        """Test the write cookie is not shared with unlisted origins."""
+        from app import CORS_ORIGINS
+
+        with patch("app.get_db_connection") as mock_get_conn:
+            mock_get_conn.return_value.cursor.return_value.fetchall.return_value = []
+            allowed = client.get("/api/schools", headers={"Origin": CORS_ORIGINS[0]})
+            other = client.get(
+                "/api/schools", headers={"Origin": "https://evil.example"}
+            )
+
+        assert allowed.headers["Access-Control-Allow-Origin"] == CORS_ORIGINS[0]
+        assert allowed.headers["Access-Control-Allow-Credentials"] == "true"
+        assert "Access-Control-Allow-Origin" not in other.headers
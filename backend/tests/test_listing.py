@@ -0,0 +1,189 @@
+"""
+Unit tests for backend/listing.py and the list endpoint query parameters.
+"""
+
+import json
+
+import pytest
+from listing import LIST_SPECS, MAX_LIMIT, ListingError, parse_page
+from werkzeug.datastructures import MultiDict
+
+
+class TestListSpec:
+    """Tests for building list SELECT statements."""
+
+    def test_default_selects_all_fields(self):
+        """Test an empty fields parameter selects every whitelisted field."""
+        spec = LIST_SPECS["maintenance"]
+        sql, params = spec.build(spec.parse_fields(None))
+        assert "m.maintenance_id AS maintenance_id" in sql
+        assert "l.campus AS campus" in sql
+        assert "JOIN Location l" in sql
+        assert params == ()
+
+    def test_unknown_field_rejected(self):
+        """Test fields outside the whitelist raise ListingError."""
+        with pytest.raises(ListingError):
+            LIST_SPECS["maintenance"].parse_fields("type,password")
+
+    def test_narrow_select_drops_unused_join(self):
+        """Test joins are omitted when no requested field needs them."""
+        spec = LIST_SPECS["maintenance"]
+        sql, _ = spec.build(spec.parse_fields("maintenance_id, type"))
+        assert sql == (
+            "SELECT m.maintenance_id AS maintenance_id, m.type AS type "
+            "FROM Maintenance m"
+        )
+
+    def test_join_dependencies_are_included(self):
+        """Test a join pulls in the joins it references."""
+        spec = LIST_SPECS["participations"]
+        sql, _ = spec.build(spec.parse_fields("personal_id,room"))
+        assert "JOIN Activity a" in sql
+        assert "LEFT JOIN Location l" in sql
+
+    def test_soft_deleted_rows_excluded(self):
+        """Test specs over persons and activities keep only live rows."""
+        spec = LIST_SPECS["participations"]
+        sql, _ = spec.build(spec.parse_fields("personal_id,room"))
+        # The predicate needs the Person join even though no field does.
+        assert "JOIN Person per" in sql
+        assert "WHERE per.deleted_at IS NULL AND a.deleted_at IS NULL" in sql
+
+    def test_required_join_always_kept(self):
+        """Test non-optional joins stay even when no field references them."""
+        spec = LIST_SPECS["persons-by-role"]
+        sql, params = spec.build(spec.parse_fields("name"), params=("Manager",))
+        assert "JOIN Profile pr" in sql
+        assert "WHERE pr.job_role = %s" in sql
+        assert params == ("Manager",)
+
+    def test_duplicate_fields_collapsed(self):
+        """Test repeated field names are selected once."""
+        assert LIST_SPECS["schools"].parse_fields("faculty,faculty") == ["faculty"]
+
+
+class TestFieldsParameter:
+    """Tests for ?fields= on the list endpoints."""
+
+    def test_fields_narrow_query(self, client, mock_get_db_connection):
+        """Test GET /api/maintenance?fields= only selects requested columns."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = [{"maintenance_id": 1, "type": "Repair"}]
+
+        response = client.get("/api/maintenance?fields=maintenance_id,type")
+
+        assert response.status_code == 200
+        sql = mock_cursor.execute.call_args[0][0]
+        assert "JOIN" not in sql
+        assert json.loads(response.data) == [{"maintenance_id": 1, "type": "Repair"}]
+
+    def test_unknown_field_returns_400(self, client, mock_get_db_connection):
+        """Test GET /api/profiles with an unknown field is rejected."""
+        response = client.get("/api/profiles?fields=name,salary")
+
+        assert response.status_code == 400
+        assert "salary" in json.loads(response.data)["error"]
+
+    def test_role_filter_with_fields(self, client, mock_get_db_connection):
+        """Test GET /api/persons?role=...&fields=... keeps the role filter."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get("/api/persons?role=Mid-level Manager&fields=name")
+
+        assert response.status_code == 200
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "pr.job_role = %s" in sql
+        assert params == ("Mid-level Manager",)
+
+
+class TestFilterGrammar:
+    """Tests for filter, sort and paging parameters."""
+
+    def test_equality_and_in_filters(self):
+        """Test eq and in filters become parameterized predicates."""
+        args = MultiDict([("type", "Cleaning"), ("location_id__in", "1,2,3")])
+        predicates, params = LIST_SPECS["maintenance"].parse_filters(args)
+        assert predicates == ["m.type = %s", "m.location_id IN (%s, %s, %s)"]
+        assert params == ["Cleaning", "1", "2", "3"]
+
+    def test_date_range_filters(self):
+        """Test range operators on date columns."""
+        args = MultiDict(
+            [
+                ("scheduled_time__gte", "2024-01-01"),
+                ("scheduled_time__lt", "2024-02-01"),
+            ]
+        )
+        predicates, params = LIST_SPECS["maintenance"].parse_filters(args)
+        assert predicates == ["m.scheduled_time >= %s", "m.scheduled_time < %s"]
+        assert params == ["2024-01-01", "2024-02-01"]
+
+    def test_invalid_date_rejected(self):
+        """Test range filters validate their values."""
+        args = MultiDict([("scheduled_time__gte", "yesterday")])
+        with pytest.raises(ListingError):
+            LIST_SPECS["maintenance"].parse_filters(args)
+
+    def test_range_not_allowed_on_exact_filter(self):
+        """Test range operators are rejected on non-range filters."""
+        args = MultiDict([("type__gt", "A")])
+        with pytest.raises(ListingError):
+            LIST_SPECS["maintenance"].parse_filters(args)
+
+    def test_bool_filter(self):
+        """Test boolean filters accept true/false spellings."""
+        args = MultiDict([("active_chemical", "true")])
+        _, params = LIST_SPECS["maintenance"].parse_filters(args)
+        assert params == [True]
+
+    def test_unknown_filter_rejected(self):
+        """Test filters outside the whitelist raise ListingError."""
+        with pytest.raises(ListingError):
+            LIST_SPECS["maintenance"].parse_filters(MultiDict([("1=1;--", "x")]))
+
+    def test_reserved_params_ignored(self):
+        """Test listing and view parameters are not treated as filters."""
+        args = MultiDict([("fields", "type"), ("sort", "type"), ("role", "x")])
+        predicates, _ = LIST_SPECS["persons"].parse_filters(args, reserved=("role",))
+        assert predicates == []
+
+    def test_sort(self):
+        """Test sort parses directions and rejects unindexed columns."""
+        spec = LIST_SPECS["maintenance"]
+        assert spec.parse_sort("-scheduled_time,maintenance_id") == (
+            "m.scheduled_time DESC, m.maintenance_id ASC"
+        )
+        with pytest.raises(ListingError):
+            spec.parse_sort("frequency")
+
+    def test_page(self):
+        """Test limit/offset parsing and clamping."""
+        assert parse_page(MultiDict()) == (None, None)
+        assert parse_page(MultiDict([("limit", "10"), ("offset", "20")])) == (10, 20)
+        assert parse_page(MultiDict([("limit", "999999")]))[0] == MAX_LIMIT
+        with pytest.raises(ListingError):
+            parse_page(MultiDict([("limit", "-1")]))
+
+    def test_filtered_endpoint(self, client, mock_get_db_connection):
+        """Test GET /api/maintenance pushes filters, sort and paging into SQL."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.get(
+            "/api/maintenance?type=Cleaning&scheduled_time__gte=2024-01-01"
+            "&sort=-scheduled_time&limit=50"
+        )
+
+        assert response.status_code == 200
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "WHERE m.type = %s AND m.scheduled_time >= %s" in sql
+        assert "ORDER BY m.scheduled_time DESC LIMIT %s OFFSET %s" in sql
+        assert params == ("Cleaning", "2024-01-01", 50, 0)
+
+    def test_bad_filter_returns_400(self, client, mock_get_db_connection):
+        """Test invalid filters are reported to the client."""
+        response = client.get("/api/activities?organiser_id__gt=P001")
+
+        assert response.status_code == 400
@@ -0,0 +1,205 @@
+"""
+Unit tests for backend/occupancy.py bucket bookkeeping.
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from occupancy import (
+    OccupancyConflict,
+    apply_activity,
+    apply_task,
+    bucket_floor,
+    buckets,
+    check_booking,
+    check_capacity,
+    occupancy,
+    rebuild,
+)
+
+
+def _bucket(hour, minute=0, **counts):
+    row = {
+        "bucket_start": datetime(2024, 1, 1, hour, minute),
+        "activity_count": 0,
+        "participant_count": 0,
+        "maintenance_count": 0,
+        "chemical_count": 0,
+    }
+    row.update(counts)
+    return row
+
+
+class TestBuckets:
+    """Tests for mapping intervals onto buckets."""
+
+    def test_bucket_floor(self):
+        """Test times are rounded down to the 30-minute bucket."""
+        assert bucket_floor(datetime(2024, 1, 1, 9, 44)) == datetime(2024, 1, 1, 9, 30)
+        assert bucket_floor(datetime(2024, 1, 1, 9, 0)) == datetime(2024, 1, 1, 9, 0)
+
+    def test_buckets_cover_partial_slots(self):
+        """Test every bucket the interval touches is included, end exclusive."""
+        starts = buckets(datetime(2024, 1, 1, 9, 15), datetime(2024, 1, 1, 10, 30))
+
+        assert starts == [
+            datetime(2024, 1, 1, 9, 0),
+            datetime(2024, 1, 1, 9, 30),
+            datetime(2024, 1, 1, 10, 0),
+        ]
+
+
+class TestApply:
+    """Tests for incremental counter updates."""
+
+    def test_activity_counts_participants(self):
+        """Test an activity adds itself and its participants to each bucket."""
+        cursor = MagicMock()
+        activity = {
+            "location_id": 4,
+            "time": datetime(2024, 1, 1, 9),
+            "duration_minutes": 60,
+            "participants": 12,
+        }
+
+        apply_activity(cursor, activity)
+
+        sql, rows = cursor.executemany.call_args[0]
+        assert "ON DUPLICATE KEY UPDATE" in sql
+        assert rows == [
+            (4, datetime(2024, 1, 1, 9), 1, 12),
+            (4, datetime(2024, 1, 1, 9, 30), 1, 12),
+        ]
+        cursor.execute.assert_not_called()
+
+    def test_removal_prunes_empty_buckets(self):
+        """Test negative deltas delete buckets that dropped to zero."""
+        cursor = MagicMock()
+        task = {
+            "location_id": 4,
+            "scheduled_time": datetime(2024, 1, 1, 9),
+            "end_time": None,
+            "active_chemical": True,
+        }
+
+        apply_task(cursor, task, -1)
+
+        _, rows = cursor.executemany.call_args[0]
+        assert rows[0] == (4, datetime(2024, 1, 1, 9), -1, -1)
+        sql, _ = cursor.execute.call_args[0]
+        assert sql.startswith("DELETE FROM LocationOccupancy")
+
+    def test_long_task_is_not_bucketed(self):
+        """Test a task longer than LONG_TASK_DURATION writes no bucket rows."""
+        cursor = MagicMock()
+        task = {
+            "location_id": 4,
+            "scheduled_time": datetime(2024, 1, 1, 9),
+            "end_time": datetime(2025, 1, 1, 9),
+            "active_chemical": True,
+        }
+
+        apply_task(cursor, task)
+
+        cursor.executemany.assert_not_called()
+
+    def test_unplaced_activity_is_ignored(self):
+        """Test activities without a location or time occupy nothing."""
+        cursor = MagicMock()
+
+        apply_activity(cursor, {"location_id": None, "time": datetime(2024, 1, 1)})
+
+        cursor.executemany.assert_not_called()
+
+
+class TestChecks:
+    """Tests for the booking and capacity checks."""
+
+    def test_booking_conflicts_with_activity_or_chemical(self):
+        """Test only activities and chemical cleanings block a booking."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [
+                _bucket(9, maintenance_count=1),
+                _bucket(9, 30, maintenance_count=1, chemical_count=1),
+            ],
+            [],
+        ]
+
+        with pytest.raises(OccupancyConflict) as exc:
+            check_booking(cursor, 4, datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10))
+
+        assert len(exc.value.buckets) == 1
+        assert exc.value.buckets[0]["chemical_count"] == 1
+
+    def test_booking_free(self):
+        """Test a window with only regular maintenance is bookable."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[_bucket(9, maintenance_count=1)], []]
+
+        check_booking(cursor, 4, datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10))
+
+    def test_long_task_occupies_window_buckets(self):
+        """Test a long-running chemical task fills only the requested window."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [_bucket(9, activity_count=1)],
+            [
+                {
+                    "scheduled_time": datetime(2023, 6, 1),
+                    "end_time": datetime(2025, 6, 1),
+                    "active_chemical": True,
+                }
+            ],
+        ]
+
+        rows = occupancy(cursor, 4, datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10))
+
+        assert [(r["bucket_start"].minute, r["chemical_count"]) for r in rows] == [
+            (0, 1),
+            (30, 1),
+        ]
+        assert rows[0]["activity_count"] == 1
+        sql, params = cursor.execute.call_args[0]
+        assert "long_running = TRUE" in sql
+        assert params == (4, datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 9))
+
+    def test_capacity(self):
+        """Test a participant is rejected once any bucket is full."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [_bucket(9, activity_count=1, participant_count=30)],
+            [],
+        ] * 2
+        activity = {"location_id": 4, "time": datetime(2024, 1, 1, 9)}
+
+        check_capacity(cursor, activity, 31)
+        with pytest.raises(OccupancyConflict, match="Capacity: 30"):
+            check_capacity(cursor, activity, 30)
+
+    def test_unlimited_capacity_skips_lookup(self):
+        """Test locations without a capacity are not checked."""
+        cursor = MagicMock()
+
+        check_capacity(cursor, {"location_id": 4, "time": datetime(2024, 1, 1)}, None)
+
+        cursor.execute.assert_not_called()
+
+
+class TestRebuild:
+    """Tests for recomputing the table from source rows."""
+
+    def test_rebuild_merges_sources(self):
+        """Test activities and tasks in the same bucket share one row."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [("A1", 4, datetime(2024, 1, 1, 9), 30, 5)],
+            [(4, datetime(2024, 1, 1, 9, 10), datetime(2024, 1, 1, 9, 20), 1)],
+        ]
+
+        rebuild(cursor)
+
+        sql, rows = cursor.executemany.call_args[0]
+        assert sql.startswith("INSERT INTO LocationOccupancy")
+        assert rows == [(4, datetime(2024, 1, 1, 9), 1, 5, 1, 1)]
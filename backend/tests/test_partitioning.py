@@ -0,0 +1,124 @@
+"""
+Unit tests for backend/partitioning.py.
+"""
+
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from partitioning import (
+    PartitionError,
+    archive,
+    enable,
+    extend,
+    months,
+    partition_definitions,
+)
+
+
+def _statements(cursor):
+    return [c[0][0] for c in cursor.execute.call_args_list]
+
+
+class TestMonths:
+    """Tests for the monthly partition bounds."""
+
+    def test_months_cross_year(self):
+        """Test months run from the first month to the last, inclusive."""
+        assert months(datetime(2023, 11, 17, 9), date(2024, 1, 1)) == [
+            date(2023, 11, 1),
+            date(2023, 12, 1),
+            date(2024, 1, 1),
+        ]
+
+    def test_definitions_end_with_catch_all(self):
+        """Test each month is bounded by the next one and pmax takes the rest."""
+        assert partition_definitions([date(2023, 12, 1)]) == [
+            "PARTITION p202312 VALUES LESS THAN ('2024-01-01')",
+            "PARTITION pmax VALUES LESS THAN (MAXVALUE)",
+        ]
+
+
+class TestEnable:
+    """Tests for converting a table."""
+
+    def test_enable_drops_foreign_keys_then_partitions(self):
+        """Test constraints go before the key change and the partitioning."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [],
+            [{"table_name": "ChemicalHazard", "name": "ChemicalHazard_ibfk_1"}],
+        ]
+        cursor.fetchone.side_effect = [
+            {"unscheduled": 0},
+            {"first": datetime(2024, 1, 5)},
+        ]
+
+        names = enable(cursor, "Maintenance", ahead=1, today=date(2024, 2, 10))
+
+        assert names == ["p202401", "p202402", "p202403", "pmax"]
+        statements = _statements(cursor)
+        assert statements[-3] == (
+            "ALTER TABLE ChemicalHazard DROP FOREIGN KEY ChemicalHazard_ibfk_1"
+        )
+        assert "ADD PRIMARY KEY (maintenance_id, scheduled_time)" in statements[-2]
+        assert statements[-1].startswith(
+            "ALTER TABLE Maintenance PARTITION BY RANGE COLUMNS (scheduled_time)"
+        )
+
+    def test_enable_rejects_unscheduled_rows(self):
+        """Test NULL times are reported instead of failing half-way."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        cursor.fetchone.return_value = {"unscheduled": 3}
+
+        with pytest.raises(PartitionError):
+            enable(cursor, "Activity")
+
+        assert not any(s.startswith("ALTER") for s in _statements(cursor))
+
+
+class TestExtendAndArchive:
+    """Tests for partition maintenance."""
+
+    def test_extend_splits_pmax(self):
+        """Test missing months are reorganized out of the catch-all."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            {"name": "p202401", "rows": 10},
+            {"name": "pmax", "rows": 0},
+        ]
+
+        added = extend(cursor, "Activity", ahead=1, today=date(2024, 2, 3))
+
+        assert added == ["p202402", "p202403"]
+        assert _statements(cursor)[-1].startswith(
+            "ALTER TABLE Activity REORGANIZE PARTITION pmax INTO"
+        )
+
+    def test_archive_exchanges_old_months(self):
+        """Test old months are swapped out, dependents moved, partition dropped."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [
+                {"name": "p202312", "rows": 5},
+                {"name": "p202401", "rows": 8},
+                {"name": "pmax", "rows": 0},
+            ],
+            [],  # archive table is not partitioned
+            [],  # and empty
+        ]
+
+        archived = archive(cursor, "Activity", date(2024, 1, 1))
+
+        assert archived == ["p202312"]
+        statements = _statements(cursor)
+        assert (
+            "ALTER TABLE Activity EXCHANGE PARTITION p202312 "
+            "WITH TABLE ActivityArchive_p202312"
+        ) in statements
+        assert any(
+            s.startswith("INSERT IGNORE INTO ParticipationArchive_p202312")
+            for s in statements
+        )
+        assert statements[-1] == "ALTER TABLE Activity DROP PARTITION p202312"
@@ -0,0 +1,189 @@
+"""
+Unit tests for backend/purge.py and soft deletes in the API.
+"""
+
+import logging
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app import purge_tombstones
+from purge import PurgeWorker, soft_delete, tombstones
+
+
+def _worker(batches, idle_seconds=0):
+    purge_batch = MagicMock(side_effect=batches)
+    worker = PurgeWorker(purge_batch, interval=60, idle_seconds=idle_seconds, pause=0)
+    return worker, purge_batch
+
+
+class TestSoftDelete:
+    """Tests for marking and finding deleted rows."""
+
+    def test_soft_delete_releases_in_same_transaction(self):
+        """Test a person's slots and bookings are released before the stamp."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+
+        assert soft_delete(cursor, "persons", "P001")
+
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        assert statements[0].endswith("deleted_at IS NULL FOR UPDATE")
+        assert any(s.startswith("UPDATE RoleQuota") for s in statements)
+        assert statements[-2].startswith("UPDATE Activity SET deleted_at")
+        assert statements[-1].startswith("UPDATE Person SET deleted_at")
+        assert "deleted_at IS NULL" in statements[-1]
+        cursor.execute.assert_called_with(statements[-1], ("P001",))
+
+    def test_soft_delete_activity_frees_booking(self):
+        """Test a deleted activity gives back its occupancy buckets."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            {
+                "activity_id": "A1",
+                "location_id": 1,
+                "time": datetime(2024, 5, 1, 10),
+                "duration_minutes": 60,
+                "participants": 3,
+            }
+        ]
+
+        assert soft_delete(cursor, "activities", "A1")
+
+        sql, rows = cursor.executemany.call_args[0]
+        assert sql.startswith("INSERT INTO LocationOccupancy")
+        assert all(row[2:] == (-1, -3) for row in rows)
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        assert statements[-1].startswith("UPDATE Activity SET deleted_at")
+
+    def test_soft_delete_missing(self):
+        """Test an unknown or already deleted row is reported."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = None
+
+        assert not soft_delete(cursor, "activities", "A404")
+        cursor.execute.assert_called_once()
+
+    def test_tombstones_oldest_first(self):
+        """Test tombstones are locked in batches, oldest first."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [{"id": "A1"}, {"id": "A2"}]
+
+        assert tombstones(cursor, "activities", 50, grace_seconds=30) == ["A1", "A2"]
+        sql, params = cursor.execute.call_args[0]
+        assert "ORDER BY deleted_at LIMIT %s FOR UPDATE" in sql
+        assert params == (30, 50)
+
+
+class TestPurgeWorker:
+    """Tests for batching and load detection."""
+
+    def test_runs_until_empty(self):
+        """Test batches are purged until none is left."""
+        worker, purge_batch = _worker([100, 100, 7, 0])
+
+        assert worker.run_once() == 207
+        assert purge_batch.call_count == 4
+
+    def test_stops_when_requests_arrive(self):
+        """Test a run ends after the current batch once the server is busy."""
+        worker, purge_batch = _worker([100, 100], idle_seconds=60)
+        worker.touch()
+
+        assert worker.run_once() == 100
+        purge_batch.assert_called_once()
+
+    def test_due_when_idle_or_deferred_too_long(self):
+        """Test a busy server is only purged after max_defer_seconds."""
+        worker, _ = _worker([], idle_seconds=60)
+        worker.touch()
+        assert not worker.due()
+
+        worker.last_run -= worker.max_defer_seconds
+        assert worker.due()
+
+    def test_named_worker(self, caplog):
+        """Test another job logs and names its thread as itself."""
+        worker = PurgeWorker(
+            MagicMock(side_effect=[3] + [0] * 1000),
+            interval=0.01,
+            idle_seconds=0,
+            pause=0,
+            name="archive-worker",
+            done_message="Archived {count} completed maintenance tasks",
+        )
+
+        with caplog.at_level(logging.INFO, logger="purge"):
+            worker.start()
+            assert worker._thread.name == "archive-worker"
+            for _ in range(200):
+                if "Archived 3" in caplog.text:
+                    break
+                time.sleep(0.01)
+            worker.stop()
+
+        assert "Archived 3 completed maintenance tasks" in caplog.text
+        assert "soft-deleted" not in caplog.text
+
+    def test_disabled(self):
+        """Test an interval of 0 never starts the thread."""
+        worker = PurgeWorker(MagicMock(), interval=0, idle_seconds=0)
+
+        worker.start()
+
+        assert worker._thread is None
+
+
+class TestSoftDeleteEndpoints:
+    """Tests for DELETE on persons/activities and the purge batch."""
+
+    def test_delete_person_touches_no_dependents(self, client, mock_get_db_connection):
+        """Test DELETE /api/persons/<id> deletes no dependent rows."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        response = client.delete("/api/persons/P001")
+
+        assert response.status_code == 200
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert not any(s.startswith("DELETE") for s in statements)
+        assert any(s.startswith("UPDATE Person SET deleted_at") for s in statements)
+        mock_conn.commit.assert_called_once()
+
+    def test_participation_needs_live_rows(self, client, mock_get_db_connection):
+        """Test nobody joins a deleted activity and no deleted person joins."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchone.return_value = None
+        mock_cursor.rowcount = 0
+
+        response = client.post(
+            "/api/participations",
+            json={"personal_id": "P001", "activity_id": "A1"},
+        )
+
+        assert response.status_code == 400
+        sql = mock_cursor.execute.call_args[0][0]
+        assert "p.deleted_at IS NULL AND a.deleted_at IS NULL" in sql
+        mock_conn.commit.assert_not_called()
+
+    def test_purge_batch_cascades(self, mock_get_db_connection):
+        """Test a purge batch removes tombstones with their dependents."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.side_effect = [[{"id": "P1"}], [], []]
+        mock_cursor.rowcount = 1
+
+        assert purge_tombstones() == 1
+
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert any(s.startswith("DELETE FROM Participation") for s in statements)
+        assert any(s.startswith("DELETE FROM Person") for s in statements)
+        mock_conn.commit.assert_called_once()
+
+    def test_purge_nothing_left(self, mock_get_db_connection):
+        """Test an empty purge commits nothing."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = []
+
+        assert purge_tombstones() == 0
+
+        mock_conn.commit.assert_not_called()
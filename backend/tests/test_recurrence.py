@@ -0,0 +1,135 @@
+"""
+Unit tests for backend/recurrence.py.
+"""
+
+from datetime import datetime, timedelta
+
+from recurrence import OccurrenceIndex, Rule, occurrences, parse_frequency
+
+
+class TestParseFrequency:
+    """Tests for turning frequency text into rules."""
+
+    def test_standard_values(self):
+        """Test the values offered by the UI."""
+        assert parse_frequency("Daily") == Rule("day")
+        assert parse_frequency("Weekly") == Rule("week")
+        assert parse_frequency("Monthly") == Rule("month")
+        assert parse_frequency("Yearly") == Rule("year")
+        assert parse_frequency("One-off") is None
+        assert parse_frequency(None) is None
+
+    def test_variants(self):
+        """Test aliases and 'every N units' phrases."""
+        assert parse_frequency("Fortnightly") == Rule("week", 2)
+        assert parse_frequency("quarterly") == Rule("month", 3)
+        assert parse_frequency("Every 3 days") == Rule("day", 3)
+        assert parse_frequency("every  month") == Rule("month")
+        assert parse_frequency("when needed") is None
+
+
+class TestOccurrences:
+    """Tests for lazily expanding a rule over a window."""
+
+    def test_weekly_window(self):
+        """Test only occurrences overlapping the window are produced."""
+        start = datetime(2024, 1, 1, 9)
+        result = list(
+            occurrences(
+                start,
+                start + timedelta(hours=2),
+                Rule("week"),
+                datetime(2024, 3, 1),
+                datetime(2024, 3, 20),
+            )
+        )
+
+        assert [o[0] for o in result] == [
+            datetime(2024, 3, 4, 9),
+            datetime(2024, 3, 11, 9),
+            datetime(2024, 3, 18, 9),
+        ]
+        assert result[0][1] == datetime(2024, 3, 4, 11)
+
+    def test_occurrence_straddling_window_start(self):
+        """Test an occurrence still running at the window start is included."""
+        start = datetime(2024, 1, 1, 23)
+        result = list(
+            occurrences(
+                start,
+                start + timedelta(hours=2),
+                Rule("day"),
+                datetime(2024, 1, 5),
+                datetime(2024, 1, 5, 12),
+            )
+        )
+
+        assert [o[0] for o in result] == [datetime(2024, 1, 4, 23)]
+
+    def test_monthly_clamps_to_month_end(self):
+        """Test monthly occurrences anchored on the 31st do not drift."""
+        start = datetime(2024, 1, 31, 8)
+        result = list(
+            occurrences(start, None, Rule("month"), start, datetime(2024, 5, 1))
+        )
+
+        assert [o[0].date().isoformat() for o in result] == [
+            "2024-01-31",
+            "2024-02-29",
+            "2024-03-31",
+            "2024-04-30",
+        ]
+
+    def test_one_off(self):
+        """Test a task without a rule occurs once."""
+        start = datetime(2024, 1, 1, 9)
+        window = (datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert len(list(occurrences(start, None, None, *window))) == 1
+        assert (
+            list(occurrences(start, None, None, datetime(2024, 1, 2), window[1])) == []
+        )
+
+    def test_far_window_is_not_stepped(self):
+        """Test expansion jumps to the window instead of iterating from the anchor."""
+        start = datetime(2000, 1, 1)
+        rule = Rule("day")
+        calls = []
+        original = rule.nth
+        rule.nth = lambda anchor, n: calls.append(n) or original(anchor, n)
+
+        list(occurrences(start, None, rule, datetime(2024, 1, 1), datetime(2024, 1, 3)))
+
+        assert len(calls) <= 4
+
+
+class TestOccurrenceIndex:
+    """Tests for range queries over indexed occurrences."""
+
+    def test_between(self):
+        """Test sub-range queries return overlapping occurrences in order."""
+        tasks = [
+            {
+                "maintenance_id": 1,
+                "frequency": "Daily",
+                "scheduled_time": datetime(2024, 1, 1, 9),
+                "end_time": datetime(2024, 1, 1, 10),
+            },
+            {
+                "maintenance_id": 2,
+                "frequency": "Weekly",
+                "scheduled_time": datetime(2024, 1, 3, 8),
+                "end_time": datetime(2024, 1, 3, 20),
+            },
+            {"maintenance_id": 3, "frequency": "Daily", "scheduled_time": None},
+        ]
+        index = OccurrenceIndex(tasks, datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert len(index) == 31 + 5
+        found = index.between(datetime(2024, 1, 10, 9, 30), datetime(2024, 1, 10, 12))
+        assert [(o[0], o[2]["maintenance_id"]) for o in found] == [
+            (datetime(2024, 1, 10, 8), 2),
+            (datetime(2024, 1, 10, 9), 1),
+        ]
+        assert index.covers(datetime(2024, 1, 5), datetime(2024, 1, 6))
+        assert not index.covers(datetime(2024, 1, 5), datetime(2024, 2, 6))
@@ -0,0 +1,122 @@
+"""
+Unit tests for backend/scheduling.py overlap detection.
+"""
+
+from datetime import datetime
+
+import pytest
+from scheduling import ScheduleError, find_conflicts, parse_time, task_interval
+
+
+def _booking(kind, id, start, end, location_id=1, building="A", chemical=False):
+    return {
+        "kind": kind,
+        "id": id,
+        "type": "Cleaning" if kind == "maintenance" else "Lecture",
+        "location_id": location_id,
+        "building": building,
+        "room": "101",
+        "start": datetime(2024, 1, 1, *start),
+        "end": datetime(2024, 1, 1, *end),
+        "chemical": chemical,
+    }
+
+
+class TestFindConflicts:
+    """Tests for the sort-and-sweep conflict report."""
+
+    def test_overlapping_tasks_in_same_location(self):
+        """Test overlapping maintenance tasks are reported once."""
+        bookings = [
+            _booking("maintenance", "2", (10,), (12,)),
+            _booking("maintenance", "1", (9,), (11,)),
+            _booking("maintenance", "3", (12,), (13,)),
+        ]
+
+        conflicts = find_conflicts(bookings)
+
+        assert len(conflicts) == 1
+        assert conflicts[0]["first"]["id"] == "1"
+        assert conflicts[0]["second"]["id"] == "2"
+        assert conflicts[0]["overlap_start"] == datetime(2024, 1, 1, 10)
+        assert conflicts[0]["overlap_end"] == datetime(2024, 1, 1, 11)
+
+    def test_back_to_back_tasks_do_not_conflict(self):
+        """Test intervals are half-open."""
+        bookings = [
+            _booking("maintenance", "1", (9,), (10,)),
+            _booking("maintenance", "2", (10,), (11,)),
+        ]
+
+        assert find_conflicts(bookings) == []
+
+    def test_long_task_overlaps_several(self):
+        """Test a long booking stays active across later ones."""
+        bookings = [
+            _booking("maintenance", "1", (8,), (18,)),
+            _booking("maintenance", "2", (9,), (10,)),
+            _booking("maintenance", "3", (11,), (12,)),
+        ]
+
+        pairs = {
+            (c["first"]["id"], c["second"]["id"]) for c in find_conflicts(bookings)
+        }
+
+        assert pairs == {("1", "2"), ("1", "3")}
+
+    def test_only_chemical_tasks_conflict_with_activities(self):
+        """Test activities conflict with chemical maintenance only."""
+        bookings = [
+            _booking("activity", "A1", (9,), (10,)),
+            _booking("maintenance", "1", (9, 30), (10, 30)),
+            _booking("activity", "A2", (14,), (15,)),
+            _booking("maintenance", "2", (14, 30), (15, 30), chemical=True),
+            _booking("activity", "A3", (14, 15), (15, 15)),
+        ]
+
+        pairs = {
+            (c["first"]["id"], c["second"]["id"]) for c in find_conflicts(bookings)
+        }
+
+        assert pairs == {("A2", "2"), ("A3", "2")}
+
+    def test_scopes(self):
+        """Test location scope separates rooms and building scope joins them."""
+        bookings = [
+            _booking("maintenance", "1", (9,), (11,), location_id=1),
+            _booking("maintenance", "2", (10,), (12,), location_id=2),
+        ]
+
+        assert find_conflicts(bookings, "location") == []
+        conflicts = find_conflicts(bookings, "building")
+        assert len(conflicts) == 1
+        assert conflicts[0]["building"] == "A"
+
+
+class TestScheduleParsing:
+    """Tests for schedule validation helpers."""
+
+    def test_parse_time(self):
+        """Test ISO values parse and empty values become None."""
+        assert parse_time("2024-01-15T10:00", "t") == datetime(2024, 1, 15, 10)
+        assert parse_time("", "t") is None
+        with pytest.raises(ScheduleError):
+            parse_time("soon", "t")
+
+    def test_parse_time_with_offset_is_naive_local(self):
+        """Test values with a UTC offset become naive local times."""
+        from datetime import timezone
+
+        parsed = parse_time("2025-01-01T00:00+08:00", "t")
+
+        assert parsed.tzinfo is None
+        assert parsed == (
+            datetime(2024, 12, 31, 16, tzinfo=timezone.utc)
+            .astimezone()
+            .replace(tzinfo=None)
+        )
+
+    def test_end_before_start_rejected(self):
+        """Test a task must end after it starts."""
+        with pytest.raises(ScheduleError):
+            task_interval(datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 9))
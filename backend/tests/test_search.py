@@ -0,0 +1,71 @@
+"""
+Unit tests for backend/search.py query building.
+"""
+
+from unittest.mock import MagicMock
+
+from search import search, words
+
+
+class TestWords:
+    """Tests for splitting the search text."""
+
+    def test_operators_are_dropped(self):
+        """Test boolean-mode and LIKE metacharacters never reach the query."""
+        assert words('+jo* -"do"e 50%_off') == ["jo", "do", "e", "50", "off"]
+
+    def test_empty(self):
+        """Test blank input yields no words."""
+        assert words("  ") == []
+        assert words(None) == []
+
+
+class TestSearch:
+    """Tests for the full-text query and its prefix fallback."""
+
+    def test_fulltext_prefix_expression(self):
+        """Test every word becomes a required prefix term."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [{"kind": "person", "id": "P001"}]
+
+        rows = search(cursor, "john doe", kinds=("person",), limit=5)
+
+        assert rows == [{"kind": "person", "id": "P001"}]
+        assert cursor.execute.call_count == 1
+        sql, params = cursor.execute.call_args[0]
+        assert "MATCH(name) AGAINST (%s IN BOOLEAN MODE)" in sql
+        assert params == ("+john* +doe*", "+john* +doe*", 5, 5)
+
+    def test_short_word_uses_prefix_match(self):
+        """Test words below the full-text token size use LIKE prefixes."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+
+        search(cursor, "Bl", kinds=("location",), limit=3)
+
+        assert cursor.execute.call_count == 1
+        sql, params = cursor.execute.call_args[0]
+        assert "MATCH" not in sql
+        assert "building LIKE %s OR room LIKE %s OR campus LIKE %s" in sql
+        assert params == ("Bl%", "Bl%", "Bl%", "Bl%", 3, 3)
+
+    def test_falls_back_when_fulltext_finds_nothing(self):
+        """Test a stopword or unindexed id is still found by prefix."""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[], [{"kind": "person", "id": "P001"}]]
+
+        rows = search(cursor, "P00", kinds=("person",))
+
+        assert rows == [{"kind": "person", "id": "P001"}]
+        assert "LIKE" in cursor.execute.call_args_list[1][0][0]
+
+    def test_union_of_kinds(self):
+        """Test each kind is a separately limited branch of one query."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [{"kind": "company"}]
+
+        search(cursor, "clean")
+
+        sql, _ = cursor.execute.call_args[0]
+        assert sql.count("UNION ALL") == 2
+        assert "FROM ExternalCompany" in sql
@@ -0,0 +1,125 @@
+"""
+Unit tests for backend/serialization.py and compressed/columnar responses.
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+import serialization
+from app import app
+from flask.json.provider import DefaultJSONProvider
+from serialization import OrjsonProvider, choose_encoding, to_columnar
+
+
+def _maintenance_rows(count):
+    return [
+        {
+            "maintenance_id": i,
+            "type": "Cleaning",
+            "frequency": "Daily",
+            "location_id": 1,
+            "active_chemical": False,
+            "contracted_company_id": None,
+            "scheduled_time": datetime(2024, 1, 15, 10, 0),
+            "building": "Block A",
+            "room": "101",
+            "campus": "Main",
+        }
+        for i in range(count)
+    ]
+
+
+class TestOrjsonProvider:
+    """Tests that the fast encoder matches Flask's default output."""
+
+    @pytest.mark.skipif(serialization.orjson is None, reason="orjson not installed")
+    def test_matches_default_provider(self):
+        """Test datetime, date and Decimal values encode like Flask's default."""
+        value = {
+            "b": datetime(2024, 3, 15, 14, 0, 0),
+            "a": date(2024, 3, 15),
+            "count": Decimal("3"),
+            "name": "Block A",
+        }
+        fast = json.loads(OrjsonProvider(app).dumps(value))
+        default = json.loads(DefaultJSONProvider(app).dumps(value))
+        assert fast == default
+
+    @pytest.mark.skipif(serialization.orjson is None, reason="orjson not installed")
+    def test_keys_are_sorted(self):
+        """Test keys are sorted like the default provider."""
+        assert OrjsonProvider(app).dumps({"b": 1, "a": 2}) == '{"a":2,"b":1}'
+
+
+class TestColumnarShape:
+    """Tests for the columnar JSON shape."""
+
+    def test_to_columnar(self):
+        """Test rows are split into a column list and value arrays."""
+        rows = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+        assert to_columnar(rows) == {
+            "columns": ["id", "name"],
+            "rows": [[1, "A"], [2, "B"]],
+        }
+
+    def test_to_columnar_empty(self):
+        """Test an empty result still has both keys."""
+        assert to_columnar([]) == {"columns": [], "rows": []}
+
+    def test_list_endpoint_columnar(self, client, mock_get_db_connection):
+        """Test GET /api/maintenance?shape=columnar returns columns and rows."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = _maintenance_rows(2)
+
+        response = client.get("/api/maintenance?shape=columnar")
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert "maintenance_id" in data["columns"]
+        assert len(data["rows"]) == 2
+
+
+class TestCompression:
+    """Tests for negotiated response compression."""
+
+    def test_choose_encoding_prefers_quality(self):
+        """Test the highest quality supported coding wins."""
+        assert choose_encoding("gzip;q=1.0, identity;q=0.5") == "gzip"
+        assert choose_encoding("identity") is None
+        assert choose_encoding(None) is None
+
+    def test_large_response_is_gzipped(self, client, mock_get_db_connection):
+        """Test responses above the threshold are compressed."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = _maintenance_rows(200)
+
+        response = client.get("/api/maintenance", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        data = json.loads(gzip.decompress(response.data))
+        assert len(data) == 200
+
+    def test_small_response_is_not_compressed(self, client, mock_get_db_connection):
+        """Test responses under the threshold are sent as-is."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = _maintenance_rows(1)
+
+        response = client.get("/api/maintenance", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in response.headers
+        assert len(json.loads(response.data)) == 1
+
+    def test_no_compression_without_accept_encoding(
+        self, client, mock_get_db_connection
+    ):
+        """Test clients that do not advertise gzip get plain JSON."""
+        mock_conn, mock_cursor = mock_get_db_connection
+        mock_cursor.fetchall.return_value = _maintenance_rows(200)
+
+        response = client.get("/api/maintenance")
+
+        assert "Content-Encoding" not in response.headers
@@ -164,6 +164,7 @@ function AppContent() {
                 { key: "type", label: "Type" },
                 { key: "campus", label: "Campus" },
                 { key: "dept_name", label: "Department" },
+                { key: "capacity", label: "Capacity" },
               ]}
               createFields={[
                 {
@@ -234,6 +235,7 @@ function AppContent() {
                   optionLabel: (s) =>
                     `${s.department} - ${s.dept_name || s.school_name}`,
                 },
+                { name: "capacity", label: "Capacity", type: "number" },
               ]}
             />
           }
@@ -264,6 +266,7 @@ function AppContent() {
                         })
                       : "-",
                 },
+                { key: "duration_minutes", label: "Duration (min)" },
                 { key: "organiser_name", label: "Organiser" },
                 { key: "building", label: "Building" },
                 { key: "room", label: "Room" },
@@ -273,6 +276,11 @@ function AppContent() {
                 { name: "activity_id", label: "Activity ID", required: true },
                 { name: "type", label: "Type" },
                 { name: "time", label: "Time", type: "datetime-local" },
+                {
+                  name: "duration_minutes",
+                  label: "Duration (min)",
+                  type: "number",
+                },
                 { name: "organiser_id", label: "Organiser ID", required: true },
                 {
                   name: "building",
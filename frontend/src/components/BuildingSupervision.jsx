@@ -20,9 +20,13 @@ export default function BuildingSupervision() {
     setLoading(true);
     try {
       const [supRes, mgrRes, bldRes] = await Promise.all([
-        fetch(`${API_BASE}/building-supervision`),
-        fetch(`${API_BASE}/persons?role=Mid-level Manager`),
-        fetch(`${API_BASE}/locations`),
+        fetch(`${API_BASE}/building-supervision`, { credentials: "include" }),
+        fetch(`${API_BASE}/persons?role=Mid-level Manager`, {
+          credentials: "include",
+        }),
+        fetch(`${API_BASE}/facets?fields=building`, {
+          credentials: "include",
+        }),
       ]);
 
       const supData = await supRes.json();
@@ -32,11 +36,7 @@ export default function BuildingSupervision() {
       setSupervisions(supData.data || supData || []);
       setManagers(mgrData.data || mgrData || []);
 
-      // Extract unique buildings
-      const uniqueBuildings = [
-        ...new Set((bldData.data || bldData || []).map((l) => l.building)),
-      ];
-      setBuildings(uniqueBuildings);
+      setBuildings((bldData.building || []).map((f) => f.value));
       setError(null);
     } catch (err) {
       setError("Failed to fetch data: " + err.message);
@@ -54,6 +54,7 @@ export default function BuildingSupervision() {
     try {
       const res = await fetch(`${API_BASE}/building-supervision`, {
         method: "POST",
+        credentials: "include",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(formData),
       });
@@ -74,6 +75,7 @@ export default function BuildingSupervision() {
     try {
       const res = await fetch(`${API_BASE}/building-supervision/${id}`, {
         method: "DELETE",
+        credentials: "include",
       });
       if (!res.ok) throw new Error("Failed to delete");
       fetchData();
@@ -13,8 +13,20 @@ import {
   Pie,
   Cell,
 } from "recharts";
+import useChangeFeed from "../context/useChangeFeed";
 
 const API_URL = "http://127.0.0.1:5050/api";
+// Tables the dashboard reports read from.
+const REPORT_TABLES = [
+  "Maintenance",
+  "Location",
+  "Person",
+  "Profile",
+  "Activity",
+  "Participation",
+  "School",
+  "Affiliation",
+];
 const COLORS = [
   "#A6192E",
   "#B08E55",
@@ -36,11 +48,13 @@ export default function Dashboard() {
   const [maintenanceFreq, setMaintenanceFreq] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [changes, setChanges] = useState(0);
+
+  useChangeFeed(REPORT_TABLES, () => setChanges((count) => count + 1));
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        setLoading(true);
         setError(null);
         const [mSum, pSum, aSum, sStats, mFreq] = await Promise.all([
           axios
@@ -72,8 +86,14 @@ export default function Dashboard() {
       }
     };
 
-    fetchData();
-  }, []);
+    if (changes === 0) {
+      fetchData();
+      return undefined;
+    }
+    // Coalesce a burst of changes into one refresh.
+    const timer = setTimeout(fetchData, 500);
+    return () => clearTimeout(timer);
+  }, [changes]);
 
   if (loading) {
     return (
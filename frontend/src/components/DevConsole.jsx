@@ -62,6 +62,11 @@ function DevConsoleContent() {
     return localStorage.getItem("devConsole_error") || null;
   });
   const [loading, setLoading] = useState(false);
+  // Row cap applied by the backend when a result was truncated, else null
+  const [truncatedAt, setTruncatedAt] = useState(null);
+  // "" (off), "explain" or "analyze"; see /api/query "profile" option
+  const [profileMode, setProfileMode] = useState("");
+  const [profile, setProfile] = useState(null);
   const [history, setHistory] = useState(() => {
     const saved = localStorage.getItem("devConsole_history");
     return saved ? JSON.parse(saved) : [];
@@ -112,10 +117,23 @@ function DevConsoleContent() {
     setLoading(true);
     setError(null);
     setResults(null);
+    setTruncatedAt(null);
+    setProfile(null);
 
     try {
-      const res = await axios.post(`${API_URL}/query`, { query });
-      setResults(res.data);
+      const isSelect = query.trim().toUpperCase().startsWith("SELECT");
+      const body =
+        profileMode && isSelect ? { query, profile: profileMode } : { query };
+      const res = await axios.post(`${API_URL}/query`, body);
+      if (body.profile) {
+        setResults(res.data.rows);
+        setProfile(res.data.profile);
+      } else {
+        setResults(res.data);
+      }
+      if (res.headers?.["x-result-truncated"] === "true") {
+        setTruncatedAt(res.headers["x-row-limit"]);
+      }
       addToHistory(query, "success");
     } catch (err) {
       console.error("Query failed:", err);
@@ -373,19 +391,31 @@ function DevConsoleContent() {
               >
                 <Trash2 size={14} /> Clear
               </button>
-              <button
-                onClick={executeQuery}
-                disabled={loading || !query.trim()}
-                style={{ height: "32px", padding: "0 20px" }}
-              >
-                {loading ? (
-                  "Running..."
-                ) : (
-                  <>
-                    <Play size={16} /> Run Query
-                  </>
-                )}
-              </button>
+              <div style={{ display: "flex", gap: "10px" }}>
+                <select
+                  value={profileMode}
+                  onChange={(e) => setProfileMode(e.target.value)}
+                  title="Profile SELECT queries"
+                  style={{ height: "32px", fontSize: "13px" }}
+                >
+                  <option value="">No profiling</option>
+                  <option value="explain">EXPLAIN (JSON)</option>
+                  <option value="analyze">EXPLAIN ANALYZE</option>
+                </select>
+                <button
+                  onClick={executeQuery}
+                  disabled={loading || !query.trim()}
+                  style={{ height: "32px", padding: "0 20px" }}
+                >
+                  {loading ? (
+                    "Running..."
+                  ) : (
+                    <>
+                      <Play size={16} /> Run Query
+                    </>
+                  )}
+                </button>
+              </div>
             </div>
           </div>
 
@@ -435,6 +465,70 @@ function DevConsoleContent() {
               </div>
             )}
 
+            {truncatedAt && (
+              <div
+                style={{
+                  padding: "10px 15px",
+                  color: "#92400e",
+                  background: "#fffbeb",
+                  borderBottom: "1px solid #fde68a",
+                  fontSize: "13px",
+                }}
+              >
+                Showing the first {truncatedAt} rows. The result was truncated;
+                add a WHERE or LIMIT clause to narrow it down.
+              </div>
+            )}
+
+            {profile && (
+              <div
+                style={{
+                  padding: "10px 15px",
+                  background: "#f8fafc",
+                  borderBottom: "1px solid #e2e8f0",
+                  fontSize: "13px",
+                  color: "#334155",
+                  maxHeight: "40%",
+                  overflow: "auto",
+                }}
+              >
+                <div style={{ display: "flex", gap: "20px", flexWrap: "wrap" }}>
+                  <span>Elapsed: {profile.elapsed_ms} ms</span>
+                  {profile.statement && (
+                    <>
+                      <span>Server: {profile.statement.server_ms} ms</span>
+                      <span>
+                        Rows examined: {profile.statement.rows_examined}
+                      </span>
+                      <span>Rows sent: {profile.statement.rows_sent}</span>
+                      {profile.statement.no_index_used > 0 && (
+                        <span style={{ color: "#b45309" }}>No index used</span>
+                      )}
+                    </>
+                  )}
+                </div>
+                {Object.keys(profile.status).length > 0 && (
+                  <div style={{ marginTop: "6px", fontFamily: "monospace" }}>
+                    {Object.entries(profile.status)
+                      .map(([name, delta]) => `${name} +${delta}`)
+                      .join("  ")}
+                  </div>
+                )}
+                <pre
+                  style={{
+                    margin: "8px 0 0",
+                    whiteSpace: "pre-wrap",
+                    fontFamily: "monospace",
+                    fontSize: "12px",
+                  }}
+                >
+                  {typeof profile.plan === "string"
+                    ? profile.plan
+                    : JSON.stringify(profile.plan, null, 2)}
+                </pre>
+              </div>
+            )}
+
             <div style={{ flex: 1, overflow: "auto" }}>
               {results ? (
                 Array.isArray(results) ? (
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback } from "react";
 import axios from "axios";
 import { Plus, Trash2, Edit2, Save, X, Download, Upload } from "lucide-react";
 import { useRole } from "../context/RoleContext";
+import useChangeFeed, { ENDPOINT_TABLES } from "../context/useChangeFeed";
 
 const API_URL = "http://127.0.0.1:5050/api";
 
@@ -97,6 +98,17 @@ export default function EntityManager({
     fetchDynamicOptions();
   }, [fetchItems, fetchDynamicOptions]);
 
+  // Deletes are applied locally; anything else refetches the list.
+  useChangeFeed([ENDPOINT_TABLES[endpoint]], (event) => {
+    if (event.op === "delete" && typeof event.key !== "object") {
+      setItems((current) =>
+        current.filter((item) => String(item[idField]) !== String(event.key)),
+      );
+    } else {
+      fetchItems();
+    }
+  });
+
   const handleCreate = async (e) => {
     e.preventDefault();
     try {
@@ -9,6 +9,10 @@ export default function SafetySearch() {
   const [selectedBuilding, setSelectedBuilding] = useState("");
   const [startTime, setStartTime] = useState("");
   const [endTime, setEndTime] = useState("");
+  // Search the calendar of recurring occurrences rather than first dates
+  const [expand, setExpand] = useState(false);
+  // Only chemical cleanings whose interval overlaps the window
+  const [hazardsOnly, setHazardsOnly] = useState(false);
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
@@ -19,12 +23,10 @@ export default function SafetySearch() {
 
   const fetchBuildings = async () => {
     try {
-      // Fetch unique buildings from locations
-      const res = await axios.get(`${API_URL}/locations`);
-      const uniqueBuildings = [
-        ...new Set(res.data.map((l) => l.building).filter(Boolean)),
-      ];
-      setBuildings(uniqueBuildings);
+      const res = await axios.get(`${API_URL}/facets`, {
+        params: { fields: "building" },
+      });
+      setBuildings(res.data.building.map((f) => f.value));
     } catch (err) {
       console.error("Failed to fetch buildings", err);
     }
@@ -39,8 +41,10 @@ export default function SafetySearch() {
       if (selectedBuilding) params.building = selectedBuilding;
       if (startTime) params.start_time = startTime;
       if (endTime) params.end_time = endTime;
+      if (expand && !hazardsOnly) params.expand = true;
 
-      const res = await axios.get(`${API_URL}/search/safety`, { params });
+      const endpoint = hazardsOnly ? "search/hazards" : "search/safety";
+      const res = await axios.get(`${API_URL}/${endpoint}`, { params });
       setResults(res.data);
     } catch (err) {
       setError("Search failed: " + (err.response?.data?.error || err.message));
@@ -163,6 +167,39 @@ export default function SafetySearch() {
               }}
             />
           </div>
+          <label
+            style={{
+              display: "flex",
+              alignItems: "center",
+              gap: "6px",
+              padding: "8px 0",
+              whiteSpace: "nowrap",
+            }}
+          >
+            <input
+              type="checkbox"
+              checked={expand}
+              disabled={hazardsOnly}
+              onChange={(e) => setExpand(e.target.checked)}
+            />
+            Include recurring occurrences
+          </label>
+          <label
+            style={{
+              display: "flex",
+              alignItems: "center",
+              gap: "6px",
+              padding: "8px 0",
+              whiteSpace: "nowrap",
+            }}
+          >
+            <input
+              type="checkbox"
+              checked={hazardsOnly}
+              onChange={(e) => setHazardsOnly(e.target.checked)}
+            />
+            Active hazards only
+          </label>
           <button
             type="submit"
             disabled={loading}
@@ -0,0 +1,42 @@
+import { useEffect, useRef } from "react";
+
+const STREAM_URL = "http://127.0.0.1:5050/api/changes/stream";
+
+// Backend table behind each EntityManager endpoint.
+export const ENDPOINT_TABLES = {
+  persons: "Person",
+  schools: "School",
+  locations: "Location",
+  activities: "Activity",
+  maintenance: "Maintenance",
+  participations: "Participation",
+  affiliations: "Affiliation",
+};
+
+/**
+ * Subscribe to the server's change feed.
+ *
+ * `onChange(event)` is called for every event on one of `tables`
+ * (`{table, op, key, version}`) and with `{op: "reset"}` when events were
+ * dropped, in which case everything shown should be refetched. The browser
+ * reconnects on its own and resumes from the last event it received.
+ */
+export default function useChangeFeed(tables, onChange) {
+  const handler = useRef(onChange);
+  useEffect(() => {
+    handler.current = onChange;
+  }, [onChange]);
+
+  const key = tables.join(",");
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return undefined;
+    const watched = new Set(key.split(","));
+    const source = new EventSource(STREAM_URL, { withCredentials: true });
+    source.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (watched.has(event.table)) handler.current(event);
+    };
+    source.addEventListener("reset", () => handler.current({ op: "reset" }));
+    return () => source.close();
+  }, [key]);
+}
@@ -1,8 +1,13 @@
 import { StrictMode } from "react";
 import { createRoot } from "react-dom/client";
+import axios from "axios";
 import "./index.css";
 import App from "./App.jsx";
 
+// Send the backend's read-your-writes cookie so reads after a write are
+// served by the primary rather than a lagging replica.
+axios.defaults.withCredentials = true;
+
 createRoot(document.getElementById("root")).render(
   <StrictMode>
     <App />